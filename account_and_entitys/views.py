@@ -49,7 +49,7 @@ from .models import XX_ACCOUNT_ENTITY_LIMIT
 from .serializers import AccountEntityLimitSerializer
 from django.db.models import CharField
 from django.db.models.functions import Cast
-from django.db.models import Q
+from django.db.models import Exists, OuterRef, Q
 from .utils import get_oracle_report_data, get_mapping_for_fusion_data
 from .oracle.oracle_balance_report_manager import OracleBalanceReportManager
 
@@ -430,14 +430,22 @@ class SegmentListView(APIView):
         If the mapping has Same='yes', only return segments with Same='yes'.
         If the mapping has Same='no', only return segments with Same='no'.
     - bypass_access_filter: Optional (superadmin only). Set to 'true' to bypass user access filter.
+    - page_size / after: Optional keyset pagination. Returns at most page_size
+        segments (ordered by code) with code > after, plus "next_after" to pass
+        for the next page. Without either parameter all segments are returned.
+    
+    Access is filtered with a semi-join against the user's materialized access
+    rows (XX_UserAccessibleSegment) or their XX_UserSegmentAccess grants, never
+    with an IN list of granted codes, so large grants stay cheap.
     """
 
     permission_classes = [IsAuthenticated]
     pagination_class = EntityPagination
+    max_keyset_page_size = 1000
 
     def get(self, request):
-        from user_management.managers import UserSegmentAccessManager
-        from user_management.managers.security_group_manager import SecurityGroupManager
+        from user_management.access_cache import user_access_cache
+        from user_management.models import XX_UserSegmentAccess
         
         search_query = request.query_params.get("search", None)
         filter_type = request.query_params.get("filter", "all").lower()
@@ -501,7 +509,7 @@ class SegmentListView(APIView):
         # SuperAdmin can bypass with bypass_access_filter=true parameter
         # All other users (including superadmin without bypass) are filtered by their assigned segments
         user_access_applied = False
-        user_allowed_segment_codes = []
+        user_allowed_segments_count = None
         access_source = None
         
         # Determine if we should apply access filter
@@ -509,33 +517,30 @@ class SegmentListView(APIView):
         should_apply_access_filter = not (is_superadmin and bypass_access_filter)
         
         if should_apply_access_filter:
+            user_access_applied = True
             # PHASE 5: First try Security Groups (preferred method)
-            security_group_segments = SecurityGroupManager.get_user_accessible_segments(user)
+            access_map = user_access_cache.ensure_materialized(user)
             
-            if security_group_segments and segment_type_obj.segment_id in security_group_segments:
+            if access_map.get(segment_type_obj.segment_id):
                 # User has security group access
-                user_allowed_segment_codes = security_group_segments[segment_type_obj.segment_id]
-                segments = segments.filter(code__in=user_allowed_segment_codes)
-                user_access_applied = True
+                user_allowed_segments_count = len(access_map[segment_type_obj.segment_id])
+                segments = segments.filter(user_access_cache.accessible_filter(user))
                 access_source = 'security_groups'
             else:
                 # PHASE 4: Fallback to direct user segment access (legacy)
-                access_result = UserSegmentAccessManager.get_user_allowed_segments(
+                direct_accesses = XX_UserSegmentAccess.objects.filter(
                     user=user,
-                    segment_type_id=segment_type_obj.segment_id,
-                    access_level=None,  # Any access level allows viewing
-                    include_inactive=False
+                    segment_type=segment_type_obj,
+                    is_active=True
                 )
+                user_allowed_segments_count = direct_accesses.values('segment_id').distinct().count()
                 
-                if access_result['success'] and access_result['segments']:
-                    user_allowed_segment_codes = [seg['segment_code'] for seg in access_result['segments']]
-                    segments = segments.filter(code__in=user_allowed_segment_codes)
-                    user_access_applied = True
+                if user_allowed_segments_count:
+                    segments = segments.filter(Exists(direct_accesses.filter(segment_id=OuterRef('pk'))))
                     access_source = 'direct_access'
                 else:
                     # User has no access to any segments of this type - return empty
                     segments = segments.none()
-                    user_access_applied = True
                     access_source = 'no_access'
 
         # Apply filter based on filter_type parameter
@@ -606,10 +611,29 @@ class SegmentListView(APIView):
                     is_active=True,
                     Same__iexact=same_filter_value  # Case-insensitive match (YES/NO)
                 ).values_list('From_value', flat=True)
-                print(f"same_filter_value={same_filter_value}, matching count={len(list(matching_mappings))}")
                 
                 # Filter segments to only include those with matching Same value (excluding original)
-                segments = segments.filter(code__in=list(matching_mappings))
+                segments = segments.filter(code__in=matching_mappings)
+
+        # Keyset pagination on (segment_type, code) - served by the unique index
+        total_count = segments.count()
+        page_size = request.query_params.get("page_size")
+        after = request.query_params.get("after")
+        next_after = None
+        if page_size is not None or after is not None:
+            try:
+                page_size = min(max(int(page_size or self.max_keyset_page_size), 1), self.max_keyset_page_size)
+            except (TypeError, ValueError):
+                return Response(
+                    {"message": "page_size must be an integer.", "data": []},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if after:
+                segments = segments.filter(code__gt=after)
+            segments = list(segments[:page_size + 1])
+            if len(segments) > page_size:
+                segments = segments[:page_size]
+                next_after = segments[-1].code
 
         # Use the new SegmentValueListSerializer
         serializer = SegmentValueListSerializer(segments, many=True)
@@ -623,13 +647,14 @@ class SegmentListView(APIView):
                 "filter_applied": filter_type,
                 "same_filter_code": same_filter_code,
                 "same_filter_value": same_filter_value,
-                "total_count": segments.count(),
+                "total_count": total_count,
+                "next_after": next_after,
                 # Access control info
                 "access_control": {
                     "user_is_superadmin": is_superadmin,
                     "access_filter_applied": user_access_applied,
                     "access_source": access_source,  # 'security_groups', 'direct_access', or 'no_access'
-                    "user_allowed_segments_count": len(user_allowed_segment_codes) if user_access_applied else None,
+                    "user_allowed_segments_count": user_allowed_segments_count,
                     "bypass_access_filter": bypass_access_filter if is_superadmin else None
                 }
             }
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ApprovalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'approvals'
+
+    def ready(self):
+        # Keep the workflow template cache in sync with template edits
+        from . import signals  # noqa: F401
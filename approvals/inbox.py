@@ -0,0 +1,117 @@
+# approval/inbox.py
+"""Maintenance and queries for the denormalized approval inbox (ApprovalInboxEntry).
+
+An inbox row exists for every PENDING assignment on an ACTIVE stage instance.
+The write helpers are called by ApprovalManager inside its transactions; reads
+go through get_user_inbox() / get_user_inbox_transfer_ids().
+"""
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import (
+    ApprovalAssignment,
+    ApprovalInboxEntry,
+    ApprovalWorkflowStageInstance,
+)
+
+DEFAULT_INBOX_PAGE_SIZE = 50
+MAX_INBOX_PAGE_SIZE = 200
+
+
+def add_assignments(stage_instance: ApprovalWorkflowStageInstance, assignments):
+    """Add inbox rows for newly created pending assignments of an active stage."""
+    rows = [
+        ApprovalInboxEntry(
+            user_id=assignment.user_id,
+            budget_transfer_id=stage_instance.workflow_instance.budget_transfer_id,
+            stage_instance=stage_instance,
+            assignment=assignment,
+            activated_at=stage_instance.activated_at or timezone.now(),
+            due_at=stage_instance.due_at,
+        )
+        for assignment in assignments
+        if assignment.status == ApprovalAssignment.STATUS_PENDING
+    ]
+    if rows:
+        ApprovalInboxEntry.objects.bulk_create(rows, ignore_conflicts=True)
+
+
+def remove_assignment(assignment: ApprovalAssignment):
+    """Drop the inbox row of an assignment that is no longer pending."""
+    ApprovalInboxEntry.objects.filter(assignment_id=assignment.pk).delete()
+
+
+def remove_stages(stage_instance_ids):
+    """Drop every inbox row of stages that are no longer active."""
+    ApprovalInboxEntry.objects.filter(stage_instance_id__in=list(stage_instance_ids)).delete()
+
+
+def get_user_inbox(user, before=None, page_size: int = DEFAULT_INBOX_PAGE_SIZE):
+    """
+    One page of a user's inbox, newest activation first, using keyset pagination.
+
+    Args:
+        user: The approver
+        before: Cursor from the previous page ((activated_at, id) of its last row)
+        page_size: Rows per page (capped at MAX_INBOX_PAGE_SIZE)
+
+    Returns:
+        (rows, next_cursor) where rows are ApprovalInboxEntry objects with
+        budget_transfer and stage_instance__stage_template selected, and
+        next_cursor is None on the last page.
+    """
+    page_size = max(1, min(int(page_size), MAX_INBOX_PAGE_SIZE))
+    qs = ApprovalInboxEntry.objects.filter(user=user)
+    if before:
+        activated_at, entry_id = before
+        qs = qs.filter(
+            Q(activated_at__lt=activated_at) | Q(activated_at=activated_at, id__lt=entry_id)
+        )
+    rows = list(
+        qs.select_related("budget_transfer", "stage_instance__stage_template")
+        .order_by("-activated_at", "-id")[: page_size + 1]
+    )
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = (rows[-1].activated_at, rows[-1].id)
+    return rows, next_cursor
+
+
+def get_user_inbox_transfer_ids(user):
+    """Subquery of transfer ids with a pending assignment for `user` on an active stage."""
+    return ApprovalInboxEntry.objects.filter(user=user).values("budget_transfer_id")
+
+
+def rebuild_inbox():
+    """
+    Recompute the whole inbox from assignments.
+
+    Only needed after assignments were edited outside ApprovalManager
+    (e.g. the fix_far_* repair commands). Returns the number of rows written.
+    """
+    pending = (
+        ApprovalAssignment.objects.filter(
+            status=ApprovalAssignment.STATUS_PENDING,
+            stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
+        )
+        .select_related("stage_instance__workflow_instance")
+        .order_by("id")
+    )
+    rows = [
+        ApprovalInboxEntry(
+            user_id=assignment.user_id,
+            budget_transfer_id=assignment.stage_instance.workflow_instance.budget_transfer_id,
+            stage_instance_id=assignment.stage_instance_id,
+            assignment_id=assignment.id,
+            activated_at=assignment.stage_instance.activated_at or assignment.created_at,
+            due_at=assignment.stage_instance.due_at,
+        )
+        for assignment in pending.iterator()
+    ]
+    with transaction.atomic():
+        ApprovalInboxEntry.objects.all().delete()
+        ApprovalInboxEntry.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
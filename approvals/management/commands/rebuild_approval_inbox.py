@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from approvals.inbox import rebuild_inbox
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the approval inbox from pending assignments on active stages'
+
+    def handle(self, *args, **options):
+        count = rebuild_inbox()
+        self.stdout.write(self.style.SUCCESS(f'✅ Approval inbox rebuilt: {count} entries'))
@@ -7,8 +7,7 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ObjectDoesNotExist
 
 from budget_management.models import xx_BudgetTransfer
-from user_management.models import xx_User, xx_UserLevel, xx_notification
-from __NOTIFICATIONS_SETUP__.code.task_notifications import send_generic_message
+from user_management.models import xx_User, xx_UserLevel
 from .models import (
     ApprovalWorkflowTemplate,
     ApprovalWorkflowStageTemplate,
@@ -18,11 +17,11 @@ from .models import (
     ApprovalAction,
     ApprovalDelegation,
 )
+from . import inbox, side_effects
+from .template_cache import ARCHIVED_STAGE_ORDER_INDEX_START, template_cache
 
 User = get_user_model()
 
-ARCHIVED_STAGE_ORDER_INDEX_START = 9999
-
 
 class ApprovalManager:
     """
@@ -116,12 +115,10 @@ class ApprovalManager:
         # Re-number execution_order sequentially (1, 2, 3...) for this transaction code group
         for index, assignment in enumerate(assignments, start=1):
             template = assignment.workflow_template
-            active_stage_templates = template.stages.filter(
-                order_index__lt=ARCHIVED_STAGE_ORDER_INDEX_START
-            )
+            spec = template_cache.get(template.id)
             
             # Validate quorum config sanity
-            for st in active_stage_templates:
+            for st in (stage for _, stages in spec.groups for stage in stages):
                 if (
                     st.decision_policy == ApprovalWorkflowStageTemplate.POLICY_QUORUM
                     and st.quorum_count
@@ -204,6 +201,7 @@ class ApprovalManager:
                 status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
             )
             now = timezone.now()
+            inbox.remove_stages(active_stages.values_list("id", flat=True))
             for stage in active_stages:
                 stage.status = ApprovalWorkflowStageInstance.STATUS_CANCELLED
                 stage.completed_at = now
@@ -241,7 +239,7 @@ class ApprovalManager:
     # Internal: activation & assignments
     # ----------------------
     @classmethod
-    def _create_assignments(cls, stage_instance: ApprovalWorkflowStageInstance):
+    def _create_assignments(cls, stage_instance: ApprovalWorkflowStageInstance, stage_spec=None):
         """
         Create assignments based on stage template filters.
         
@@ -250,86 +248,134 @@ class ApprovalManager:
         - Filters users by required_role (XX_SecurityGroupRole) within that security group
         - Stage template's security_group field is now ignored
         
+        Runs in a constant number of queries regardless of group size (candidate
+        users with levels, one bulk insert, one read-back), since the caller holds
+        the workflow instance row lock while this runs.
+        
+        Returns the stage's pending assignments for the eligible users.
         If no users found -> return empty list (caller should auto-skip).
+        
+        stage_spec is the cached StageSpec for the stage; looked up when omitted.
         """
-        from user_management.models import XX_UserGroupMembership, XX_SecurityGroupRole
+        from user_management.models import XX_UserGroupMembership
         
-        st = stage_instance.stage_template
         workflow_instance = stage_instance.workflow_instance
+        st = stage_spec or template_cache.stage(
+            workflow_instance.template_id, stage_instance.stage_template_id
+        )
         budget_transfer = workflow_instance.budget_transfer
         
+        if st is None:
+            print(f"[WARNING] Stage template {stage_instance.stage_template_id} no longer exists - no assignments created")
+            return []
+        
         # Get security group from the transfer (all workflows use the same group now)
         if not budget_transfer.security_group_id:
             print(f"[WARNING] Transfer {budget_transfer.code} has no security group - no assignments created")
             return []
         
-        security_group = budget_transfer.security_group
-        
         # Filter by required role if specified
         # required_role is FK to XX_SecurityGroupRole (group-specific role assignment)
-        if st.required_role:
+        if st.required_role_id:
             # CRITICAL FIX: Use the role's security_group, NOT the transaction's security_group
             # This allows cross-group workflows (e.g., Finance Team transaction -> Fusion Team approvers)
-            role_security_group = st.required_role.security_group
+            group_name = st.role_security_group_name
             
-            print(f"\n=== DEBUG _create_assignments ===")
-            print(f"Stage: {st.name} (ID: {st.id})")
-            print(f"Transaction Security Group: {security_group.group_name}")
-            print(f"Required Role: {st.required_role}")
-            print(f"Role Security Group: {role_security_group.group_name}")
-            
-            # Get active members who have this specific role in the role's security group
+            # Active members who have this specific role in the role's security group
             member_user_ids = XX_UserGroupMembership.objects.filter(
-                security_group=role_security_group,  # Use role's security group
+                security_group_id=st.role_security_group_id,  # Use role's security group
                 is_active=True,
-                assigned_roles=st.required_role  # Direct FK lookup
-            ).values_list('user_id', flat=True)
-            
-            print(f"Users with required role in {role_security_group.group_name}: {list(member_user_ids)}")
-            
+                assigned_roles=st.required_role_id  # Direct FK lookup
+            ).values('user_id')
         else:
             # No required role - use transaction's security group members
-            print(f"\n=== DEBUG _create_assignments ===")
-            print(f"Stage: {st.name} (ID: {st.id})")
-            print(f"Security Group: {security_group.group_name}")
-            print(f"Required Role: None - using all active members")
-            
+            group_name = budget_transfer.security_group.group_name
             member_user_ids = XX_UserGroupMembership.objects.filter(
-                security_group=security_group,
+                security_group_id=budget_transfer.security_group_id,
                 is_active=True
-            ).values_list('user_id', flat=True)
+            ).values('user_id')
         
-        qs = xx_User.objects.filter(
-            id__in=member_user_ids,
-            is_active=True
+        # 1) Candidate users and their level names in one query (membership lookup is a subquery)
+        candidates = list(
+            xx_User.objects.filter(id__in=member_user_ids, is_active=True)
+            .order_by('id')
+            .values_list('id', 'role', 'user_level__name')
         )
         
-        print(f"Total users to assign: {qs.count()}")
+        # 2) One insert; users that already have an assignment on this stage are skipped
+        ApprovalAssignment.objects.bulk_create(
+            [
+                ApprovalAssignment(
+                    stage_instance=stage_instance,
+                    user_id=user_id,
+                    role_snapshot=role,
+                    level_snapshot=level_name,
+                    is_mandatory=True,
+                )
+                for user_id, role, level_name in candidates
+            ],
+            ignore_conflicts=True,
+        )
         
-        created = []
-        for user in qs.distinct():
-            print(f"Creating assignment for user: {user.username} (ID: {user.id})")
-            obj, created_flag = ApprovalAssignment.objects.get_or_create(
+        # 3) Read the set back (bulk_create with ignore_conflicts does not return PKs)
+        created = list(
+            ApprovalAssignment.objects.filter(
                 stage_instance=stage_instance,
-                user=user,
-                defaults={
-                    "role_snapshot": getattr(user, "role", None),
-                    "level_snapshot": getattr(user.user_level, "name", None) if user.user_level else None,
-                    "is_mandatory": True,
-                },
-            )
-            if created_flag:
-                created.append(obj)
+                user_id__in=[user_id for user_id, _, _ in candidates],
+                status=ApprovalAssignment.STATUS_PENDING,
+            ).order_by('id')
+        ) if candidates else []
         
-        print(f"Created {len(created)} new assignments")
-        print("=== END DEBUG ===\n")
+        print(
+            f"[INFO] Stage {st.name} (ID: {st.id}): {len(created)} assignments "
+            f"in group {group_name} (required role: {st.required_role_label})"
+        )
+        
+        inbox.add_assignments(stage_instance, created)
         
         if not created:
-            role_group = st.required_role.security_group.group_name if st.required_role else security_group.group_name
-            print(f"[WARNING] No users found for stage {st.name} with role {st.required_role} in group {role_group}")
+            print(f"[WARNING] No users found for stage {st.name} with role {st.required_role_label} in group {group_name}")
         
         return created
 
+    @classmethod
+    def _finish_approved_workflow(
+        cls,
+        budget_transfer: xx_BudgetTransfer,
+        instance: ApprovalWorkflowInstance,
+        spec,
+    ):
+        """
+        Mark a workflow whose last stage group completed as approved, then start
+        the transfer's next workflow or, if none is left, approve the transfer.
+        """
+        instance.status = ApprovalWorkflowInstance.STATUS_APPROVED
+        instance.finished_at = timezone.now()
+        instance.current_stage_template = None
+        instance.save(
+            update_fields=[
+                "status",
+                "finished_at",
+                "current_stage_template",
+            ]
+        )
+        
+        # NEW: Check if there's a next workflow to start (Phase 6)
+        next_workflow = ApprovalWorkflowInstance.get_next_workflow(budget_transfer, instance)
+        if next_workflow:
+            next_code = template_cache.get(next_workflow.template_id).code
+            print(f"[INFO] Workflow {spec.code} completed. Starting next workflow: {next_code}")
+            cls._activate_next_stage_internal(budget_transfer, instance=next_workflow)
+        else:
+            print(f"[INFO] All workflows completed for transfer {budget_transfer.code}")
+            
+            # Update budget transfer status to 'approved'
+            budget_transfer.status = 'approved'
+            budget_transfer.save(update_fields=['status'])
+            print(f"[INFO] Budget transfer {budget_transfer.code} status updated to 'approved'")
+            
+            # Oracle upload is triggered elsewhere (avoid duplicate uploads)
+
     @classmethod
     def _activate_next_stage_internal(
         cls,
@@ -350,9 +396,7 @@ class ApprovalManager:
             instance = ApprovalWorkflowInstance.objects.select_for_update().get(
                 pk=instance.pk
             )
-            active_stage_templates = instance.template.stages.filter(
-                order_index__lt=ARCHIVED_STAGE_ORDER_INDEX_START
-            )
+            spec = template_cache.get(instance.template_id)
 
             # prevent progressing finished workflows
             if instance.status in {
@@ -362,118 +406,70 @@ class ApprovalManager:
             }:
                 return instance
 
-            # find active stage(s)
-            active = instance.stage_instances.filter(
-                status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+            # find active stage(s); default ordering puts the lowest order_index first
+            active_template_id = (
+                instance.stage_instances.filter(
+                    status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+                )
+                .values_list("stage_template_id", flat=True)
+                .first()
             )
-            if not active.exists():
+            if active_template_id is None:
                 # Did workflow ever start?
-                completed = instance.stage_instances.filter(
-                    status=ApprovalWorkflowStageInstance.STATUS_COMPLETED
-                ).order_by("-stage_template__order_index")
+                # stages whose template was deleted since are left out
+                completed_stages = [
+                    spec.stage(template_id)
+                    for template_id in instance.stage_instances.filter(
+                        status=ApprovalWorkflowStageInstance.STATUS_COMPLETED
+                    ).values_list("stage_template_id", flat=True)
+                ]
+                completed_orders = [
+                    stage.order_index for stage in completed_stages if stage is not None
+                ]
 
-                if completed.exists():
+                if completed_orders:
                     # continue after last completed
-                    last_order = completed.first().stage_template.order_index
-                    next_template = (
-                        active_stage_templates.filter(order_index__gt=last_order)
-                        .order_by("order_index")
-                        .first()
-                    )
-                    if not next_template:
+                    last_order = max(completed_orders)
+                    next_group = spec.next_group(last_order)
+                    if not next_group:
                         # no more stages -> mark workflow approved
-                        instance.status = ApprovalWorkflowInstance.STATUS_APPROVED
-                        instance.finished_at = timezone.now()
-                        instance.current_stage_template = None
-                        instance.save(
-                            update_fields=[
-                                "status",
-                                "finished_at",
-                                "current_stage_template",
-                            ]
-                        )
-                        
-                        # NEW: Check if there's a next workflow to start (Phase 6)
-                        next_workflow = ApprovalWorkflowInstance.get_next_workflow(budget_transfer, instance)
-                        if next_workflow:
-                            print(f"[INFO] Workflow {instance.template.code} completed. Starting next workflow: {next_workflow.template.code}")
-                            cls._activate_next_stage_internal(budget_transfer, instance=next_workflow)
-                        else:
-                            print(f"[INFO] All workflows completed for transfer {budget_transfer.code}")
-                            
-                            # Update budget transfer status to 'approved'
-                            budget_transfer.status = 'approved'
-                            budget_transfer.save(update_fields=['status'])
-                            print(f"[INFO] Budget transfer {budget_transfer.code} status updated to 'approved'")
-                            
-                            # Oracle upload is triggered elsewhere (avoid duplicate uploads)
-                        
+                        cls._finish_approved_workflow(budget_transfer, instance, spec)
                         return instance
-                    next_order = next_template.order_index
                 else:
                     # truly first activation
-                    next_template = active_stage_templates.order_by(
-                        "order_index"
-                    ).first()
-                    if not next_template:
+                    next_group = spec.first_group()
+                    if not next_group:
                         raise ValueError("Workflow template has no stages defined")
-                    next_order = next_template.order_index
             else:
                 # mark existing active as completed if they are "done"
                 # (caller should have set them completed already; this path will just pick next order)
-                current_order = active.first().stage_template.order_index
-                next_q = (
-                    active_stage_templates.filter(order_index__gt=current_order)
-                    .order_by("order_index")
-                    .first()
-                )
-                if not next_q:
-                    # no more stages -> mark workflow approved
-                    instance.status = ApprovalWorkflowInstance.STATUS_APPROVED
-                    instance.finished_at = timezone.now()
-                    instance.current_stage_template = None
-                    instance.save(
-                        update_fields=[
-                            "status",
-                            "finished_at",
-                            "current_stage_template",
-                        ]
+                active_spec = spec.stage(active_template_id)
+                if active_spec is None:
+                    raise ValueError(
+                        f"Stage template {active_template_id} of the active stage no longer exists"
                     )
-                    
-                    # NEW: Check if there's a next workflow to start (Phase 6)
-                    next_workflow = ApprovalWorkflowInstance.get_next_workflow(budget_transfer, instance)
-                    if next_workflow:
-                        print(f"[INFO] Workflow {instance.template.code} completed. Starting next workflow: {next_workflow.template.code}")
-                        cls._activate_next_stage_internal(budget_transfer, instance=next_workflow)
-                    else:
-                        print(f"[INFO] All workflows completed for transfer {budget_transfer.code}")
-                        
-                        # Update budget transfer status to 'approved'
-                        budget_transfer.status = 'approved'
-                        budget_transfer.save(update_fields=['status'])
-                        print(f"[INFO] Budget transfer {budget_transfer.code} status updated to 'approved'")
-                        
-                        # Oracle upload is triggered elsewhere (avoid duplicate uploads)
-                    
+                current_order = active_spec.order_index
+                next_group = spec.next_group(current_order)
+                if not next_group:
+                    # no more stages -> mark workflow approved
+                    cls._finish_approved_workflow(budget_transfer, instance, spec)
                     return instance
-                next_order = next_q.order_index
 
             # activate all stage templates with order_index == next_order
-            next_templates = active_stage_templates.filter(
-                order_index=next_order
-            ).order_by("order_index")
+            next_order, next_templates = next_group
             created_stage_instances = []
             now = timezone.now()
             for tpl in next_templates:
                 si = ApprovalWorkflowStageInstance.objects.create(
                     workflow_instance=instance,
-                    stage_template=tpl,
+                    stage_template_id=tpl.id,
                     status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
                     activated_at=now,
+                    due_at=ApprovalWorkflowStageInstance.compute_due_at(now, tpl.sla_hours),
                 )
                 created_stage_instances.append(si)
                 # create assignments
-                assignments = cls._create_assignments(si)
+                assignments = cls._create_assignments(si, stage_spec=tpl)
                 # If no assignments created -> skip stage automatically
                 if not assignments:
                     si.status = ApprovalWorkflowStageInstance.STATUS_SKIPPED
@@ -502,8 +498,8 @@ class ApprovalManager:
             # set workflow instance status
             instance.status = ApprovalWorkflowInstance.STATUS_IN_PROGRESS
             # set current_stage_template to the first of activated templates for convenience
-            instance.current_stage_template = (
-                created_stage_instances[0].stage_template
+            instance.current_stage_template_id = (
+                created_stage_instances[0].stage_template_id
                 if created_stage_instances
                 else None
             )
@@ -524,32 +520,25 @@ class ApprovalManager:
         if not instance:
             raise ValueError("No workflow instance found")
 
-        # lock active stages in transaction when caller wants to progress
-        active_stages = instance.stage_instances.filter(
-            status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
-        )
-        if not active_stages.exists():
-            return False, "pending"
+        spec = template_cache.get(instance.template_id)
 
-        # Determine the order_index group to evaluate (lowest order_index among active)
-        order_index = (
-            active_stages.order_by("stage_template__order_index")
-            .first()
-            .stage_template.order_index
-        )
-        group_stages = instance.stage_instances.filter(
-            status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
-            stage_template__order_index=order_index,
-        )
+        # Evaluate the lowest order_index group among the active stages
+        group_stages = cls._active_stage_group(instance, spec)
+        if not group_stages:
+            return False, "pending"
 
         any_rejected = False
         all_approved = True
 
         for stage in group_stages:
-            stpl = stage.stage_template
+            stpl = spec.stage(stage.stage_template_id)
+            # A stage whose template was deleted since keeps the defaults:
+            # rejections allowed, one approval needed
+            allow_reject = stpl.allow_reject if stpl else True
+            decision_policy = stpl.decision_policy if stpl else None
             # short-circuit: if rejects exist and rejection allowed -> reject
             if (
-                stpl.allow_reject
+                allow_reject
                 and stage.actions.filter(action=ApprovalAction.ACTION_REJECT).exists()
             ):
                 any_rejected = True
@@ -565,17 +554,17 @@ class ApprovalManager:
 
             total_assignments = stage.assignments.count()
 
-            if stpl.decision_policy == ApprovalWorkflowStageTemplate.POLICY_ALL:
+            if decision_policy == ApprovalWorkflowStageTemplate.POLICY_ALL:
                 # require all assignments to have approved (ignoring delegated mandatory? we treat delegated assignment as assigned person)
                 all_ids = set(stage.assignments.values_list("id", flat=True))
                 if set(approved_assignment_ids) != all_ids:
                     all_approved = False
 
-            elif stpl.decision_policy == ApprovalWorkflowStageTemplate.POLICY_ANY:
+            elif decision_policy == ApprovalWorkflowStageTemplate.POLICY_ANY:
                 if approved_count < 1:
                     all_approved = False
 
-            elif stpl.decision_policy == ApprovalWorkflowStageTemplate.POLICY_QUORUM:
+            elif decision_policy == ApprovalWorkflowStageTemplate.POLICY_QUORUM:
                 quorum = stpl.quorum_count or max(1, total_assignments // 2 + 1)
                 if approved_count < quorum:
                     all_approved = False
@@ -594,6 +583,27 @@ class ApprovalManager:
             return True, "approved"
         return False, "pending"
 
+    @staticmethod
+    def _active_stage_group(instance: ApprovalWorkflowInstance, spec) -> list:
+        """
+        Active stage instances sharing the lowest order_index, ordered by ID.
+        Order indexes come from the cached template, so this is one query.
+        """
+        active_stages = list(
+            instance.stage_instances.filter(
+                status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+            ).order_by("id")
+        )
+        if not active_stages:
+            return []
+
+        def order_of(stage):
+            stage_spec = spec.stage(stage.stage_template_id)
+            return stage_spec.order_index if stage_spec else ARCHIVED_STAGE_ORDER_INDEX_START
+
+        order_index = min(order_of(stage) for stage in active_stages)
+        return [stage for stage in active_stages if order_of(stage) == order_index]
+
     @classmethod
     def _complete_active_stage_group(
         cls, instance: ApprovalWorkflowInstance, outcome: str, comment: str = None
@@ -602,24 +612,17 @@ class ApprovalManager:
         Mark active group (lowest order_index) as completed/skipped according to outcome,
         deactivate delegations, log actions and invoke hooks.
         """
-        active_stages = instance.stage_instances.filter(
-            status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+        group_stages = cls._active_stage_group(
+            instance, template_cache.get(instance.template_id)
         )
-        if not active_stages.exists():
+        if not group_stages:
             return
 
-        order_index = (
-            active_stages.order_by("stage_template__order_index")
-            .first()
-            .stage_template.order_index
-        )
-        group_stages = instance.stage_instances.filter(
-            status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
-            stage_template__order_index=order_index,
-        )
         now = timezone.now()
         system_user = cls._get_system_user()
 
+        inbox.remove_stages([st.id for st in group_stages])
+
         if outcome == "approved":
             for st in group_stages:
                 st.status = ApprovalWorkflowStageInstance.STATUS_COMPLETED
@@ -657,7 +660,7 @@ class ApprovalManager:
             )
             # log system action
             ApprovalAction.objects.create(
-                stage_instance=group_stages.first(),
+                stage_instance=group_stages[0],
                 user=system_user,
                 assignment=None,
                 action=ApprovalAction.ACTION_REJECT,
@@ -698,6 +701,11 @@ class ApprovalManager:
             ).first()
             if not active_stage:
                 raise ValueError("No active stage to act on")
+            stage_spec = template_cache.stage(
+                instance.template_id, active_stage.stage_template_id
+            )
+            if stage_spec is None:
+                raise ValueError("The active stage's template no longer exists")
 
             assignment = active_stage.assignments.filter(user=user).first()
             if not assignment:
@@ -715,12 +723,12 @@ class ApprovalManager:
             # enforce policies
             if (
                 action == ApprovalAction.ACTION_REJECT
-                and not active_stage.stage_template.allow_reject
+                and not stage_spec.allow_reject
             ):
                 raise ValueError("Rejection not allowed in this stage")
             if (
                 action == ApprovalAction.ACTION_DELEGATE
-                and not active_stage.stage_template.allow_delegate
+                and not stage_spec.allow_delegate
             ):
                 raise ValueError("Delegation not allowed in this stage")
 
@@ -762,6 +770,7 @@ class ApprovalManager:
             if action in (ApprovalAction.ACTION_APPROVE, ApprovalAction.ACTION_REJECT):
                 assignment.status = action
                 assignment.save(update_fields=["status"])
+                inbox.remove_assignment(assignment)
                 workflow_instance = active_stage.workflow_instance
                 assignment_user_ids = workflow_instance.stage_instances.values_list(
                     "assignments__user_id",
@@ -780,27 +789,17 @@ class ApprovalManager:
                 else:
                     ara_message = f"قام {user.username} برفض المعاملة {budget_transfer.code}"
 
-                for user_id in recipient_ids:
-                    notification = xx_notification.objects.create(
-                        user_id=user_id,
-                        Transaction_id=budget_transfer.transaction_id,
-                        type_of_Trasnction=budget_transfer.type,
-                        Type_of_action="Approval",
-                        eng_message=eng_message,
-                        ara_message=ara_message,
-                    )
-                    send_generic_message(
-                        user_id,
-                        message=eng_message,
-                        eng_message=eng_message,
-                        ara_message=ara_message,
-                        notification=notification,
-                        data={
-                            "transaction_id": budget_transfer.transaction_id,
-                            "status": action_label,
-                            "code": budget_transfer.code,
-                        },
-                    )
+                side_effects.notify_users(
+                    recipient_ids,
+                    budget_transfer,
+                    eng_message,
+                    ara_message,
+                    data={
+                        "transaction_id": budget_transfer.transaction_id,
+                        "status": action_label,
+                        "code": budget_transfer.code,
+                    },
+                )
 
             # Evaluate whether stage group has finished
             finished, outcome = cls.check_finished_stage(budget_transfer)
@@ -819,6 +818,91 @@ class ApprovalManager:
 
         return instance
 
+    @classmethod
+    def process_actions_bulk(cls, user: xx_User, items):
+        """
+        Apply many approve/reject actions for one user in a single transaction.
+
+        items: iterable of (transfer_id, action, comment) tuples.
+
+        All active workflow instances involved are locked up front in primary
+        key order, so concurrent bulk calls cannot deadlock on each other. Each
+        item then runs in its own savepoint: a failing item is rolled back, with
+        the notifications it raised, and reported without affecting the
+        others. Notifications are collected and sent once after commit.
+
+        Returns one result per item, in input order:
+            {"transaction_id", "action", "status": "success"|"error", "message",
+             "workflow_finished": bool, "workflow_status": str}
+        """
+        items = [tuple(item) for item in items]
+        transfer_ids = {transfer_id for transfer_id, _, _ in items}
+        results = [None] * len(items)
+
+        with side_effects.deferred_side_effects(), transaction.atomic():
+            transfers = xx_BudgetTransfer.objects.in_bulk(list(transfer_ids))
+            locked = list(
+                ApprovalWorkflowInstance.objects.select_for_update()
+                .filter(
+                    budget_transfer_id__in=transfer_ids,
+                    status__in=[
+                        ApprovalWorkflowInstance.STATUS_PENDING,
+                        ApprovalWorkflowInstance.STATUS_IN_PROGRESS,
+                    ],
+                )
+                .order_by("pk")
+                .values_list("budget_transfer_id", "pk")
+            )
+            lock_order = {}
+            for transfer_id, instance_id in locked:
+                lock_order.setdefault(transfer_id, instance_id)
+
+            # Same order as the locks were taken in; transfers without an
+            # active instance go last and fail in process_action.
+            order = sorted(
+                range(len(items)),
+                key=lambda i: (lock_order.get(items[i][0], float("inf")), i),
+            )
+            for index in order:
+                transfer_id, action, comment = items[index]
+                result = {
+                    "transaction_id": transfer_id,
+                    "action": action,
+                    "status": "success",
+                    "message": "",
+                    "workflow_finished": False,
+                    "workflow_status": None,
+                }
+                results[index] = result
+                budget_transfer = transfers.get(transfer_id)
+                try:
+                    if budget_transfer is None:
+                        raise ValueError("Budget transfer not found")
+                    if action not in {
+                        ApprovalAction.ACTION_APPROVE,
+                        ApprovalAction.ACTION_REJECT,
+                    }:
+                        raise ValueError(f"Invalid bulk action: {action}")
+                    # Notifications of a rolled back item are dropped with it
+                    with side_effects.side_effect_savepoint(), transaction.atomic():
+                        cls.process_action(budget_transfer, user, action, comment=comment)
+                except Exception as e:
+                    result["status"] = "error"
+                    result["message"] = str(e)
+                    continue
+
+                result["message"] = f"Action {action} recorded"
+                # Reporting only: the action is recorded whatever happens here
+                try:
+                    budget_transfer.refresh_from_db()
+                    finished, workflow_status = cls.is_workflow_finished(budget_transfer)
+                    result["workflow_finished"] = finished
+                    result["workflow_status"] = workflow_status
+                except Exception as e:
+                    result["message"] += f" (workflow status unavailable: {str(e)})"
+
+        return results
+
     # ----------------------
     # Delegation
     # ----------------------
@@ -838,7 +922,12 @@ class ApprovalManager:
           - create ApprovalDelegation + assignment for delegate
           - mark original assignment delegated
         """
-        if not stage_instance.stage_template.allow_delegate:
+        stage_spec = template_cache.stage(
+            stage_instance.workflow_instance.template_id, stage_instance.stage_template_id
+        )
+        if stage_spec is None:
+            raise ValueError("This stage's template no longer exists")
+        if not stage_spec.allow_delegate:
             raise ValueError("Delegation not allowed in this stage")
 
         with transaction.atomic():
@@ -883,6 +972,10 @@ class ApprovalManager:
             from_assignment.status = ApprovalAssignment.STATUS_DELEGATED
             from_assignment.save(update_fields=["status"])
 
+            # move the inbox row to the delegate
+            inbox.remove_assignment(from_assignment)
+            inbox.add_assignments(stage_instance, [delegate_assignment])
+
             # log delegation action
             ApprovalAction.objects.create(
                 stage_instance=stage_instance,
@@ -896,7 +989,7 @@ class ApprovalManager:
             workflow_instance = stage_instance.workflow_instance
             budget_transfer = getattr(workflow_instance, "budget_transfer", None)
             if budget_transfer:
-                stage_name = getattr(stage_instance.stage_template, "name", "Stage")
+                stage_name = stage_spec.name
                 eng_message = (
                     f"Stage {stage_name} delegated to {to_user} for transaction {budget_transfer.code}"
                 )
@@ -911,28 +1004,18 @@ class ApprovalManager:
                 if getattr(budget_transfer, "user_id", None):
                     recipient_ids.add(budget_transfer.user_id)
 
-                for user_id in recipient_ids:
-                    notification = xx_notification.objects.create(
-                        user_id=user_id,
-                        Transaction_id=budget_transfer.transaction_id,
-                        type_of_Trasnction=budget_transfer.type,
-                        Type_of_action="Approval",
-                        eng_message=eng_message,
-                        ara_message=ara_message,
-                    )
-                    send_generic_message(
-                        user_id,
-                        message=eng_message,
-                        eng_message=eng_message,
-                        ara_message=ara_message,
-                        notification=notification,
-                        data={
-                            "transaction_id": budget_transfer.transaction_id,
-                            "status": "delegated",
-                            "stage": stage_name,
-                            "code": budget_transfer.code,
-                        },
-                    )
+                side_effects.notify_users(
+                    recipient_ids,
+                    budget_transfer,
+                    eng_message,
+                    ara_message,
+                    data={
+                        "transaction_id": budget_transfer.transaction_id,
+                        "status": "delegated",
+                        "stage": stage_name,
+                        "code": budget_transfer.code,
+                    },
+                )
 
         return delegation
 
@@ -945,109 +1028,21 @@ class ApprovalManager:
         Return list of BudgetTransfer objects for which this user
         has pending approval assignments in active workflow stages.
         
-        NEW BEHAVIOR (Phase 6):
-        - Uses workflow_instances (ForeignKey) instead of workflow_instance (OneToOneField)
-        - Filters by user's role matching the stage's required_role
+        Reads the approval inbox projection (see approvals.inbox), so this is a
+        single indexed subquery on the user's inbox rows. The result is still a
+        BudgetTransfer queryset so callers can keep filtering and ordering it.
         """
-        base_qs = xx_BudgetTransfer.objects.filter(
-            workflow_instances__status=ApprovalWorkflowInstance.STATUS_IN_PROGRESS
-        ).distinct()
-        print(f"Total transfers in queryset: {base_qs.count()}")
-
-        # Pre-user filter: active stages with any pending assignments
-        transfers = base_qs.filter(
-            workflow_instances__stage_instances__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
-            workflow_instances__stage_instances__assignments__status=ApprovalAssignment.STATUS_PENDING,
-        ).distinct()
-        print(f"Transfers with active stages: {transfers.count()}")
-        print(f"Transfers with pending assignments: {transfers.count()}")
-        try:
-            pre_ids = list(transfers.values_list("id", flat=True))
-        except Exception:
-            pre_ids = []
-        # Debug: list stages and assignments (with users) before filtering by user
-        try:
-            print("Debug: Active stages and assignments for current transfers (before user filter):")
-            for tr in transfers:
-                wi = getattr(tr, "workflow_instance", None)
-                wi_id = getattr(wi, "id", None)
-                tr_id = getattr(tr, "id", getattr(tr, "pk", "?"))
-                print(f"- Transfer {tr_id}, WorkflowInstance {wi_id}")
-                if not wi:
-                    continue
-                stages_qs = wi.stage_instances.filter(
-                    status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
-                )
-                for stg in stages_qs:
-                    stg_id = getattr(stg, "id", getattr(stg, "pk", "?"))
-                    tpl_name = getattr(getattr(stg, "stage_template", None), "name", "<no tpl>")
-                    print(f"  Stage {stg_id} ({tpl_name}) status={stg.status}")
-                    for asg in stg.assignments.all():
-                        asg_id = getattr(asg, "id", getattr(asg, "pk", "?"))
-                        asg_user = getattr(asg, "user", None)
-                        asg_user_id = getattr(asg_user, "id", getattr(asg_user, "pk", None))
-                        asg_user_name = None
-                        try:
-                            asg_user_name = str(asg_user)
-                        except Exception:
-                            asg_user_name = f"<user {asg_user_id}>"
-                        print(
-                            f"    Assignment {asg_id}: user={asg_user_name} (id={asg_user_id}) status={asg.status}"
-                        )
-        except Exception as e:
-            print(f"Debug listing error: {e}")
-        # IMPORTANT: Anchor user+pending to the SAME active stage instance.
-        # Using the assignment's stage_instance relation avoids mixing conditions
-        # across different stages in the same workflow.
-        # NEW: Uses workflow_instances (ForeignKey) instead of workflow_instance
-        transfers = base_qs.filter(
-            workflow_instances__stage_instances__assignments__user=user,
-            workflow_instances__stage_instances__assignments__status=ApprovalAssignment.STATUS_PENDING,
-            workflow_instances__stage_instances__assignments__stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
-        ).distinct()
-        print(
-            f"Transfers with active pending assignment for user {user}: {transfers.count()}"
+        return xx_BudgetTransfer.objects.filter(
+            transaction_id__in=inbox.get_user_inbox_transfer_ids(user)
         )
-        try:
-            post_ids = list(transfers.values_list("id", flat=True))
-            excluded = sorted(set(pre_ids) - set(post_ids))
-            if excluded:
-                print(
-                    f"Transfers excluded after anchoring to user's active pending assignment: {excluded}"
-                )
-        except Exception:
-            pass
 
-        # Extra debug: list the exact assignment(s) for this user in active stages
-        try:
-            user_asgs = ApprovalAssignment.objects.filter(
-                user=user,
-                status=ApprovalAssignment.STATUS_PENDING,
-                stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
-                stage_instance__workflow_instance__status=ApprovalWorkflowInstance.STATUS_IN_PROGRESS,
-                stage_instance__workflow_instance__budget_transfer__in=transfers,
-            ).select_related(
-                "stage_instance__workflow_instance",
-                "stage_instance__stage_template",
-            )[:100]  # Limit for debug output
-            print(
-                f"Debug: Active PENDING assignments for user {user} that drive the final result: {user_asgs.count()}"
-            )
-            for asg in user_asgs:
-                tr_id = getattr(
-                    getattr(asg.stage_instance.workflow_instance, "budget_transfer", None),
-                    "id",
-                    None,
-                )
-                stg = asg.stage_instance
-                tpl_name = getattr(stg.stage_template, "name", "<no tpl>")
-                print(
-                    f"  -> Transfer {tr_id}, Stage {stg.id} ({tpl_name}), assignment {asg.id}, status={asg.status}"
-                )
-        except Exception as e:
-            print(f"Debug (user assignments) listing error: {e}")
-
-        return transfers
+    @staticmethod
+    def get_user_inbox(user: xx_User, before=None, page_size: int = inbox.DEFAULT_INBOX_PAGE_SIZE):
+        """
+        Keyset-paginated inbox rows for this user (newest activation first).
+        Returns (rows, next_cursor); see approvals.inbox.get_user_inbox.
+        """
+        return inbox.get_user_inbox(user, before=before, page_size=page_size)
 
     @staticmethod
     def is_workflow_finished(budget_transfer: xx_BudgetTransfer):
@@ -1140,7 +1135,10 @@ class ApprovalManager:
         if not last_action:
             return
 
-        stage_name = getattr(stage_instance.stage_template, "name", "Stage")
+        stage_spec = template_cache.stage(
+            stage_instance.workflow_instance.template_id, stage_instance.stage_template_id
+        )
+        stage_name = stage_spec.name if stage_spec else "Stage"
         status_label = (
             "approved"
             if last_action.action == ApprovalAction.ACTION_APPROVE
@@ -1158,28 +1156,18 @@ class ApprovalManager:
         if getattr(budget_transfer, "user_id", None):
             recipient_ids.add(budget_transfer.user_id)
 
-        for user_id in recipient_ids:
-            notification = xx_notification.objects.create(
-                user_id=user_id,
-                Transaction_id=budget_transfer.transaction_id,
-                type_of_Trasnction=budget_transfer.type,
-                Type_of_action="Approval",
-                eng_message=eng_message,
-                ara_message=ara_message,
-            )
-            send_generic_message(
-                user_id,
-                message=eng_message,
-                eng_message=eng_message,
-                ara_message=ara_message,
-                notification=notification,
-                data={
-                    "transaction_id": budget_transfer.transaction_id,
-                    "status": status_label,
-                    "stage": stage_name,
-                    "code": budget_transfer.code,
-                },
-            )
+        side_effects.notify_users(
+            recipient_ids,
+            budget_transfer,
+            eng_message,
+            ara_message,
+            data={
+                "transaction_id": budget_transfer.transaction_id,
+                "status": status_label,
+                "stage": stage_name,
+                "code": budget_transfer.code,
+            },
+        )
 
     @staticmethod
     def on_stage_skipped(stage_instance: ApprovalWorkflowStageInstance):
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:07
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def backfill_due_at(apps, schema_editor):
+    """Set due_at on stages that were already active when the column was added."""
+    StageInstance = apps.get_model('approvals', 'ApprovalWorkflowStageInstance')
+    active = StageInstance.objects.filter(
+        status='active',
+        due_at__isnull=True,
+        activated_at__isnull=False,
+        stage_template__sla_hours__isnull=False,
+    ).select_related('stage_template')
+    for stage in active.iterator():
+        if stage.stage_template.sla_hours:
+            stage.due_at = stage.activated_at + timedelta(hours=stage.stage_template.sla_hours)
+            stage.save(update_fields=['due_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0007_xx_workflowtemplateassignment_transaction_code_filter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='approvalworkflowstageinstance',
+            name='due_at',
+            field=models.DateTimeField(blank=True, help_text='SLA deadline (activated_at + stage_template.sla_hours); null when the stage has no SLA', null=True),
+        ),
+        migrations.AddField(
+            model_name='approvalworkflowstageinstance',
+            name='sla_breach_notified',
+            field=models.BooleanField(default=False, help_text='Set once on_sla_breached has been called for this stage'),
+        ),
+        migrations.AddIndex(
+            model_name='approvalworkflowstageinstance',
+            index=models.Index(fields=['status', 'due_at'], name='APPROVAL_WO_status_64a1ea_idx'),
+        ),
+        migrations.RunPython(backfill_due_at, migrations.RunPython.noop),
+    ]
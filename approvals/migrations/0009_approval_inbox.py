@@ -0,0 +1,59 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:09
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def backfill_inbox(apps, schema_editor):
+    """Create inbox rows for assignments that are already pending on active stages."""
+    ApprovalAssignment = apps.get_model('approvals', 'ApprovalAssignment')
+    ApprovalInboxEntry = apps.get_model('approvals', 'ApprovalInboxEntry')
+    pending = ApprovalAssignment.objects.filter(
+        status='pending',
+        stage_instance__status='active',
+    ).select_related('stage_instance__workflow_instance')
+    ApprovalInboxEntry.objects.bulk_create(
+        [
+            ApprovalInboxEntry(
+                user_id=assignment.user_id,
+                budget_transfer_id=assignment.stage_instance.workflow_instance.budget_transfer_id,
+                stage_instance_id=assignment.stage_instance_id,
+                assignment_id=assignment.id,
+                activated_at=assignment.stage_instance.activated_at or assignment.created_at,
+                due_at=assignment.stage_instance.due_at,
+            )
+            for assignment in pending.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('budget_management', '0007_xx_budgettransfer_security_group'),
+        ('approvals', '0008_stage_instance_sla_due_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalInboxEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('activated_at', models.DateTimeField()),
+                ('due_at', models.DateTimeField(blank=True, null=True)),
+                ('assignment', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entry', to='approvals.approvalassignment')),
+                ('budget_transfer', models.ForeignKey(db_column='transaction_id', on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox_entries', to='budget_management.xx_budgettransfer')),
+                ('stage_instance', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='inbox_entries', to='approvals.approvalworkflowstageinstance')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='approval_inbox', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'APPROVAL_INBOX',
+                'ordering': ['-activated_at', '-id'],
+                'indexes': [models.Index(fields=['user', 'activated_at', 'id'], name='APPROVAL_IN_user_id_f0d8cf_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_inbox, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0009_approval_inbox'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='approvalworkflowstageinstance',
+            index=models.Index(fields=['completed_at', 'id'], name='APPROVAL_WO_complet_25e03a_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0010_stage_instance_completed_at_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalTemplateCacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(blank=True, default='', max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'APPROVAL_TEMPLATE_CACHE_VERSION',
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('approvals', '0011_template_cache_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApprovalDelegationCleanupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'APPROVAL_DELEGATION_CLEANUP_STATE',
+            },
+        ),
+    ]
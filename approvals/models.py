@@ -1,3 +1,5 @@
+from datetime import timedelta
+
 from django.db import models
 from django.utils import timezone
 from django.conf import settings
@@ -237,12 +239,23 @@ class ApprovalWorkflowStageInstance(models.Model):
 	status = models.CharField(max_length=12, choices=STATUS_CHOICES, default=STATUS_PENDING)
 	activated_at = models.DateTimeField(null=True, blank=True)
 	completed_at = models.DateTimeField(null=True, blank=True)
+	due_at = models.DateTimeField(
+		null=True,
+		blank=True,
+		help_text="SLA deadline (activated_at + stage_template.sla_hours); null when the stage has no SLA",
+	)
+	sla_breach_notified = models.BooleanField(
+		default=False,
+		help_text="Set once on_sla_breached has been called for this stage",
+	)
 
 	class Meta:
 		db_table = "APPROVAL_WORKFLOW_STAGE_INSTANCE"
 		ordering = ["workflow_instance", "stage_template__order_index"]
 		indexes = [
 			models.Index(fields=["workflow_instance", "status"]),
+			models.Index(fields=["status", "due_at"]),
+			models.Index(fields=["completed_at", "id"]),
 		]
 
 	def __str__(self):
@@ -254,6 +267,13 @@ class ApprovalWorkflowStageInstance(models.Model):
 	def is_terminal(self):
 		return self.status in {self.STATUS_COMPLETED, self.STATUS_SKIPPED, self.STATUS_CANCELLED}
 
+	@staticmethod
+	def compute_due_at(activated_at, sla_hours):
+		"""SLA deadline for a stage activated at `activated_at`, or None without an SLA."""
+		if not activated_at or not sla_hours:
+			return None
+		return activated_at + timedelta(hours=sla_hours)
+
 class ApprovalAssignment(models.Model):
     """Materialized eligible approvers for a given stage instance."""
     STATUS_PENDING = "pending"
@@ -365,6 +385,81 @@ class ApprovalDelegation(models.Model):
 			self.save(update_fields=["active", "deactivated_at"])
 
 
+class ApprovalInboxEntry(models.Model):
+	"""Denormalized approval inbox: one row per pending assignment on an active stage.
+
+	Maintained by ApprovalManager (_create_assignments, process_action, delegate,
+	cancel_workflow) inside the same transaction as the assignment change, so a
+	user's pending approvals are a single indexed lookup on (user, activated_at, id)
+	instead of a multi-join distinct() across workflow, stage and assignment tables.
+	Use approvals.inbox.rebuild_inbox() (or the rebuild_approval_inbox command)
+	after editing assignments outside the manager.
+	"""
+
+	user = models.ForeignKey(
+		"user_management.xx_User", related_name="approval_inbox", on_delete=models.CASCADE
+	)
+	budget_transfer = models.ForeignKey(
+		"budget_management.xx_BudgetTransfer",
+		on_delete=models.CASCADE,
+		related_name="approval_inbox_entries",
+		db_column="transaction_id",
+	)
+	stage_instance = models.ForeignKey(
+		ApprovalWorkflowStageInstance, related_name="inbox_entries", on_delete=models.CASCADE
+	)
+	assignment = models.OneToOneField(
+		ApprovalAssignment, related_name="inbox_entry", on_delete=models.CASCADE
+	)
+	activated_at = models.DateTimeField()
+	due_at = models.DateTimeField(null=True, blank=True)
+
+	class Meta:
+		db_table = "APPROVAL_INBOX"
+		ordering = ["-activated_at", "-id"]
+		indexes = [
+			models.Index(fields=["user", "activated_at", "id"]),
+		]
+
+	def __str__(self):
+		return f"Inbox {self.user_id} -> Transfer {self.budget_transfer_id} (StageInstance {self.stage_instance_id})"
+
+
+class ApprovalTemplateCacheVersion(models.Model):
+	"""Version token of the workflow template snapshots (see approvals.template_cache).
+
+	A single row, given a new token in the transaction that changes a workflow
+	template, a stage template or a security group role, so every process drops
+	its snapshots once the change commits.
+	"""
+
+	token = models.CharField(max_length=32, blank=True, default="")
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = "APPROVAL_TEMPLATE_CACHE_VERSION"
+
+	def __str__(self):
+		return f"Template cache version {self.token}"
+
+
+class ApprovalDelegationCleanupState(models.Model):
+	"""High-water mark of the cleanup_delegations task (a single row, pk=1).
+
+	completed_at of the last stage instance the previous run checked; the next
+	run only walks stages completed after it (see approvals.tasks).
+	"""
+
+	watermark = models.DateTimeField(null=True, blank=True)
+	updated_at = models.DateTimeField(auto_now=True)
+
+	class Meta:
+		db_table = "APPROVAL_DELEGATION_CLEANUP_STATE"
+
+	def __str__(self):
+		return f"Delegation cleanup watermark {self.watermark}"
+
+
 class XX_WorkflowTemplateAssignment(models.Model):
 	"""
 	Links workflow templates to security groups with execution order.
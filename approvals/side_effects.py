@@ -0,0 +1,156 @@
+# approvals/side_effects.py
+"""
+Deferred side effects for approval actions.
+
+Approval actions normally notify recipients inline, while the workflow
+instance row is still locked. Inside a deferred_side_effects() block those
+effects are collected instead and run once after the surrounding transaction
+commits:
+
+  - notifications are de-duplicated per (user, transaction, message)
+  - arbitrary jobs registered with defer(key, func) run once per key
+
+Nothing is sent if the transaction rolls back. Work that runs in its own
+savepoint wraps it in side_effect_savepoint(), so the effects of a rolled back
+savepoint are dropped with it instead of being sent with the rest.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager
+
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+_state = threading.local()
+
+
+class _DeferredBatch:
+    def __init__(self):
+        self.notifications = {}
+        self.jobs = {}
+
+    def merge(self, other):
+        for key, notification in other.notifications.items():
+            self.notifications.setdefault(key, notification)
+        for key, func in other.jobs.items():
+            self.jobs.setdefault(key, func)
+
+    def flush(self):
+        for notification in self.notifications.values():
+            try:
+                _send_notification(**notification)
+            except Exception as e:
+                logger.error(
+                    f"Deferred notification to user {notification['user_id']} failed: {str(e)}"
+                )
+
+        for key, func in self.jobs.items():
+            try:
+                func()
+            except Exception as e:
+                logger.error(f"Deferred job {key} failed: {str(e)}")
+
+
+def _current_batch():
+    return getattr(_state, "batch", None)
+
+
+def is_deferring():
+    return _current_batch() is not None
+
+
+@contextmanager
+def deferred_side_effects():
+    """
+    Collect side effects raised inside the block and run them after commit.
+
+    Nested blocks join the outermost one. If the block raises, the collected
+    side effects are dropped.
+    """
+    if is_deferring():
+        yield _current_batch()
+        return
+
+    batch = _DeferredBatch()
+    _state.batch = batch
+    try:
+        yield batch
+    finally:
+        _state.batch = None
+    # Runs immediately when not inside an atomic block
+    transaction.on_commit(batch.flush)
+
+
+@contextmanager
+def side_effect_savepoint():
+    """
+    Scope the side effects raised inside the block to a savepoint.
+
+    Use around a transaction.atomic() savepoint inside a deferred_side_effects()
+    block: the effects join the enclosing batch only if the block completes,
+    and are dropped if it raises. Outside a deferred block this does nothing.
+    """
+    parent = _current_batch()
+    if parent is None:
+        yield None
+        return
+
+    batch = _DeferredBatch()
+    _state.batch = batch
+    try:
+        yield batch
+    finally:
+        _state.batch = parent
+    parent.merge(batch)
+
+
+def defer(key, func):
+    """Run func after commit, once per key. Runs immediately when not deferring."""
+    batch = _current_batch()
+    if batch is None:
+        func()
+        return
+    batch.jobs.setdefault(key, func)
+
+
+def notify_users(recipient_ids, budget_transfer, eng_message, ara_message, data, action_type="Approval"):
+    """Create an xx_notification and push it for every recipient."""
+    batch = _current_batch()
+    for user_id in recipient_ids:
+        notification = {
+            "user_id": user_id,
+            "budget_transfer": budget_transfer,
+            "eng_message": eng_message,
+            "ara_message": ara_message,
+            "data": data,
+            "action_type": action_type,
+        }
+        if batch is None:
+            _send_notification(**notification)
+        else:
+            key = (user_id, budget_transfer.transaction_id, eng_message)
+            batch.notifications.setdefault(key, notification)
+
+
+def _send_notification(user_id, budget_transfer, eng_message, ara_message, data, action_type):
+    from user_management.models import xx_notification
+    from __NOTIFICATIONS_SETUP__.code.task_notifications import send_generic_message
+
+    notification = xx_notification.objects.create(
+        user_id=user_id,
+        Transaction_id=budget_transfer.transaction_id,
+        type_of_Trasnction=budget_transfer.type,
+        Type_of_action=action_type,
+        eng_message=eng_message,
+        ara_message=ara_message,
+    )
+    send_generic_message(
+        user_id,
+        message=eng_message,
+        eng_message=eng_message,
+        ara_message=ara_message,
+        notification=notification,
+        data=data,
+    )
@@ -0,0 +1,25 @@
+"""
+Signal handlers for the approvals app.
+
+Invalidates the workflow template cache whenever the data its snapshots were
+built from changes: workflow templates, stage templates, or the security group
+roles stage templates require.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user_management.models import XX_SecurityGroupRole
+
+from .models import ApprovalWorkflowStageTemplate, ApprovalWorkflowTemplate
+from .template_cache import template_cache
+
+
+@receiver(post_save, sender=ApprovalWorkflowTemplate)
+@receiver(post_delete, sender=ApprovalWorkflowTemplate)
+@receiver(post_save, sender=ApprovalWorkflowStageTemplate)
+@receiver(post_delete, sender=ApprovalWorkflowStageTemplate)
+@receiver(post_save, sender=XX_SecurityGroupRole)
+@receiver(post_delete, sender=XX_SecurityGroupRole)
+def invalidate_template_cache(sender, **kwargs):
+    template_cache.invalidate()
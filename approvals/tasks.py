@@ -1,31 +1,129 @@
 # approval/tasks.py
+import logging
+from datetime import timedelta
+
 from celery import shared_task
+from django.db.models import Q
 from django.utils import timezone
-from datetime import timedelta
-from .models import ApprovalWorkflowStageInstance
+from .models import ApprovalDelegation, ApprovalDelegationCleanupState, ApprovalWorkflowStageInstance
 from .managers import ApprovalManager
 
+logger = logging.getLogger(__name__)
+
+SLA_BREACH_BATCH_SIZE = 500
+
+DELEGATION_CLEANUP_BATCH_SIZE = 1000
+DELEGATION_CLEANUP_OVERLAP = timedelta(minutes=10)
+
 
 @shared_task
-def check_sla_breaches():
+def check_sla_breaches(batch_size: int = SLA_BREACH_BATCH_SIZE):
     """
-    Find all active stage instances that have SLA exceeded and call on_sla_breached.
+    Find active stage instances past their SLA deadline and call on_sla_breached once per stage.
+
+    Uses the persisted due_at (set at activation) and the (status, due_at) index, so
+    the cost tracks the number of breached stages rather than the number of active ones.
+    Stages are processed in id-ordered chunks and flagged as notified after each chunk.
+    A hook that raises leaves its stage un-flagged so it is retried on the next run.
     """
     now = timezone.now()
-    for stage in ApprovalWorkflowStageInstance.objects.filter(status="active"):
-        sla_hours = stage.stage_template.sla_hours
-        if sla_hours:
-            deadline = stage.activated_at + timedelta(hours=sla_hours)
-            if now > deadline:
+    overdue = (
+        ApprovalWorkflowStageInstance.objects.filter(
+            status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
+            due_at__lte=now,
+            sla_breach_notified=False,
+        )
+        .select_related("stage_template", "workflow_instance__budget_transfer")
+        .order_by("id")
+    )
+
+    notified = 0
+    last_id = 0
+    while True:
+        batch = list(overdue.filter(id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        last_id = batch[-1].id
+
+        notified_ids = []
+        for stage in batch:
+            try:
                 ApprovalManager.on_sla_breached(stage)
+            except Exception:
+                logger.error(f"on_sla_breached failed for stage instance {stage.id}", exc_info=True)
+                continue
+            notified_ids.append(stage.id)
+
+        ApprovalWorkflowStageInstance.objects.filter(id__in=notified_ids).update(
+            sla_breach_notified=True
+        )
+        notified += len(notified_ids)
+
+    return notified
 
 
 @shared_task
-def cleanup_delegations():
+def cleanup_delegations(batch_size: int = DELEGATION_CLEANUP_BATCH_SIZE, full: bool = False):
     """
     Deactivate stale delegations where the stage is no longer active.
+
+    Every path that takes a stage out of "active" sets completed_at, so each run
+    only walks stages completed since the previous run's high-water mark (a row
+    of ApprovalDelegationCleanupState, shared by every worker), in
+    (completed_at, id)-ordered chunks, with one UPDATE of the active delegations
+    per chunk. The mark is rewound by DELEGATION_CLEANUP_OVERLAP to catch stages
+    committed late; re-checking those is harmless since only active delegations
+    are updated.
+
+    Without a mark (first run) or with full=True, stale delegations are found
+    from the active side instead, which is bounded by the number of active
+    delegations rather than the stage history.
+
+    Returns the number of delegations deactivated.
     """
     now = timezone.now()
-    qs = ApprovalWorkflowStageInstance.objects.exclude(status="active")
-    for stage in qs:
-        stage.delegations.filter(active=True).update(active=False, deactivated_at=now)
+    state, _ = ApprovalDelegationCleanupState.objects.get_or_create(pk=1)
+    watermark = None if full else state.watermark
+
+    if watermark is None:
+        deactivated = ApprovalDelegation.objects.filter(active=True).exclude(
+            stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+        ).update(active=False, deactivated_at=now)
+        _save_watermark(state, now)
+        return deactivated
+
+    changed = (
+        ApprovalWorkflowStageInstance.objects.filter(
+            completed_at__gt=watermark - DELEGATION_CLEANUP_OVERLAP,
+            completed_at__lte=now,
+        )
+        .exclude(status=ApprovalWorkflowStageInstance.STATUS_ACTIVE)
+        .order_by("completed_at", "id")
+    )
+
+    deactivated = 0
+    high_water = watermark
+    last = None
+    while True:
+        chunk = changed
+        if last is not None:
+            chunk = chunk.filter(
+                Q(completed_at__gt=last[0]) | Q(completed_at=last[0], id__gt=last[1])
+            )
+        rows = list(chunk.values_list("completed_at", "id")[:batch_size])
+        if not rows:
+            break
+        last = rows[-1]
+        high_water = max(high_water, last[0])
+
+        deactivated += ApprovalDelegation.objects.filter(
+            active=True, stage_instance_id__in=[stage_id for _, stage_id in rows]
+        ).update(active=False, deactivated_at=now)
+
+    _save_watermark(state, high_water)
+    return deactivated
+
+
+def _save_watermark(state, watermark):
+    state.watermark = watermark
+    state.save(update_fields=["watermark", "updated_at"])
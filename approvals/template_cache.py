@@ -0,0 +1,195 @@
+# approvals/template_cache.py
+"""
+Workflow Template Cache
+
+Frozen, per-process snapshots of approval workflow templates so stage
+progression does not re-query stage templates, order_index ranges, policies
+and required roles on every action. Templates only change on admin edits.
+
+Each snapshot (TemplateSpec) holds:
+
+- every stage template of the workflow (including archived ones, so stage
+  instances created before a stage was archived still resolve)
+- the non-archived stages grouped by order_index, in order
+- per stage: decision policy, quorum, allow_reject/allow_delegate, SLA hours,
+  required role, the role's security group and required user level IDs
+
+Snapshots are tagged with a shared "template version": a token in the
+database (ApprovalTemplateCacheVersion). Saving or deleting a workflow
+template, a stage template or a security group role writes a new token in the
+same transaction (see signals.py). Each process re-reads the token at most
+every VERSION_CHECK_SECONDS (see budget_transfer.global_function.version_tokens),
+so a change saved in one process reaches the others within that interval.
+
+A stage template deleted while a workflow is running no longer has a
+snapshot: stage() then returns None and callers must handle it.
+
+Usage:
+    from approvals.template_cache import template_cache
+
+    spec = template_cache.get(instance.template_id)
+    order, stages = spec.first_group()
+    stage = spec.stage(stage_instance.stage_template_id)
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, NamedTuple, Optional, Tuple
+
+from budget_transfer.global_function.version_tokens import VersionTokens
+
+ARCHIVED_STAGE_ORDER_INDEX_START = 9999
+
+
+class StageSpec(NamedTuple):
+    id: int
+    order_index: int
+    name: str
+    decision_policy: str
+    quorum_count: Optional[int]
+    allow_reject: bool
+    allow_delegate: bool
+    sla_hours: Optional[int]
+    required_role_id: Optional[int]
+    required_role_label: Optional[str]
+    role_security_group_id: Optional[int]
+    role_security_group_name: Optional[str]
+    required_user_level_id: Optional[int]
+
+
+class TemplateSpec(NamedTuple):
+    id: int
+    code: str
+    version: int
+    stages: Mapping            # stage_template_id -> StageSpec (archived stages included)
+    groups: Tuple              # ((order_index, (StageSpec, ...)), ...) excluding archived stages
+
+    def stage(self, stage_template_id) -> Optional[StageSpec]:
+        return self.stages.get(stage_template_id)
+
+    def group(self, order_index) -> Tuple[StageSpec, ...]:
+        for group_order, stages in self.groups:
+            if group_order == order_index:
+                return stages
+        return ()
+
+    def first_group(self) -> Optional[Tuple[int, Tuple[StageSpec, ...]]]:
+        return self.groups[0] if self.groups else None
+
+    def next_group(self, after_order_index) -> Optional[Tuple[int, Tuple[StageSpec, ...]]]:
+        for group in self.groups:
+            if group[0] > after_order_index:
+                return group
+        return None
+
+
+class WorkflowTemplateCache:
+    """
+    Per-process cache of frozen TemplateSpec snapshots keyed by template ID.
+    """
+
+    def __init__(self):
+        self._specs: Dict[int, Tuple[str, TemplateSpec]] = {}
+        self._lock = threading.Lock()
+        self._versions = VersionTokens('approvals.ApprovalTemplateCacheVersion')
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def get_template_version(self, refresh: bool = False) -> str:
+        """
+        The shared template version token, re-read from the database at most
+        every VERSION_CHECK_SECONDS unless refresh is set.
+        """
+        return self._versions.get(refresh=refresh)
+
+    def invalidate(self):
+        """
+        Invalidate snapshots in every process.
+
+        Called from signal handlers when templates, stage templates or roles
+        change. The new token is written in the caller's transaction: other
+        processes pick it up once it commits (within VERSION_CHECK_SECONDS),
+        and a rolled back change leaves the old token in place.
+        """
+        self._versions.bump()
+        with self._lock:
+            self._specs.clear()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, template_id) -> TemplateSpec:
+        """
+        Get the frozen snapshot of a workflow template.
+
+        Raises ApprovalWorkflowTemplate.DoesNotExist for unknown IDs.
+        """
+        entry = self._specs.get(template_id)
+        if entry is not None and entry[0] == self.get_template_version():
+            return entry[1]
+
+        version = self.get_template_version(refresh=True)
+        spec = self._build(template_id)
+        if self.get_template_version(refresh=True) == version:
+            # Only store if no template changed while we were building
+            with self._lock:
+                self._specs[template_id] = (version, spec)
+        return spec
+
+    def stage(self, template_id, stage_template_id) -> Optional[StageSpec]:
+        return self.get(template_id).stage(stage_template_id)
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _build(self, template_id) -> TemplateSpec:
+        from .models import ApprovalWorkflowTemplate
+
+        template = ApprovalWorkflowTemplate.objects.get(pk=template_id)
+        stage_templates = (
+            template.stages.select_related('required_role__security_group', 'required_role__role')
+            .order_by('order_index', 'id')
+        )
+
+        stages = {}
+        groups = []
+        for st in stage_templates:
+            role = st.required_role
+            spec = StageSpec(
+                id=st.id,
+                order_index=st.order_index,
+                name=st.name,
+                decision_policy=st.decision_policy,
+                quorum_count=st.quorum_count,
+                allow_reject=st.allow_reject,
+                allow_delegate=st.allow_delegate,
+                sla_hours=st.sla_hours,
+                required_role_id=st.required_role_id,
+                required_role_label=str(role) if role else None,
+                role_security_group_id=role.security_group_id if role else None,
+                role_security_group_name=role.security_group.group_name if role else None,
+                required_user_level_id=st.required_user_level_id,
+            )
+            stages[st.id] = spec
+            if st.order_index >= ARCHIVED_STAGE_ORDER_INDEX_START:
+                continue
+            if groups and groups[-1][0] == st.order_index:
+                groups[-1][1].append(spec)
+            else:
+                groups.append((st.order_index, [spec]))
+
+        return TemplateSpec(
+            id=template.id,
+            code=template.code,
+            version=template.version,
+            stages=MappingProxyType(stages),
+            groups=tuple((order, tuple(specs)) for order, specs in groups),
+        )
+
+
+# Global cache instance
+template_cache = WorkflowTemplateCache()
@@ -0,0 +1,71 @@
+"""
+Shared data for the approvals tests.
+
+- create_group() / create_users(): a security group and its approvers
+- create_template(): a workflow template with one stage template per stage
+- create_transfers(): budget transfers of a security group, without starting workflows
+"""
+
+from decimal import Decimal
+
+from approvals.models import (
+    ApprovalWorkflowStageTemplate,
+    ApprovalWorkflowTemplate,
+    XX_WorkflowTemplateAssignment,
+)
+from budget_management.models import xx_BudgetTransfer
+from user_management.models import XX_SecurityGroup, XX_UserGroupMembership, xx_User
+
+
+def create_users(prefix, count, group=None):
+    """Users named <prefix>0..<prefix>N-1, active members of group if given."""
+    users = [xx_User.objects.create(username=f'{prefix}{index}', role='user') for index in range(count)]
+    if group is not None:
+        for user in users:
+            XX_UserGroupMembership.objects.create(user=user, security_group=group, is_active=True)
+    return users
+
+
+def create_group(name):
+    return XX_SecurityGroup.objects.create(group_name=name)
+
+
+def create_template(code, group, stages):
+    """
+    A FAR workflow template assigned to group.
+
+    Args:
+        stages: One dict of ApprovalWorkflowStageTemplate fields per stage,
+            in order; order_index defaults to the stage's position
+    """
+    template = ApprovalWorkflowTemplate.objects.create(code=code, transfer_type='FAR', name=code)
+    for index, fields in enumerate(stages, start=1):
+        fields = dict(fields)
+        fields.setdefault('order_index', index)
+        fields.setdefault('name', f'{code} stage {index}')
+        ApprovalWorkflowStageTemplate.objects.create(workflow_template=template, **fields)
+    XX_WorkflowTemplateAssignment.objects.create(security_group=group, workflow_template=template)
+    return template
+
+
+def create_transfers(group, codes):
+    """
+    Pending FAR transfers of group, ordered by pk.
+
+    Created with bulk_create so no workflow is created yet; call
+    ApprovalManager.start_workflow() on the ones that need one.
+    """
+    xx_BudgetTransfer.objects.bulk_create([
+        xx_BudgetTransfer(
+            transaction_date='2025',
+            amount=Decimal(1),
+            status='pending',
+            requested_by='tests',
+            code=code,
+            type='FAR',
+            control_budget='C',
+            security_group=group,
+        )
+        for code in codes
+    ])
+    return list(xx_BudgetTransfer.objects.filter(code__in=codes).order_by('pk'))
@@ -0,0 +1,167 @@
+"""
+Tests for bulk approval actions and their deferred side effects.
+"""
+
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from approvals import side_effects
+from approvals.managers import ApprovalManager
+from approvals.models import ApprovalAction, ApprovalAssignment, ApprovalInboxEntry, ApprovalWorkflowInstance
+from approvals.tests.fixtures import create_group, create_template, create_transfers, create_users
+from budget_management.models import xx_BudgetTransfer
+
+
+@override_settings(AUDIT_LOG_SINK={'ASYNC': False})
+class BulkActionTests(TestCase):
+    """Each bulk item is rolled back alone; the effects of committed items run once after commit."""
+
+    def setUp(self):
+        self.group = create_group('BULK')
+        self.approver, self.other = create_users('bulk', 2, self.group)
+        create_template('BULK', self.group, [{'decision_policy': 'ANY', 'allow_reject': True}])
+        self.transfers = create_transfers(self.group, ['FAR-B1', 'FAR-B2', 'FAR-B3'])
+        for transfer in self.transfers:
+            ApprovalManager.start_workflow(transfer)
+
+        self.sent = []
+        send = mock.patch.object(
+            side_effects, '_send_notification', side_effect=lambda **notification: self.sent.append(notification)
+        )
+        send.start()
+        self.addCleanup(send.stop)
+        # Dashboards are refreshed by their own background task
+        dirty = mock.patch('budget_management.signals.budget_trasnfer.mark_dashboard_dirty')
+        dirty.start()
+        self.addCleanup(dirty.stop)
+
+        self.jobs_run = []
+        self.processed = []
+
+    def process_action_failing_for(self, failing):
+        """process_action that records its calls, and raises after doing its work for `failing`."""
+        process_action = ApprovalManager.process_action
+
+        def wrapper(budget_transfer, user, action, comment=None):
+            self.processed.append(budget_transfer.pk)
+            result = process_action(budget_transfer, user, action, comment=comment)
+            side_effects.defer(('refresh', budget_transfer.pk), lambda: self.jobs_run.append(budget_transfer.pk))
+            side_effects.defer('shared', lambda: self.jobs_run.append('shared'))
+            if budget_transfer.pk == failing.pk:
+                raise RuntimeError('Oracle upload rejected')
+            return result
+
+        return mock.patch.object(ApprovalManager, 'process_action', side_effect=wrapper)
+
+    def notified_transfers(self):
+        return {notification['budget_transfer'].pk for notification in self.sent}
+
+    def test_failing_item_rolls_back_only_itself(self):
+        ok_first, failing, ok_last = self.transfers
+
+        with self.process_action_failing_for(failing), self.captureOnCommitCallbacks(execute=True):
+            results = ApprovalManager.process_actions_bulk(self.approver, [
+                (ok_first.pk, 'approve', 'ok'),
+                (failing.pk, 'approve', 'ok'),
+                (ok_last.pk, 'reject', 'no'),
+            ])
+            # Nothing is sent before the commit
+            self.assertEqual(self.sent, [])
+            self.assertEqual(self.jobs_run, [])
+
+        self.assertEqual([result['status'] for result in results], ['success', 'error', 'success'])
+        self.assertEqual(results[1]['message'], 'Oracle upload rejected')
+        self.assertEqual(results[0]['workflow_status'], 'approved')
+        self.assertEqual(results[2]['workflow_status'], 'rejected')
+
+        # The failed item's action, assignment and inbox changes were rolled back
+        self.assertFalse(ApprovalAction.objects.filter(
+            stage_instance__workflow_instance__budget_transfer=failing, user=self.approver
+        ).exists())
+        self.assertEqual(
+            ApprovalAssignment.objects.get(
+                stage_instance__workflow_instance__budget_transfer=failing, user=self.approver
+            ).status,
+            ApprovalAssignment.STATUS_PENDING,
+        )
+        self.assertTrue(ApprovalInboxEntry.objects.filter(budget_transfer=failing, user=self.approver).exists())
+        self.assertEqual(xx_BudgetTransfer.objects.get(pk=failing.pk).status, 'pending')
+        self.assertEqual(xx_BudgetTransfer.objects.get(pk=ok_first.pk).status, 'approved')
+
+        # Only the committed items' effects ran, once each
+        self.assertNotIn(failing.pk, self.notified_transfers())
+        self.assertEqual(self.notified_transfers(), {ok_first.pk, ok_last.pk})
+        keys = [
+            (notification['user_id'], notification['budget_transfer'].pk, notification['eng_message'])
+            for notification in self.sent
+        ]
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(sorted(self.jobs_run, key=str), sorted([ok_first.pk, ok_last.pk, 'shared'], key=str))
+
+    def test_items_run_in_lock_order(self):
+        instance_order = list(
+            ApprovalWorkflowInstance.objects.order_by('pk').values_list('budget_transfer_id', flat=True)
+        )
+        with self.process_action_failing_for(xx_BudgetTransfer(pk=0)), self.captureOnCommitCallbacks(execute=True):
+            results = ApprovalManager.process_actions_bulk(self.approver, [
+                (transfer.pk, 'approve', None) for transfer in reversed(self.transfers)
+            ] + [(999999, 'approve', None)])
+
+        self.assertEqual(self.processed, instance_order)
+        # Results keep the input order; the unknown transfer is reported, not processed
+        self.assertEqual([result['transaction_id'] for result in results[:3]], [t.pk for t in reversed(self.transfers)])
+        self.assertEqual(results[3]['status'], 'error')
+        self.assertEqual(results[3]['message'], 'Budget transfer not found')
+
+    def test_invalid_action_is_reported_without_running(self):
+        with self.process_action_failing_for(xx_BudgetTransfer(pk=0)), self.captureOnCommitCallbacks(execute=True):
+            results = ApprovalManager.process_actions_bulk(self.approver, [(self.transfers[0].pk, 'delegate', None)])
+
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(self.processed, [])
+        self.assertEqual(self.sent, [])
+
+    def test_nothing_runs_when_the_outer_transaction_rolls_back(self):
+        with self.process_action_failing_for(xx_BudgetTransfer(pk=0)), \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                results = ApprovalManager.process_actions_bulk(self.approver, [
+                    (transfer.pk, 'approve', 'ok') for transfer in self.transfers
+                ])
+                self.assertEqual({result['status'] for result in results}, {'success'})
+                raise RuntimeError('caller failed')
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.sent, [])
+        self.assertEqual(self.jobs_run, [])
+        self.assertFalse(ApprovalAction.objects.filter(user=self.approver).exists())
+
+
+class SideEffectSavepointTests(TestCase):
+    """side_effect_savepoint() keeps or drops the effects of its block with the savepoint."""
+
+    def test_effects_of_a_failed_savepoint_are_dropped(self):
+        ran = []
+        with self.captureOnCommitCallbacks(execute=True):
+            with side_effects.deferred_side_effects(), transaction.atomic():
+                side_effects.defer('kept', lambda: ran.append('kept'))
+                with self.assertRaises(ValueError):
+                    with side_effects.side_effect_savepoint(), transaction.atomic():
+                        side_effects.defer('dropped', lambda: ran.append('dropped'))
+                        raise ValueError
+                with side_effects.side_effect_savepoint(), transaction.atomic():
+                    side_effects.defer('merged', lambda: ran.append('merged'))
+                    # Same key as the enclosing batch: runs once
+                    side_effects.defer('kept', lambda: ran.append('kept twice'))
+                self.assertEqual(ran, [])
+
+        self.assertEqual(ran, ['kept', 'merged'])
+
+    def test_outside_a_deferred_block_effects_run_immediately(self):
+        ran = []
+        with side_effects.side_effect_savepoint() as batch:
+            side_effects.defer('now', lambda: ran.append('now'))
+        self.assertIsNone(batch)
+        self.assertEqual(ran, ['now'])
@@ -0,0 +1,132 @@
+"""
+Tests for keeping the denormalized approval inbox in sync with assignments.
+"""
+
+from django.test import TestCase
+
+from approvals import inbox
+from approvals.managers import ApprovalManager
+from approvals.models import (
+    ApprovalAssignment,
+    ApprovalInboxEntry,
+    ApprovalWorkflowStageInstance,
+)
+from approvals.tests.fixtures import create_group, create_template, create_transfers, create_users
+from budget_management.models import xx_BudgetTransfer
+
+
+def inbox_rows():
+    return set(ApprovalInboxEntry.objects.values_list('user_id', 'assignment_id', 'stage_instance_id'))
+
+
+def live_rows():
+    """What the inbox must hold: pending assignments on active stages."""
+    return set(
+        ApprovalAssignment.objects.filter(
+            status=ApprovalAssignment.STATUS_PENDING,
+            stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE,
+        ).values_list('user_id', 'id', 'stage_instance_id')
+    )
+
+
+class ApprovalInboxTests(TestCase):
+    """Every ApprovalManager path keeps one inbox row per pending assignment on an active stage."""
+
+    def setUp(self):
+        self.group = create_group('INBOX')
+        self.users = create_users('inbox', 3, self.group)
+        self.outsider = create_users('outsider', 1)[0]
+        create_template('INBOX', self.group, [
+            {'decision_policy': 'ALL', 'allow_delegate': True, 'sla_hours': 4},
+            {'decision_policy': 'ANY'},
+        ])
+        self.transfer = create_transfers(self.group, ['FAR-I1'])[0]
+        ApprovalManager.start_workflow(self.transfer)
+
+    def transfer_fresh(self):
+        return xx_BudgetTransfer.objects.get(pk=self.transfer.pk)
+
+    def active_stage(self):
+        return ApprovalWorkflowStageInstance.objects.get(status=ApprovalWorkflowStageInstance.STATUS_ACTIVE)
+
+    def test_activation_adds_a_row_per_assignment(self):
+        stage = self.active_stage()
+
+        self.assertEqual(inbox_rows(), live_rows())
+        self.assertEqual(
+            set(ApprovalInboxEntry.objects.values_list('user_id', flat=True)),
+            {user.pk for user in self.users},
+        )
+        entry = ApprovalInboxEntry.objects.first()
+        self.assertEqual(entry.budget_transfer_id, self.transfer.pk)
+        self.assertEqual(entry.activated_at, stage.activated_at)
+        self.assertEqual(entry.due_at, stage.due_at)
+
+    def test_approval_removes_only_the_approvers_row(self):
+        ApprovalManager.process_action(self.transfer_fresh(), self.users[0], 'approve', comment='ok')
+
+        self.assertEqual(inbox_rows(), live_rows())
+        self.assertFalse(ApprovalInboxEntry.objects.filter(user=self.users[0]).exists())
+        self.assertEqual(ApprovalInboxEntry.objects.count(), 2)
+
+    def test_delegation_moves_the_row_to_the_delegate(self):
+        ApprovalManager.delegate(self.users[1], self.outsider, self.active_stage())
+
+        self.assertEqual(inbox_rows(), live_rows())
+        users = set(ApprovalInboxEntry.objects.values_list('user_id', flat=True))
+        self.assertNotIn(self.users[1].pk, users)
+        self.assertIn(self.outsider.pk, users)
+
+    def test_group_completion_replaces_the_stage_rows(self):
+        first_stage = self.active_stage()
+        for user in self.users:
+            ApprovalManager.process_action(self.transfer_fresh(), user, 'approve', comment='ok')
+
+        self.assertEqual(inbox_rows(), live_rows())
+        self.assertFalse(ApprovalInboxEntry.objects.filter(stage_instance=first_stage).exists())
+        second_stage = self.active_stage()
+        self.assertNotEqual(second_stage.pk, first_stage.pk)
+        self.assertEqual(ApprovalInboxEntry.objects.filter(stage_instance=second_stage).count(), 3)
+
+    def test_cancellation_removes_every_row(self):
+        ApprovalManager.cancel_workflow(self.transfer_fresh())
+
+        self.assertEqual(inbox_rows(), set())
+        self.assertEqual(live_rows(), set())
+
+    def test_keyset_cursor_walks_every_row_once(self):
+        for transfer in create_transfers(self.group, ['FAR-I2', 'FAR-I3', 'FAR-I4']):
+            ApprovalManager.start_workflow(transfer)
+        user = self.users[0]
+        expected = list(
+            ApprovalInboxEntry.objects.filter(user=user).order_by('-activated_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(len(expected), 4)
+
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = ApprovalManager.get_user_inbox(user, before=cursor, page_size=3)
+            seen.extend(row.id for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_page_size_is_capped(self):
+        rows, cursor = inbox.get_user_inbox(self.users[0], page_size=0)
+        self.assertEqual(len(rows), 1)
+        self.assertIsNone(cursor)
+
+    def test_rebuild_matches_the_live_state(self):
+        ApprovalManager.process_action(self.transfer_fresh(), self.users[0], 'approve', comment='ok')
+        ApprovalManager.delegate(self.users[1], self.outsider, self.active_stage())
+        other = create_transfers(self.group, ['FAR-I5'])[0]
+        ApprovalManager.start_workflow(other)
+        expected = inbox_rows()
+        # Drift from edits made outside ApprovalManager
+        ApprovalInboxEntry.objects.filter(budget_transfer=other).delete()
+
+        self.assertEqual(inbox.rebuild_inbox(), len(expected))
+
+        self.assertEqual(inbox_rows(), expected)
+        self.assertEqual(inbox_rows(), live_rows())
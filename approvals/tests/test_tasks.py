@@ -0,0 +1,142 @@
+"""
+Tests for the approvals background tasks.
+"""
+
+from datetime import timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from approvals.managers import ApprovalManager
+from approvals.models import ApprovalDelegation, ApprovalDelegationCleanupState, ApprovalWorkflowStageInstance
+from approvals.tasks import DELEGATION_CLEANUP_OVERLAP, check_sla_breaches, cleanup_delegations
+from approvals.tests.fixtures import create_group, create_template, create_transfers, create_users
+
+
+class SlaBreachTests(TestCase):
+    """Overdue stages are notified once; a failing hook is retried on the next run."""
+
+    def setUp(self):
+        group = create_group('SLA')
+        create_users('sla', 2, group)
+        create_template('SLA', group, [{'decision_policy': 'ANY', 'sla_hours': 2}])
+        for transfer in create_transfers(group, ['FAR-S1', 'FAR-S2', 'FAR-S3']):
+            ApprovalManager.start_workflow(transfer)
+        self.stages = list(
+            ApprovalWorkflowStageInstance.objects.filter(
+                status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
+            ).order_by('id')
+        )
+        ApprovalWorkflowStageInstance.objects.filter(pk__in=[stage.pk for stage in self.stages]).update(
+            due_at=timezone.now() - timedelta(hours=1)
+        )
+
+    def notified(self):
+        return set(
+            ApprovalWorkflowStageInstance.objects.filter(sla_breach_notified=True).values_list('id', flat=True)
+        )
+
+    def test_failing_hook_leaves_only_its_stage_unflagged(self):
+        failing = self.stages[1]
+
+        def on_sla_breached(stage):
+            if stage.pk == failing.pk:
+                raise RuntimeError('escalation failed')
+
+        with mock.patch.object(ApprovalManager, 'on_sla_breached', side_effect=on_sla_breached) as hook, \
+                self.assertLogs('approvals.tasks', level='ERROR') as logs:
+            self.assertEqual(check_sla_breaches(batch_size=1), 2)
+
+        self.assertEqual(hook.call_count, 3)
+        self.assertEqual(self.notified(), {self.stages[0].pk, self.stages[2].pk})
+        self.assertIn(f'stage instance {failing.pk}', logs.output[0])
+        self.assertIn('RuntimeError', logs.output[0])
+
+        # Only the failed stage is picked up again
+        with mock.patch.object(ApprovalManager, 'on_sla_breached') as hook:
+            self.assertEqual(check_sla_breaches(), 1)
+        hook.assert_called_once_with(mock.ANY)
+        self.assertEqual(hook.call_args[0][0].pk, failing.pk)
+        self.assertEqual(self.notified(), {stage.pk for stage in self.stages})
+
+    def test_notified_stages_are_not_picked_up_again(self):
+        with mock.patch.object(ApprovalManager, 'on_sla_breached') as hook:
+            self.assertEqual(check_sla_breaches(), 3)
+            self.assertEqual(check_sla_breaches(), 0)
+        self.assertEqual(hook.call_count, 3)
+
+    def test_stages_within_sla_are_not_notified(self):
+        ApprovalWorkflowStageInstance.objects.filter(pk=self.stages[0].pk).update(
+            due_at=timezone.now() + timedelta(hours=1)
+        )
+        with mock.patch.object(ApprovalManager, 'on_sla_breached') as hook:
+            self.assertEqual(check_sla_breaches(), 2)
+        self.assertNotIn(self.stages[0].pk, {call[0][0].pk for call in hook.call_args_list})
+
+
+class DelegationCleanupTests(TestCase):
+    """Each run walks stages completed since the stored mark, rewound by the overlap window."""
+
+    def setUp(self):
+        group = create_group('DELEG')
+        self.from_user, self.to_user = create_users('deleg', 2, group)
+        create_template('DELEG', group, [{'decision_policy': 'ANY', 'allow_delegate': True}])
+        transfers = create_transfers(group, ['FAR-D1', 'FAR-D2', 'FAR-D3', 'FAR-D4'])
+        for transfer in transfers:
+            ApprovalManager.start_workflow(transfer)
+        self.stages = list(ApprovalWorkflowStageInstance.objects.order_by('id'))
+        self.delegations = [
+            ApprovalDelegation.objects.create(from_user=self.from_user, to_user=self.to_user, stage_instance=stage)
+            for stage in self.stages
+        ]
+        self.watermark = timezone.now() - timedelta(hours=1)
+
+    def complete(self, stage, completed_at):
+        ApprovalWorkflowStageInstance.objects.filter(pk=stage.pk).update(
+            status=ApprovalWorkflowStageInstance.STATUS_COMPLETED, completed_at=completed_at
+        )
+
+    def set_watermark(self, watermark):
+        ApprovalDelegationCleanupState.objects.update_or_create(pk=1, defaults={'watermark': watermark})
+
+    def active(self):
+        return set(ApprovalDelegation.objects.filter(active=True).values_list('id', flat=True))
+
+    def test_first_run_scans_active_delegations_and_stores_the_mark(self):
+        self.complete(self.stages[0], self.watermark - timedelta(days=30))
+
+        self.assertEqual(cleanup_delegations(), 1)
+
+        self.assertNotIn(self.delegations[0].pk, self.active())
+        state = ApprovalDelegationCleanupState.objects.get(pk=1)
+        self.assertIsNotNone(state.watermark)
+        self.assertGreater(state.watermark, self.watermark)
+
+    def test_incremental_run_only_walks_stages_after_the_overlap_window(self):
+        old, late, recent, running = self.stages
+        self.complete(old, self.watermark - DELEGATION_CLEANUP_OVERLAP - timedelta(minutes=1))
+        self.complete(late, self.watermark - DELEGATION_CLEANUP_OVERLAP + timedelta(minutes=1))
+        recent_completed_at = self.watermark + timedelta(minutes=30)
+        self.complete(recent, recent_completed_at)
+        self.set_watermark(self.watermark)
+
+        with self.assertNumQueries(7):
+            # State row, a chunk and an UPDATE per stage in the window, the empty chunk, the mark
+            self.assertEqual(cleanup_delegations(batch_size=1), 2)
+
+        # Stages completed before the window were handled by an earlier run
+        self.assertEqual(self.active(), {self.delegations[0].pk, self.delegations[3].pk})
+        self.assertEqual(ApprovalDelegationCleanupState.objects.get(pk=1).watermark, recent_completed_at)
+
+        # The mark moved past them: the next run has nothing to do
+        self.assertEqual(cleanup_delegations(), 0)
+        self.assertEqual(ApprovalDelegationCleanupState.objects.get(pk=1).watermark, recent_completed_at)
+
+    def test_full_run_ignores_the_mark(self):
+        self.complete(self.stages[0], self.watermark - timedelta(days=30))
+        self.set_watermark(self.watermark)
+
+        self.assertEqual(cleanup_delegations(), 0)
+        self.assertEqual(cleanup_delegations(full=True), 1)
+        self.assertNotIn(self.delegations[0].pk, self.active())
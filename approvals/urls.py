@@ -7,6 +7,7 @@ from .views import (
     WorkflowTemplateAssignmentDetailView,
     BulkAssignWorkflowsView,
     ReorderWorkflowAssignmentsView,
+    ApprovalInboxView,
 )
 
 router = DefaultRouter()
@@ -21,4 +22,7 @@ urlpatterns = [
     path('workflow-assignments/<int:pk>/', WorkflowTemplateAssignmentDetailView.as_view(), name='workflow-assignments-detail'),
     path('workflow-assignments/bulk-assign/', BulkAssignWorkflowsView.as_view(), name='workflow-assignments-bulk'),
     path('workflow-assignments/reorder/', ReorderWorkflowAssignmentsView.as_view(), name='workflow-assignments-reorder'),
+    
+    # Approval inbox (pending approvals for the current user)
+    path('inbox/', ApprovalInboxView.as_view(), name='approval-inbox'),
 ]
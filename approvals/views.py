@@ -279,3 +279,59 @@ class ReorderWorkflowAssignmentsView(APIView):
             'message': f'Reordered {updated_count} workflow assignment(s)',
             'assignments': serializer.data
         })
+
+
+# -------------------------------
+# Approval Inbox
+# -------------------------------
+class ApprovalInboxView(APIView):
+    """
+    GET: Current user's pending approvals from the approval inbox, newest first.
+    Query params: page_size (default 50, max 200), cursor (next_cursor from the previous page)
+    """
+    permission_classes = [IsAuthenticated]
+    
+    def get(self, request):
+        from django.utils.dateparse import parse_datetime
+        from .inbox import DEFAULT_INBOX_PAGE_SIZE
+        from .managers import ApprovalManager
+        
+        before = None
+        cursor = request.query_params.get('cursor')
+        if cursor:
+            activated_at, _, entry_id = cursor.rpartition('|')
+            activated_at = parse_datetime(activated_at)
+            if activated_at is None or not entry_id.isdigit():
+                return Response({
+                    'success': False,
+                    'error': 'Invalid cursor'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            before = (activated_at, int(entry_id))
+        
+        try:
+            page_size = int(request.query_params.get('page_size', DEFAULT_INBOX_PAGE_SIZE))
+        except ValueError:
+            page_size = DEFAULT_INBOX_PAGE_SIZE
+        
+        rows, next_cursor = ApprovalManager.get_user_inbox(request.user, before=before, page_size=page_size)
+        results = [
+            {
+                'transaction_id': row.budget_transfer_id,
+                'code': row.budget_transfer.code,
+                'amount': row.budget_transfer.amount,
+                'status': row.budget_transfer.status,
+                'requested_by': row.budget_transfer.requested_by,
+                'request_date': row.budget_transfer.request_date,
+                'stage_instance_id': row.stage_instance_id,
+                'stage_name': row.stage_instance.stage_template.name,
+                'activated_at': row.activated_at,
+                'due_at': row.due_at,
+            }
+            for row in rows
+        ]
+        
+        return Response({
+            'success': True,
+            'results': results,
+            'next_cursor': f'{next_cursor[0].isoformat()}|{next_cursor[1]}' if next_cursor else None,
+        })
@@ -0,0 +1,352 @@
+"""
+Incremental dashboard counters.
+
+Keeps xx_DashboardCounter in step with xx_BudgetTransfer and
+xx_TransactionTransfer by applying signed deltas from their signals, inside
+the transaction that changed them, so dashboards are read from a handful of
+counter rows instead of re-aggregating both tables.
+
+Dimensions (key -> rows per status):
+
+- transfers          ""                      number of transfers
+- prefix             code[:3].upper()        transfers per code prefix (FAR, AFR, ...)
+- status_level       status_level            transfers per approval level
+- transaction_date   transaction_date        transfers per period (month abbreviation)
+- cost_center        cost_center_code        lines, sum(from_center), sum(to_center)
+- account            account_code            same, per account
+- combination        "cost_center|account"   same, per pair
+
+Line rows are filed under the status of their transfer, so a status change
+moves the transfer's line totals from the old status to the new one.
+
+Writes that bypass signals (bulk_create, queryset.update, raw SQL) are not
+tracked; reconcile_counters() recomputes everything and repairs drift, and
+runs nightly (budget_management.tasks.reconcile_dashboard_counters).
+"""
+
+import threading
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+
+TRANSFERS = "transfers"
+PREFIX = "prefix"
+STATUS_LEVEL = "status_level"
+TRANSACTION_DATE = "transaction_date"
+COST_CENTER = "cost_center"
+ACCOUNT = "account"
+COMBINATION = "combination"
+
+TRANSFER_DIMENSIONS = (TRANSFERS, PREFIX, STATUS_LEVEL, TRANSACTION_DATE)
+LINE_DIMENSIONS = (COST_CENTER, ACCOUNT, COMBINATION)
+
+# Transfer fields the counters depend on
+TRANSFER_FIELDS = ("status", "code", "status_level", "transaction_date")
+# Line fields the counters depend on
+LINE_FIELDS = ("transaction_id", "cost_center_code", "account_code", "from_center", "to_center")
+
+ZERO = Decimal("0")
+
+# Transfers being deleted in this thread. Their lines are subtracted with the
+# transfer, because a cascade may delete the lines before or after it.
+_deleting = threading.local()
+
+
+def _key(value):
+    return "" if value is None else str(value)
+
+
+def code_prefix(code):
+    return (code or "")[:3].upper()
+
+
+def transfer_keys(state):
+    """(dimension, key) pairs a transfer is counted under. state holds TRANSFER_FIELDS."""
+    return (
+        (TRANSFERS, ""),
+        (PREFIX, code_prefix(state["code"])),
+        (STATUS_LEVEL, _key(state["status_level"])),
+        (TRANSACTION_DATE, _key(state["transaction_date"])),
+    )
+
+
+def line_keys(cost_center_code, account_code):
+    """(dimension, key) pairs a line is summed under."""
+    return (
+        (COST_CENTER, _key(cost_center_code)),
+        (ACCOUNT, _key(account_code)),
+        (COMBINATION, f"{_key(cost_center_code)}|{_key(account_code)}"),
+    )
+
+
+def transfer_state(instance):
+    return {field: getattr(instance, field) for field in TRANSFER_FIELDS}
+
+
+def line_state(instance):
+    return {field: getattr(instance, field) for field in LINE_FIELDS}
+
+
+class CounterDelta:
+    """Accumulates signed deltas per (dimension, key, status) before writing them."""
+
+    def __init__(self):
+        self.rows = defaultdict(lambda: [0, ZERO, ZERO])
+
+    def add_transfer(self, state, sign):
+        for dimension, key in transfer_keys(state):
+            self.rows[(dimension, key, state["status"])][0] += sign
+
+    def add_lines(self, status, cost_center_code, account_code, count, total_from, total_to, sign):
+        for dimension, key in line_keys(cost_center_code, account_code):
+            row = self.rows[(dimension, key, status)]
+            row[0] += sign * count
+            row[1] += sign * (total_from or ZERO)
+            row[2] += sign * (total_to or ZERO)
+
+    def apply(self):
+        """Write the accumulated deltas (sorted, so concurrent writers lock rows in the same order)."""
+        from .models import xx_DashboardCounter
+
+        for (dimension, key, status), (count, total_from, total_to) in sorted(self.rows.items()):
+            if not count and not total_from and not total_to:
+                continue
+            lookup = {"dimension": dimension, "key": key, "status": status}
+            changes = {
+                "count": F("count") + count,
+                "total_from_center": F("total_from_center") + total_from,
+                "total_to_center": F("total_to_center") + total_to,
+            }
+            if xx_DashboardCounter.objects.filter(**lookup).update(**changes):
+                continue
+            try:
+                with transaction.atomic():
+                    xx_DashboardCounter.objects.create(
+                        count=count, total_from_center=total_from, total_to_center=total_to, **lookup
+                    )
+            except IntegrityError:
+                # Created concurrently - apply on top of it
+                xx_DashboardCounter.objects.filter(**lookup).update(**changes)
+
+
+# ----------------------------------------------------------------------------
+# Signal-side entry points
+# ----------------------------------------------------------------------------
+
+def _transfer_status(transaction_id):
+    from .models import xx_BudgetTransfer
+
+    if transaction_id is None:
+        return None
+    return (
+        xx_BudgetTransfer.objects.filter(pk=transaction_id)
+        .values_list("status", flat=True)
+        .first()
+    )
+
+
+def _grouped_lines(transaction_id):
+    from transaction.models import xx_TransactionTransfer
+
+    return (
+        xx_TransactionTransfer.objects.filter(transaction_id=transaction_id)
+        .values("cost_center_code", "account_code")
+        .annotate(lines=Count("transfer_id"), total_from=Sum("from_center"), total_to=Sum("to_center"))
+        .order_by()
+    )
+
+
+def transfer_saved(instance, created, previous=None):
+    """Apply deltas for a created/updated transfer. previous: TRANSFER_FIELDS before the save."""
+    current = transfer_state(instance)
+    delta = CounterDelta()
+    if created or previous is None:
+        delta.add_transfer(current, +1)
+    elif previous != current:
+        delta.add_transfer(previous, -1)
+        delta.add_transfer(current, +1)
+        if previous["status"] != current["status"]:
+            for row in _grouped_lines(instance.pk):
+                args = (row["cost_center_code"], row["account_code"], row["lines"], row["total_from"], row["total_to"])
+                delta.add_lines(previous["status"], *args, sign=-1)
+                delta.add_lines(current["status"], *args, sign=+1)
+    delta.apply()
+
+
+def _deleting_ids():
+    if not hasattr(_deleting, "ids"):
+        _deleting.ids = set()
+    return _deleting.ids
+
+
+def transfer_deleting(instance):
+    """Capture a transfer's line totals before it (and its lines) are deleted."""
+    instance._dashboard_lines = list(_grouped_lines(instance.pk))
+    _deleting_ids().add(instance.pk)
+
+
+def transfer_deleted(instance):
+    """Remove a deleted transfer together with the lines captured by transfer_deleting()."""
+    _deleting_ids().discard(instance.pk)
+    state = transfer_state(instance)
+    delta = CounterDelta()
+    delta.add_transfer(state, -1)
+    for row in getattr(instance, "_dashboard_lines", ()):
+        delta.add_lines(
+            state["status"], row["cost_center_code"], row["account_code"],
+            row["lines"], row["total_from"], row["total_to"], sign=-1,
+        )
+    delta.apply()
+
+
+def line_saved(instance, previous=None):
+    """Apply deltas for a created/updated line. previous: LINE_FIELDS before the save."""
+    current = line_state(instance)
+    if previous == current:
+        return
+    delta = CounterDelta()
+    statuses = {}
+    for state, sign in ((previous, -1), (current, +1)):
+        if not state or state["transaction_id"] is None:
+            continue
+        transaction_id = state["transaction_id"]
+        if transaction_id not in statuses:
+            statuses[transaction_id] = _transfer_status(transaction_id)
+        if statuses[transaction_id] is None:
+            continue
+        delta.add_lines(
+            statuses[transaction_id], state["cost_center_code"], state["account_code"],
+            1, state["from_center"], state["to_center"], sign=sign,
+        )
+    delta.apply()
+
+
+def line_deleted(instance):
+    if instance.transaction_id in _deleting_ids():
+        # Part of a transfer delete - subtracted by transfer_deleted()
+        return
+    status = _transfer_status(instance.transaction_id)
+    if status is None:
+        return
+    delta = CounterDelta()
+    delta.add_lines(
+        status, instance.cost_center_code, instance.account_code,
+        1, instance.from_center, instance.to_center, sign=-1,
+    )
+    delta.apply()
+
+
+# ----------------------------------------------------------------------------
+# Reads
+# ----------------------------------------------------------------------------
+
+def get_counters(dimensions, status=None):
+    """{(dimension, key, status): (count, total_from_center, total_to_center)}"""
+    from .models import xx_DashboardCounter
+
+    queryset = xx_DashboardCounter.objects.filter(dimension__in=dimensions)
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    return {
+        (row.dimension, row.key, row.status): (row.count, row.total_from_center, row.total_to_center)
+        for row in queryset
+    }
+
+
+# ----------------------------------------------------------------------------
+# Full rebuild / reconciliation
+# ----------------------------------------------------------------------------
+
+def compute_counters():
+    """
+    Recompute every counter from scratch.
+
+    Returns {(dimension, key, status): (count, total_from_center, total_to_center)}.
+    """
+    from transaction.models import xx_TransactionTransfer
+
+    from .models import xx_BudgetTransfer
+
+    expected = defaultdict(lambda: [0, ZERO, ZERO])
+
+    transfer_groups = (
+        xx_BudgetTransfer.objects.values(*TRANSFER_FIELDS)
+        .annotate(transfers=Count("pk"))
+        .order_by()
+    )
+    for row in transfer_groups:
+        for dimension, key in transfer_keys(row):
+            expected[(dimension, key, row["status"])][0] += row["transfers"]
+
+    line_groups = (
+        xx_TransactionTransfer.objects.filter(transaction__isnull=False)
+        .values("transaction__status", "cost_center_code", "account_code")
+        .annotate(lines=Count("pk"), total_from=Sum("from_center"), total_to=Sum("to_center"))
+        .order_by()
+    )
+    for row in line_groups:
+        for dimension, key in line_keys(row["cost_center_code"], row["account_code"]):
+            entry = expected[(dimension, key, row["transaction__status"])]
+            entry[0] += row["lines"]
+            entry[1] += row["total_from"] or ZERO
+            entry[2] += row["total_to"] or ZERO
+
+    return {key: tuple(value) for key, value in expected.items() if value[0]}
+
+
+def reconcile_counters(fix=True):
+    """
+    Compare the stored counters with a full recomputation.
+
+    Args:
+        fix: Overwrite drifted rows, create missing ones and delete stale ones
+
+    Returns:
+        List of mismatches: [{'dimension', 'key', 'status', 'stored', 'expected'}]
+    """
+    from .models import xx_DashboardCounter
+
+    with transaction.atomic():
+        # Lock the counters before aggregating: a transfer saved meanwhile
+        # waits to apply its delta until the overwrite below has committed,
+        # instead of being counted in the stored rows but not in the expected ones
+        stored = {
+            (row.dimension, row.key, row.status): row
+            for row in xx_DashboardCounter.objects.select_for_update()
+        }
+        expected = compute_counters()
+
+        mismatches = []
+        to_create = []
+        for lookup in sorted(set(expected) | set(stored)):
+            want = expected.get(lookup, (0, ZERO, ZERO))
+            row = stored.get(lookup)
+            have = (row.count, row.total_from_center, row.total_to_center) if row else (0, ZERO, ZERO)
+            if want == have:
+                continue
+            mismatches.append({
+                "dimension": lookup[0],
+                "key": lookup[1],
+                "status": lookup[2],
+                "stored": [have[0], str(have[1]), str(have[2])],
+                "expected": [want[0], str(want[1]), str(want[2])],
+            })
+            if not fix:
+                continue
+            if row is None:
+                to_create.append(xx_DashboardCounter(
+                    dimension=lookup[0], key=lookup[1], status=lookup[2],
+                    count=want[0], total_from_center=want[1], total_to_center=want[2],
+                ))
+            elif lookup not in expected:
+                row.delete()
+            else:
+                xx_DashboardCounter.objects.filter(pk=row.pk).update(
+                    count=want[0], total_from_center=want[1], total_to_center=want[2]
+                )
+        if to_create:
+            xx_DashboardCounter.objects.bulk_create(to_create)
+
+    return mismatches
@@ -0,0 +1,293 @@
+"""
+Per-security-group dashboard snapshots.
+
+DashboardBudgetTransferView shows, per transfer type (FAR, AFR, DFR, HFR)
+and status, the number of transfers in the user's security groups. Instead
+of counting live on every request, each security group has a precomputed
+xx_DashboardGroupSnapshot, built from one grouped query over
+(code_prefix, status, status_level):
+
+    {"total": 12, "counts": {"FAR": {"pending": 2, "approved": 1}, ...}, "levels": {"1": 9, "2": 3}}
+
+Transaction IDs are not part of the snapshot; transaction_ids_page() returns
+them one page at a time, on request.
+
+A transfer belongs to exactly one group, so the dashboard of a multi-group
+user is the merge of their groups' snapshots. Merged group-sets are cached
+under the member groups' (id, version) pairs, so they are invalidated as soon
+as any member snapshot is recomputed.
+
+Refreshes are incremental: transfer saves/deletes mark only the affected
+groups stale (mark_groups_stale), and the debounced dashboard refresh
+(run_pending_dashboard_refresh) recomputes just those (refresh_group_snapshots).
+
+Usage:
+    from budget_management.dashboard_snapshots import get_user_snapshot, by_transfer_type
+
+    snapshot = get_user_snapshot(request.user)
+    data = by_transfer_type(snapshot)
+"""
+
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, F
+from django.utils import timezone
+
+TRANSFER_TYPES = ("FAR", "AFR", "DFR", "HFR")
+STATUSES = ("pending", "approved", "rejected")
+
+GROUP_SET_CACHE_PREFIX = "dashboard_group_set"
+GROUP_SET_CACHE_TIMEOUT = 60 * 60
+
+SUPERADMIN_ROLE = 1
+
+DEFAULT_IDS_PAGE_SIZE = 100
+MAX_IDS_PAGE_SIZE = 1000
+
+
+# ----------------------------------------------------------------------------
+# Building
+# ----------------------------------------------------------------------------
+
+def _group_filter(group_id):
+    if group_id is None:
+        return {"security_group__isnull": True}
+    return {"security_group_id": group_id}
+
+
+def build_group_snapshot(group_id):
+    """Compute the snapshot data of one security group (None: transfers without a group)."""
+    from .models import xx_BudgetTransfer
+
+    total = 0
+    counts = {}
+    levels = {}
+    rows = (
+        xx_BudgetTransfer.objects.filter(**_group_filter(group_id))
+        .values("code_prefix", "status", "status_level")
+        .annotate(transfers=Count("pk"))
+        .order_by()
+    )
+    for row in rows:
+        total += row["transfers"]
+        by_status = counts.setdefault(row["code_prefix"], {})
+        by_status[row["status"]] = by_status.get(row["status"], 0) + row["transfers"]
+        level = str(row["status_level"])
+        levels[level] = levels.get(level, 0) + row["transfers"]
+    return {"total": total, "counts": counts, "levels": levels}
+
+
+def mark_groups_stale(group_ids):
+    """Mark the snapshots of the given groups for recomputation (None: no group)."""
+    from .models import xx_DashboardGroupSnapshot
+
+    group_ids = set(group_ids)
+    if None in group_ids:
+        xx_DashboardGroupSnapshot.objects.filter(security_group__isnull=True).update(is_stale=True)
+        group_ids.discard(None)
+    if group_ids:
+        xx_DashboardGroupSnapshot.objects.filter(security_group_id__in=group_ids).update(is_stale=True)
+
+
+def _refresh_group(snapshot_id, group_id):
+    from .models import xx_DashboardGroupSnapshot
+
+    # Cleared first, so changes made while computing mark the row stale again
+    xx_DashboardGroupSnapshot.objects.filter(pk=snapshot_id).update(is_stale=False)
+    xx_DashboardGroupSnapshot.objects.filter(pk=snapshot_id).update(
+        data=build_group_snapshot(group_id),
+        version=F("version") + 1,
+        refreshed_at=timezone.now(),
+    )
+
+
+def _ensure_snapshot_rows(group_ids):
+    """Create (stale) snapshot rows for groups that do not have one yet."""
+    from .models import xx_DashboardGroupSnapshot
+
+    existing = set(
+        xx_DashboardGroupSnapshot.objects.values_list("security_group_id", flat=True)
+    )
+    missing = [group_id for group_id in set(group_ids) if group_id not in existing]
+    if missing:
+        xx_DashboardGroupSnapshot.objects.bulk_create(
+            [xx_DashboardGroupSnapshot(security_group_id=group_id) for group_id in missing],
+            ignore_conflicts=True,
+        )
+
+
+def _groups_with_transfers():
+    from .models import xx_BudgetTransfer
+
+    return set(
+        xx_BudgetTransfer.objects.order_by()
+        .values_list("security_group_id", flat=True)
+        .distinct()
+    )
+
+
+def refresh_group_snapshots(group_ids=None, full=False):
+    """
+    Recompute stale group snapshots.
+
+    Args:
+        group_ids: Only consider these groups (default: every group with transfers)
+        full: Recompute even snapshots that are not stale
+
+    Returns:
+        int: Number of snapshots recomputed
+    """
+    from .models import xx_DashboardGroupSnapshot
+
+    if group_ids is None:
+        group_ids = _groups_with_transfers()
+        snapshots = xx_DashboardGroupSnapshot.objects.all()
+    else:
+        group_ids = set(group_ids)
+        snapshots = xx_DashboardGroupSnapshot.objects.filter(
+            security_group_id__in=[group_id for group_id in group_ids if group_id is not None]
+        )
+        if None in group_ids:
+            snapshots = snapshots | xx_DashboardGroupSnapshot.objects.filter(security_group__isnull=True)
+    _ensure_snapshot_rows(group_ids)
+
+    if not full:
+        snapshots = snapshots.filter(is_stale=True)
+    refreshed = 0
+    for snapshot_id, group_id in snapshots.values_list("pk", "security_group_id"):
+        _refresh_group(snapshot_id, group_id)
+        refreshed += 1
+    return refreshed
+
+
+# ----------------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------------
+
+def get_user_group_ids(user):
+    """Security groups whose transfers the user sees, or None for all (SuperAdmin)."""
+    from user_management.models import XX_UserGroupMembership
+
+    if user.role == SUPERADMIN_ROLE:
+        return None
+    return set(
+        XX_UserGroupMembership.objects.filter(user=user, is_active=True)
+        .order_by()
+        .values_list("security_group_id", flat=True)
+    )
+
+
+def merge_snapshots(datas):
+    """Merge group snapshot data; groups are disjoint so counts simply add up."""
+    total = 0
+    counts = {}
+    levels = {}
+    for data in datas:
+        total += data.get("total", 0)
+        for prefix, by_status in data.get("counts", {}).items():
+            merged = counts.setdefault(prefix, {})
+            for status_value, count in by_status.items():
+                merged[status_value] = merged.get(status_value, 0) + count
+        for level, count in data.get("levels", {}).items():
+            levels[level] = levels.get(level, 0) + count
+    return {"total": total, "counts": counts, "levels": levels}
+
+
+def get_user_snapshot(user, refresh=False):
+    """
+    Merged snapshot of the groups the user is entitled to.
+
+    Groups without a computed snapshot are computed inline; stale ones are
+    served as they are (refresh_pending is set) unless refresh=True.
+
+    Returns:
+        {"total", "counts", "levels", "versions": {group_id: version}, "refresh_pending": bool}
+    """
+    from .models import xx_DashboardGroupSnapshot
+
+    group_ids = get_user_group_ids(user)
+    if group_ids is not None and not group_ids:
+        return {"total": 0, "counts": {}, "levels": {}, "versions": {}, "refresh_pending": False}
+
+    if group_ids is None:
+        group_ids = _groups_with_transfers()
+        snapshots = xx_DashboardGroupSnapshot.objects.all()
+    else:
+        snapshots = xx_DashboardGroupSnapshot.objects.filter(security_group_id__in=group_ids)
+
+    rows = list(snapshots.values_list("security_group_id", "version", "is_stale", "refreshed_at"))
+    uncomputed = set(group_ids) - {group_id for group_id, _, _, refreshed_at in rows if refreshed_at}
+    if refresh:
+        uncomputed |= {group_id for group_id, _, is_stale, _ in rows if is_stale}
+    if uncomputed:
+        refresh_group_snapshots(uncomputed, full=True)
+        rows = list(snapshots.values_list("security_group_id", "version", "is_stale", "refreshed_at"))
+
+    versions = sorted((group_id or 0, version) for group_id, version, _, _ in rows)
+    digest = hashlib.sha256(repr(versions).encode("utf-8")).hexdigest()
+    cache_key = f"{GROUP_SET_CACHE_PREFIX}:{digest}"
+    merged = cache.get(cache_key)
+    if merged is None:
+        merged = merge_snapshots(snapshots.values_list("data", flat=True))
+        cache.set(cache_key, merged, GROUP_SET_CACHE_TIMEOUT)
+
+    return dict(
+        merged,
+        versions={group_id: version for group_id, version in versions},
+        refresh_pending=any(is_stale for _, _, is_stale, _ in rows),
+    )
+
+
+def by_transfer_type(snapshot):
+    """Format a (merged) snapshot as the dashboard's "by_transfer_type" section."""
+    data = {}
+    for prefix in TRANSFER_TYPES:
+        by_status = snapshot["counts"].get(prefix, {})
+        data[prefix] = {
+            "total_transfers": sum(by_status.values()),
+            **{f"{status_value}_transfers": by_status.get(status_value, 0) for status_value in STATUSES},
+        }
+    return data
+
+
+def transaction_ids_page(user, transfer_type, status_value=None, page=1, page_size=DEFAULT_IDS_PAGE_SIZE):
+    """
+    One page of the transaction IDs behind a dashboard count.
+
+    Args:
+        transfer_type: Code prefix (FAR, AFR, DFR, HFR)
+        status_value: pending/approved/rejected, or None/"all" for all statuses
+        page: 1-based page number
+        page_size: IDs per page (capped at MAX_IDS_PAGE_SIZE)
+
+    Returns:
+        {"type", "status", "page", "page_size", "count", "results": [transaction_id, ...]}
+    """
+    from .models import xx_BudgetTransfer
+
+    page = max(int(page), 1)
+    page_size = min(max(int(page_size), 1), MAX_IDS_PAGE_SIZE)
+
+    if status_value == "all":
+        status_value = None
+
+    queryset = xx_BudgetTransfer.objects.filter(code_prefix=transfer_type.upper())
+    if status_value:
+        queryset = queryset.filter(status=status_value)
+    group_ids = get_user_group_ids(user)
+    if group_ids is not None:
+        queryset = queryset.filter(security_group_id__in=group_ids)
+
+    offset = (page - 1) * page_size
+    return {
+        "type": transfer_type.upper(),
+        "status": status_value or "all",
+        "page": page,
+        "page_size": page_size,
+        "count": queryset.count(),
+        "results": list(
+            queryset.order_by("transaction_id")
+            .values_list("transaction_id", flat=True)[offset:offset + page_size]
+        ),
+    }
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from budget_management.dashboard_counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Compare the incremental dashboard counters with a full recomputation and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report mismatches, do not fix them',
+        )
+
+    def handle(self, *args, **options):
+        mismatches = reconcile_counters(fix=not options['check'])
+        for mismatch in mismatches:
+            self.stdout.write(
+                f"{mismatch['dimension']}[{mismatch['key']}] {mismatch['status']}: "
+                f"stored={mismatch['stored']} expected={mismatch['expected']}"
+            )
+        if not mismatches:
+            self.stdout.write(self.style.SUCCESS('✅ Dashboard counters are consistent'))
+        elif options['check']:
+            self.stdout.write(self.style.WARNING(f'⚠️ {len(mismatches)} drifted counter rows'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ Repaired {len(mismatches)} counter rows'))
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:25
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def backfill_counters(apps, schema_editor):
+    """
+    Build the dashboard counters from the existing transfers and lines.
+
+    Aggregates the historical models here rather than calling
+    budget_management.dashboard_counters, so later changes to that module do
+    not change what this migration writes.
+    """
+    BudgetTransfer = apps.get_model('budget_management', 'xx_BudgetTransfer')
+    TransactionTransfer = apps.get_model('transaction', 'xx_TransactionTransfer')
+    DashboardCounter = apps.get_model('budget_management', 'xx_DashboardCounter')
+
+    def key(value):
+        return '' if value is None else str(value)
+
+    counters = defaultdict(lambda: [0, Decimal('0'), Decimal('0')])
+
+    transfer_groups = (
+        BudgetTransfer.objects.values('status', 'code', 'status_level', 'transaction_date')
+        .annotate(transfers=Count('pk'))
+        .order_by()
+    )
+    for row in transfer_groups:
+        for dimension, dimension_key in (
+            ('transfers', ''),
+            ('prefix', (row['code'] or '')[:3].upper()),
+            ('status_level', key(row['status_level'])),
+            ('transaction_date', key(row['transaction_date'])),
+        ):
+            counters[(dimension, dimension_key, row['status'])][0] += row['transfers']
+
+    line_groups = (
+        TransactionTransfer.objects.filter(transaction__isnull=False)
+        .values('transaction__status', 'cost_center_code', 'account_code')
+        .annotate(lines=Count('pk'), total_from=Sum('from_center'), total_to=Sum('to_center'))
+        .order_by()
+    )
+    for row in line_groups:
+        cost_center, account = key(row['cost_center_code']), key(row['account_code'])
+        for dimension, dimension_key in (
+            ('cost_center', cost_center),
+            ('account', account),
+            ('combination', f'{cost_center}|{account}'),
+        ):
+            entry = counters[(dimension, dimension_key, row['transaction__status'])]
+            entry[0] += row['lines']
+            entry[1] += row['total_from'] or 0
+            entry[2] += row['total_to'] or 0
+
+    DashboardCounter.objects.bulk_create(
+        [
+            DashboardCounter(
+                dimension=dimension, key=dimension_key, status=status,
+                count=count, total_from_center=total_from, total_to_center=total_to,
+            )
+            for (dimension, dimension_key, status), (count, total_from, total_to) in sorted(counters.items())
+            if count
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget_management', '0007_xx_budgettransfer_security_group'),
+        ('transaction', '0003_alter_xx_transactiontransfer_actual_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='xx_DashboardCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(max_length=30)),
+                ('key', models.CharField(blank=True, default='', max_length=100)),
+                ('status', models.CharField(max_length=20)),
+                ('count', models.BigIntegerField(default=0)),
+                ('total_from_center', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('total_to_center', models.DecimalField(decimal_places=2, default=0, max_digits=30)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'XX_DASHBOARD_COUNTER_XX',
+                'indexes': [models.Index(fields=['dimension', 'status'], name='XX_DASHBOAR_dimensi_12c769_idx')],
+                'unique_together': {('dimension', 'key', 'status')},
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
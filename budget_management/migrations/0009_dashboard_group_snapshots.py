@@ -0,0 +1,33 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:33
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0007_xx_auditloginhistory_xx_auditlog'),
+        ('budget_management', '0008_dashboard_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='xx_DashboardGroupSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('data', models.JSONField(default=dict)),
+                ('is_stale', models.BooleanField(default=True)),
+                ('refreshed_at', models.DateTimeField(blank=True, null=True)),
+                ('security_group', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshots', to='user_management.xx_securitygroup')),
+            ],
+            options={
+                'db_table': 'XX_DASHBOARD_GROUP_SNAPSHOT_XX',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='xx_dashboardgroupsnapshot',
+            constraint=models.UniqueConstraint(fields=('security_group',), name='unique_dashboard_group_snapshot'),
+        ),
+    ]
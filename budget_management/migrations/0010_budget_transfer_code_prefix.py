@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:35
+
+from django.db import migrations, models
+from django.db.models import Value
+from django.db.models.functions import Coalesce, Substr, Upper
+
+
+def backfill_code_prefix(apps, schema_editor):
+    """Populate code_prefix for existing transfers in a single UPDATE."""
+    BudgetTransfer = apps.get_model('budget_management', 'xx_BudgetTransfer')
+    BudgetTransfer.objects.update(
+        code_prefix=Upper(Substr(Coalesce('code', Value('')), 1, 3))
+    )
+
+
+def reset_group_snapshots(apps, schema_editor):
+    """Snapshots now hold counts instead of ID lists - rebuild them on next read."""
+    DashboardGroupSnapshot = apps.get_model('budget_management', 'xx_DashboardGroupSnapshot')
+    DashboardGroupSnapshot.objects.update(is_stale=True, refreshed_at=None, data={})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget_management', '0009_dashboard_group_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xx_budgettransfer',
+            name='code_prefix',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=3),
+        ),
+        migrations.RunPython(backfill_code_prefix, migrations.RunPython.noop),
+        migrations.RunPython(reset_group_snapshots, migrations.RunPython.noop),
+    ]
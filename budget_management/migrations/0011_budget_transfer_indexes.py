@@ -0,0 +1,30 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget_management', '0010_budget_transfer_code_prefix'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='xx_budgettransfer',
+            name='code_prefix',
+            field=models.CharField(blank=True, default='', max_length=3),
+        ),
+        migrations.AddIndex(
+            model_name='xx_budgettransfer',
+            index=models.Index(fields=['code_prefix', 'status'], name='XX_BUDGET_T_code_pr_f9a522_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='xx_budgettransfer',
+            index=models.Index(fields=['security_group', 'status'], name='XX_BUDGET_T_securit_bbb7f5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='xx_budgettransfer',
+            index=models.Index(fields=['user_id', 'request_date'], name='XX_BUDGET_T_user_id_14f687_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget_management', '0011_budget_transfer_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='xx_OracleEssJob',
+            fields=[
+                ('job_id', models.AutoField(primary_key=True, serialize=False)),
+                ('request_id', models.CharField(max_length=50)),
+                ('job_name', models.CharField(max_length=100)),
+                ('state', models.CharField(default='WAITING', max_length=20)),
+                ('status_data', models.JSONField(blank=True, null=True)),
+                ('polls', models.IntegerField(default=0)),
+                ('max_polls', models.IntegerField()),
+                ('poll_interval', models.IntegerField()),
+                ('next_poll_at', models.DateTimeField()),
+                ('handler', models.CharField(max_length=200)),
+                ('context', models.JSONField(default=dict)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('audit', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ess_jobs', to='budget_management.xx_budget_integration_audit')),
+                ('transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='ess_jobs', to='budget_management.xx_budgettransfer')),
+            ],
+            options={
+                'db_table': 'XX_ORACLE_ESS_JOB_XX',
+                'indexes': [models.Index(fields=['state', 'next_poll_at'], name='XX_ORACLE_E_state_1909ce_idx')],
+            },
+        ),
+    ]
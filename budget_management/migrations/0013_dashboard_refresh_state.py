@@ -0,0 +1,25 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('budget_management', '0012_oracle_ess_jobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='xx_DashboardRefreshState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('normal_dirty', models.BooleanField(default=False)),
+                ('smart_dirty', models.BooleanField(default=False)),
+                ('refresh_scheduled_until', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'XX_DASHBOARD_REFRESH_STATE_XX',
+            },
+        ),
+    ]
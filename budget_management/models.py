@@ -5,10 +5,33 @@ from django.db.models import Q, Count, F
 from django.db.models import Value
 from django.db.models.functions import Cast
 from django.db.models import CharField
+from user_management import state_tracking
 
 import json
 
 
+# Transfer types, i.e. the values code_prefix takes for generated codes
+TRANSFER_CODE_PREFIXES = ("FAR", "AFR", "FAD", "DFR", "HFR")
+
+
+def transfer_code_prefix(code):
+    """Transfer type prefix of a transaction code ("far-0012" -> "FAR")."""
+    return (code or "")[:3].upper()
+
+
+def filter_transfers_by_code(queryset, code):
+    """
+    Filter transfers by the "code" query parameter of the list views.
+
+    A transfer type (FAR, AFR, ...) uses the indexed code_prefix column;
+    anything else keeps the substring match on code.
+    """
+    value = str(code).strip().upper()
+    if value in TRANSFER_CODE_PREFIXES:
+        return queryset.filter(code_prefix=value)
+    return queryset.filter(code__icontains=code)
+
+
 class xx_BudgetTransfer(models.Model):
     """Model to track budget transfers between users"""
 
@@ -29,6 +52,8 @@ class xx_BudgetTransfer(models.Model):
         null=True, blank=True
     )  # Keep as TextField but avoid in complex queries
     code = models.CharField(max_length=10, null=True, blank=True)
+    # Upper-cased first three characters of code (FAR, AFR, DFR, HFR, ...), kept in sync by save()
+    code_prefix = models.CharField(max_length=3, blank=True, default="")
    
     status_level = models.IntegerField(default=1)
     attachment = models.CharField(max_length=10, null=True, blank=True, default="No")  # Changed from EncryptedCharField
@@ -65,6 +90,11 @@ class xx_BudgetTransfer(models.Model):
 
     class Meta:
         db_table = "XX_BUDGET_TRANSFER_XX"
+        indexes = [
+            models.Index(fields=["code_prefix", "status"]),
+            models.Index(fields=["security_group", "status"]),
+            models.Index(fields=["user_id", "request_date"]),
+        ]
 
     def __str__(self):
         return f"Transfer {self.transaction_id}: {self.amount} requested by {self.requested_by} status {self.status}"
@@ -74,20 +104,22 @@ class xx_BudgetTransfer(models.Model):
         Override save to validate security group requirement before workflow submission.
         """
         # Check if status is changing to "submitted"
-        if self.pk:  # Existing record (update)
-            try:
-                old_instance = xx_BudgetTransfer.objects.get(pk=self.pk)
-                # If changing TO submitted status
-                if old_instance.status != "submitted" and self.status == "submitted":
-                    if not self.security_group_id:
-                        from django.core.exceptions import ValidationError
-                        raise ValidationError(
-                            f"Cannot submit transfer {self.code}: Security group is required. "
-                            "Please assign this transfer to a security group before submitting for approval."
-                        )
-            except xx_BudgetTransfer.DoesNotExist:
-                pass  # New record, no validation needed yet
-        
+        if self.pk and self.status == "submitted" and not self.security_group_id:
+            # Previous status from the loaded-state snapshot (no query for loaded instances)
+            previous = state_tracking.previous_values(self, ["status"])
+            # If changing TO submitted status (no previous row: new record, no validation needed yet)
+            if previous is not None and previous["status"] != "submitted":
+                from django.core.exceptions import ValidationError
+                raise ValidationError(
+                    f"Cannot submit transfer {self.code}: Security group is required. "
+                    "Please assign this transfer to a security group before submitting for approval."
+                )
+
+        self.code_prefix = transfer_code_prefix(self.code)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "code" in update_fields:
+            kwargs["update_fields"] = set(update_fields) | {"code_prefix"}
+
         super().save(*args, **kwargs)
     
     @property
@@ -103,6 +135,11 @@ class xx_BudgetTransfer(models.Model):
         return ApprovalWorkflowInstance.get_active_workflow(self)
 
 
+# Tracked at import time so the snapshot is refreshed before any other
+# post_save receiver (some save the transfer again)
+state_tracking.track(xx_BudgetTransfer)
+
+
 # SELECT * FROM XX_BUDGET_TRANSFER_XX
 # JOIN XX_Transaction_Transfer_XX ON XX_BUDGET_TRANSFER_XX.transaction_id = XX_Transaction_Transfer_XX.transaction_id
 # JOIN XX_Entity_XX ON XX_Transaction_Transfer_XX.cost_center_code = XX_Entity_XX.entity
@@ -391,6 +428,90 @@ class xx_DashboardBudgetTransfer(models.Model):
 
 
 
+class xx_DashboardCounter(models.Model):
+    """
+    Incrementally maintained dashboard aggregates.
+
+    One row per (dimension, key, status). Transfer-level dimensions count
+    transfers; line-level dimensions count xx_TransactionTransfer lines and sum
+    their from/to amounts. Kept up to date by signed deltas applied from the
+    transfer/line signals (see budget_management.dashboard_counters) and checked
+    by a nightly reconciliation.
+    """
+
+    dimension = models.CharField(max_length=30)
+    key = models.CharField(max_length=100, blank=True, default="")
+    status = models.CharField(max_length=20)
+    count = models.BigIntegerField(default=0)
+    total_from_center = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    total_to_center = models.DecimalField(max_digits=30, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "XX_DASHBOARD_COUNTER_XX"
+        unique_together = ("dimension", "key", "status")
+        indexes = [
+            models.Index(fields=["dimension", "status"]),
+        ]
+
+    def __str__(self):
+        return f"DashboardCounter {self.dimension}:{self.key}:{self.status} = {self.count}"
+
+
+class xx_DashboardGroupSnapshot(models.Model):
+    """
+    Precomputed transfer-type dashboard for one security group.
+
+    data holds the group's transfer count and transaction IDs per code prefix
+    and status ({"total": n, "ids": {"FAR": {"pending": [...]}}}). A NULL
+    security_group holds transfers without a group. Rows are marked stale by
+    the transfer signals and recomputed by the debounced dashboard refresh;
+    version increases on every recompute (see budget_management.dashboard_snapshots).
+    """
+
+    security_group = models.ForeignKey(
+        'user_management.XX_SecurityGroup',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='dashboard_snapshots',
+    )
+    version = models.PositiveIntegerField(default=0)
+    data = models.JSONField(default=dict)
+    is_stale = models.BooleanField(default=True)
+    refreshed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "XX_DASHBOARD_GROUP_SNAPSHOT_XX"
+        constraints = [
+            models.UniqueConstraint(fields=["security_group"], name="unique_dashboard_group_snapshot"),
+        ]
+
+    def __str__(self):
+        return f"Dashboard snapshot for group {self.security_group_id} v{self.version}"
+
+
+class xx_DashboardRefreshState(models.Model):
+    """
+    Pending work of the debounced dashboard refresh (a single row, pk=1).
+
+    The dirty flags are set in the transaction of the transfer save that
+    changes the dashboards and cleared by the refresh_dashboards task before it
+    recomputes them. refresh_scheduled_until limits scheduling to one task per
+    window (see budget_transfer.global_function.dashbaord).
+    """
+
+    normal_dirty = models.BooleanField(default=False)
+    smart_dirty = models.BooleanField(default=False)
+    refresh_scheduled_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "XX_DASHBOARD_REFRESH_STATE_XX"
+
+    def __str__(self):
+        return f"Dashboard refresh state (normal={self.normal_dirty}, smart={self.smart_dirty})"
+
+
 class xx_budget_integration_audit(models.Model):
     """Model to track budget integration audits - supports multi-step workflows"""
 
@@ -423,4 +544,59 @@ class xx_budget_integration_audit(models.Model):
         ordering = ['transaction_id', 'step_number']
 
     def __str__(self):
-        return f"Audit {self.audit_id} - Transaction {self.transaction_id.transaction_id} - Step {self.step_number}: {self.step_name} ({self.status})"
\ No newline at end of file
+        return f"Audit {self.audit_id} - Transaction {self.transaction_id.transaction_id} - Step {self.step_number}: {self.step_name} ({self.status})"
+
+class xx_OracleEssJob(models.Model):
+    """
+    Oracle ESS job of an upload workflow, polled in the background.
+
+    Rows are created when a workflow step submits an ESS job and are advanced
+    by the poll_ess_job task (see oracle_fbdi_integration/utilities/ess_jobs.py);
+    context holds what the workflow needs to continue once the job ends.
+    """
+
+    STATE_WAITING = "WAITING"
+
+    job_id = models.AutoField(primary_key=True)
+    transaction = models.ForeignKey(
+        xx_BudgetTransfer,
+        on_delete=models.CASCADE,
+        related_name="ess_jobs",
+        null=True,
+        blank=True,
+    )
+    audit = models.ForeignKey(
+        xx_budget_integration_audit,
+        on_delete=models.SET_NULL,
+        related_name="ess_jobs",
+        null=True,
+        blank=True,
+    )
+
+    request_id = models.CharField(max_length=50)
+    job_name = models.CharField(max_length=100)
+
+    # WAITING until the job ends, then its final ESS state (SUCCEEDED, ERROR, ...) or TIMEOUT
+    state = models.CharField(max_length=20, default=STATE_WAITING)
+    status_data = models.JSONField(null=True, blank=True)  # last status response
+
+    polls = models.IntegerField(default=0)
+    max_polls = models.IntegerField()
+    poll_interval = models.IntegerField()  # seconds
+    next_poll_at = models.DateTimeField()
+
+    # Dotted path of the workflow function to call with the final status
+    handler = models.CharField(max_length=200)
+    context = models.JSONField(default=dict)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "XX_ORACLE_ESS_JOB_XX"
+        indexes = [
+            models.Index(fields=["state", "next_poll_at"]),
+        ]
+
+    def __str__(self):
+        return f"ESS job {self.request_id} - {self.job_name} ({self.state})"
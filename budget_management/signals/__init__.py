@@ -12,5 +12,13 @@ except ImportError as e:
 except Exception as e:
     print(f"[ERROR] Unexpected error loading budget transfer signals: {e}")
 
+try:
+    from . import transcation_transfer
+    print("[OK] Transaction transfer signals imported successfully")
+except ImportError as e:
+    print(f"[ERROR] Error importing transaction transfer signals: {e}")
+except Exception as e:
+    print(f"[ERROR] Unexpected error loading transaction transfer signals: {e}")
+
 # You can add more signal imports here in the future
 # from . import other_signals_file
\ No newline at end of file
@@ -4,6 +4,7 @@ Automatically execute functions when budget transfer changes occur
 """
 
 from django.db.models.signals import post_save, pre_save, post_delete, pre_delete
+from django.db import transaction
 from django.dispatch import receiver
 from django.utils import timezone
 
@@ -11,8 +12,10 @@ from approvals.managers import ApprovalManager, ARCHIVED_STAGE_ORDER_INDEX_START
 from __NOTIFICATIONS_SETUP__.code.task_notifications import send_generic_message
 from ..models import xx_BudgetTransfer
 from user_management.models import xx_notification, XX_UserGroupMembership
+from user_management import state_tracking
 import logging
-from budget_transfer.global_function.dashbaord import dashboard_smart, dashboard_normal
+from budget_transfer.global_function.dashbaord import mark_dashboard_dirty
+from budget_management import dashboard_counters, dashboard_snapshots
 from transaction.models import xx_TransactionTransfer
 from budget_management.tasks import upload_journal_to_oracle
 
@@ -24,6 +27,53 @@ logger = logging.getLogger("budget_transfer_signals")
 # ============================================================================
 
 
+@receiver(pre_save, sender=xx_BudgetTransfer)
+def budget_transfer_capture_counter_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """
+    Remember the counter-relevant fields and the security group before an
+    update so post_save can apply the dashboard counter deltas and mark the
+    group snapshots stale.
+    """
+    if raw or instance._state.adding:
+        return
+    counted = set(dashboard_counters.TRANSFER_FIELDS) | {"security_group"}
+    if update_fields is not None and not set(update_fields) & counted:
+        # None of the counted fields can change
+        instance._dashboard_previous = dashboard_counters.transfer_state(instance)
+        instance._dashboard_previous_group = instance.security_group_id
+        return
+    previous = state_tracking.previous_values(
+        instance, [*dashboard_counters.TRANSFER_FIELDS, "security_group_id"]
+    )
+    if previous is not None:
+        instance._dashboard_previous_group = previous.pop("security_group_id")
+    instance._dashboard_previous = previous
+
+
+@receiver(post_save, sender=xx_BudgetTransfer)
+def budget_transfer_update_counters(sender, instance, created, raw=False, **kwargs):
+    """Apply the transfer's dashboard counter deltas in the saving transaction."""
+    if raw:
+        return
+    try:
+        with transaction.atomic():
+            dashboard_counters.transfer_saved(
+                instance, created, getattr(instance, "_dashboard_previous", None)
+            )
+    except Exception as e:
+        logger.error(f"Error updating dashboard counters for BudgetTransfer {instance.transaction_id}: {str(e)}")
+    instance._dashboard_previous = None
+
+    try:
+        dashboard_snapshots.mark_groups_stale({
+            instance.security_group_id,
+            getattr(instance, "_dashboard_previous_group", instance.security_group_id),
+        })
+    except Exception as e:
+        logger.error(f"Error marking dashboard snapshots stale for BudgetTransfer {instance.transaction_id}: {str(e)}")
+    instance._dashboard_previous_group = instance.security_group_id
+
+
 @receiver(post_save, sender=xx_BudgetTransfer)
 def budget_transfer_post_save(sender, instance, created, **kwargs):
     """
@@ -31,27 +81,32 @@ def budget_transfer_post_save(sender, instance, created, **kwargs):
     Use this for notifications, related updates, or post-processing
     """
     try:
-        # Run dashboard function for ALL saves (create AND update)
-        if instance.status == "approved":
-            print("approved enterd")
-            dashboard_smart()
-        # elif instance.status == "pending":
-        print("pending enterd")
-        dashboard_normal()
+        # Dashboards are recomputed by a debounced background job for ALL saves
+        # (create AND update); the smart dashboard only when approved totals change
+        mark_dashboard_dirty(smart=instance.status == "approved")
 
         if created:
             logger.info(
-                f"New BudgetTransfer created: {instance.transaction_id} - Dashboard updated"
+                f"New BudgetTransfer created: {instance.transaction_id} - Dashboard refresh scheduled"
             )
         else:
             logger.info(
-                f"BudgetTransfer updated: {instance.transaction_id} - Dashboard updated"
+                f"BudgetTransfer updated: {instance.transaction_id} - Dashboard refresh scheduled"
             )
 
     except Exception as e:
         logger.error(f"Error in budget_transfer_post_save: {str(e)}")
 
 
+@receiver(pre_delete, sender=xx_BudgetTransfer)
+def budget_transfer_capture_counter_lines(sender, instance, **kwargs):
+    """Capture the transfer's line totals so post_delete can remove them from the counters."""
+    try:
+        dashboard_counters.transfer_deleting(instance)
+    except Exception as e:
+        logger.error(f"Error capturing dashboard counters for BudgetTransfer {instance.transaction_id}: {str(e)}")
+
+
 @receiver(post_delete, sender=xx_BudgetTransfer)
 def budget_transfer_post_delete(sender, instance, **kwargs):
     """
@@ -59,10 +114,12 @@ def budget_transfer_post_delete(sender, instance, **kwargs):
     Use this for cleanup, notifications, or post-deletion processing
     """
     try:
-        dashboard_smart()
-        dashboard_normal()
+        with transaction.atomic():
+            dashboard_counters.transfer_deleted(instance)
+        dashboard_snapshots.mark_groups_stale({instance.security_group_id})
+        mark_dashboard_dirty(smart=True)
         logger.info(
-            f"Dashboard updated after deleting BudgetTransfer {instance.transaction_id}"
+            f"Dashboard refresh scheduled after deleting BudgetTransfer {instance.transaction_id}"
         )
 
     except Exception as e:
@@ -0,0 +1,55 @@
+"""
+Django signals for xx_TransactionTransfer model
+Keep the incremental dashboard counters in step with transfer lines
+"""
+
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from budget_management import dashboard_counters
+from budget_transfer.global_function.dashbaord import mark_dashboard_dirty
+from transaction.models import xx_TransactionTransfer
+from user_management import state_tracking
+
+logger = logging.getLogger("budget_transfer_signals")
+
+
+@receiver(pre_save, sender=xx_TransactionTransfer)
+def transaction_transfer_capture_counter_state(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the counted line fields before an update."""
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not set(update_fields) & {
+        "transaction", "cost_center_code", "account_code", "from_center", "to_center"
+    }:
+        instance._dashboard_previous = dashboard_counters.line_state(instance)
+        return
+    instance._dashboard_previous = state_tracking.previous_values(instance, dashboard_counters.LINE_FIELDS)
+
+
+@receiver(post_save, sender=xx_TransactionTransfer)
+def transaction_transfer_update_counters(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_dashboard_previous", None)
+    instance._dashboard_previous = None
+    try:
+        with transaction.atomic():
+            dashboard_counters.line_saved(instance, None if created else previous)
+        if previous != dashboard_counters.line_state(instance):
+            mark_dashboard_dirty(smart=True)
+    except Exception as e:
+        logger.error(f"Error updating dashboard counters for line {instance.pk}: {str(e)}")
+
+
+@receiver(post_delete, sender=xx_TransactionTransfer)
+def transaction_transfer_delete_counters(sender, instance, **kwargs):
+    try:
+        with transaction.atomic():
+            dashboard_counters.line_deleted(instance)
+        mark_dashboard_dirty(smart=True)
+    except Exception as e:
+        logger.error(f"Error updating dashboard counters for deleted line {instance.pk}: {str(e)}")
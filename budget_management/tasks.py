@@ -2,7 +2,7 @@
 Celery tasks for budget management
 Background tasks that run asynchronously
 """
-from celery import shared_task
+from celery import shared_task, signature
 from django.utils import timezone
 import logging
 
@@ -64,41 +64,16 @@ def upload_journal_to_oracle(self, transaction_id, entry_type="submit"):
         
        
         
-        # Run the complete workflow (UCM → Interface Loader → Journal Import → AutoPost)
+        # Run the complete workflow (UCM → Interface Loader → Journal Import → AutoPost);
+        # its ESS jobs are polled in the background and oracle_upload_finished gets the result
         upload_result, result_path = create_and_upload_journal(
             transfers=transfers,
             transaction_id=transaction_id,
-            entry_type=entry_type
+            entry_type=entry_type,
+            on_complete=oracle_upload_finished.s(transaction_id),
         )
         
-        if upload_result.get("success"):
-            # Update the budget transfer
-            
-            logger.info(f"Oracle upload completed successfully for transaction {transaction_id}")
-            
-            # Send completion notification - DISABLED
-            # if user_id:
-            #     send_upload_completed(user_id, transaction_id, result_path)
-            
-            return {
-                "success": True,
-                "message": "Upload completed successfully",
-                "result_path": str(result_path)
-            }
-        else:
-            logger.error(f"Oracle upload failed for transaction {transaction_id}: {upload_result.get('error')}")
-            
-            # Revert status to pending
-            xx_BudgetTransfer.objects.filter(pk=transaction_id).update(status="pending")
-            
-            # Send failure notification - DISABLED
-            # if user_id:
-            #     send_upload_failed(user_id, transaction_id, upload_result.get('error'))
-            
-            return {
-                "success": False,
-                "error": upload_result.get("error")
-            }
+        return _upload_started(transaction_id, upload_result, result_path)
             
     except Exception as e:
         logger.error(f"❌ Error in upload_journal_to_oracle task: {str(e)}")
@@ -115,7 +90,7 @@ def upload_journal_to_oracle(self, transaction_id, entry_type="submit"):
 
 
 @shared_task(bind=True, max_retries=3)
-def upload_budget_to_oracle(self, transaction_id,entry_type="submit"):
+def upload_budget_to_oracle(self, transaction_id,entry_type="submit", journal_uploaded=False):
     """
     Background task to upload budget to Oracle
     This runs asynchronously and doesn't block the HTTP request
@@ -123,6 +98,8 @@ def upload_budget_to_oracle(self, transaction_id,entry_type="submit"):
     
     Args:
         transaction_id: The budget transfer transaction ID
+        journal_uploaded: FAR transfers upload a reject journal first; this
+            task runs again with journal_uploaded=True once it succeeded
     """
     from budget_management.models import xx_BudgetTransfer
     
@@ -155,52 +132,32 @@ def upload_budget_to_oracle(self, transaction_id,entry_type="submit"):
             }
         
         
-        if budget_transfer.type=="FAR":
+        if budget_transfer.type=="FAR" and not journal_uploaded:
             print(f"Starting Journal upload for transaction {transaction_id} before budget upload")
+            # The budget upload follows once the journal workflow succeeded
             upload_result,result_path =create_and_upload_journal(
                 transfers=transfers,
                 transaction_id=transaction_id,
-                entry_type="reject"
+                entry_type="reject",
+                on_complete=oracle_upload_finished.s(
+                    transaction_id,
+                    revert_on_failure=False,
+                    then=upload_budget_to_oracle.si(transaction_id, entry_type, journal_uploaded=True),
+                ),
             )
-            print(f"Journal upload result for transaction {transaction_id}: {upload_result}")
-            if not upload_result.get("success"):
-                print(f"error happened for  {transaction_id}")
-                logger.warning(f"Journal upload failed for transaction {transaction_id}: {upload_result.get('error')}")
-                error=upload_result.get('error','Unknown error')
-                return {
-                    "success": False,
-                    "error": error
-                }
+            return _upload_started(transaction_id, upload_result, result_path)
             
         
-        logger.info(f"Journal upload succeeded for transaction {transaction_id}. Proceeding to budget upload.")
-        print(f"Journal upload succeeded for transaction {transaction_id}. Proceeding to budget upload.")
+        logger.info(f"Starting budget upload for transaction {transaction_id}.")
+        print(f"Starting budget upload for transaction {transaction_id}.")
         upload_result, result_path = create_and_upload_budget(
         transfers=transfers,
         transaction_id=transaction_id,
-        entry_type="Approve"
+        entry_type="Approve",
+        on_complete=oracle_upload_finished.s(transaction_id),
         )
     
-        if upload_result.get("success"):
-            # Update the budget transfer
-            
-            logger.info(f"Oracle upload completed successfully for transaction {transaction_id}")
-            
-            return {
-                "success": True,
-                "message": "Upload completed successfully",
-                "result_path": str(result_path)
-            }
-        else:
-            logger.error(f"Oracle upload failed for transaction {transaction_id}: {upload_result.get('error')}")
-            
-            # Revert status to pending
-            xx_BudgetTransfer.objects.filter(pk=transaction_id).update(status="pending")
-            
-            return {
-                "success": False,
-                "error": upload_result.get("error")
-            }
+        return _upload_started(transaction_id, upload_result, result_path)
             
     except Exception as e:
         logger.error(f"❌ Error in upload_budget_to_oracle task: {str(e)}")
@@ -210,3 +167,108 @@ def upload_budget_to_oracle(self, transaction_id,entry_type="submit"):
         
         # Retry the task
         raise self.retry(exc=e, countdown=60)  # Retry after 60 seconds
+
+
+def _upload_started(transaction_id, upload_result, result_path):
+    """Task result once an upload workflow is started (its outcome goes to oracle_upload_finished)"""
+    if upload_result.get("pending"):
+        logger.info(f"Oracle upload submitted for transaction {transaction_id}; ESS jobs are polled in the background")
+        return {
+            "success": True,
+            "pending": True,
+            "message": "Upload submitted",
+            "result_path": str(result_path)
+        }
+    return {
+        "success": bool(upload_result.get("success")),
+        "error": upload_result.get("error"),
+        "result_path": str(result_path)
+    }
+
+
+@shared_task
+def oracle_upload_finished(upload_result, transaction_id, revert_on_failure=True, then=None):
+    """
+    Called with the result of an Oracle upload workflow once its ESS jobs are done
+    
+    Args:
+        upload_result: Workflow results (run_complete_workflow)
+        transaction_id: The budget transfer transaction ID
+        revert_on_failure: Set the transfer back to "pending" if the upload failed
+        then: Signature of a task to run if the upload succeeded
+    """
+    from budget_management.models import xx_BudgetTransfer
+
+    if upload_result.get("success"):
+        logger.info(f"Oracle upload completed successfully for transaction {transaction_id}")
+        if then is not None:
+            signature(then).delay()
+        return True
+
+    logger.error(f"Oracle upload failed for transaction {transaction_id}: {upload_result.get('error')}")
+    if revert_on_failure:
+        # Revert status to pending; saved (not a queryset update) so the
+        # dashboard counter and snapshot signals see the change
+        transfer = xx_BudgetTransfer.objects.filter(pk=transaction_id).first()
+        if transfer is not None:
+            transfer.status = "pending"
+            transfer.save(update_fields=["status"])
+    return False
+
+
+@shared_task
+def poll_ess_job(job_id, poll):
+    """
+    Check an Oracle ESS job once; reschedules itself while the job runs and
+    continues its upload workflow when it ends (see ess_jobs)
+    """
+    from oracle_fbdi_integration.utilities import ess_jobs
+
+    return ess_jobs.poll_job(job_id, poll)
+
+
+@shared_task
+def resume_stalled_ess_jobs():
+    """Re-schedule the polls of ESS jobs whose poll task went missing."""
+    from oracle_fbdi_integration.utilities import ess_jobs
+
+    resumed = ess_jobs.resume_stalled_jobs()
+    if resumed:
+        logger.warning(f"ESS jobs: re-scheduled {resumed} stalled polls")
+    return resumed
+
+
+@shared_task
+def refresh_dashboards():
+    """
+    Recompute the dashboards marked dirty since the last run.
+
+    Scheduled (debounced) by mark_dashboard_dirty when transfers change, instead
+    of recomputing inside the request that saved the transfer.
+    """
+    from budget_transfer.global_function.dashbaord import run_pending_dashboard_refresh
+
+    refreshed = run_pending_dashboard_refresh()
+    logger.info(f"Dashboard refresh completed: {', '.join(refreshed) or 'nothing to do'}")
+    return refreshed
+
+
+@shared_task
+def reconcile_dashboard_counters():
+    """
+    Recompute the incremental dashboard counters and repair any drift.
+
+    Counters are maintained from model signals; writes that bypass them
+    (bulk_create, queryset.update, raw SQL) are corrected here nightly. The
+    security group snapshots are fully recomputed for the same reason.
+    """
+    from budget_management.dashboard_counters import reconcile_counters
+    from budget_management.dashboard_snapshots import refresh_group_snapshots
+
+    refresh_group_snapshots(full=True)
+    mismatches = reconcile_counters(fix=True)
+    if mismatches:
+        logger.warning(f"Dashboard counters: repaired {len(mismatches)} drifted rows")
+    else:
+        logger.info("Dashboard counters: no drift")
+    return len(mismatches)
@@ -0,0 +1,156 @@
+"""
+Tests for the incremental dashboard counters and their reconciliation.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from budget_management import dashboard_counters
+from budget_management.models import xx_BudgetTransfer, xx_DashboardCounter
+from transaction.models import xx_TransactionTransfer
+
+
+def counters(dimension):
+    """{(key, status): (count, total_from_center, total_to_center)} of the non-empty rows of a dimension."""
+    return {
+        (row.key, row.status): (row.count, row.total_from_center, row.total_to_center)
+        for row in xx_DashboardCounter.objects.filter(dimension=dimension)
+        if row.count or row.total_from_center or row.total_to_center
+    }
+
+
+@override_settings(AUDIT_LOG_SINK={"ASYNC": False})
+class DashboardCounterTests(TestCase):
+    """Signals apply signed deltas that always add up to a full recomputation."""
+
+    def setUp(self):
+        # Dashboards are refreshed by their own background task
+        for module in ("budget_trasnfer", "transcation_transfer"):
+            dirty = mock.patch(f"budget_management.signals.{module}.mark_dashboard_dirty")
+            dirty.start()
+            self.addCleanup(dirty.stop)
+
+    def create_transfer(self, code="FAR-1", status="pending", lines=()):
+        transfer = xx_BudgetTransfer.objects.create(
+            transaction_date="Jan",
+            amount=Decimal("1"),
+            status=status,
+            requested_by="tests",
+            code=code,
+            type="FAR",
+            control_budget="C",
+        )
+        for cost_center, account, from_center, to_center in lines:
+            xx_TransactionTransfer.objects.create(
+                transaction=transfer,
+                cost_center_code=cost_center,
+                account_code=account,
+                from_center=Decimal(from_center),
+                to_center=Decimal(to_center),
+            )
+        return transfer
+
+    def assertNoDrift(self):
+        self.assertEqual(dashboard_counters.reconcile_counters(fix=False), [])
+
+    def test_status_change_moves_line_totals(self):
+        transfer = self.create_transfer(lines=[(100, 200, "10", "0"), (100, 300, "0", "5")])
+        self.assertEqual(counters(dashboard_counters.COST_CENTER), {("100", "pending"): (2, Decimal("10"), Decimal("5"))})
+
+        transfer.status = "approved"
+        transfer.save()
+
+        self.assertEqual(counters(dashboard_counters.COST_CENTER), {("100", "approved"): (2, Decimal("10"), Decimal("5"))})
+        self.assertEqual(counters(dashboard_counters.COMBINATION), {
+            ("100|200", "approved"): (1, Decimal("10"), Decimal("0")),
+            ("100|300", "approved"): (1, Decimal("0"), Decimal("5")),
+        })
+        self.assertEqual(counters(dashboard_counters.TRANSFERS), {("", "approved"): (1, Decimal("0"), Decimal("0"))})
+        self.assertNoDrift()
+
+    def test_code_change_moves_the_prefix_row(self):
+        transfer = self.create_transfer(code="FAR-7")
+
+        transfer.code = "afr-7"
+        transfer.save(update_fields=["code"])
+
+        self.assertEqual(counters(dashboard_counters.PREFIX), {("AFR", "pending"): (1, Decimal("0"), Decimal("0"))})
+        self.assertNoDrift()
+
+    def test_cascade_delete_subtracts_lines_once(self):
+        kept = self.create_transfer(code="FAR-1", lines=[(100, 200, "1", "0")])
+        deleted = self.create_transfer(code="FAR-2", lines=[(100, 200, "10", "0"), (100, 300, "0", "5")])
+        line_deleted = mock.patch.object(
+            dashboard_counters, "line_deleted", wraps=dashboard_counters.line_deleted
+        )
+
+        with line_deleted as line_deleted:
+            deleted.delete()
+
+        # The cascaded lines ran while the transfer was marked as deleting, so
+        # only transfer_deleted() subtracted them
+        self.assertEqual(line_deleted.call_count, 2)
+        self.assertEqual(dashboard_counters._deleting_ids(), set())
+        self.assertEqual(counters(dashboard_counters.COST_CENTER), {("100", "pending"): (1, Decimal("1"), Decimal("0"))})
+        self.assertEqual(counters(dashboard_counters.TRANSFERS), {("", "pending"): (1, Decimal("0"), Decimal("0"))})
+        self.assertEqual(kept.transfers.count(), 1)
+        self.assertNoDrift()
+
+    def test_line_delete_outside_a_transfer_delete_is_subtracted(self):
+        transfer = self.create_transfer(lines=[(100, 200, "10", "0"), (100, 300, "0", "5")])
+
+        transfer.transfers.get(account_code=200).delete()
+
+        self.assertEqual(counters(dashboard_counters.COST_CENTER), {("100", "pending"): (1, Decimal("0"), Decimal("5"))})
+        self.assertNoDrift()
+
+    def test_mixed_saves_and_deletes_leave_no_drift(self):
+        first = self.create_transfer(code="FAR-1", lines=[(100, 200, "10", "0")])
+        second = self.create_transfer(code="AFR-2", lines=[(101, 200, "0", "3"), (102, 201, "4", "0")])
+        third = self.create_transfer(code="DFR-3", status="submitted", lines=[(100, 201, "2", "2")])
+
+        line = first.transfers.get()
+        line.cost_center_code = 103
+        line.from_center = Decimal("12")
+        line.save()
+        second.status = "approved"
+        second.status_level = 2
+        second.save()
+        xx_TransactionTransfer.objects.create(transaction=second, cost_center_code=100, account_code=200, from_center=Decimal("1"))
+        second.transfers.filter(cost_center_code=101).delete()
+        third.delete()
+        first.code = "HFR-1"
+        first.save()
+
+        self.assertNoDrift()
+
+    def test_reconcile_repairs_writes_that_bypass_signals(self):
+        transfer = self.create_transfer(lines=[(100, 200, "10", "0")])
+        xx_BudgetTransfer.objects.filter(pk=transfer.pk).update(status="approved")
+
+        mismatches = dashboard_counters.reconcile_counters()
+
+        self.assertIn(
+            {"dimension": "transfers", "key": "", "status": "approved", "stored": [0, "0", "0"], "expected": [1, "0", "0"]},
+            mismatches,
+        )
+        self.assertNoDrift()
+
+    def test_reconcile_keeps_a_save_landing_after_the_aggregation(self):
+        self.create_transfer(code="FAR-1", lines=[(100, 200, "10", "0")])
+        compute_counters = dashboard_counters.compute_counters
+
+        def compute_then_save():
+            expected = compute_counters()
+            # A transfer committed right after the aggregation. Concurrently it
+            # waits on the counter lock; it must not be overwritten either way.
+            self.create_transfer(code="FAR-2", lines=[(100, 200, "5", "0")])
+            return expected
+
+        with mock.patch.object(dashboard_counters, "compute_counters", side_effect=compute_then_save):
+            self.assertEqual(dashboard_counters.reconcile_counters(), [])
+
+        self.assertEqual(counters(dashboard_counters.COST_CENTER), {("100", "pending"): (2, Decimal("15"), Decimal("0"))})
+        self.assertNoDrift()
@@ -0,0 +1,182 @@
+"""
+Tests for background polling of Oracle ESS jobs against a fake ESS endpoint.
+"""
+
+import json
+import os
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.test import TestCase
+from django.utils import timezone
+
+from budget_management.models import xx_OracleEssJob
+from oracle_fbdi_integration.utilities import ess_jobs
+
+ADVANCE_CALLS = []
+
+
+def record_advance(state, job_status=None):
+    """Workflow function of the test jobs: records the final status and ends."""
+    ADVANCE_CALLS.append(job_status)
+    state["results"]["state"] = job_status["state"]
+    return None
+
+
+class FakeEssServer:
+    """ESS status endpoint answering with the states set in `responses`."""
+
+    def __init__(self):
+        self.responses = {}
+        self.requests = []
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                request_id = self.path.rstrip("/").rsplit("/", 1)[-1]
+                fake.requests.append(request_id)
+                body = fake.responses.get(request_id, {"state": "RUNNING"})
+                payload = body if isinstance(body, bytes) else json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class EssJobPollingTests(TestCase):
+    """Each poll checks the job once; every claimed job is polled again or ends."""
+
+    def setUp(self):
+        ADVANCE_CALLS.clear()
+        self.ess = FakeEssServer().__enter__()
+        self.addCleanup(self.ess.__exit__)
+        env = mock.patch.dict(os.environ, {"FUSION_BASE_URL": self.ess.url})
+        env.start()
+        self.addCleanup(env.stop)
+        # Record the next polls instead of sending them to the broker
+        schedule = mock.patch.object(ess_jobs, "schedule_poll")
+        self.schedule_poll = schedule.start()
+        self.addCleanup(schedule.stop)
+
+    def create_job(self, request_id="1001", max_polls=3, **fields):
+        fields.setdefault("next_poll_at", timezone.now())
+        return xx_OracleEssJob.objects.create(
+            request_id=request_id,
+            job_name="Import Budget Amounts",
+            max_polls=max_polls,
+            poll_interval=10,
+            handler="budget_management.tests.test_ess_jobs.record_advance",
+            context={"state": {"results": {}}, "on_complete": None},
+            **fields,
+        )
+
+    def test_track_job_schedules_first_poll_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            job = ess_jobs.track_job(
+                ess_jobs.EssJob("1001", "Import Budget Amounts"),
+                "budget_management.tests.test_ess_jobs.record_advance",
+                {"results": {}},
+            )
+            self.schedule_poll.assert_not_called()
+        self.schedule_poll.assert_called_once_with(job)
+        self.assertEqual(job.state, xx_OracleEssJob.STATE_WAITING)
+
+    def test_running_job_is_polled_again(self):
+        job = self.create_job()
+
+        self.assertEqual(ess_jobs.poll_job(job.pk, 0), xx_OracleEssJob.STATE_WAITING)
+
+        job.refresh_from_db()
+        self.assertEqual(job.polls, 1)
+        self.assertEqual(self.schedule_poll.call_count, 1)
+        self.assertEqual(ADVANCE_CALLS, [])
+
+    def test_duplicate_poll_is_skipped(self):
+        job = self.create_job()
+
+        ess_jobs.poll_job(job.pk, 0)
+        self.assertIsNone(ess_jobs.poll_job(job.pk, 0))
+
+        self.assertEqual(self.ess.requests, ["1001"])
+        self.assertEqual(xx_OracleEssJob.objects.get(pk=job.pk).polls, 1)
+
+    def test_terminal_states_end_the_job_and_continue_the_workflow(self):
+        for request_id, state in (("2001", "SUCCEEDED"), ("2002", "ERROR"), ("2003", "CANCELLED")):
+            self.ess.responses[request_id] = {"state": state}
+            job = self.create_job(request_id)
+
+            self.assertEqual(ess_jobs.poll_job(job.pk, 0), state)
+
+            job.refresh_from_db()
+            self.assertEqual(job.state, state)
+            self.assertIsNotNone(job.completed_at)
+            self.assertEqual(ADVANCE_CALLS[-1]["state"], state)
+        self.schedule_poll.assert_not_called()
+        # Ended jobs are not polled again
+        self.assertIsNone(ess_jobs.poll_job(job.pk, 1))
+
+    def test_job_times_out_after_max_polls(self):
+        job = self.create_job(max_polls=2)
+
+        ess_jobs.poll_job(job.pk, 0)
+        self.assertEqual(ess_jobs.poll_job(job.pk, 1), "TIMEOUT")
+
+        self.assertEqual(xx_OracleEssJob.objects.get(pk=job.pk).state, "TIMEOUT")
+        self.assertEqual([status["state"] for status in ADVANCE_CALLS], ["TIMEOUT"])
+
+    def test_unreadable_status_is_polled_again(self):
+        self.ess.responses["3001"] = b"<html>Service Unavailable</html>"
+        job = self.create_job("3001")
+
+        self.assertEqual(ess_jobs.poll_job(job.pk, 0), xx_OracleEssJob.STATE_WAITING)
+
+        self.assertEqual(self.schedule_poll.call_count, 1)
+        with mock.patch.dict(os.environ, {"FUSION_BASE_URL": ""}):
+            self.assertEqual(ess_jobs.poll_job(job.pk, 1), xx_OracleEssJob.STATE_WAITING)
+        self.assertEqual(self.schedule_poll.call_count, 2)
+        self.assertEqual(ADVANCE_CALLS, [])
+
+    def test_unreadable_status_times_out_after_max_polls(self):
+        self.ess.responses["3002"] = b"not json"
+        job = self.create_job("3002", max_polls=1)
+
+        self.assertEqual(ess_jobs.poll_job(job.pk, 0), "TIMEOUT")
+
+    def test_stalled_job_is_rescheduled(self):
+        overdue = timezone.now() - timedelta(seconds=ess_jobs.DEFAULTS["STALL_SECONDS"] + 60)
+        stalled = self.create_job("4001", polls=1, next_poll_at=overdue)
+        self.create_job("4002", next_poll_at=timezone.now())
+        self.create_job("4003", next_poll_at=overdue, state="SUCCEEDED")
+
+        self.assertEqual(ess_jobs.resume_stalled_jobs(), 1)
+
+        self.schedule_poll.assert_called_once_with(stalled)
+        self.assertEqual(ess_jobs.poll_job(stalled.pk, 1), xx_OracleEssJob.STATE_WAITING)
+
+    def test_claim_with_max_polls_used_up_times_out_without_checking(self):
+        # The last check was claimed but its poll never finished
+        job = self.create_job("5001", max_polls=3, polls=3)
+
+        self.assertEqual(ess_jobs.poll_job(job.pk, 3), "TIMEOUT")
+
+        self.assertEqual(self.ess.requests, [])
+        self.assertEqual(xx_OracleEssJob.objects.get(pk=job.pk).state, "TIMEOUT")
+        self.assertEqual([status["state"] for status in ADVANCE_CALLS], ["TIMEOUT"])
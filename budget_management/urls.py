@@ -10,6 +10,7 @@ from .views import (
     UpdateBudgetTransferView,
     DeleteBudgetTransferView,
     transcationtransferapprovel_reject,
+    BulkApprovalActionView,
     ListBudgetTransfer_approvels_View,
     BudgetTransferFileUploadView,
     DeleteBudgetTransferAttachmentView,
@@ -75,6 +76,11 @@ urlpatterns = [
         transcationtransferapprovel_reject.as_view(),
         name="transaction-approve-reject",
     ),
+    path(
+        "transfers/approve-reject/bulk/",
+        BulkApprovalActionView.as_view(),
+        name="transaction-approve-reject-bulk",
+    ),
 
 
     path("transfers/unhold/", Transction_unhold_View.as_view()),
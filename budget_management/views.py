@@ -14,13 +14,14 @@ from approvals.managers import ApprovalManager
 from approvals.models import ApprovalAction, ApprovalWorkflowInstance
 from budget_management.tasks import upload_budget_to_oracle, upload_journal_to_oracle
 from oracle_fbdi_integration.utilities.automatic_posting import submit_automatic_posting
-from oracle_fbdi_integration.utilities.Status import wait_for_job
 from oracle_fbdi_integration.utilities.journal_integration import create_and_upload_journal
 from oracle_fbdi_integration.utilities.budget_integration import create_and_upload_budget
 
 from user_management.models import xx_User, xx_notification, XX_UserGroupMembership
 from .models import (
+    TRANSFER_CODE_PREFIXES,
     filter_budget_transfers_all_in_entities,
+    filter_transfers_by_code,
     xx_BudgetTransfer,
     xx_BudgetTransferAttachment,
     xx_BudgetTransferRejectReason,
@@ -35,8 +36,16 @@ from budget_transfer.global_function.dashbaord import (
     get_all_dashboard_data,
     get_approval_rate_change,
     get_saved_dashboard_data,
+    is_dashboard_refresh_pending,
+    mark_dashboard_dirty,
     refresh_dashboard_data,
 )
+from budget_management.dashboard_snapshots import (
+    DEFAULT_IDS_PAGE_SIZE,
+    by_transfer_type,
+    get_user_snapshot,
+    transaction_ids_page,
+)
 from public_funtion.update_pivot_fund import update_pivot_fund
 import base64
 from django.db.models.functions import Cast
@@ -133,7 +142,9 @@ class CreateBudgetTransferView(APIView):
             prefix = "FAR-"
 
         last_transfer = (
-            xx_BudgetTransfer.objects.filter(code__startswith=prefix)
+            xx_BudgetTransfer.objects.filter(
+                code_prefix=prefix[:3], code__startswith=prefix
+            )
             .order_by("-code")
             .first()
         )
@@ -206,7 +217,7 @@ class CreateBudgetTransferView(APIView):
                     # Find all FAR transfers already linked to this HFR (exclude current draft)
                     linked_fars = xx_BudgetTransfer.objects.filter(
                         linked_transfer_id=linked_budget_transfer,
-                        code__startswith="FAR"
+                        code_prefix="FAR"
                     ).exclude(transaction_id=transfer.transaction_id)
 
                     for far in linked_fars:
@@ -473,7 +484,10 @@ class ListBudgetTransferView(APIView):
         if code:
             # Coerce to string first and use upper() to avoid errors if a non-string is provided
             code_upper = code.upper()
-            transfers = transfers.filter(type=code_upper)
+            if code_upper in TRANSFER_CODE_PREFIXES:
+                transfers = transfers.filter(code_prefix=code_upper)
+            else:
+                transfers = transfers.filter(type=code_upper)
 
         if request.user.abilities_legacy.count() > 0:
             transfers = filter_budget_transfers_all_in_entities(
@@ -689,7 +703,7 @@ class ListBudgetTransferView(APIView):
                 # Only count FARs that have been submitted (status_level >= 2) or approved
                 linked_fars = xx_BudgetTransfer.objects.filter(
                     linked_transfer_id=transaction_id,
-                    code__startswith="FAR"
+                    code_prefix="FAR"
                 ).filter(
                     Q(status="approved") | Q(status_level__gte=2)  # In progress (submitted) or approved
                 ).exclude(
@@ -839,59 +853,9 @@ class ListBudgetTransfer_approvels_View(APIView):
             # Get pending transfers for this user (already filtered by ApprovalManager)
             # This returns transfers where user has pending assignments in active stages
             pending_transfers = ApprovalManager.get_user_pending_approvals(request.user)
-            
-            # Additional filter: only transfers from user's approval security groups (skip for SuperAdmin)
-            if user_approval_groups is not None:
-                # Further filter: user must be assigned to stages that match their role in security group
-                from approvals.models import ApprovalWorkflowStageInstance, ApprovalAssignment
-                
-                # Get user's roles in each security group
-                user_roles_by_group = {}
-                if user_memberships:
-                    for membership in user_memberships:
-                        group_id = membership.security_group_id
-                        user_roles_by_group[group_id] = list(
-                            membership.assigned_roles.values_list('role_id', flat=True)
-                        )
-                
-                # Build list of transfer IDs where user has pending assignments
-                # Note: We don't filter by transfer.security_group_id here because multi-stage
-                # workflows may have stages requiring different security groups than the transfer's
-                # origin group. The workflow system handles proper assignment validation.
-                valid_transfer_ids = []
-                print(f"\n=== DEBUG: Assignment filtering for user {user.username} ===")
-                
-                for transfer in pending_transfers:
-                    workflow_instance = getattr(transfer, 'workflow_instance', None)
-                    if not workflow_instance:
-                        continue
-                    
-                    print(f"\n--- Transfer {transfer.code} (ID: {transfer.transaction_id}) ---")
-                    
-                    # Get user's active pending assignments for this transfer
-                    user_assignments = ApprovalAssignment.objects.filter(
-                        user=request.user,
-                        status=ApprovalAssignment.STATUS_PENDING,
-                        stage_instance__workflow_instance__id=workflow_instance.id,
-                        stage_instance__status=ApprovalWorkflowStageInstance.STATUS_ACTIVE
-                    ).select_related('stage_instance__stage_template')
-                    
-                    print(f"User has {user_assignments.count()} pending assignments for this transfer")
-                    
-                    # If user has any pending assignments for this transfer, they can see it
-                    if user_assignments.exists():
-                        print(f"  ✅ User has pending assignment - ALLOWED")
-                        valid_transfer_ids.append(transfer.transaction_id)
-                
-                print(f"\n=== Valid transfer IDs after assignment check: {valid_transfer_ids} ===\n")
-                
-                # Filter to only valid transfers
-                pending_transfers = pending_transfers.filter(transaction_id__in=valid_transfer_ids)
-            else:
-                # SuperAdmin: apply basic security group filter
-                pending_transfers = pending_transfers.filter(
-                    Q(security_group_id__isnull=True) | Q(security_group__isnull=False)
-                )
+            # No security group filter here: the inbox only holds the user's own pending
+            # assignments on active stages, and multi-stage workflows may have stages
+            # requiring different security groups than the transfer's origin group.
 
             if request.user.abilities_legacy.count() > 0:
                 pending_transfers = filter_budget_transfers_all_in_entities(
@@ -899,7 +863,7 @@ class ListBudgetTransfer_approvels_View(APIView):
                 )
 
             if code:
-                pending_transfers = pending_transfers.filter(code__icontains=code)
+                pending_transfers = filter_transfers_by_code(pending_transfers, code)
             
             pending_transfers = apply_search_filter(pending_transfers, search)
 
@@ -992,7 +956,7 @@ class ListBudgetTransfer_approvels_View(APIView):
                 )
 
             if code:
-                history_transfers = history_transfers.filter(code__icontains=code)
+                history_transfers = filter_transfers_by_code(history_transfers, code)
             
             history_transfers = apply_search_filter(history_transfers, search)
 
@@ -1208,6 +1172,86 @@ class DeleteBudgetTransferView(APIView):
             )
 
 
+def _queue_final_decision_upload(trasncation, Status):
+    """
+    Queue the Oracle upload for a transfer whose workflow just finished.
+
+    Returns the result message for the caller, or None when there is nothing
+    to report.
+    """
+    transaction_id = trasncation.transaction_id
+    if trasncation.code[0:3] != "HFR":
+        if Status == "approved":
+            # Queue background task for Oracle upload
+            print(f"Queuing budget upload task for transaction {transaction_id}")
+            upload_budget_to_oracle.delay(
+                transaction_id=transaction_id,
+                entry_type="Approve"
+            )
+            return "Transaction approved successfully"
+
+        if Status == "rejected":
+            print(f"Queuing journal upload task for transaction {transaction_id}")
+            upload_journal_to_oracle.delay(
+                transaction_id=transaction_id,
+                entry_type="reject"
+            )
+            return "Transaction rejected successfully"
+        return None
+
+    # ========== HFR REJECTION LOGIC ==========
+    # For HFR: When rejected, return remaining unused amount to Oracle
+    if Status == "rejected":
+        # Calculate remaining unused amount
+        hfr_transfers = xx_TransactionTransfer.objects.filter(transaction_id=transaction_id)
+        original_hold = sum(
+            Decimal(str(t.from_center)) if t.from_center else Decimal('0.00')
+            for t in hfr_transfers
+        )
+
+        # Find all approved/in-progress FAR transfers linked to this HFR
+        linked_fars = xx_BudgetTransfer.objects.filter(
+            linked_transfer_id=transaction_id,
+            code_prefix="FAR"
+        ).filter(
+            Q(status="approved") | Q(status_level__gte=2)
+        ).exclude(
+            status_level__lt=1
+        )
+
+        total_used = Decimal('0.00')
+        for far in linked_fars:
+            far_transfers = xx_TransactionTransfer.objects.filter(transaction_id=far.transaction_id)
+            far_total = sum(
+                Decimal(str(t.from_center)) if t.from_center else Decimal('0.00')
+                for t in far_transfers
+            )
+            total_used += far_total
+
+        remaining = original_hold - total_used
+
+        print(f"🔴 HFR REJECTION: Transaction {transaction_id}")
+        print(f"   Original Hold: {original_hold}")
+        print(f"   Already Used: {total_used}")
+        print(f"   Remaining to Return: {remaining}")
+
+        # Only upload journal if there's remaining amount to return
+        if remaining > 0:
+            print(f"Queuing journal upload for HFR rejection (returning {remaining})")
+            upload_journal_to_oracle.delay(
+                transaction_id=transaction_id,
+                entry_type="reject"
+            )
+            return f"HFR rejected - returning {float(remaining):,.2f} to fund"
+        print(f"No remaining amount to return (fully used)")
+        return "HFR rejected - hold was fully used, no amount to return"
+
+    if Status == "approved":
+        # HFR approved - no Oracle action needed (hold remains active)
+        return "HFR approved - hold is now active"
+    return None
+
+
 class transcationtransferapprovel_reject(APIView):
     """Submit ADJD transaction transfers for approval"""
 
@@ -1356,96 +1400,13 @@ class transcationtransferapprovel_reject(APIView):
                     # for transfer in trasfers:
                     try:
                         # Update the pivot fund
-                        if trasncation.code[0:3] != "HFR":
-
-                            if Status == "approved":
-                                # Queue background task for Oracle upload
-                                print(f"Queuing budget upload task for transaction {transaction_id}")
-                                upload_budget_to_oracle.delay(
-                                    transaction_id=transaction_id,
-                                    entry_type="Approve"
-                                )
-                                results.append({
-                                    "transaction_id": transaction_id,
-                                    "status": "success",
-                                    "message": "Transaction approved successfully"
-                                })
-                            
-                            if Status == "rejected":
-                                print(f"Queuing journal upload task for transaction {transaction_id}")
-                                upload_journal_to_oracle.delay(
-                                    transaction_id=transaction_id,
-                                    entry_type="reject"
-                                )
-                                results.append({
-                                    "transaction_id": transaction_id,
-                                    "status": "success",
-                                    "message": "Transaction rejected successfully"
-                                })
-                        
-                        # ========== HFR REJECTION LOGIC ==========
-                        # For HFR: When rejected, return remaining unused amount to Oracle
-                        elif trasncation.code[0:3] == "HFR":
-                            if Status == "rejected":
-                                # Calculate remaining unused amount
-                                hfr_transfers = xx_TransactionTransfer.objects.filter(transaction_id=transaction_id)
-                                original_hold = sum(
-                                    Decimal(str(t.from_center)) if t.from_center else Decimal('0.00')
-                                    for t in hfr_transfers
-                                )
-                                
-                                # Find all approved/in-progress FAR transfers linked to this HFR
-                                linked_fars = xx_BudgetTransfer.objects.filter(
-                                    linked_transfer_id=transaction_id,
-                                    code__startswith="FAR"
-                                ).filter(
-                                    Q(status="approved") | Q(status_level__gte=2)
-                                ).exclude(
-                                    status_level__lt=1
-                                )
-                                
-                                total_used = Decimal('0.00')
-                                for far in linked_fars:
-                                    far_transfers = xx_TransactionTransfer.objects.filter(transaction_id=far.transaction_id)
-                                    far_total = sum(
-                                        Decimal(str(t.from_center)) if t.from_center else Decimal('0.00')
-                                        for t in far_transfers
-                                    )
-                                    total_used += far_total
-                                
-                                remaining = original_hold - total_used
-                                
-                                print(f"🔴 HFR REJECTION: Transaction {transaction_id}")
-                                print(f"   Original Hold: {original_hold}")
-                                print(f"   Already Used: {total_used}")
-                                print(f"   Remaining to Return: {remaining}")
-                                
-                                # Only upload journal if there's remaining amount to return
-                                if remaining > 0:
-                                    print(f"Queuing journal upload for HFR rejection (returning {remaining})")
-                                    upload_journal_to_oracle.delay(
-                                        transaction_id=transaction_id,
-                                        entry_type="reject"
-                                    )
-                                    results.append({
-                                        "transaction_id": transaction_id,
-                                        "status": "success",
-                                        "message": f"HFR rejected - returning {float(remaining):,.2f} to fund"
-                                    })
-                                else:
-                                    print(f"No remaining amount to return (fully used)")
-                                    results.append({
-                                        "transaction_id": transaction_id,
-                                        "status": "success",
-                                        "message": "HFR rejected - hold was fully used, no amount to return"
-                                    })
-                            elif Status == "approved":
-                                # HFR approved - no Oracle action needed (hold remains active)
-                                results.append({
-                                    "transaction_id": transaction_id,
-                                    "status": "success",
-                                    "message": "HFR approved - hold is now active"
-                                })
+                        message = _queue_final_decision_upload(trasncation, Status)
+                        if message:
+                            results.append({
+                                "transaction_id": transaction_id,
+                                "status": "success",
+                                "message": message
+                            })
                     
                     except Exception as e:
                         results.append(
@@ -1481,6 +1442,104 @@ class transcationtransferapprovel_reject(APIView):
         )
 
 
+class BulkApprovalActionView(APIView):
+    """
+    Approve or reject many transfers in one request.
+
+    Body: {"items": [{"transaction_id": 1, "decide": "approve", "reason": "..."}, ...]}
+
+    All items are applied in one transaction (one savepoint per item), and
+    notifications and Oracle uploads run once after commit.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        raw_items = request.data.get("items") if isinstance(request.data, dict) else request.data
+        if not isinstance(raw_items, list) or not raw_items:
+            return Response(
+                {
+                    "error": "Empty data provided",
+                    "message": "Please provide at least one item",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        items = []
+        for item in raw_items:
+            if not isinstance(item, dict):
+                return Response(
+                    {"error": "Invalid item", "message": "Each item must be an object"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            try:
+                transaction_id = int(item.get("transaction_id"))
+            except (TypeError, ValueError):
+                return Response(
+                    {
+                        "error": "transaction id is required",
+                        "message": "Please provide transaction id",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            decide = item.get("decide")
+            reason = item.get("reason")
+            if decide not in (ApprovalAction.ACTION_APPROVE, ApprovalAction.ACTION_REJECT):
+                return Response(
+                    {
+                        "error": "Invalid decision value",
+                        "message": "Bulk actions support approve and reject only",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if decide == ApprovalAction.ACTION_REJECT and not reason:
+                return Response(
+                    {
+                        "error": "Reason is required for rejection",
+                        "message": f"Please provide a reason for rejecting transaction {transaction_id}",
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            items.append((transaction_id, decide, reason))
+
+        results = ApprovalManager.process_actions_bulk(request.user, items)
+
+        # The bulk transaction has committed; queue one Oracle upload per finished transfer
+        finished_ids = {
+            result["transaction_id"]
+            for result in results
+            if result["status"] == "success" and result["workflow_finished"]
+        }
+        transfers = xx_BudgetTransfer.objects.in_bulk(list(finished_ids))
+        queued = {}
+        for transaction_id in finished_ids:
+            workflow_status = next(
+                result["workflow_status"]
+                for result in results
+                if result["transaction_id"] == transaction_id and result["workflow_finished"]
+            )
+            try:
+                queued[transaction_id] = _queue_final_decision_upload(
+                    transfers[transaction_id], workflow_status
+                )
+            except Exception as e:
+                queued[transaction_id] = f"Oracle upload could not be queued: {str(e)}"
+
+        for result in results:
+            if result["workflow_finished"] and queued.get(result["transaction_id"]):
+                result["message"] = queued[result["transaction_id"]]
+
+        return Response(
+            {
+                "message": "Transfers processed",
+                "succeeded": sum(1 for result in results if result["status"] == "success"),
+                "failed": sum(1 for result in results if result["status"] == "error"),
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+
 class BudgetTransferFileUploadView(APIView):
     """Upload files for a budget transfer and store as BLOBs"""
 
@@ -1735,13 +1794,17 @@ class StaticDashboardView(APIView):
                     )
             else:
                 # Always try to get existing cached data first
+                # Snapshots carry "refreshed_at"; refresh_pending is True while a
+                # recorded change is waiting for the debounced background refresh
                 if dashboard_type == "all":
                     # Get all dashboard data (both smart and normal)
                     data = get_all_dashboard_data()
                     if data:
+                        data["refresh_pending"] = is_dashboard_refresh_pending("all")
                         return Response(data, status=status.HTTP_200_OK)
                     else:
                         # Return empty structure if no data exists yet
+                        mark_dashboard_dirty(smart=True)
                         return Response(
                             {
                                 "message": "No dashboard data available yet. Data will be generated in background.",
@@ -1753,9 +1816,11 @@ class StaticDashboardView(APIView):
                     # Get specific dashboard type (smart or normal)
                     data = get_saved_dashboard_data(dashboard_type)
                     if data:
+                        data["refresh_pending"] = is_dashboard_refresh_pending(dashboard_type)
                         return Response(data, status=status.HTTP_200_OK)
                     else:
                         # Return message if no cached data exists
+                        mark_dashboard_dirty(smart=dashboard_type == "smart")
                         return Response(
                             {
                                 "message": f"No {dashboard_type} dashboard data available yet. Data will be generated in background.",
@@ -1796,150 +1861,28 @@ class DashboardBudgetTransferView(APIView):
             start_time = time.time()
             print("Starting optimized normal dashboard calculation...")
 
-            # PHASE 1: Database-level counting and aggregations
+            # PHASE 1: Precomputed per-security-group snapshots
             count_start = time.time()
 
-            # Get all transfers with minimal data loading
-            transfers_queryset = xx_BudgetTransfer.objects.only(
-                "code", "status", "status_level", "request_date", "transaction_date","security_group", "requested_by"
-            )
-            
-            # PHASE 6: Filter by security group membership
-            # Show transfers where user's security group matches transfer's security group
-            # This allows:
-            # 1. Creators (planners) - see all transfers from their group
-            # 2. Approvers (managers) - see all transfers they need to approve in their group
-            # 3. SuperAdmin - sees all transfers
-            
-            # Check if user is SuperAdmin (role=1)
-            if request.user.role == 1:
-                # SuperAdmin sees all transfers
-                print(f"User {request.user.username} is SuperAdmin - showing all transfers")
-            else:
-                # Get all security groups user belongs to
-                user_security_group_ids = XX_UserGroupMembership.objects.filter(
-                    user=request.user,
-                    is_active=True
-                ).values_list('security_group_id', flat=True)
-                
-                if user_security_group_ids:
-                    # Show all transfers from user's security groups
-                    transfers_queryset = transfers_queryset.filter(
-                        security_group_id__in=user_security_group_ids
-                    )
-                    print(f"User {request.user.username} sees transfers from {len(user_security_group_ids)} security group(s)")
-                else:
-                    # User not in any security group - no transfers visible
-                    transfers_queryset = transfers_queryset.none()
-                    print(f"User {request.user.username} has no security group membership")
-            
-            print(f"Transfers after filtering: {transfers_queryset.count()}")
-           
-
-
             if dashboard_type == "normal" or dashboard_type == "all":
-                # Use database aggregations for counting
                 try:
-
-                    total_count = transfers_queryset.count()
-
-                    # Count by status using database aggregation
-                    status_counts = transfers_queryset.aggregate(
-                        approved=Count("transaction_id", filter=Q(status="approved")),
-                        rejected=Count("transaction_id", filter=Q(status="rejected")),
-                        pending=Count("transaction_id", filter=Q(status="pending")),
-                    )
-
-                    # Count by status level using database aggregation
-                    level_counts = transfers_queryset.aggregate(
-                        level1=Count("transaction_id", filter=Q(status_level=1)),
-                        level2=Count("transaction_id", filter=Q(status_level=2)),
-                        level3=Count("transaction_id", filter=Q(status_level=3)),
-                        level4=Count("transaction_id", filter=Q(status_level=4)),
-                    )
-
-                    # Count by code prefix using database functions
-                    type_status_counts = transfers_queryset.aggregate(
-                        far_total=Count("transaction_id", filter=Q(code__istartswith="FAR")),
-                        far_pending=Count("transaction_id", filter=Q(code__istartswith="FAR", status="pending")),
-                        far_approved=Count("transaction_id", filter=Q(code__istartswith="FAR", status="approved")),
-                        far_rejected=Count("transaction_id", filter=Q(code__istartswith="FAR", status="rejected")),
-                        afr_total=Count("transaction_id", filter=Q(code__istartswith="AFR")),
-                        afr_pending=Count("transaction_id", filter=Q(code__istartswith="AFR", status="pending")),
-                        afr_approved=Count("transaction_id", filter=Q(code__istartswith="AFR", status="approved")),
-                        afr_rejected=Count("transaction_id", filter=Q(code__istartswith="AFR", status="rejected")),
-                        dfr_total=Count("transaction_id", filter=Q(code__istartswith="DFR")),
-                        dfr_pending=Count("transaction_id", filter=Q(code__istartswith="DFR", status="pending")),
-                        dfr_approved=Count("transaction_id", filter=Q(code__istartswith="DFR", status="approved")),
-                        dfr_rejected=Count("transaction_id", filter=Q(code__istartswith="DFR", status="rejected")),
-                        hfr_total=Count("transaction_id", filter=Q(code__istartswith="HFR")),
-                        hfr_pending=Count("transaction_id", filter=Q(code__istartswith="HFR", status="pending")),
-                        hfr_approved=Count("transaction_id", filter=Q(code__istartswith="HFR", status="approved")),
-                        hfr_rejected=Count("transaction_id", filter=Q(code__istartswith="HFR", status="rejected")),
-                    )
+                    # Merge the snapshots of the user's security groups
+                    # (SuperAdmin: all groups). Creators and approvers see every
+                    # transfer of their groups; users without a group see none.
+                    snapshot = get_user_snapshot(request.user, refresh=force_refresh)
+                    total_count = snapshot["total"]
 
                     print(
-                        f"Database counting completed in {time.time() - count_start:.2f}s"
+                        f"Dashboard snapshots merged in {time.time() - count_start:.2f}s"
                     )
 
-                    # Build transaction id lists by type and status
-                    def ids_for(code_prefix, status_value=None):
-                        qs = transfers_queryset.filter(code__istartswith=code_prefix)
-                        if status_value:
-                            qs = qs.filter(status=status_value)
-                        return list(qs.values_list("transaction_id", flat=True))
-
                     # PHASE 2: Format response data
                     data = {
-                        "by_transfer_type": {
-                            "FAR": {
-                                "total_transfers": type_status_counts["far_total"],
-                                "pending_transfers": type_status_counts["far_pending"],
-                                "approved_transfers": type_status_counts["far_approved"],
-                                "rejected_transfers": type_status_counts["far_rejected"],
-                                "transaction_ids": {
-                                    "all": ids_for("FAR"),
-                                    "pending": ids_for("FAR", "pending"),
-                                    "approved": ids_for("FAR", "approved"),
-                                    "rejected": ids_for("FAR", "rejected"),
-                                },
-                            },
-                            "AFR": {
-                                "total_transfers": type_status_counts["afr_total"],
-                                "pending_transfers": type_status_counts["afr_pending"],
-                                "approved_transfers": type_status_counts["afr_approved"],
-                                "rejected_transfers": type_status_counts["afr_rejected"],
-                                "transaction_ids": {
-                                    "all": ids_for("AFR"),
-                                    "pending": ids_for("AFR", "pending"),
-                                    "approved": ids_for("AFR", "approved"),
-                                    "rejected": ids_for("AFR", "rejected"),
-                                },
-                            },
-                            "DFR": {
-                                "total_transfers": type_status_counts["dfr_total"],
-                                "pending_transfers": type_status_counts["dfr_pending"],
-                                "approved_transfers": type_status_counts["dfr_approved"],
-                                "rejected_transfers": type_status_counts["dfr_rejected"],
-                                "transaction_ids": {
-                                    "all": ids_for("DFR"),
-                                    "pending": ids_for("DFR", "pending"),
-                                    "approved": ids_for("DFR", "approved"),
-                                    "rejected": ids_for("DFR", "rejected"),
-                                },
-                            },
-                            "HFR": {
-                                "total_transfers": type_status_counts["hfr_total"],
-                                "pending_transfers": type_status_counts["hfr_pending"],
-                                "approved_transfers": type_status_counts["hfr_approved"],
-                                "rejected_transfers": type_status_counts["hfr_rejected"],
-                                "transaction_ids": {
-                                    "all": ids_for("HFR"),
-                                    "pending": ids_for("HFR", "pending"),
-                                    "approved": ids_for("HFR", "approved"),
-                                    "rejected": ids_for("HFR", "rejected"),
-                                },
-                            },
+                        "by_transfer_type": by_transfer_type(snapshot),
+                        "by_status_level": snapshot["levels"],
+                        "snapshot": {
+                            "versions": snapshot["versions"],
+                            "refresh_pending": snapshot["refresh_pending"],
                         },
                         "performance_metrics": {
                             "total_processing_time": round(time.time() - start_time, 2),
@@ -1953,8 +1896,20 @@ class DashboardBudgetTransferView(APIView):
                     )
                     print(f"Processed {total_count} transfers")
 
-                    # Save dashboard data
-                    save_start = time.time()
+                    # Transaction IDs only on request, one page at a time:
+                    # ?ids_type=FAR&ids_status=pending&ids_page=1&ids_page_size=100
+                    ids_type = request.query_params.get("ids_type")
+                    if ids_type:
+                        data["transaction_ids"] = transaction_ids_page(
+                            request.user,
+                            ids_type,
+                            status_value=request.query_params.get("ids_status") or None,
+                            page=request.query_params.get("ids_page", 1),
+                            page_size=request.query_params.get(
+                                "ids_page_size", DEFAULT_IDS_PAGE_SIZE
+                            ),
+                        )
+
                     try:
                         # Ensure a local container exists to store dashboard data
                         return_data["normal"] = data
@@ -2251,7 +2206,7 @@ class ListBudgetTransfer_approvels_MobileView(APIView):
             )
 
         if code:
-            transfers = transfers.filter(code__icontains=code)
+            transfers = filter_transfers_by_code(transfers, code)
 
         transfers = transfers.order_by("-request_date")
         # Return all results without pagination
@@ -2697,7 +2652,7 @@ class Transction_unhold_View(APIView):
             # Find all approved/in-progress FAR transfers linked to this HFR
             linked_fars = xx_BudgetTransfer.objects.filter(
                 linked_transfer_id=transaction_id,
-                code__startswith="FAR"
+                code_prefix="FAR"
             ).filter(
                 Q(status="approved") | Q(status_level__gte=2)
             ).exclude(
@@ -57,32 +57,38 @@ def dashboard_smart(filter_cost_center=None, filter_account_code=None):
         if filter_account_code:
             base_queryset = base_queryset.filter(account_code=filter_account_code)
 
-        # Aggregate by cost center code (single database query)
-        cost_center_totals = list(
-            base_queryset.values("cost_center_code")
-            .annotate(
-                total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+        if not (filter_cost_center or filter_account_code):
+            # Unfiltered totals come from the incremental dashboard counters (one query)
+            cost_center_totals, account_code_totals, all_combinations = (
+                _smart_totals_from_counters()
+            )
+        else:
+            # Aggregate by cost center code (single database query)
+            cost_center_totals = list(
+                base_queryset.values("cost_center_code")
+                .annotate(
+                    total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+                )
+                .order_by("cost_center_code")
             )
-            .order_by("cost_center_code")
-        )
 
-        # Aggregate by account code (single database query)
-        account_code_totals = list(
-            base_queryset.values("account_code")
-            .annotate(
-                total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+            # Aggregate by account code (single database query)
+            account_code_totals = list(
+                base_queryset.values("account_code")
+                .annotate(
+                    total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+                )
+                .order_by("account_code")
             )
-            .order_by("account_code")
-        )
 
-        # Aggregate by combination of cost center and account code (single database query)
-        all_combinations = list(
-            base_queryset.values("cost_center_code", "account_code")
-            .annotate(
-                total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+            # Aggregate by combination of cost center and account code (single database query)
+            all_combinations = list(
+                base_queryset.values("cost_center_code", "account_code")
+                .annotate(
+                    total_from_center=Sum("from_center"), total_to_center=Sum("to_center")
+                )
+                .order_by("cost_center_code", "account_code")
             )
-            .order_by("cost_center_code", "account_code")
-        )
 
         # Get filtered individual records if filters are applied
         if filter_cost_center or filter_account_code:
@@ -155,6 +161,7 @@ def dashboard_smart(filter_cost_center=None, filter_account_code=None):
             )
 
             existing_data = dashboard.get_data() or {}
+            data["refreshed_at"] = timezone.now().isoformat()
             existing_data["smart"] = data
 
             dashboard.set_data(existing_data)
@@ -178,35 +185,58 @@ def dashboard_smart(filter_cost_center=None, filter_account_code=None):
         return False
 
 
+def _smart_totals_from_counters():
+    """
+    Approved-transfer totals by cost center, account and combination, read from
+    xx_DashboardCounter in the same shape as the .values().annotate() queries.
+    """
+    from budget_management import dashboard_counters as counters
+
+    def code(value):
+        return int(value) if value != "" else None
+
+    def sort_key(value):
+        return (value is not None, value or 0)
+
+    cost_center_totals, account_code_totals, all_combinations = [], [], []
+    rows = counters.get_counters(counters.LINE_DIMENSIONS, status="approved")
+    for (dimension, key, _), (count, total_from, total_to) in rows.items():
+        if not count:
+            continue
+        totals = {"total_from_center": total_from, "total_to_center": total_to}
+        if dimension == counters.COST_CENTER:
+            cost_center_totals.append(dict(cost_center_code=code(key), **totals))
+        elif dimension == counters.ACCOUNT:
+            account_code_totals.append(dict(account_code=code(key), **totals))
+        else:
+            cost_center, account = key.split("|", 1)
+            all_combinations.append(
+                dict(cost_center_code=code(cost_center), account_code=code(account), **totals)
+            )
+
+    cost_center_totals.sort(key=lambda item: sort_key(item["cost_center_code"]))
+    account_code_totals.sort(key=lambda item: sort_key(item["account_code"]))
+    all_combinations.sort(
+        key=lambda item: (sort_key(item["cost_center_code"]), sort_key(item["account_code"]))
+    )
+    return cost_center_totals, account_code_totals, all_combinations
+
+
 from django.utils import timezone
 from datetime import date
 import calendar
 
 
-def get_approval_rate_change(transfers_queryset):
+def _previous_and_current_month_names():
     today = timezone.now().date()
-    total_count = transfers_queryset.count()
-    print(f"Total transfers in queryset: {total_count}")
-    transfers_queryset = transfers_queryset.filter(status__in=["approved", "rejected"])
-    print(f"Filtered transfers (Approved/Rejected): {transfers_queryset.count()}")
-    # --- Previous month start/end ---
     if today.month == 1:  # January edge case
         pm_month = 12
     else:
         pm_month = today.month - 1
-    p_month_name = calendar.month_abbr[pm_month]
-    c_month_name = calendar.month_abbr[today.month]
-    # --- Filter ---
-    pm_qs = transfers_queryset.filter(transaction_date=p_month_name)
-    cm_qs = transfers_queryset.filter(transaction_date=c_month_name)
-    print(f"PM: {p_month_name}, CM: {c_month_name}")
-    # --- Counts ---
-    PM_submitted = pm_qs.count()
-    CM_submitted = cm_qs.count()
-    print(f"PM submitted: {PM_submitted}, CM submitted: {CM_submitted}")
-    PM_approved = pm_qs.filter(status="approved").count()
-    CM_approved = cm_qs.filter(status="approved").count()
-    print(f"PM approved: {PM_approved}, CM approved: {CM_approved}")
+    return calendar.month_abbr[pm_month], calendar.month_abbr[today.month]
+
+
+def _approval_rate_change(PM_submitted, PM_approved, CM_submitted, CM_approved):
     # --- Rates ---
     PM_rate = PM_approved / PM_submitted if PM_submitted else 0
     CM_rate = CM_approved / CM_submitted if CM_submitted else 0
@@ -230,6 +260,46 @@ def get_approval_rate_change(transfers_queryset):
     }
 
 
+def get_approval_rate_change_from_counters(counter_rows):
+    """Same result as get_approval_rate_change over all transfers, from transaction_date counters."""
+    from budget_management import dashboard_counters as counters
+
+    p_month_name, c_month_name = _previous_and_current_month_names()
+
+    def count(month, status):
+        return counter_rows.get((counters.TRANSACTION_DATE, month, status), (0,))[0]
+
+    PM_approved = count(p_month_name, "approved")
+    CM_approved = count(c_month_name, "approved")
+    PM_submitted = PM_approved + count(p_month_name, "rejected")
+    CM_submitted = CM_approved + count(c_month_name, "rejected")
+    print(f"PM: {p_month_name}, CM: {c_month_name}")
+    print(f"PM submitted: {PM_submitted}, CM submitted: {CM_submitted}")
+    return _approval_rate_change(PM_submitted, PM_approved, CM_submitted, CM_approved)
+
+
+def get_approval_rate_change(transfers_queryset):
+    today = timezone.now().date()
+    total_count = transfers_queryset.count()
+    print(f"Total transfers in queryset: {total_count}")
+    transfers_queryset = transfers_queryset.filter(status__in=["approved", "rejected"])
+    print(f"Filtered transfers (Approved/Rejected): {transfers_queryset.count()}")
+    # --- Previous month start/end ---
+    p_month_name, c_month_name = _previous_and_current_month_names()
+    # --- Filter ---
+    pm_qs = transfers_queryset.filter(transaction_date=p_month_name)
+    cm_qs = transfers_queryset.filter(transaction_date=c_month_name)
+    print(f"PM: {p_month_name}, CM: {c_month_name}")
+    # --- Counts ---
+    PM_submitted = pm_qs.count()
+    CM_submitted = cm_qs.count()
+    print(f"PM submitted: {PM_submitted}, CM submitted: {CM_submitted}")
+    PM_approved = pm_qs.filter(status="approved").count()
+    CM_approved = cm_qs.filter(status="approved").count()
+    print(f"PM approved: {PM_approved}, CM approved: {CM_approved}")
+    return _approval_rate_change(PM_submitted, PM_approved, CM_submitted, CM_approved)
+
+
 def dashboard_normal():
     """
     Optimized normal dashboard using database-level aggregations and counting
@@ -241,35 +311,44 @@ def dashboard_normal():
         # PHASE 1: Database-level counting and aggregations
         count_start = time.time()
 
+        from budget_management import dashboard_counters as counters
+
         # Get all transfers with minimal data loading
         transfers_queryset = xx_BudgetTransfer.objects.only(
             "code", "status", "status_level", "request_date", "transaction_date"
         )
 
-        # Use database aggregations for counting
-        total_count = transfers_queryset.count()
+        # Counts come from the incremental dashboard counters (one query)
+        counter_rows = counters.get_counters(counters.TRANSFER_DIMENSIONS)
 
-        # Count by status using database aggregation
-        status_counts = transfers_queryset.aggregate(
-            approved=Count("transaction_id", filter=Q(status="approved")),
-            rejected=Count("transaction_id", filter=Q(status="rejected")),
-            pending=Count("transaction_id", filter=Q(status="pending")),
-        )
+        def count_of(dimension, key=None, status=None):
+            return sum(
+                value[0]
+                for (row_dimension, row_key, row_status), value in counter_rows.items()
+                if row_dimension == dimension
+                and (key is None or row_key == key)
+                and (status is None or row_status == status)
+            )
 
-        # Count by status level using database aggregation
-        level_counts = transfers_queryset.aggregate(
-            level1=Count("transaction_id", filter=Q(status_level=1)),
-            level2=Count("transaction_id", filter=Q(status_level=2)),
-            level3=Count("transaction_id", filter=Q(status_level=3)),
-            level4=Count("transaction_id", filter=Q(status_level=4)),
-        )
+        total_count = count_of(counters.TRANSFERS)
 
-        # Count by code prefix using database functions
-        code_counts = transfers_queryset.aggregate(
-            far=Count("transaction_id", filter=Q(code__istartswith="FAR")),
-            afr=Count("transaction_id", filter=Q(code__istartswith="AFR")),
-            fad=Count("transaction_id", filter=Q(code__istartswith="FAD")),
-        )
+        # Count by status
+        status_counts = {
+            name: count_of(counters.TRANSFERS, status=name)
+            for name in ("approved", "rejected", "pending")
+        }
+
+        # Count by status level
+        level_counts = {
+            f"level{level}": count_of(counters.STATUS_LEVEL, key=str(level))
+            for level in (1, 2, 3, 4)
+        }
+
+        # Count by code prefix
+        code_counts = {
+            prefix.lower(): count_of(counters.PREFIX, key=prefix)
+            for prefix in ("FAR", "AFR", "FAD")
+        }
 
         # Get request dates efficiently (only non-null dates)
         request_dates = list(
@@ -282,7 +361,7 @@ def dashboard_normal():
         request_dates_iso = [date.isoformat() for date in request_dates]
 
         # NEW: Approval rate analysis (last vs current month)
-        approval_rate_data = get_approval_rate_change(transfers_queryset)
+        approval_rate_data = get_approval_rate_change_from_counters(counter_rows)
 
         print(f"Database counting completed in {time.time() - count_start:.2f}s")
 
@@ -322,6 +401,7 @@ def dashboard_normal():
             )
 
             existing_data = dashboard.get_data() or {}
+            data["refreshed_at"] = timezone.now().isoformat()
             existing_data["normal"] = data
 
             dashboard.set_data(existing_data)
@@ -403,3 +483,140 @@ def refresh_dashboard_data(dashboard_type="smart"):
     else:
         print(f"Invalid dashboard type: {dashboard_type}")
         return False
+
+
+# ============================================================================
+# Debounced background refresh
+# ============================================================================
+#
+# Transfer saves only mark the dashboards dirty. The first mark in a window
+# schedules refresh_dashboards (budget_management.tasks) to run
+# DASHBOARD_REFRESH_WINDOW_SECONDS later, so at most one recompute runs per
+# window no matter how many transfers change. Readers get the last saved
+# snapshot, which carries a "refreshed_at" timestamp.
+#
+# The dirty flags and the debounce live in xx_DashboardRefreshState (one
+# row), so the web processes and the Celery worker see the same state.
+
+DASHBOARD_DIRTY_FIELDS = {
+    "normal": "normal_dirty",
+    "smart": "smart_dirty",
+}
+DEFAULT_DASHBOARD_REFRESH_WINDOW_SECONDS = 60
+
+
+def get_dashboard_refresh_window():
+    from django.conf import settings
+
+    return getattr(
+        settings,
+        "DASHBOARD_REFRESH_WINDOW_SECONDS",
+        DEFAULT_DASHBOARD_REFRESH_WINDOW_SECONDS,
+    )
+
+
+def _set_dirty_flags(smart=False):
+    from budget_management.models import xx_DashboardRefreshState
+
+    fields = {"normal_dirty": True}
+    not_set = Q(normal_dirty=False)
+    if smart:
+        fields["smart_dirty"] = True
+        not_set |= Q(smart_dirty=False)
+
+    # Only write when a flag is not set yet, so concurrent saves do not all
+    # queue on the state row
+    if not xx_DashboardRefreshState.objects.filter(not_set, pk=1).update(**fields):
+        xx_DashboardRefreshState.objects.get_or_create(pk=1, defaults=fields)
+
+
+def mark_dashboard_dirty(smart=False):
+    """
+    Record that the dashboards need recomputing and make sure a refresh is scheduled.
+
+    Args:
+        smart (bool): Also recompute the smart dashboard (approved transfer totals)
+
+    The flags are set in the current transaction, so they are saved together
+    with the change. Scheduling happens after the transaction commits, so
+    rolled back saves do not queue work.
+    """
+    from django.db import transaction
+
+    _set_dirty_flags(smart)
+
+    def after_commit():
+        # Set again: a refresh that ran before the commit may have cleared the
+        # flags without seeing this change
+        _set_dirty_flags(smart)
+        schedule_dashboard_refresh()
+
+    transaction.on_commit(after_commit)
+
+
+def schedule_dashboard_refresh():
+    """Queue one refresh per window; later calls in the same window are no-ops."""
+    from datetime import timedelta
+    from budget_management.models import xx_DashboardRefreshState
+    from budget_management.tasks import refresh_dashboards
+
+    window = get_dashboard_refresh_window()
+    now = timezone.now()
+    claimed = (
+        xx_DashboardRefreshState.objects.filter(pk=1)
+        .filter(Q(refresh_scheduled_until__isnull=True) | Q(refresh_scheduled_until__lt=now))
+        .update(refresh_scheduled_until=now + timedelta(seconds=window * 2))
+    )
+    if not claimed:
+        return
+    try:
+        refresh_dashboards.apply_async(countdown=window)
+    except Exception as e:
+        # Broker unavailable: let the next save try again
+        xx_DashboardRefreshState.objects.filter(pk=1).update(refresh_scheduled_until=None)
+        print(f"Error scheduling dashboard refresh: {e}")
+
+
+def is_dashboard_refresh_pending(dashboard_type="normal"):
+    """True if a change has been recorded that the saved snapshot does not include yet."""
+    from budget_management.models import xx_DashboardRefreshState
+
+    flags = (
+        xx_DashboardRefreshState.objects.filter(pk=1)
+        .values(*DASHBOARD_DIRTY_FIELDS.values())
+        .first()
+    )
+    if not flags:
+        return False
+    if dashboard_type == "all":
+        return any(flags.values())
+    field = DASHBOARD_DIRTY_FIELDS.get(dashboard_type)
+    return bool(field and flags[field])
+
+
+def run_pending_dashboard_refresh():
+    """
+    Recompute the dashboards marked dirty and the stale security group
+    snapshots. Called by the refresh_dashboards task.
+
+    Flags are cleared before recomputing, so saves that happen while the
+    aggregation runs mark the dashboards dirty again and schedule another pass.
+
+    Returns:
+        list: Dashboard types that were recomputed ("groups" for group snapshots)
+    """
+    from budget_management.dashboard_snapshots import refresh_group_snapshots
+    from budget_management.models import xx_DashboardRefreshState
+
+    xx_DashboardRefreshState.objects.filter(pk=1).update(refresh_scheduled_until=None)
+    refreshed = []
+    for dashboard_type in ("smart", "normal"):
+        field = DASHBOARD_DIRTY_FIELDS[dashboard_type]
+        # Claim the flag: only one worker recomputes a given change
+        if not xx_DashboardRefreshState.objects.filter(pk=1, **{field: True}).update(**{field: False}):
+            continue
+        refresh_dashboard_data(dashboard_type)
+        refreshed.append(dashboard_type)
+    if refresh_group_snapshots():
+        refreshed.append("groups")
+    return refreshed
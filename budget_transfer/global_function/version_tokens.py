@@ -0,0 +1,80 @@
+"""
+Version Tokens
+
+Database-backed version tokens shared by the per-process caches
+(approvals.template_cache, django_dynamic_validation.requirement_cache,
+user_management.access_cache), so a change saved in one process invalidates
+the cached data of every other process.
+
+A token lives in a row of a small model with a `token` CharField(32), one row
+per key. bump() writes a fresh random token in the caller's transaction:
+other processes see it once the change commits, and a rolled back change
+leaves the old token in place. A random token rather than a counter, so a
+rolled back bump is never reused.
+
+get() re-reads a token from the database at most every check_seconds (and
+right after bump() in this process). Pass check_seconds=0 for tokens that
+must be read on every lookup; get_many() always reads, in one query.
+
+Usage:
+    from budget_transfer.global_function.version_tokens import VersionTokens
+
+    versions = VersionTokens('approvals.ApprovalTemplateCacheVersion')
+    versions.bump()          # in the transaction that changes a template
+    token = versions.get()   # on the lookup path
+"""
+
+import threading
+import time
+import uuid
+from typing import Dict, Iterable
+
+from django.apps import apps
+
+VERSION_CHECK_SECONDS = 5
+DEFAULT_KEY = 1
+
+
+class VersionTokens:
+    """
+    Version tokens stored in `model_label`, one row per value of `key_field`.
+    """
+
+    def __init__(self, model_label: str, key_field: str = 'pk', check_seconds: float = VERSION_CHECK_SECONDS):
+        self.model_label = model_label
+        self.key_field = key_field
+        self.check_seconds = check_seconds
+        self._checked: Dict[object, tuple] = {}   # key -> (token, checked_at)
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        return apps.get_model(self.model_label)
+
+    def bump(self, key=DEFAULT_KEY):
+        """Write a new token for key in the caller's transaction."""
+        self.model.objects.update_or_create(**{self.key_field: key}, defaults={'token': uuid.uuid4().hex})
+        with self._lock:
+            self._checked.pop(key, None)
+
+    def get(self, key=DEFAULT_KEY, refresh: bool = False) -> str:
+        """
+        The token of key ('' if never bumped), re-read from the database at
+        most every check_seconds unless refresh is set.
+        """
+        now = time.monotonic()
+        checked = self._checked.get(key)
+        if refresh or checked is None or now - checked[1] >= self.check_seconds:
+            token = self.model.objects.filter(**{self.key_field: key}).values_list('token', flat=True).first() or ''
+            with self._lock:
+                self._checked[key] = (token, now)
+            return token
+        return checked[0]
+
+    def get_many(self, keys: Iterable) -> Dict[object, str]:
+        """Read the tokens of several keys in one query ('' for keys never bumped)."""
+        keys = list(keys)
+        tokens = dict(
+            self.model.objects.filter(**{f'{self.key_field}__in': keys}).values_list(self.key_field, 'token')
+        )
+        return {key: tokens.get(key, '') for key in keys}
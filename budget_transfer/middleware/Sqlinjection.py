@@ -3,16 +3,111 @@
 import re
 import logging
 import json
-from django.http import HttpResponseBadRequest
+import threading
+import time
+from typing import FrozenSet, NamedTuple, Pattern, Tuple
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseBadRequest
 from django.http.request import RawPostDataException
 from django.utils.deprecation import MiddlewareMixin
 
 logger = logging.getLogger(__name__)
 
+# Bodies larger than this are rejected with 413 (settings.SQL_INJECTION_MAX_BODY_BYTES)
+DEFAULT_MAX_BODY_BYTES = 2 * 1024 * 1024
+# JSON nested deeper than this is rejected with 400 (settings.SQL_INJECTION_MAX_DEPTH)
+DEFAULT_MAX_DEPTH = 32
+# Scans slower than this are logged (settings.SQL_INJECTION_SLOW_SCAN_MS)
+DEFAULT_SLOW_SCAN_MS = 50
+
+
+class RuleSet(NamedTuple):
+    """
+    A group of patterns compiled into one alternation, with a prefilter.
+
+    Every pattern of the set needs at least one of `chars` or `keywords` to
+    match, so values containing none of them are skipped without running the
+    regex. Non-ASCII values always run it: IGNORECASE folds characters such as
+    "ı" or "ſ" onto ASCII letters, which str.lower() does not.
+    """
+    pattern: Pattern
+    chars: FrozenSet[str]
+    keywords: Tuple[str, ...]
+
+    @classmethod
+    def compile(cls, patterns, chars="", keywords=()):
+        combined = "|".join(f"(?:{pattern})" for pattern in patterns)
+        return cls(re.compile(combined, re.IGNORECASE), frozenset(chars), tuple(keywords))
+
+    def may_match(self, value):
+        """False only if no pattern of the set can match anywhere in value."""
+        if not value.isascii() or not self.chars.isdisjoint(value):
+            return True
+        lowered = value.lower()
+        return any(keyword in lowered for keyword in self.keywords)
+
+    def search(self, value):
+        if not self.may_match(value):
+            return None
+        return self.pattern.search(value)
+
+
+class ScanLimitExceeded(Exception):
+    """A request the scan cannot fully inspect; it is rejected with `status`."""
+
+    def __init__(self, message, status):
+        super().__init__(message)
+        self.status = status
+
+
+class ScanMetrics:
+    """Process-wide counters of the middleware's own cost (see snapshot())."""
+
+    FIELDS = ("requests", "blocked", "oversize_rejected", "depth_rejected")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._counts = dict.fromkeys(self.FIELDS, 0)
+            self._total_seconds = 0.0
+            self._max_seconds = 0.0
+
+    def incr(self, field):
+        with self._lock:
+            self._counts[field] += 1
+
+    def observe(self, seconds, blocked):
+        with self._lock:
+            self._counts["requests"] += 1
+            if blocked:
+                self._counts["blocked"] += 1
+            self._total_seconds += seconds
+            self._max_seconds = max(self._max_seconds, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            requests = self._counts["requests"]
+            return dict(
+                self._counts,
+                total_ms=round(self._total_seconds * 1000, 3),
+                avg_ms=round(self._total_seconds * 1000 / requests, 3) if requests else 0.0,
+                max_ms=round(self._max_seconds * 1000, 3),
+            )
+
 
 class SQLInjectionProtectionMiddleware(MiddlewareMixin):
     """
     Middleware to detect and block potential SQL injection attempts
+
+    Each rule set is compiled once into a single alternation (RuleSet), and
+    the path whitelist decision is made once per request rather than per value.
+    Bodies above SQL_INJECTION_MAX_BODY_BYTES (413) and JSON nested deeper
+    than SQL_INJECTION_MAX_DEPTH (400) are rejected rather than passed on
+    unscanned. Timing is recorded in the class-level `metrics` (ScanMetrics).
     """
 
     # Common SQL injection patterns - More specific to reduce false positives
@@ -40,55 +135,154 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
         r"(concat|char|ascii|substring|length|version|database|user|current_user)\s*\(",  # SQL functions
     ]
 
+    # For whitelisted endpoints, only check for very obvious SQL injection
+    WHITELISTED_PATTERNS = [
+        r"union\s+(all\s+)?select",
+        r"drop\s+(table|database)",
+        r"insert\s+into\s+",
+        r"delete\s+from\s+",
+        r"'\s*(or|and)\s+('|\d+\s*=\s*\d+)",
+    ]
+
+    # Only the most obvious SQL injection patterns (approval API endpoints)
+    OBVIOUS_PATTERNS = [
+        r"union\s+(all\s+)?select",  # UNION SELECT
+        r"drop\s+(table|database|schema)",  # DROP statements
+        r"insert\s+into\s+.*values",  # INSERT statements
+        r"delete\s+from\s+\w+",  # DELETE statements
+        r"'\s*(or|and)\s+('1'='1'|'1'='1|1=1)",  # Classic injection
+        r";\s*(drop|delete|insert|update|create)\s+",  # Semicolon attacks
+        r"exec\s*\(",  # EXEC commands
+        r"<\s*script[^>]*>",  # Script tags
+    ]
+
+    # Checked against the path (more restrictive for paths)
+    PATH_PATTERNS = [
+        r"union(.*?)select",
+        r"drop(.*?)table",
+        r"exec(.*?)\s",
+        r"delete(.*?)from",
+        r"insert(.*?)into",
+    ]
+
+    # Whitelist patterns for legitimate content
+    WHITELIST_PATTERNS = [
+        r"^/api/(approvals|budget|auth|accounts-entities|admin_panel|transfers)/",  # API endpoints
+        r"workflow",  # Allow "workflow" in content
+        r"approval",  # Allow "approval" in content
+        r"transfer",  # Allow "transfer" in content
+        r"stage",  # Allow "stage" in content
+    ]
+
+    # Compiled once per process; the prefilter tokens are the characters or
+    # keywords at least one of which every pattern of the set requires
+    FULL_RULES = RuleSet.compile(
+        SQL_INJECTION_PATTERNS,
+        chars="'%=-#(<:;/",
+        keywords=("union", "select", "insert", "delete", "update", "drop", "create"),
+    )
+    WHITELISTED_RULES = RuleSet.compile(
+        WHITELISTED_PATTERNS,
+        chars="'",
+        keywords=("union", "drop", "insert", "delete"),
+    )
+    OBVIOUS_RULES = RuleSet.compile(
+        OBVIOUS_PATTERNS,
+        chars="';<",
+        keywords=("union", "drop", "insert", "delete", "exec"),
+    )
+    PATH_RULES = RuleSet.compile(
+        PATH_PATTERNS,
+        keywords=("union", "drop", "exec", "delete", "insert"),
+    )
+    WHITELIST = re.compile("|".join(f"(?:{pattern})" for pattern in WHITELIST_PATTERNS), re.IGNORECASE)
+
+    metrics = ScanMetrics()
+
     def __init__(self, get_response):
         self.get_response = get_response
-        self.compiled_patterns = [
-            re.compile(pattern, re.IGNORECASE)
-            for pattern in self.SQL_INJECTION_PATTERNS
-        ]
-
-        # Whitelist patterns for legitimate content
-        self.whitelist_patterns = [
-            r"^/api/(approvals|budget|auth|accounts-entities|admin_panel|transfers)/",  # API endpoints
-            r"workflow",  # Allow "workflow" in content
-            r"approval",  # Allow "approval" in content
-            r"transfer",  # Allow "transfer" in content
-            r"stage",  # Allow "stage" in content
-        ]
-        self.compiled_whitelist = [
-            re.compile(pattern, re.IGNORECASE) for pattern in self.whitelist_patterns
-        ]
+        self.max_body_bytes = getattr(settings, "SQL_INJECTION_MAX_BODY_BYTES", DEFAULT_MAX_BODY_BYTES)
+        self.max_depth = getattr(settings, "SQL_INJECTION_MAX_DEPTH", DEFAULT_MAX_DEPTH)
+        self.slow_scan_seconds = getattr(settings, "SQL_INJECTION_SLOW_SCAN_MS", DEFAULT_SLOW_SCAN_MS) / 1000
 
     def __call__(self, request):
-        # Skip SQL injection check for approval API endpoints
-        if request.path.startswith("/api/approvals/"):
-            # For approval endpoints, only check for very obvious SQL injection attempts
-            if self.contains_obvious_sql_injection(request):
-                logger.warning(
-                    f"Obvious SQL injection attempt detected from {request.META.get('REMOTE_ADDR')}: {request.get_full_path()}"
-                )
-                return HttpResponseBadRequest("Invalid request detected")
-        else:
-            # Check request before processing for other endpoints
-            if self.contains_sql_injection(request):
-                logger.warning(
-                    f"SQL injection attempt detected from {request.META.get('REMOTE_ADDR')}: {request.get_full_path()}"
-                )
-                return HttpResponseBadRequest("Invalid request detected")
+        started = time.perf_counter()
+        try:
+            # Skip SQL injection check for approval API endpoints
+            if request.path.startswith("/api/approvals/"):
+                # For approval endpoints, only check for very obvious SQL injection attempts
+                blocked = self.contains_obvious_sql_injection(request)
+                if blocked:
+                    logger.warning(
+                        f"Obvious SQL injection attempt detected from {request.META.get('REMOTE_ADDR')}: {request.get_full_path()}"
+                    )
+            else:
+                # Check request before processing for other endpoints
+                blocked = self.contains_sql_injection(request)
+                if blocked:
+                    logger.warning(
+                        f"SQL injection attempt detected from {request.META.get('REMOTE_ADDR')}: {request.get_full_path()}"
+                    )
+        except ScanLimitExceeded as e:
+            self._record_scan(request, time.perf_counter() - started, True)
+            logger.warning(
+                f"Request rejected from {request.META.get('REMOTE_ADDR')}: {e} ({request.method} {request.path})"
+            )
+            return HttpResponse(str(e), status=e.status, content_type="text/plain")
+        self._record_scan(request, time.perf_counter() - started, blocked)
+
+        if blocked:
+            return HttpResponseBadRequest("Invalid request detected")
 
         response = self.get_response(request)
         return response
 
+    def _record_scan(self, request, seconds, blocked):
+        self.metrics.observe(seconds, blocked)
+        if seconds > self.slow_scan_seconds:
+            logger.warning(
+                f"Slow SQL injection scan: {seconds * 1000:.1f} ms for {request.method} {request.path}"
+            )
+
+    def _rules_for_path(self, path):
+        """Whitelisted paths are only checked for very obvious SQL injection."""
+        if path and self.WHITELIST.search(path):
+            return self.WHITELISTED_RULES
+        return self.FULL_RULES
+
+    def _read_body(self, request):
+        """
+        The request body.
+
+        Raises ScanLimitExceeded (413) if it is over the size cap, before
+        reading it when Content-Length already tells. May raise
+        RawPostDataException if the body was already consumed.
+        """
+        try:
+            declared = int(request.META.get("CONTENT_LENGTH") or 0)
+        except (TypeError, ValueError):
+            declared = 0
+        if declared > self.max_body_bytes:
+            self.metrics.incr("oversize_rejected")
+            raise ScanLimitExceeded("Request body too large", 413)
+        body = request.body
+        if len(body) > self.max_body_bytes:
+            self.metrics.incr("oversize_rejected")
+            raise ScanLimitExceeded("Request body too large", 413)
+        return body
+
     def contains_sql_injection(self, request):
         """
         Check if request contains potential SQL injection
         """
+        rules = self._rules_for_path(request.path)
+
         # Normalize content type (ignore charset, etc.)
         content_type = (request.content_type or "").split(";")[0].lower()
 
         # Check GET parameters
         for key, value in request.GET.items():
-            if self.is_malicious(value, request.path):
+            if self._matches(rules, value):
                 logger.warning(f"SQL injection in GET parameter '{key}': {value}")
                 return True
 
@@ -97,12 +291,11 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
             if content_type == "application/json":
                 # Safely inspect JSON body without touching request.POST
                 try:
-                    body_bytes = (
-                        request.body
-                    )  # May raise RawPostDataException if already consumed
-                    json_data = json.loads(body_bytes.decode("utf-8"))
-                    if self.check_json_data(json_data, request.path):
-                        return True
+                    body_bytes = self._read_body(request)
+                    if body_bytes and self._body_may_match(rules, body_bytes):
+                        json_data = self._load_json(body_bytes)
+                        if self._check_json(json_data, rules):
+                            return True
                 except RawPostDataException:
                     # Body already consumed (e.g., by previous middleware) — skip JSON inspection
                     logger.debug(
@@ -112,7 +305,7 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
                     # If we can't parse JSON, check the raw body (best-effort)
                     try:
                         raw = body_bytes.decode("utf-8", errors="ignore")
-                        if self.is_malicious(raw, request.path):
+                        if self._matches(rules, raw):
                             logger.warning(f"SQL injection in request body: {raw}")
                             return True
                     except Exception:
@@ -121,7 +314,7 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
             elif content_type.startswith("multipart/"):
                 # File uploads: never touch request.body; only inspect form fields
                 for key, value in request.POST.items():
-                    if self.is_malicious(value, request.path):
+                    if self._matches(rules, value):
                         logger.warning(
                             f"SQL injection in multipart POST parameter '{key}': {value}"
                         )
@@ -130,7 +323,7 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
             elif content_type in ("application/x-www-form-urlencoded", "text/plain"):
                 # Regular forms: POST is safe to read; avoid body access
                 for key, value in request.POST.items():
-                    if self.is_malicious(value, request.path):
+                    if self._matches(rules, value):
                         logger.warning(
                             f"SQL injection in POST parameter '{key}': {value}"
                         )
@@ -138,14 +331,17 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
             else:
                 # Fallback: attempt to read body if available and not consumed
                 try:
-                    raw = request.body.decode("utf-8", errors="ignore")
-                    if raw and self.is_malicious(raw, request.path):
+                    body_bytes = self._read_body(request)
+                    raw = body_bytes.decode("utf-8", errors="ignore") if body_bytes else ""
+                    if raw and self._matches(rules, raw):
                         logger.warning(f"SQL injection in raw request body: {raw}")
                         return True
                 except RawPostDataException:
                     logger.debug(
                         "Skipping raw body inspection: raw post data already consumed"
                     )
+        except ScanLimitExceeded:
+            raise
         except Exception:
             # Be conservative; do not block the request on middleware inspection errors
             logger.debug(
@@ -159,139 +355,101 @@ class SQLInjectionProtectionMiddleware(MiddlewareMixin):
 
         return False
 
-    def check_json_data(self, data, context_path=None):
+    def _load_json(self, body_bytes):
+        try:
+            return json.loads(body_bytes.decode("utf-8"))
+        except RecursionError:
+            # Nested far beyond max_depth: the parser itself gave up
+            self.metrics.incr("depth_rejected")
+            raise ScanLimitExceeded("JSON nested too deeply", 400)
+
+    def _body_may_match(self, rules, body_bytes):
         """
-        Recursively check JSON data for SQL injection patterns
+        Whole-body prefilter: a JSON body without escapes in which no rule
+        token appears cannot hold a matching key or string, so it is not parsed.
         """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                if self.is_malicious(str(key), context_path) or self.check_json_data(
-                    value, context_path
-                ):
-                    logger.warning(
-                        f"SQL injection in JSON key '{key}' or value: {value}"
-                    )
-                    return True
-        elif isinstance(data, list):
-            for item in data:
-                if self.check_json_data(item, context_path):
+        if b"\\" in body_bytes:
+            # Escapes (\u0027, \/ ...) can hide tokens from the raw text
+            return True
+        return rules.may_match(body_bytes.decode("utf-8", errors="ignore"))
+
+    def _matches(self, rules, value):
+        if not isinstance(value, str):
+            value = str(value)
+        return rules.search(value) is not None
+
+    def _check_json(self, data, rules, depth=0):
+        """
+        Check JSON keys and strings iteratively.
+
+        Raises ScanLimitExceeded (400) for containers nested deeper than
+        max_depth levels.
+        """
+        stack = [(data, depth)]
+        while stack:
+            node, level = stack.pop()
+            if isinstance(node, (dict, list)) and level >= self.max_depth:
+                self.metrics.incr("depth_rejected")
+                raise ScanLimitExceeded("JSON nested too deeply", 400)
+            if isinstance(node, dict):
+                for key, value in node.items():
+                    if self._matches(rules, key):
+                        logger.warning(f"SQL injection in JSON key '{key}'")
+                        return True
+                    stack.append((value, level + 1))
+            elif isinstance(node, list):
+                stack.extend((item, level + 1) for item in node)
+            elif isinstance(node, str):
+                if rules.search(node):
+                    logger.warning(f"SQL injection in JSON string: {node}")
                     return True
-        elif isinstance(data, str):
-            if self.is_malicious(data, context_path):
-                logger.warning(f"SQL injection in JSON string: {data}")
-                return True
         return False
 
+    def check_json_data(self, data, context_path=None):
+        """
+        Recursively check JSON data for SQL injection patterns
+        """
+        return self._check_json(data, self._rules_for_path(context_path))
+
     def is_malicious_path(self, path):
         """
         Check if path contains SQL injection patterns (more restrictive for paths)
         """
-        dangerous_path_patterns = [
-            r"union(.*?)select",
-            r"drop(.*?)table",
-            r"exec(.*?)\s",
-            r"delete(.*?)from",
-            r"insert(.*?)into",
-        ]
-
-        for pattern_str in dangerous_path_patterns:
-            pattern = re.compile(pattern_str, re.IGNORECASE)
-            if pattern.search(path):
-                return True
-        return False
+        return self.PATH_RULES.search(path) is not None
 
     def is_malicious(self, value, context_path=None):
         """
         Check if a value contains SQL injection patterns
         """
-        if not isinstance(value, str):
-            value = str(value)
-
-        # Check if this is from a whitelisted API endpoint
-        if context_path:
-            for whitelist_pattern in self.compiled_whitelist:
-                if whitelist_pattern.search(context_path):
-                    # For whitelisted endpoints, only check for very obvious SQL injection
-                    obvious_sql_patterns = [
-                        r"union\s+(all\s+)?select",
-                        r"drop\s+(table|database)",
-                        r"insert\s+into\s+",
-                        r"delete\s+from\s+",
-                        r"'\s*(or|and)\s+('|\d+\s*=\s*\d+)",
-                    ]
-                    for pattern_str in obvious_sql_patterns:
-                        pattern = re.compile(pattern_str, re.IGNORECASE)
-                        if pattern.search(value):
-                            return True
-                    return False
-
-        # Standard check for all patterns
-        for pattern in self.compiled_patterns:
-            if pattern.search(value):
-                return True
-        return False
+        return self._matches(self._rules_for_path(context_path), value)
 
     def contains_obvious_sql_injection(self, request):
         """
         Check for only very obvious SQL injection attempts (for API endpoints)
         """
-        # Only check for the most obvious SQL injection patterns
-        obvious_patterns = [
-            r"union\s+(all\s+)?select",  # UNION SELECT
-            r"drop\s+(table|database|schema)",  # DROP statements
-            r"insert\s+into\s+.*values",  # INSERT statements
-            r"delete\s+from\s+\w+",  # DELETE statements
-            r"'\s*(or|and)\s+('1'='1'|'1'='1|1=1)",  # Classic injection
-            r";\s*(drop|delete|insert|update|create)\s+",  # Semicolon attacks
-            r"exec\s*\(",  # EXEC commands
-            r"<\s*script[^>]*>",  # Script tags
-        ]
-
-        compiled_obvious = [
-            re.compile(pattern, re.IGNORECASE) for pattern in obvious_patterns
-        ]
-
         # Check GET parameters
         for key, value in request.GET.items():
-            for pattern in compiled_obvious:
-                if pattern.search(str(value)):
-                    logger.warning(
-                        f"Obvious SQL injection in GET parameter '{key}': {value}"
-                    )
-                    return True
+            if self._matches(self.OBVIOUS_RULES, value):
+                logger.warning(
+                    f"Obvious SQL injection in GET parameter '{key}': {value}"
+                )
+                return True
 
         # Check JSON body for API endpoints
         content_type = (request.content_type or "").split(";")[0].lower()
         if content_type == "application/json":
             try:
-                body_bytes = request.body
-                json_data = json.loads(body_bytes.decode("utf-8"))
-                return self.check_obvious_json_data(json_data, compiled_obvious)
+                body_bytes = self._read_body(request)
+                if body_bytes and self._body_may_match(self.OBVIOUS_RULES, body_bytes):
+                    json_data = self._load_json(body_bytes)
+                    return self.check_obvious_json_data(json_data)
             except (json.JSONDecodeError, UnicodeDecodeError, RawPostDataException):
                 pass
 
         return False
 
-    def check_obvious_json_data(self, data, compiled_patterns):
+    def check_obvious_json_data(self, data, compiled_patterns=None):
         """
         Check JSON data for only obvious SQL injection patterns
         """
-        if isinstance(data, dict):
-            for key, value in data.items():
-                for pattern in compiled_patterns:
-                    if pattern.search(str(key)) or pattern.search(str(value)):
-                        logger.warning(f"Obvious SQL injection in JSON: {key}={value}")
-                        return True
-                if isinstance(value, (dict, list)):
-                    if self.check_obvious_json_data(value, compiled_patterns):
-                        return True
-        elif isinstance(data, list):
-            for item in data:
-                if self.check_obvious_json_data(item, compiled_patterns):
-                    return True
-        elif isinstance(data, str):
-            for pattern in compiled_patterns:
-                if pattern.search(data):
-                    logger.warning(f"Obvious SQL injection in JSON string: {data}")
-                    return True
-        return False
+        return self._check_json(data, self.OBVIOUS_RULES)
@@ -4,6 +4,7 @@ Django settings for budget_transfer project.
 
 from pathlib import Path
 from datetime import timedelta
+from celery.schedules import crontab
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -296,6 +297,37 @@ CELERY_TASK_TIME_LIMIT = 30 * 60
 # Celery task soft time limit (25 minutes warning)
 CELERY_TASK_SOFT_TIME_LIMIT = 25 * 60
 
+# Dashboards are recomputed by a debounced background task at most once per window (seconds)
+DASHBOARD_REFRESH_WINDOW_SECONDS = 60
+
+# Audit log entries are queued and bulk-written by a background thread
+# (see user_management/audit_sink.py)
+AUDIT_LOG_SINK = {
+    "ASYNC": True,
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 1.0,  # seconds
+    "MAX_QUEUE_SIZE": 10000,
+    "PUT_TIMEOUT": 0.05,  # seconds to wait for room when the queue is full
+    "OVERFLOW": "drop",  # "drop" or "sync" (write inline) when still full
+}
+
+# Closed days of audit logs are rolled up for the statistics endpoint; raw
+# entries older than the retention are archived (see user_management/audit_rollups.py)
+AUDIT_LOG_ROLLUP = {
+    "RETENTION_DAYS": 90,  # None: keep raw entries forever
+    "ARCHIVE": True,  # False: delete instead of moving to XX_AUDIT_LOG_ARCHIVE_XX
+    "BATCH_SIZE": 5000,
+    "GRACE_MINUTES": 10,  # days are rolled up this long after they end
+}
+
+# Oracle ESS jobs of upload workflows are polled by self-rescheduling tasks
+# instead of sleeping in the worker (see oracle_fbdi_integration/utilities/ess_jobs.py)
+ORACLE_ESS_POLLING = {
+    "POLL_INTERVAL": 10,  # seconds between status checks
+    "MAX_POLLS": 30,  # checks before a job is given up (TIMEOUT)
+    "STALL_SECONDS": 120,  # overdue polls are re-scheduled by resume-stalled-ess-jobs
+}
+
 # Celery beat schedule (for periodic tasks - optional)
 CELERY_BEAT_SCHEDULE = {
     # Add periodic tasks here if needed
@@ -303,4 +335,20 @@ CELERY_BEAT_SCHEDULE = {
     #     'task': 'app.tasks.task_name',
     #     'schedule': crontab(hour=2, minute=0),
     # },
+    'reconcile-dashboard-counters': {
+        'task': 'budget_management.tasks.reconcile_dashboard_counters',
+        'schedule': crontab(hour=2, minute=0),
+    },
+    'rollup-audit-logs': {
+        'task': 'user_management.tasks.rollup_audit_logs',
+        'schedule': crontab(minute=15),
+    },
+    'archive-audit-logs': {
+        'task': 'user_management.tasks.archive_audit_logs',
+        'schedule': crontab(hour=3, minute=0),
+    },
+    'resume-stalled-ess-jobs': {
+        'task': 'budget_management.tasks.resume_stalled_ess_jobs',
+        'schedule': crontab(minute='*'),
+    },
 }
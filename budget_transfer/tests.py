@@ -0,0 +1,75 @@
+"""
+Tests for the SQL injection protection middleware's scan limits.
+"""
+
+import json
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from budget_transfer.middleware.Sqlinjection import SQLInjectionProtectionMiddleware
+
+PAYLOAD = "' UNION SELECT password FROM users --"
+
+
+def nested(depth, leaf):
+    data = leaf
+    for _ in range(depth):
+        data = {"a": data}
+    return data
+
+
+class SQLInjectionScanLimitTests(SimpleTestCase):
+    """Requests the scan cannot fully inspect are rejected, not passed on."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.middleware = SQLInjectionProtectionMiddleware(lambda request: HttpResponse("ok"))
+        SQLInjectionProtectionMiddleware.metrics.reset()
+
+    def post_json(self, path, data):
+        return self.middleware(
+            self.factory.post(path, data=json.dumps(data), content_type="application/json")
+        )
+
+    def test_clean_json_passes(self):
+        response = self.post_json("/api/reports/", nested(5, {"name": "Q1 report"}))
+        self.assertEqual(response.status_code, 200)
+
+    def test_payload_within_limits_is_blocked(self):
+        response = self.post_json("/api/reports/", nested(5, {"name": PAYLOAD}))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(SQLInjectionProtectionMiddleware.metrics.snapshot()["blocked"], 1)
+
+    def test_json_over_depth_limit_is_rejected(self):
+        response = self.post_json("/api/reports/", nested(40, PAYLOAD))
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(SQLInjectionProtectionMiddleware.metrics.snapshot()["depth_rejected"], 1)
+
+    def test_json_deeper_than_the_parser_allows_is_rejected(self):
+        body = '{"a":' * 5000 + json.dumps(PAYLOAD) + "}" * 5000
+        response = self.middleware(
+            self.factory.post("/api/reports/", data=body, content_type="application/json")
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_approval_endpoints_reject_json_over_depth_limit(self):
+        response = self.post_json("/api/approvals/actions/", nested(40, PAYLOAD))
+        self.assertEqual(response.status_code, 400)
+
+    def test_body_over_size_limit_is_rejected(self):
+        data = {"padding": "x" * (2 * 1024 * 1024), "name": PAYLOAD}
+        response = self.post_json("/api/reports/", data)
+        self.assertEqual(response.status_code, 413)
+        self.assertEqual(SQLInjectionProtectionMiddleware.metrics.snapshot()["oversize_rejected"], 1)
+
+    def test_approval_endpoints_reject_body_over_size_limit(self):
+        response = self.post_json("/api/approvals/actions/", {"padding": "x" * (2 * 1024 * 1024)})
+        self.assertEqual(response.status_code, 413)
+
+    @override_settings(SQL_INJECTION_MAX_BODY_BYTES=1024, SQL_INJECTION_MAX_DEPTH=4)
+    def test_limits_come_from_settings(self):
+        self.middleware = SQLInjectionProtectionMiddleware(lambda request: HttpResponse("ok"))
+        self.assertEqual(self.post_json("/api/reports/", {"name": "x" * 2048}).status_code, 413)
+        self.assertEqual(self.post_json("/api/reports/", nested(5, PAYLOAD)).status_code, 400)
+        self.assertEqual(self.post_json("/api/reports/", nested(3, "Q1 report")).status_code, 200)
@@ -38,3 +38,6 @@ class DynamicValidationConfig(AppConfig):
             import execution_points  # noqa: F401
         except ImportError:
             pass
+        
+        # Keep the requirement cache in sync with workflow/segment changes
+        from . import signals  # noqa: F401
@@ -0,0 +1,11 @@
+"""
+Validation Engine Benchmarks
+
+Synthetic-data benchmark suite for the submit hot path. Run it with:
+
+    python manage.py benchmark_validation
+    python manage.py benchmark_validation --lines 300 --depth 10 --latency-ms 5
+    python manage.py benchmark_validation --save-baseline
+
+See harness.py for the metrics collected and fixtures.py for the generated data.
+"""
@@ -0,0 +1,157 @@
+"""
+Synthetic data for the validation benchmarks.
+
+Everything here writes to whatever database is active, so only call it against
+the throwaway SQLite database created by the benchmark_validation command.
+
+- register_latency_datasources(): datasources that sleep for a controllable time
+- create_transaction(): a budget transfer with N transfer lines
+- create_workflow(): a linear workflow of configurable depth
+"""
+
+import time
+from decimal import Decimal
+from typing import List
+
+from django_dynamic_validation.datasource_params import StandardParams
+from django_dynamic_validation.datasource_registry import datasource_registry
+from django_dynamic_validation.execution_point_registry import execution_point_registry
+from django_dynamic_validation.models import DataSource, ValidationStep, ValidationWorkflow
+
+
+BENCHMARK_POINT = 'benchmark_point'
+LATENCY_DATASOURCE_PREFIX = 'Bench_Latency_'
+
+
+def register_latency_datasources(count: int, latency_ms: float) -> List[str]:
+    """
+    Register `count` datasources that sleep for `latency_ms` before returning.
+
+    They take the standard transaction_id parameter so they are resolved through
+    the same auto-population path as the real transaction datasources, and are
+    marked thread-safe so they are eligible for parallel execution.
+    """
+    names = []
+    delay = latency_ms / 1000.0
+    for index in range(count):
+        name = f'{LATENCY_DATASOURCE_PREFIX}{index}'
+        datasource_registry.unregister(name)
+
+        def make_getter(value):
+            def get_latency_value(transaction_id):
+                if delay:
+                    time.sleep(delay)
+                return value
+            return get_latency_value
+
+        datasource_registry.register(
+            name=name,
+            parameters=[StandardParams.TRANSACTION_ID],
+            return_type='int',
+            description=f'Benchmark datasource with {latency_ms}ms latency',
+            thread_safe=True
+        )(make_getter(index + 1))
+        names.append(name)
+    return names
+
+
+def sync_datasource_rows(names: List[str]):
+    """Create the DataSource rows ExpressionEvaluator looks up by name."""
+    for name in names:
+        metadata = datasource_registry.get_metadata(name)
+        DataSource.objects.update_or_create(
+            name=name,
+            defaults={
+                'description': metadata['description'],
+                'function_name': metadata['function_name'],
+                'parameter_names': metadata['parameters'],
+                'return_type': metadata['return_type'],
+            }
+        )
+
+
+def register_benchmark_point(datasource_names: List[str]) -> str:
+    execution_point_registry.register(
+        code=BENCHMARK_POINT,
+        name='Benchmark Point',
+        description='Synthetic execution point used by benchmark_validation',
+        category='benchmarks',
+        allowed_datasources=list(datasource_names)
+    )
+    return BENCHMARK_POINT
+
+
+def create_transaction(lines: int):
+    """
+    Create a budget transfer with `lines` transfer lines.
+
+    Uses bulk_create so the xx_BudgetTransfer post_save handlers (workflow
+    creation, dashboard refresh, Oracle upload) do not run.
+    """
+    from budget_management.models import xx_BudgetTransfer
+    from transaction.models import xx_TransactionTransfer
+
+    transfer = xx_BudgetTransfer.objects.bulk_create([
+        xx_BudgetTransfer(
+            transaction_date='2025-01-01',
+            amount=Decimal(lines * 100),
+            status='pending',
+            requested_by='benchmark',
+            code='FAR-BENCH',
+            type='FAR',
+            control_budget='MOFA_CASH',
+        )
+    ])[0]
+    if transfer.pk is None:
+        # Backends that don't return PKs from bulk_create
+        transfer = xx_BudgetTransfer.objects.filter(code='FAR-BENCH').latest('transaction_id')
+
+    xx_TransactionTransfer.objects.bulk_create([
+        xx_TransactionTransfer(
+            transaction=transfer,
+            from_center=Decimal(100) if index % 2 == 0 else Decimal(0),
+            to_center=Decimal(0) if index % 2 == 0 else Decimal(100),
+            account_code=1000 + index,
+            cost_center_code=index,
+        )
+        for index in range(lines)
+    ])
+    return transfer
+
+
+def create_workflow(name: str, depth: int, datasource_names: List[str], execution_point: str = BENCHMARK_POINT):
+    """
+    Create an active linear workflow with `depth` steps.
+
+    Each step sums every benchmark datasource and routes to the next step on
+    success, so evaluation cost scales with depth x datasources.
+    """
+    expression = ' + '.join(f'datasource:{ds}' for ds in datasource_names) or '1'
+
+    steps = []
+    for index in range(depth):
+        steps.append(ValidationStep.objects.create(
+            name=f'{name} Step {index + 1}',
+            order=index,
+            left_expression=expression,
+            operation='>=',
+            right_expression='0',
+            if_true_action='complete_success',
+            if_false_action='complete_failure',
+            if_false_action_data={'error': f'{name} step {index + 1} failed'},
+        ))
+
+    # Chain the steps now that every ID is known
+    for current, following in zip(steps, steps[1:]):
+        current.if_true_action = 'proceed_to_step_by_id'
+        current.if_true_action_data = {'next_step_id': following.id}
+        current.save(update_fields=['if_true_action', 'if_true_action_data'])
+
+    workflow = ValidationWorkflow.objects.create(
+        name=name,
+        execution_point=execution_point,
+        status='active',
+        initial_step=steps[0] if steps else None,
+    )
+    workflow.steps.add(*steps)
+    return workflow
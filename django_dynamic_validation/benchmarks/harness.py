@@ -0,0 +1,259 @@
+"""
+Benchmark harness for the validation engine.
+
+Measures three layers of the submit hot path:
+
+- expression_evaluator:          ExpressionEvaluator.evaluate on one step expression
+- execution_engine:              ValidationExecutionEngine.execute on one workflow
+- execute_workflows_for_point:   every workflow registered for the benchmark point
+
+For each scenario it reports latency percentiles, the number of SQL queries per
+run and allocation counts (net allocated blocks and tracemalloc peak). Timing
+and allocation passes are separate so tracemalloc overhead does not skew latency.
+
+Results can be compared against a stored baseline (baseline.json next to this
+module); see compare_to_baseline().
+"""
+
+import json
+import math
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from . import fixtures
+
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / 'baseline.json'
+
+# Metrics checked against the baseline and the allowed relative increase for each.
+# Query counts are deterministic, so any increase is a regression.
+REGRESSION_METRICS = {
+    'p50_ms': None,      # uses the --tolerance value
+    'p95_ms': None,
+    'queries': 0.0,
+    'alloc_blocks': None,
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered), math.ceil(pct / 100.0 * len(ordered))) - 1)
+    return ordered[rank]
+
+
+def measure(func: Callable[[], object], iterations: int, warmup: int = 1) -> Dict:
+    """
+    Run `func` repeatedly and collect latency, query and allocation metrics.
+
+    Returns:
+        {
+            'iterations': int,
+            'mean_ms', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms': float,
+            'queries': float,        # mean SQL queries per run
+            'alloc_blocks': int,     # mean net allocated blocks per run
+            'peak_kib': float        # tracemalloc peak for a single run
+        }
+    """
+    for _ in range(warmup):
+        func()
+
+    latencies = []
+    query_counts = []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - started) * 1000.0)
+        query_counts.append(len(captured.captured_queries))
+
+    # Allocation pass
+    block_deltas = []
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        for _ in range(max(1, min(iterations, 10))):
+            before = sys.getallocatedblocks()
+            func()
+            block_deltas.append(sys.getallocatedblocks() - before)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p90_ms': round(percentile(latencies, 90), 3),
+        'p95_ms': round(percentile(latencies, 95), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+        'queries': round(statistics.fmean(query_counts), 2),
+        'alloc_blocks': int(statistics.fmean(block_deltas)),
+        'peak_kib': round(peak / 1024.0, 1),
+    }
+
+
+def build_scenarios(lines: int, depth: int, workflows: int, datasources: int, latency_ms: float) -> Dict[str, Callable]:
+    """
+    Create the synthetic dataset and return {scenario_name: callable}.
+
+    Must run inside a database that can be thrown away.
+    """
+    from django_dynamic_validation.execution_engine import ValidationExecutionEngine
+    from django_dynamic_validation.execution_point_registry import execute_workflows_for_point
+    from django_dynamic_validation.expression_evaluator import ExpressionEvaluator
+    from django_dynamic_validation.views_helpers import _auto_populate_datasource_params
+
+    latency_names = fixtures.register_latency_datasources(datasources, latency_ms)
+    datasource_names = ['Transaction_Lines_Count', 'Transaction_Total_From'] + latency_names
+    fixtures.sync_datasource_rows(datasource_names)
+    point = fixtures.register_benchmark_point(datasource_names)
+
+    transfer = fixtures.create_transaction(lines)
+    workflow_objects = [
+        fixtures.create_workflow(f'Benchmark Workflow {index + 1}', depth, datasource_names)
+        for index in range(workflows)
+    ]
+
+    datasource_params = _auto_populate_datasource_params(
+        execution_point=point,
+        context_data={'transaction_id': transfer.transaction_id}
+    )
+    expression = workflow_objects[0].initial_step.left_expression
+
+    def run_expression():
+        return ExpressionEvaluator().evaluate(expression, datasource_params)
+
+    def run_engine():
+        return ValidationExecutionEngine(workflow_objects[0]).execute(
+            context_data={'transaction_id': transfer.transaction_id},
+            datasource_params=datasource_params
+        )
+
+    def run_point():
+        result = execute_workflows_for_point(
+            execution_point_code=point,
+            context_data={'transaction_id': transfer.transaction_id},
+            datasource_params=datasource_params
+        )
+        if not result['success']:
+            raise RuntimeError(result['error'])
+        return result
+
+    return {
+        'expression_evaluator': run_expression,
+        'execution_engine': run_engine,
+        'execute_workflows_for_point': run_point,
+    }
+
+
+def run_benchmarks(
+    lines: int = 50,
+    depth: int = 5,
+    workflows: int = 3,
+    datasources: int = 2,
+    latency_ms: float = 0.0,
+    iterations: int = 30,
+    warmup: int = 2,
+    scenarios: Optional[List[str]] = None,
+) -> Dict:
+    """
+    Build the dataset, run every (or the selected) scenario and return a report.
+    """
+    config = {
+        'lines': lines,
+        'depth': depth,
+        'workflows': workflows,
+        'datasources': datasources,
+        'latency_ms': latency_ms,
+    }
+    available = build_scenarios(lines, depth, workflows, datasources, latency_ms)
+    selected = scenarios or list(available)
+
+    results = {}
+    for name in selected:
+        if name not in available:
+            raise ValueError(f"Unknown scenario '{name}'. Available: {', '.join(available)}")
+        results[name] = measure(available[name], iterations=iterations, warmup=warmup)
+
+    return {
+        'config': config,
+        'python': sys.version.split()[0],
+        'results': results,
+    }
+
+
+def load_baseline(path: Path = DEFAULT_BASELINE_PATH) -> Optional[Dict]:
+    path = Path(path)
+    if not path.exists():
+        return None
+    with path.open(encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+def save_baseline(report: Dict, path: Path = DEFAULT_BASELINE_PATH):
+    with Path(path).open('w', encoding='utf-8') as handle:
+        json.dump(report, handle, indent=2, sort_keys=True)
+        handle.write('\n')
+
+
+def compare_to_baseline(report: Dict, baseline: Dict, tolerance: float = 0.5) -> List[Dict]:
+    """
+    Compare a report against a baseline report.
+
+    Args:
+        report: Output of run_benchmarks()
+        baseline: Previously saved report
+        tolerance: Allowed relative increase for latency/allocation metrics (0.5 = +50%)
+
+    Returns:
+        List of regressions:
+        [{'scenario': str, 'metric': str, 'baseline': float, 'current': float, 'change_pct': float}]
+        Scenarios missing from either side are skipped. If the configs differ the
+        numbers are not comparable and a single 'config' regression is returned.
+    """
+    if baseline.get('config') != report.get('config'):
+        return [{
+            'scenario': '*',
+            'metric': 'config',
+            'baseline': baseline.get('config'),
+            'current': report.get('config'),
+            'change_pct': None,
+        }]
+
+    regressions = []
+    for scenario, current in report.get('results', {}).items():
+        previous = baseline.get('results', {}).get(scenario)
+        if not previous:
+            continue
+        for metric, metric_tolerance in REGRESSION_METRICS.items():
+            if metric not in previous or metric not in current:
+                continue
+            allowed = tolerance if metric_tolerance is None else metric_tolerance
+            base_value = previous[metric]
+            value = current[metric]
+            if allowed == 0:
+                regressed = value > base_value
+            else:
+                # Relative checks are meaningless against a zero/negative baseline
+                regressed = base_value > 0 and value > base_value * (1 + allowed)
+            if regressed:
+                change_pct = round((value - base_value) / base_value * 100.0, 1) if base_value else None
+                regressions.append({
+                    'scenario': scenario,
+                    'metric': metric,
+                    'baseline': base_value,
+                    'current': value,
+                    'change_pct': change_pct,
+                })
+    return regressions
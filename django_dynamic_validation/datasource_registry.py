@@ -39,14 +39,24 @@ class DataSourceRegistry:
         if cls._instance is None:
             cls._instance = super(DataSourceRegistry, cls).__new__(cls)
             cls._instance._registry = {}
+            cls._instance._version = 0
         return cls._instance
     
+    @property
+    def version(self) -> int:
+        """Counter bumped on every registry change (used to invalidate derived caches)."""
+        return self._version
+    
+    def _bump_version(self):
+        self._version += 1
+    
     def register(
         self,
         name: str,
         parameters: List[str],
         return_type: str,
-        description: str = ""
+        description: str = "",
+        thread_safe: bool = False
     ) -> Callable:
         """
         Decorator to register a datasource function.
@@ -56,6 +66,10 @@ class DataSourceRegistry:
             parameters: List of parameter names the function accepts
             return_type: Expected return type ('int', 'float', 'string', 'boolean')
             description: Human-readable description of what the datasource provides
+            thread_safe: True if the function can safely run in a worker thread
+                         (no shared mutable state, only ORM/HTTP calls). Workflows
+                         that only use thread-safe datasources are eligible for
+                         parallel execution in execute_workflows_for_point.
             
         Returns:
             Decorated function
@@ -101,8 +115,10 @@ class DataSourceRegistry:
                 'parameters': parameters,
                 'return_type': return_type,
                 'description': description,
-                'function_name': func.__name__
+                'function_name': func.__name__,
+                'thread_safe': thread_safe
             }
+            self._bump_version()
             
             # Return the original function unchanged
             @wraps(func)
@@ -162,10 +178,26 @@ class DataSourceRegistry:
                 'parameters': data['parameters'],
                 'return_type': data['return_type'],
                 'description': data['description'],
-                'function_name': data['function_name']
+                'function_name': data['function_name'],
+                'thread_safe': data.get('thread_safe', False)
             }
         return result
     
+    def is_thread_safe(self, name: str) -> bool:
+        """
+        Check if a datasource has been marked as safe to call from a worker thread.
+        
+        Args:
+            name: Name of the datasource
+            
+        Returns:
+            True if registered with thread_safe=True, False otherwise (including unknown names)
+        """
+        if name not in self._registry:
+            self._try_register_segment_datasources(name)
+        entry = self._registry.get(name)
+        return bool(entry and entry.get('thread_safe', False))
+    
     def validate_params(self, name: str, provided_params: Dict[str, Any]) -> tuple[bool, Optional[str]]:
         """
         Validate that provided parameters match the datasource requirements.
@@ -267,12 +299,14 @@ class DataSourceRegistry:
         """
         if name in self._registry:
             del self._registry[name]
+            self._bump_version()
             return True
         return False
     
     def clear(self):
         """Clear all registered datasources (mainly for testing)."""
         self._registry.clear()
+        self._bump_version()
 
     def _try_register_segment_datasources(self, name: str) -> None:
         """Lazily register segment datasources when referenced."""
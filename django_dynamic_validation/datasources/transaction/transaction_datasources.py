@@ -17,7 +17,8 @@ Transaction_Lines_Count = 'Transaction_Lines_Count'
     name=Transaction_Lines_Count,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="int",
-    description="Count of lines for a given transaction"
+    description="Count of lines for a given transaction",
+    thread_safe=True
 )
 def get_transaction_lines_count(transaction_id):
     """Get count of transfer lines for a transaction."""
@@ -31,7 +32,8 @@ Transaction_Total_From = 'Transaction_Total_From'
     name=Transaction_Total_From,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="int",
-    description="Total 'from' amount for a given transaction"
+    description="Total 'from' amount for a given transaction",
+    thread_safe=True
 )
 def get_transaction_total_from(transaction_id):
     """Get total 'from_center' amount for all transfers in a transaction."""
@@ -48,7 +50,8 @@ Transaction_Total_To = 'Transaction_Total_To'
     name=Transaction_Total_To,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="int",
-    description="Total 'to' amount for a given transaction"
+    description="Total 'to' amount for a given transaction",
+    thread_safe=True
 )
 def get_transaction_total_to(transaction_id):
     """Get total 'to_center' amount for all transfers in a transaction."""
@@ -65,7 +68,8 @@ Transaction_Type = 'Transaction_Type'
     name=Transaction_Type,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="string",
-    description="Type of a given transaction (FAR, AFR, DFR, etc.)"
+    description="Type of a given transaction (FAR, AFR, DFR, etc.)",
+    thread_safe=True
 )
 def get_transaction_type(transaction_id):
     """Get the type code of a budget transfer transaction."""
@@ -78,7 +82,8 @@ Transaction_CONTROL_BUDGET_NAME = 'Transaction_CONTROL_BUDGET_NAME'
     name=Transaction_CONTROL_BUDGET_NAME,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="string",
-    description="Control budget name of a given transaction ('سيولة', 'تكاليف')"
+    description="Control budget name of a given transaction ('سيولة', 'تكاليف')",
+    thread_safe=True
 )
 def get_transaction_control_budget_name(transaction_id):
     """Get the control budget name of a budget transfer transaction."""
@@ -93,7 +98,8 @@ Transaction_User_Security_Group = 'Transaction_User_Security_Group'
     name=Transaction_User_Security_Group,
     parameters=[StandardParams.TRANSACTION_ID],
     return_type="string",
-    description="User security group associated with a given transaction"
+    description="User security group associated with a given transaction",
+    thread_safe=True
 )
 def get_transaction_user_security_group(transaction_id):
     """Get the user security group of a budget transfer transaction."""
@@ -47,7 +47,8 @@ SEGMENT_FUND_AVAILABLE_CASH = 'SEGMENT_FUND_AVAILABLE_CASH'
     name=SEGMENT_FUND_AVAILABLE_CASH,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="AVAILABLE amount for a given transaction line"
+    description="AVAILABLE amount for a given transaction line",
+    thread_safe=True
 )
 def get_segment_fund_available_cash(transfer_id):
     """AVAILABLE amount for a given transaction line"""
@@ -58,7 +59,8 @@ SEGMENT_FUND_AVAILABLE_COST = 'SEGMENT_FUND_AVAILABLE_COST'
     name=SEGMENT_FUND_AVAILABLE_COST,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="AVAILABLE amount for a given transaction line"
+    description="AVAILABLE amount for a given transaction line",
+    thread_safe=True
 )
 def get_segment_fund_available_cost(transfer_id):
     """AVAILABLE amount for a given transaction line"""
@@ -69,7 +71,8 @@ SEGMENT_TOTAL_BUDGET_COST = 'SEGMENT_TOTAL_BUDGET_COST'
     name=SEGMENT_TOTAL_BUDGET_COST,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="TOTAL_BUDGET amount for a given transaction line"
+    description="TOTAL_BUDGET amount for a given transaction line",
+    thread_safe=True
 )
 def get_segment_total_budget_cost(transfer_id):
     """TOTAL_BUDGET amount for a given transaction line"""
@@ -80,7 +83,8 @@ SEGMENT_TOTAL_BUDGET_CASH = 'SEGMENT_TOTAL_BUDGET_CASH'
     name=SEGMENT_TOTAL_BUDGET_CASH,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="TOTAL_BUDGET amount for a given transaction line"
+    description="TOTAL_BUDGET amount for a given transaction line",
+    thread_safe=True
 )
 def get_segment_total_budget_cash(transfer_id):
     """TOTAL_BUDGET amount for a given transaction line"""
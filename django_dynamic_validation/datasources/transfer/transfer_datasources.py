@@ -18,7 +18,8 @@ Transaction_Line_FROM = 'Transaction_Line_FROM'
     name=Transaction_Line_FROM,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="FROM amount for a given transaction line"
+    description="FROM amount for a given transaction line",
+    thread_safe=True
 )
 def get_transaction_line_from(transfer_id):
     """Get 'from_center' amount for a specific transfer line."""
@@ -33,7 +34,8 @@ Transaction_Line_TO = 'Transaction_Line_TO'
     name=Transaction_Line_TO,
     parameters=[StandardParams.TRANSFER_ID],
     return_type="int",
-    description="TO amount for a given transaction line"
+    description="TO amount for a given transaction line",
+    thread_safe=True
 )
 def get_transaction_line_to(transfer_id):
     """Get 'to_center' amount for a specific transfer line."""
@@ -119,7 +121,8 @@ def register_segment_datasources():
                 name=datasource_name,
                 parameters=[StandardParams.TRANSFER_ID],  # STANDARD parameter for auto-population!
                 return_type="string",
-                description=f"Segment {segment_num} ({seg_type.segment_name}) for a transaction line"
+                description=f"Segment {segment_num} ({seg_type.segment_name}) for a transaction line",
+                thread_safe=True
             )(segment_function)
         _segment_datasources_registered = True
     except Exception as e:
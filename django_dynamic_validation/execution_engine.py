@@ -22,18 +22,27 @@ class ValidationExecutionEngine:
     5. Continues until workflow completes or fails
     """
     
-    def __init__(self, workflow: ValidationWorkflow, user=None):
+    def __init__(self, workflow: ValidationWorkflow, user=None, persist: bool = True,
+                 evaluator: Optional[ExpressionEvaluator] = None):
         """
         Initialize the execution engine.
         
         Args:
             workflow: The ValidationWorkflow to execute
             user: The user initiating the execution
+            persist: Save the execution and step executions to the database.
+                     With persist=False (dry run) they are built in memory only;
+                     the execution has no id and is available as self.execution,
+                     its steps as self.step_executions.
+            evaluator: Optional ExpressionEvaluator to reuse (e.g. one sharing a
+                       datasource value cache across workflows)
         """
         self.workflow = workflow
         self.user = user
-        self.evaluator = ExpressionEvaluator()
+        self.persist = persist
+        self.evaluator = evaluator or ExpressionEvaluator()
         self.execution: Optional[ValidationExecution] = None
+        self.step_executions = []
         self.datasource_params: Dict[str, Dict[str, Any]] = {}
     
     def execute(self, context_data: Dict[str, Any] = None, datasource_params: Dict[str, Dict[str, Any]] = None) -> ValidationExecution:
@@ -65,13 +74,14 @@ class ValidationExecutionEngine:
         sanitized_context = self._sanitize_context(full_context)
         
         # Create execution record
-        self.execution = ValidationExecution.objects.create(
+        self.execution = ValidationExecution(
             workflow=self.workflow,
             current_step=self.workflow.initial_step,
             context_data=sanitized_context,
             started_by=self.user,
             status='running'
         )
+        self._save_execution()
         
         # Execute steps in sequence
         current_step = self.workflow.initial_step
@@ -87,7 +97,7 @@ class ValidationExecutionEngine:
         if self.execution.status == 'running':
             self.execution.status = 'completed_success'
             self.execution.completed_at = timezone.now()
-            self.execution.save()
+            self._save_execution()
         
         return self.execution
     
@@ -116,23 +126,22 @@ class ValidationExecutionEngine:
                 if action_data and ('error' in action_data or 'message' in action_data):
                     self._last_failure_message = action_data.get('error') or action_data.get('message')
             
+            # If validation failed and step has a custom failure message in action_data, store it
+            error_msg = None
+            if not condition_result and action_data:
+                error_msg = action_data.get('error') or action_data.get('message')
+            
             # Record step execution
-            step_exec = ValidationStepExecution.objects.create(
+            self._record_step_execution(ValidationStepExecution(
                 execution=self.execution,
                 step=step,
                 left_value=str(left_val),
                 right_value=str(right_val),
                 condition_result=condition_result,
                 executed_action=action,
-                action_result_data=action_data or {}
-            )
-            
-            # If validation failed and step has a custom failure message in action_data, store it
-            if not condition_result and action_data:
-                error_msg = action_data.get('error') or action_data.get('message')
-                if error_msg:
-                    step_exec.error_message = error_msg
-                    step_exec.save()
+                action_result_data=action_data or {},
+                error_message=error_msg
+            ))
             
             # Execute the action and get next step
             next_step = self._execute_action(action, action_data)
@@ -470,7 +479,7 @@ class ValidationExecutionEngine:
             if current_index + 1 < len(active_steps):
                 next_step = active_steps[current_index + 1]
                 self.execution.current_step = next_step
-                self.execution.save()
+                self._save_execution()
                 return next_step
             else:
                 # No more steps
@@ -482,7 +491,7 @@ class ValidationExecutionEngine:
             try:
                 next_step = ValidationStep.objects.get(id=next_step_id)
                 self.execution.current_step = next_step
-                self.execution.save()
+                self._save_execution()
                 return next_step
             except ValidationStep.DoesNotExist:
                 raise ValueError(f"Next step with ID {next_step_id} not found")
@@ -490,7 +499,7 @@ class ValidationExecutionEngine:
         elif action == 'complete_success':
             self.execution.status = 'completed_success'
             self.execution.completed_at = timezone.now()
-            self.execution.save()
+            self._save_execution()
             return None
         
         elif action == 'complete_failure':
@@ -503,7 +512,7 @@ class ValidationExecutionEngine:
                 context['failure_message'] = self._last_failure_message
                 self.execution.context_data = context
             
-            self.execution.save()
+            self._save_execution()
             return None
         
         else:
@@ -560,14 +569,25 @@ class ValidationExecutionEngine:
         
         return sanitized
     
+    def _save_execution(self):
+        """Persist the execution record unless running as a dry run."""
+        if self.persist:
+            self.execution.save()
+    
+    def _record_step_execution(self, step_exec: ValidationStepExecution):
+        """Keep the step execution in memory and persist it unless running as a dry run."""
+        if self.persist:
+            step_exec.save()
+        self.step_executions.append(step_exec)
+    
     def _record_step_error(self, step: ValidationStep, error_message: str):
         """Record a step execution error."""
-        ValidationStepExecution.objects.create(
+        self._record_step_execution(ValidationStepExecution(
             execution=self.execution,
             step=step,
             executed_action='error',
             error_message=error_message
-        )
+        ))
     
     def _mark_execution_error(self, error_message: str):
         """Mark the execution as errored."""
@@ -583,4 +603,4 @@ class ValidationExecutionEngine:
         context = self.execution.context_data or {}
         context['error'] = error_message
         self.execution.context_data = context
-        self.execution.save()
+        self._save_execution()
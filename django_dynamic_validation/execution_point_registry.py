@@ -27,6 +27,7 @@ class ExecutionPointRegistry:
     
     def __init__(self):
         self.execution_points: Dict[str, Dict] = {}
+        self.version = 0  # Bumped on every change; see requirement_cache
     
     def register(
         self,
@@ -70,6 +71,7 @@ class ExecutionPointRegistry:
             'category': category,
             'allowed_datasources': allowed_datasources or []
         }
+        self.version += 1
         
         return code
     
@@ -259,6 +261,7 @@ class ExecutionPointRegistry:
         if datasource_name not in allowed:
             allowed.append(datasource_name)
             self.execution_points[code]['allowed_datasources'] = allowed
+            self.version += 1
         
         return True
     
@@ -280,6 +283,7 @@ class ExecutionPointRegistry:
         if datasource_name in allowed:
             allowed.remove(datasource_name)
             self.execution_points[code]['allowed_datasources'] = allowed
+            self.version += 1
             return True
         
         return False
@@ -346,12 +350,11 @@ def get_required_datasources_for_point(execution_point_code: str) -> Dict:
         print(f"Required datasources: {info['datasources']}")
         print(f"Example params: {info['example_params']}")
     """
-    from .models import ValidationWorkflow
-    from .datasource_registry import datasource_registry
-    from .expression_evaluator import ExpressionEvaluator
+    from .requirement_cache import requirement_cache
     
     # Validate execution point exists
-    if not execution_point_registry.exists(execution_point_code):
+    table = requirement_cache.get(execution_point_code)
+    if table is None:
         return {
             'success': False,
             'error': f"Execution point '{execution_point_code}' is not registered",
@@ -360,70 +363,39 @@ def get_required_datasources_for_point(execution_point_code: str) -> Dict:
             'example_params': {}
         }
     
-    # Get all active workflows for this execution point
-    workflows = ValidationWorkflow.objects.filter(
-        execution_point=execution_point_code,
-        status='active'
-    ).prefetch_related('steps')
-    
-    if not workflows.exists():
-        return {
-            'success': True,
-            'execution_point': execution_point_code,
-            'datasources': [],
-            'total_datasources': 0,
-            'example_params': {},
-            'message': f'No active workflows for execution point: {execution_point_code}'
+    datasources_info = [
+        {
+            'name': info['name'],
+            'parameters': list(info['parameters']),
+            'return_type': info['return_type'],
+            'description': info['description']
         }
+        for info in table['datasources'].values()
+    ]
+    example_params = {name: dict(params) for name, params in table['example_params'].items()}
     
-    # Collect all unique datasources used across all workflows
-    datasource_names = set()
-    
-    for workflow in workflows:
-        for step in workflow.steps.all():
-            # Extract datasources from left expression
-            left_datasources = ExpressionEvaluator.get_referenced_datasources(step.left_expression)
-            datasource_names.update(left_datasources)
-            
-            # Extract datasources from right expression
-            right_datasources = ExpressionEvaluator.get_referenced_datasources(step.right_expression)
-            datasource_names.update(right_datasources)
-    
-    # Get detailed information for each datasource
-    datasources_info = []
-    example_params = {}
-    
-    for ds_name in sorted(datasource_names):
-        ds_info = datasource_registry.get_metadata(ds_name)
-        if ds_info:
-            datasources_info.append({
-                'name': ds_name,
-                'parameters': ds_info.get('parameters', []),
-                'return_type': ds_info.get('return_type', 'unknown'),
-                'description': ds_info.get('description', '')
-            })
-            
-            # Create example parameters structure
-            params = ds_info.get('parameters', [])
-            if params:
-                example_params[ds_name] = {
-                    param: f'<{param}_value>' for param in params
-                }
-    
-    return {
+    result = {
         'success': True,
         'execution_point': execution_point_code,
         'datasources': datasources_info,
         'total_datasources': len(datasources_info),
         'example_params': example_params
     }
+    if not table['has_active_workflows']:
+        result['message'] = f'No active workflows for execution point: {execution_point_code}'
+    return result
 
 
 def execute_workflows_for_point(
     execution_point_code: str,
     context_data: Optional[Dict] = None,
     datasource_params: Optional[Dict] = None,
-    user=None
+    user=None,
+    parallel: bool = False,
+    max_workers: Optional[int] = None,
+    workflow_timeout: Optional[float] = None,
+    persist: bool = True,
+    value_cache: Optional[Dict] = None
 ) -> Dict:
     """
     Execute all active workflows for a specific execution point.
@@ -437,6 +409,24 @@ def execute_workflows_for_point(
         context_data: Context data for the execution
         datasource_params: Parameters for datasources (dict of datasource_name -> params dict)
         user: User initiating the action (for audit trail)
+        parallel: Run independent workflows concurrently in a bounded thread pool.
+                  Only workflows whose datasources are all registered with
+                  thread_safe=True are dispatched to the pool; the rest run on the
+                  calling thread. Falls back to sequential execution inside an open
+                  transaction, since worker threads use their own DB connections
+                  and cannot see uncommitted rows.
+        max_workers: Pool size for parallel mode
+                     (default: settings.VALIDATION_PARALLEL_MAX_WORKERS or 4)
+        workflow_timeout: Seconds to wait for each pooled workflow before reporting
+                          it as an error (default: settings.VALIDATION_WORKFLOW_TIMEOUT,
+                          None waits indefinitely)
+        persist: Save ValidationExecution/ValidationStepExecution rows. With
+                 persist=False the workflows run as a dry run: nothing is written
+                 and each execution entry has execution_id None.
+        value_cache: Optional dict shared by every workflow's evaluator so each
+                     datasource is called once per distinct parameter set
+                     (see ExpressionEvaluator). Reuse it across calls to share
+                     values between execution points of the same evaluation.
         
     Returns:
         Dictionary with consistent keys (always present):
@@ -480,6 +470,15 @@ def execute_workflows_for_point(
         
         # Proceed with business logic if all passed
         process_transfer(...)
+        
+        # Datasource-bound workflows can run concurrently; results keep workflow order
+        result = execute_workflows_for_point(
+            execution_point_code='on_transfer_line_submit',
+            datasource_params=params,
+            user=request.user,
+            parallel=True,
+            workflow_timeout=30
+        )
     """
     from .models import ValidationWorkflow
     from .execution_engine import ValidationExecutionEngine
@@ -502,7 +501,7 @@ def execute_workflows_for_point(
     workflows = ValidationWorkflow.objects.filter(
         execution_point=execution_point_code,
         status='active'
-    ).order_by('created_at')
+    ).order_by('created_at', 'id')
     
     if not workflows.exists():
         return {
@@ -517,38 +516,41 @@ def execute_workflows_for_point(
             'message': f'No active workflows for execution point: {execution_point_code}'
         }
     
-    # Validate datasource parameters (optional but recommended)
+    # Validate datasource parameters (optional but recommended).
+    # The requirement table is resolved once per registry/workflow version,
+    # so this is a dict lookup per required datasource.
     if datasource_params is not None:
-        required_info = get_required_datasources_for_point(execution_point_code)
-        if required_info['success'] and required_info['total_datasources'] > 0:
+        from .requirement_cache import requirement_cache
+        required_table = requirement_cache.get(execution_point_code)
+        if required_table and required_table['datasources']:
             missing_datasources = []
             incomplete_datasources = []
             
-            for ds_info in required_info['datasources']:
-                ds_name = ds_info['name']
+            for ds_name, ds_info in required_table['datasources'].items():
                 required_params = ds_info['parameters']
+                provided_params = datasource_params.get(ds_name)
                 
                 # Check if datasource is provided
-                if ds_name not in datasource_params:
+                if provided_params is None:
                     if required_params:  # Only warn if it has required parameters
                         missing_datasources.append({
                             'name': ds_name,
-                            'required_params': required_params
+                            'required_params': list(required_params)
                         })
                 else:
                     # Check if all required parameters are provided
-                    provided_params = datasource_params[ds_name]
                     missing_params = [p for p in required_params if p not in provided_params]
                     
                     if missing_params:
                         incomplete_datasources.append({
                             'name': ds_name,
                             'missing_params': missing_params,
-                            'required_params': required_params
+                            'required_params': list(required_params)
                         })
             
             # If there are missing or incomplete datasources, return helpful error
             if missing_datasources or incomplete_datasources:
+                required_info = get_required_datasources_for_point(execution_point_code)
                 error_details = {
                     'missing_datasources': missing_datasources,
                     'incomplete_datasources': incomplete_datasources,
@@ -582,71 +584,32 @@ def execute_workflows_for_point(
     failed_workflows = []
     all_failure_messages = []  # Collect all failure messages across all workflows
     
-    for workflow in workflows:
-        try:
-            engine = ValidationExecutionEngine(workflow, user=user)
-            execution = engine.execute(
-                context_data=context_data or {},
-                datasource_params=datasource_params or {}
+    if parallel:
+        outcomes = _execute_workflows_parallel(
+            workflows,
+            context_data=context_data,
+            datasource_params=datasource_params,
+            user=user,
+            max_workers=max_workers,
+            workflow_timeout=workflow_timeout,
+            persist=persist,
+            value_cache=value_cache
+        )
+    else:
+        outcomes = [
+            _execute_single_workflow(
+                workflow, context_data or {}, datasource_params or {}, user,
+                persist=persist, value_cache=value_cache
             )
-            
-            # Collect failure messages from execution
-            failure_messages = []
-            if execution.status in ['completed_failure', 'error']:
-                for step_exec in execution.step_executions.all():
-                    if step_exec.error_message:
-                        failure_messages.append(step_exec.error_message)
-                        # Add to aggregated list with workflow context
-                        all_failure_messages.append({
-                            'workflow_name': workflow.name,
-                            'step_name': step_exec.step.name,
-                            'message': step_exec.error_message
-                        })
-                
-                # Also check context_data for failure message
-                if execution.context_data and 'failure_message' in execution.context_data:
-                    if not failure_messages:
-                        failure_messages.append(execution.context_data['failure_message'])
-                        all_failure_messages.append({
-                            'workflow_name': workflow.name,
-                            'step_name': 'Workflow',
-                            'message': execution.context_data['failure_message']
-                        })
-            
-            result = {
-                'workflow_id': workflow.id,
-                'workflow_name': workflow.name,
-                'execution_id': execution.id,
-                'status': execution.status,
-                'passed': execution.status == 'completed_success'
-            }
-            
-            # Add failure messages if any
-            if failure_messages:
-                result['failure_messages'] = failure_messages
-                result['error'] = failure_messages[0]  # First message as main error
-            
-            results.append(result)
-            
-            if execution.status != 'completed_success':
-                failed_workflows.append(workflow.name)
-                
-        except Exception as e:
-            error_msg = str(e)
-            results.append({
-                'workflow_id': workflow.id,
-                'workflow_name': workflow.name,
-                'status': 'error',
-                'error': error_msg,
-                'passed': False
-            })
+            for workflow in workflows
+        ]
+    
+    # Outcomes are always in workflow order, regardless of execution mode
+    for workflow, (result, failure_entries) in zip(workflows, outcomes):
+        results.append(result)
+        all_failure_messages.extend(failure_entries)
+        if not result.get('passed'):
             failed_workflows.append(workflow.name)
-            # Add exception to failure messages
-            all_failure_messages.append({
-                'workflow_name': workflow.name,
-                'step_name': 'System Error',
-                'message': error_msg
-            })
     
     all_passed = len(failed_workflows) == 0
     
@@ -663,3 +626,191 @@ def execute_workflows_for_point(
         'all_failure_messages': all_failure_messages  # All failure messages from all workflows
     }
 
+
+def _execute_single_workflow(workflow, context_data: Dict, datasource_params: Dict, user=None,
+                             persist: bool = True, value_cache: Optional[Dict] = None):
+    """
+    Execute one workflow and build its result entry.
+    
+    Returns:
+        Tuple of (result dict, list of aggregated failure message dicts)
+    """
+    from .execution_engine import ValidationExecutionEngine
+    from .expression_evaluator import ExpressionEvaluator
+    
+    failure_entries = []
+    try:
+        engine = ValidationExecutionEngine(
+            workflow,
+            user=user,
+            persist=persist,
+            evaluator=ExpressionEvaluator(value_cache=value_cache)
+        )
+        execution = engine.execute(
+            context_data=context_data,
+            datasource_params=datasource_params
+        )
+        
+        # Collect failure messages from execution
+        failure_messages = []
+        if execution.status in ['completed_failure', 'error']:
+            # The engine keeps its step executions in memory, persisted or not
+            for step_exec in engine.step_executions:
+                if step_exec.error_message:
+                    failure_messages.append(step_exec.error_message)
+                    # Add to aggregated list with workflow context
+                    failure_entries.append({
+                        'workflow_name': workflow.name,
+                        'step_name': step_exec.step.name,
+                        'message': step_exec.error_message
+                    })
+            
+            # Also check context_data for failure message
+            if execution.context_data and 'failure_message' in execution.context_data:
+                if not failure_messages:
+                    failure_messages.append(execution.context_data['failure_message'])
+                    failure_entries.append({
+                        'workflow_name': workflow.name,
+                        'step_name': 'Workflow',
+                        'message': execution.context_data['failure_message']
+                    })
+        
+        result = {
+            'workflow_id': workflow.id,
+            'workflow_name': workflow.name,
+            'execution_id': execution.id,
+            'status': execution.status,
+            'passed': execution.status == 'completed_success'
+        }
+        
+        # Add failure messages if any
+        if failure_messages:
+            result['failure_messages'] = failure_messages
+            result['error'] = failure_messages[0]  # First message as main error
+        
+        return result, failure_entries
+    
+    except Exception as e:
+        return _workflow_error_outcome(workflow, str(e), 'System Error')
+
+
+def _workflow_error_outcome(workflow, error_msg: str, step_name: str):
+    """Build the result entry for a workflow that could not complete."""
+    result = {
+        'workflow_id': workflow.id,
+        'workflow_name': workflow.name,
+        'status': 'error',
+        'error': error_msg,
+        'passed': False
+    }
+    failure_entries = [{
+        'workflow_name': workflow.name,
+        'step_name': step_name,
+        'message': error_msg
+    }]
+    return result, failure_entries
+
+
+def _workflow_is_thread_safe(workflow) -> bool:
+    """Check that every datasource referenced by the workflow's steps is marked thread-safe."""
+    from .datasource_registry import datasource_registry
+    from .expression_evaluator import ExpressionEvaluator
+    
+    for step in workflow.steps.all():
+        for expression in (step.left_expression, step.right_expression):
+            for ds_name in ExpressionEvaluator.get_referenced_datasources(expression or ''):
+                if not datasource_registry.is_thread_safe(ds_name):
+                    return False
+    return True
+
+
+def _execute_single_workflow_in_thread(workflow, context_data: Dict, datasource_params: Dict, user=None, **options):
+    """
+    Worker-thread entry point.
+    
+    Django opens one DB connection per thread; close it when the workflow finishes
+    so pool threads never leak connections or reuse a stale one.
+    """
+    from django.db import close_old_connections, connections
+    
+    close_old_connections()
+    try:
+        return _execute_single_workflow(workflow, context_data, datasource_params, user, **options)
+    finally:
+        connections.close_all()
+
+
+def _execute_workflows_parallel(
+    workflows,
+    context_data: Optional[Dict],
+    datasource_params: Optional[Dict],
+    user=None,
+    max_workers: Optional[int] = None,
+    workflow_timeout: Optional[float] = None,
+    **options
+) -> List:
+    """
+    Execute workflows concurrently and return their outcomes in workflow order.
+    
+    Thread-safe workflows are submitted to a bounded pool first; the remaining
+    workflows then run on the calling thread while the pool is busy. Extra
+    keyword options (persist, value_cache) are passed to _execute_single_workflow.
+    """
+    from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+    from django.conf import settings
+    from django.db import connection
+    
+    workflows = list(workflows)
+    
+    # Worker connections cannot see rows written in the caller's open transaction
+    if connection.in_atomic_block or len(workflows) < 2:
+        return [
+            _execute_single_workflow(workflow, context_data or {}, datasource_params or {}, user, **options)
+            for workflow in workflows
+        ]
+    
+    if max_workers is None:
+        max_workers = getattr(settings, 'VALIDATION_PARALLEL_MAX_WORKERS', 4)
+    if workflow_timeout is None:
+        workflow_timeout = getattr(settings, 'VALIDATION_WORKFLOW_TIMEOUT', None)
+    
+    outcomes = [None] * len(workflows)
+    futures = {}
+    executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix='validation')
+    try:
+        for index, workflow in enumerate(workflows):
+            if _workflow_is_thread_safe(workflow):
+                # Each workflow gets its own context dict since the engine mutates it
+                futures[index] = executor.submit(
+                    _execute_single_workflow_in_thread,
+                    workflow,
+                    dict(context_data or {}),
+                    datasource_params or {},
+                    user,
+                    **options
+                )
+        
+        for index, workflow in enumerate(workflows):
+            if index not in futures:
+                outcomes[index] = _execute_single_workflow(
+                    workflow, dict(context_data or {}), datasource_params or {}, user, **options
+                )
+        
+        for index, future in futures.items():
+            workflow = workflows[index]
+            try:
+                outcomes[index] = future.result(timeout=workflow_timeout)
+            except FutureTimeoutError:
+                future.cancel()
+                outcomes[index] = _workflow_error_outcome(
+                    workflow,
+                    f"Workflow '{workflow.name}' timed out after {workflow_timeout} seconds",
+                    'Timeout'
+                )
+            except Exception as e:
+                outcomes[index] = _workflow_error_outcome(workflow, str(e), 'System Error')
+    finally:
+        # Don't block on timed-out workflows; their threads finish in the background
+        executor.shutdown(wait=False, cancel_futures=True)
+    
+    return outcomes
@@ -40,9 +40,18 @@ class ExpressionEvaluator:
     # Pattern to validate the entire expression (basic safety check)
     ALLOWED_CHARS_PATTERN = r'^[0-9+\-*/.()%\s]*datasource:[a-zA-Z_][a-zA-Z0-9_]*[+\-*/.()%0-9\s]*$'
     
-    def __init__(self):
-        """Initialize the evaluator with cached datasources."""
-        self._datasource_cache: Dict[str, DataSource] = {}
+    def __init__(self, datasource_cache: Dict[str, DataSource] = None, value_cache: Dict = None):
+        """
+        Initialize the evaluator with cached datasources.
+        
+        Args:
+            datasource_cache: Optional dict of DataSource rows to share between evaluators
+            value_cache: Optional dict memoizing datasource values by (name, params).
+                         Only pass one in when the underlying data cannot change while
+                         it is in use, e.g. a single dry-run validation of a transaction.
+        """
+        self._datasource_cache: Dict[str, DataSource] = {} if datasource_cache is None else datasource_cache
+        self._value_cache = value_cache
         self._datasource_params: Dict[str, Dict[str, Any]] = {}
     
     def evaluate(self, expression: str, datasource_params: Dict[str, Dict[str, Any]] = None) -> Union[int, float]:
@@ -135,8 +144,8 @@ class ExpressionEvaluator:
                 # Get parameters for this datasource
                 params = self._datasource_params.get(datasource_name, {})
                 
-                # Call get_value with parameters
-                value = datasource.get_value(params)
+                # Call get_value with parameters (memoized when a value cache is shared)
+                value = self._get_value(datasource, params)
                 
                 # Return as string that can be used in eval()
                 if isinstance(value, str):
@@ -159,9 +168,34 @@ class ExpressionEvaluator:
         except Exception as e:
             raise ExpressionEvaluationError(f"Error resolving datasources: {str(e)}")
     
+    def _get_value(self, datasource: DataSource, params: Dict[str, Any]):
+        """Return the datasource value, reusing it from the value cache if possible."""
+        if self._value_cache is None:
+            return datasource.get_value(params)
+        
+        key = (datasource.name, self._params_key(params))
+        if key not in self._value_cache:
+            self._value_cache[key] = datasource.get_value(params)
+        return self._value_cache[key]
+    
+    @staticmethod
+    def _params_key(params: Dict[str, Any]) -> tuple:
+        """Hashable key for a params dict; unhashable values (e.g. requests) key by identity."""
+        items = []
+        for name in sorted(params):
+            value = params[name]
+            try:
+                hash(value)
+            except TypeError:
+                value = ('id', id(value))
+            items.append((name, value))
+        return tuple(items)
+    
     def clear_cache(self):
-        """Clear the datasource cache."""
+        """Clear the datasource and value caches."""
         self._datasource_cache.clear()
+        if self._value_cache is not None:
+            self._value_cache.clear()
     
     @staticmethod
     def get_referenced_datasources(expression: str) -> list:
@@ -0,0 +1,121 @@
+"""
+Django management command to benchmark the validation engine.
+
+Creates a throwaway SQLite test database, fills it with synthetic workflows,
+datasources and transaction lines, then measures ExpressionEvaluator,
+ValidationExecutionEngine and execute_workflows_for_point.
+
+Usage:
+    python manage.py benchmark_validation
+    python manage.py benchmark_validation --lines 300 --depth 10 --workflows 5 --latency-ms 2
+    python manage.py benchmark_validation --save-baseline
+    python manage.py benchmark_validation --fail-on-regression --tolerance 0.3
+"""
+
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from django_dynamic_validation.benchmarks import harness
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the validation engine on synthetic data and compare against a stored baseline'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=50, help='Transfer lines in the synthetic transaction')
+        parser.add_argument('--depth', type=int, default=5, help='Steps per generated workflow')
+        parser.add_argument('--workflows', type=int, default=3, help='Workflows registered for the benchmark point')
+        parser.add_argument('--datasources', type=int, default=2, help='Latency datasources referenced by each step')
+        parser.add_argument('--latency-ms', type=float, default=0.0, help='Sleep per latency datasource call')
+        parser.add_argument('--iterations', type=int, default=30, help='Measured runs per scenario')
+        parser.add_argument('--warmup', type=int, default=2, help='Unmeasured runs per scenario')
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            dest='scenarios',
+            help='Only run this scenario (repeatable): expression_evaluator, execution_engine, execute_workflows_for_point',
+        )
+        parser.add_argument('--baseline', default=str(harness.DEFAULT_BASELINE_PATH), help='Baseline JSON path')
+        parser.add_argument('--save-baseline', action='store_true', help='Write this run as the new baseline')
+        parser.add_argument('--tolerance', type=float, default=0.5, help='Allowed relative slowdown (0.5 = +50%%)')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit with an error on regressions')
+        parser.add_argument('--json', action='store_true', help='Print the raw report as JSON')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('benchmark_validation runs against a throwaway SQLite database; '
+                               'configure DATABASES["default"] with the sqlite3 engine.')
+
+        self.stdout.write(self.style.SUCCESS('=== Validation Engine Benchmark ===\n'))
+        self.stdout.write('Creating benchmark database...')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            report = harness.run_benchmarks(
+                lines=options['lines'],
+                depth=options['depth'],
+                workflows=options['workflows'],
+                datasources=options['datasources'],
+                latency_ms=options['latency_ms'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                scenarios=options['scenarios'],
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self._print_report(report)
+
+        if options['save_baseline']:
+            harness.save_baseline(report, options['baseline'])
+            self.stdout.write(self.style.SUCCESS(f"\n✓ Baseline saved to {options['baseline']}"))
+            return
+
+        baseline = harness.load_baseline(options['baseline'])
+        if baseline is None:
+            self.stdout.write(self.style.WARNING('\nNo baseline found; run with --save-baseline to create one.'))
+            return
+
+        regressions = harness.compare_to_baseline(report, baseline, tolerance=options['tolerance'])
+        if not regressions:
+            self.stdout.write(self.style.SUCCESS('\n✓ No regressions against baseline'))
+            return
+
+        self.stdout.write(self.style.ERROR(f'\n✗ {len(regressions)} regression(s) against baseline:'))
+        for regression in regressions:
+            if regression['metric'] == 'config':
+                self.stdout.write(self.style.ERROR(
+                    f"  - Config differs from baseline: {regression['baseline']} vs {regression['current']}"
+                ))
+                continue
+            change = f" (+{regression['change_pct']}%)" if regression['change_pct'] is not None else ''
+            self.stdout.write(self.style.ERROR(
+                f"  - {regression['scenario']}.{regression['metric']}: "
+                f"{regression['baseline']} -> {regression['current']}{change}"
+            ))
+
+        if options['fail_on_regression']:
+            raise CommandError('Benchmark regressions detected')
+
+    def _print_report(self, report):
+        config = report['config']
+        self.stdout.write(
+            f"\nlines={config['lines']} depth={config['depth']} workflows={config['workflows']} "
+            f"datasources={config['datasources']} latency_ms={config['latency_ms']}\n"
+        )
+        header = f"{'scenario':<30}{'p50':>9}{'p90':>9}{'p95':>9}{'p99':>9}{'max':>9}{'queries':>9}{'blocks':>9}{'peakKiB':>9}"
+        self.stdout.write(header)
+        self.stdout.write('-' * len(header))
+        for name, metrics in report['results'].items():
+            self.stdout.write(
+                f"{name:<30}"
+                f"{metrics['p50_ms']:>9.2f}{metrics['p90_ms']:>9.2f}{metrics['p95_ms']:>9.2f}"
+                f"{metrics['p99_ms']:>9.2f}{metrics['max_ms']:>9.2f}"
+                f"{metrics['queries']:>9.1f}{metrics['alloc_blocks']:>9}{metrics['peak_kib']:>9.1f}"
+            )
@@ -17,6 +17,7 @@ from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django_dynamic_validation.datasource_registry import datasource_registry
 from django_dynamic_validation.models import DataSource
+from django_dynamic_validation.requirement_cache import requirement_cache
 import importlib
 import os
 from pathlib import Path
@@ -126,6 +127,10 @@ class Command(BaseCommand):
                     self.style.ERROR(f'  ✗ Deleted: {name}')
                 )
         
+        # Rebuild the execution point requirement tables against the synced registry
+        requirement_cache.invalidate()
+        requirement_cache.warm()
+        
         # Print summary
         self.stdout.write(
             self.style.SUCCESS(
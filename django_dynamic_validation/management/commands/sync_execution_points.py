@@ -5,6 +5,7 @@ Management command to sync and display registered execution points.
 from django.core.management.base import BaseCommand
 from django_dynamic_validation.execution_point_registry import execution_point_registry
 from django_dynamic_validation.models import ValidationWorkflow
+from django_dynamic_validation.requirement_cache import requirement_cache
 
 
 class Command(BaseCommand):
@@ -77,4 +78,8 @@ class Command(BaseCommand):
                 )
             )
         
+        # Rebuild the execution point requirement tables against the synced registry
+        requirement_cache.invalidate()
+        requirement_cache.warm()
+        
         self.stdout.write(self.style.SUCCESS('\nExecution points synced successfully!\n'))
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('django_dynamic_validation', '0011_alter_validationstep_operation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequirementCacheVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(blank=True, default='', max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
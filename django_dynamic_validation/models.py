@@ -432,3 +432,22 @@ class ValidationStepExecution(models.Model):
     
     def __str__(self):
         return f"Step {self.step.id} execution in {self.execution.id}"
+
+
+# ============================================================================
+# CACHE VERSION
+# ============================================================================
+
+class RequirementCacheVersion(models.Model):
+    """
+    Version token of the execution point requirement tables (see requirement_cache).
+    
+    A single row, given a new token in the transaction that changes a workflow,
+    step or segment type, so every process sees the change once it commits.
+    """
+    
+    token = models.CharField(max_length=32, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Requirement cache version {self.token}"
@@ -0,0 +1,195 @@
+"""
+Dry-run validation preview for budget transfer transactions.
+
+Runs every active on_transfer_submit workflow for the transaction and every
+on_transfer_line_submit workflow for each of its lines without writing
+ValidationExecution/ValidationStepExecution rows. All workflows of one preview
+share a datasource value cache, so a datasource called with the same
+parameters (e.g. transaction totals) is evaluated once per preview instead of
+once per workflow per line.
+
+Results are cached in the Django cache under a fingerprint of the transaction,
+its lines and line segments, the registry/workflow versions and the user, so
+viewing an unchanged transaction again returns without running any workflow.
+Datasources that read data outside those rows (balances, envelopes, ...) can
+still change underneath a cached preview; VALIDATION_PREVIEW_CACHE_TIMEOUT
+(seconds, default 300) bounds how stale such a result can be.
+
+Usage:
+    from django_dynamic_validation.preview import preview_transaction_validation
+
+    preview = preview_transaction_validation(transaction_id, user=request.user, request=request)
+    preview['validation_errors']        # same entries TransactionTransferListView returns
+"""
+
+import hashlib
+import json
+from typing import Dict
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import execution_points
+from .datasource_params import StandardParams
+from .requirement_cache import requirement_cache
+from .views_helpers import _auto_populate_datasource_params
+
+
+PREVIEW_CACHE_PREFIX = 'validation_preview'
+DEFAULT_PREVIEW_CACHE_TIMEOUT = 300
+
+
+def get_transaction_fingerprint(transaction_id, user=None) -> Dict:
+    """
+    Load what a preview depends on and hash it.
+
+    Returns:
+        {
+            'fingerprint': str,          # sha256 hex digest
+            'transfer_ids': [int, ...]   # line ids in evaluation order
+        }
+    """
+    from account_and_entitys.models import XX_TransactionSegment
+    from budget_management.models import xx_BudgetTransfer
+    from transaction.models import xx_TransactionTransfer
+
+    header = list(xx_BudgetTransfer.objects.filter(transaction_id=transaction_id).values())
+    lines = list(
+        xx_TransactionTransfer.objects.filter(transaction_id=transaction_id)
+        .order_by('transfer_id')
+        .values()
+    )
+    segments = list(
+        XX_TransactionSegment.objects.filter(transaction_transfer__transaction_id=transaction_id)
+        .order_by('id')
+        .values(
+            'id',
+            'transaction_transfer_id',
+            'segment_type_id',
+            'segment_value_id',
+            'from_segment_value_id',
+            'to_segment_value_id',
+        )
+    )
+
+    payload = {
+        'transaction_id': transaction_id,
+        'user_id': getattr(user, 'pk', None),
+        'versions': requirement_cache.current_version(),
+        'header': header,
+        'lines': lines,
+        'segments': segments,
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return {
+        'fingerprint': hashlib.sha256(encoded).hexdigest(),
+        'transfer_ids': [line['transfer_id'] for line in lines],
+    }
+
+
+def preview_transaction_validation(transaction_id, user=None, request=None, use_cache: bool = True) -> Dict:
+    """
+    Evaluate all submit validations for a transaction without persisting anything.
+
+    Args:
+        transaction_id: xx_BudgetTransfer.transaction_id
+        user: User the preview is for (part of the cache key, since user
+              datasources can return different values per user)
+        request: Request passed to user datasources (REQUEST parameter)
+        use_cache: Return a cached preview when the fingerprint matches
+
+    Returns:
+        {
+            'transaction_id': int,
+            'fingerprint': str,
+            'cached': bool,                   # True if served from the cache
+            'all_passed': bool,
+            'validation_errors': [            # scope is 'transaction' or 'transfer_line'
+                {'scope', 'transaction_id', ['transfer_id'], 'workflow', 'step', 'message', 'execution_id'}
+            ],
+            'validation_errors_count': int
+        }
+    """
+    snapshot = get_transaction_fingerprint(transaction_id, user=user)
+    cache_key = f"{PREVIEW_CACHE_PREFIX}:{transaction_id}:{snapshot['fingerprint']}"
+
+    if use_cache:
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return dict(cached, cached=True)
+
+    value_cache = {}
+    errors = []
+    all_passed = True
+
+    result = _run_point(
+        execution_points.on_transfer_submit,
+        {StandardParams.TRANSACTION_ID: transaction_id},
+        user, request, value_cache
+    )
+    all_passed = all_passed and result.get('all_passed', False)
+    errors.extend(_failures_to_errors(result, scope='transaction', transaction_id=transaction_id))
+
+    for transfer_id in snapshot['transfer_ids']:
+        result = _run_point(
+            execution_points.on_transfer_line_submit,
+            {
+                StandardParams.TRANSACTION_ID: transaction_id,
+                StandardParams.TRANSFER_ID: transfer_id,
+            },
+            user, request, value_cache
+        )
+        all_passed = all_passed and result.get('all_passed', False)
+        errors.extend(_failures_to_errors(
+            result, scope='transfer_line', transaction_id=transaction_id, transfer_id=transfer_id
+        ))
+
+    preview = {
+        'transaction_id': transaction_id,
+        'fingerprint': snapshot['fingerprint'],
+        'cached': False,
+        'all_passed': all_passed,
+        'validation_errors': errors,
+        'validation_errors_count': len(errors),
+    }
+    timeout = getattr(settings, 'VALIDATION_PREVIEW_CACHE_TIMEOUT', DEFAULT_PREVIEW_CACHE_TIMEOUT)
+    cache.set(cache_key, preview, timeout)
+    return preview
+
+
+def _run_point(execution_point, context_data, user, request, value_cache) -> Dict:
+    from .execution_point_registry import execute_workflows_for_point
+
+    datasource_params = _auto_populate_datasource_params(
+        execution_point=execution_point,
+        context_data=context_data,
+        request=request
+    )
+    return execute_workflows_for_point(
+        execution_point_code=execution_point,
+        context_data=context_data,
+        datasource_params=datasource_params,
+        user=user,
+        persist=False,
+        value_cache=value_cache
+    )
+
+
+def _failures_to_errors(result, scope, transaction_id, transfer_id=None):
+    """Convert execute_workflows_for_point failures to the list view's error entries."""
+    if result.get('all_passed', False):
+        return []
+
+    errors = []
+    for failure in result.get('all_failure_messages', []):
+        entry = {'scope': scope, 'transaction_id': transaction_id}
+        if transfer_id is not None:
+            entry['transfer_id'] = transfer_id
+        entry.update({
+            'workflow': failure.get('workflow_name', 'Unknown'),
+            'step': failure.get('step_name', 'Unknown'),
+            'message': failure.get('message', 'Validation failed'),
+            'execution_id': failure.get('execution_id'),
+        })
+        errors.append(entry)
+    return errors
@@ -0,0 +1,189 @@
+"""
+Execution Point Requirement Cache
+
+Resolves, once, everything execute_workflows_for_point needs to know about an
+execution point before running its workflows:
+
+- the allowed datasource list (with the dynamic segment marker expanded)
+- the datasources referenced by the point's active workflows, with their
+  required parameters, return type and description
+- example parameters for error messages
+
+Each resolved table is frozen (MappingProxyType / tuples) and tagged with the
+version it was built from. The version combines:
+
+- datasource_registry.version       (bumped on register/unregister)
+- execution_point_registry.version  (bumped on register/add/remove)
+- the workflow version: a token in the database (RequirementCacheVersion),
+  replaced by signals in the transaction that changes a workflow, step or
+  segment type, and by the sync commands
+
+so checking parameters on the hot path is a dict lookup instead of a registry
+walk plus segment discovery queries.
+
+The registries are per process; the workflow version is shared through the
+database. Each process re-reads it at most every VERSION_CHECK_SECONDS (see
+budget_transfer.global_function.version_tokens), so a change saved in one
+process reaches the others within that interval.
+
+Usage:
+    from django_dynamic_validation.requirement_cache import requirement_cache
+
+    table = requirement_cache.get('on_transfer_submit')
+    for name, info in table['datasources'].items():
+        print(name, info['parameters'])
+"""
+
+import threading
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional, Tuple
+
+from budget_transfer.global_function.version_tokens import VersionTokens
+
+
+class RequirementCache:
+    """
+    Per-process cache of frozen requirement tables keyed by execution point code.
+    """
+
+    def __init__(self):
+        self._tables: Dict[str, Tuple[tuple, Mapping]] = {}
+        self._lock = threading.Lock()
+        self._versions = VersionTokens('django_dynamic_validation.RequirementCacheVersion')
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def get_workflow_version(self, refresh: bool = False) -> str:
+        """
+        The shared workflow version token, re-read from the database at most
+        every VERSION_CHECK_SECONDS unless refresh is set.
+        """
+        return self._versions.get(refresh=refresh)
+
+    def current_version(self, refresh: bool = False) -> tuple:
+        from .datasource_registry import datasource_registry
+        from .execution_point_registry import execution_point_registry
+
+        return (
+            datasource_registry.version,
+            execution_point_registry.version,
+            self.get_workflow_version(refresh=refresh),
+        )
+
+    def invalidate(self):
+        """
+        Invalidate requirement tables in every process.
+
+        Called from signal handlers when workflows, steps or segment types
+        change. The new token is written in the caller's transaction: other
+        processes pick it up once it commits (within VERSION_CHECK_SECONDS),
+        and a rolled back change leaves the old token in place.
+        """
+        self._versions.bump()
+        with self._lock:
+            self._tables.clear()
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get(self, execution_point_code: str) -> Optional[Mapping]:
+        """
+        Get the frozen requirement table for an execution point.
+
+        Returns:
+            Read-only mapping with keys 'execution_point', 'has_active_workflows',
+            'allowed_datasources', 'datasources' (name -> info mapping) and
+            'example_params', or None if the execution point is not registered.
+        """
+        from .execution_point_registry import execution_point_registry
+
+        if not execution_point_registry.exists(execution_point_code):
+            return None
+
+        entry = self._tables.get(execution_point_code)
+        if entry is not None and entry[0] == self.current_version():
+            return entry[1]
+
+        workflow_version = self.get_workflow_version(refresh=True)
+        table = self._build(execution_point_code)
+        # Read the version after building: resolving metadata may lazily
+        # register segment datasources, which bumps the registry version
+        version = self.current_version(refresh=True)
+        if version[2] == workflow_version:
+            # Only store if no workflow changed while we were building
+            with self._lock:
+                self._tables[execution_point_code] = (version, table)
+        return table
+
+    def get_allowed_datasources(self, execution_point_code: str) -> Tuple[str, ...]:
+        """Allowed datasource names for a point, with dynamic segments already expanded."""
+        table = self.get(execution_point_code)
+        return table['allowed_datasources'] if table else ()
+
+    def warm(self):
+        """Build tables for every registered execution point (used by the sync commands)."""
+        from .execution_point_registry import execution_point_registry
+
+        for point in execution_point_registry.list_all():
+            self.get(point['code'])
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _build(self, execution_point_code: str) -> Mapping:
+        from .datasource_registry import datasource_registry
+        from .execution_point_registry import execution_point_registry
+        from .expression_evaluator import ExpressionEvaluator
+        from .models import ValidationStep, ValidationWorkflow
+
+        allowed = tuple(execution_point_registry.get_allowed_datasources(execution_point_code))
+
+        # Collect all unique datasources used across the point's active workflows
+        datasource_names = set()
+        expressions = ValidationStep.objects.filter(
+            workflows__execution_point=execution_point_code,
+            workflows__status='active'
+        ).values_list('left_expression', 'right_expression')
+        for left_expression, right_expression in expressions:
+            datasource_names.update(ExpressionEvaluator.get_referenced_datasources(left_expression or ''))
+            datasource_names.update(ExpressionEvaluator.get_referenced_datasources(right_expression or ''))
+
+        datasources = {}
+        example_params = {}
+        for ds_name in sorted(datasource_names):
+            metadata = datasource_registry.get_metadata(ds_name)
+            if not metadata:
+                continue
+            params = tuple(metadata.get('parameters', []))
+            datasources[ds_name] = MappingProxyType({
+                'name': ds_name,
+                'parameters': params,
+                'return_type': metadata.get('return_type', 'unknown'),
+                'description': metadata.get('description', ''),
+                'thread_safe': metadata.get('thread_safe', False),
+            })
+            if params:
+                example_params[ds_name] = MappingProxyType({
+                    param: f'<{param}_value>' for param in params
+                })
+
+        has_active_workflows = ValidationWorkflow.objects.filter(
+            execution_point=execution_point_code,
+            status='active'
+        ).exists()
+
+        return MappingProxyType({
+            'execution_point': execution_point_code,
+            'has_active_workflows': has_active_workflows,
+            'allowed_datasources': allowed,
+            'datasources': MappingProxyType(datasources),
+            'example_params': MappingProxyType(example_params),
+        })
+
+
+# Global cache instance
+requirement_cache = RequirementCache()
@@ -0,0 +1,41 @@
+"""
+Signal handlers for the dynamic validation app.
+
+Invalidates the execution point requirement cache whenever the inputs it was
+resolved from change: workflows, their steps, or active segment types (which
+drive the dynamic Transaction_Line_SEGMENT_* datasources).
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import ValidationStep, ValidationWorkflow
+from .requirement_cache import requirement_cache
+
+
+@receiver(post_save, sender=ValidationWorkflow)
+@receiver(post_delete, sender=ValidationWorkflow)
+@receiver(post_save, sender=ValidationStep)
+@receiver(post_delete, sender=ValidationStep)
+def invalidate_requirements_on_workflow_change(sender, **kwargs):
+    requirement_cache.invalidate()
+
+
+@receiver(m2m_changed, sender=ValidationWorkflow.steps.through)
+def invalidate_requirements_on_steps_change(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        requirement_cache.invalidate()
+
+
+def invalidate_requirements_on_segment_type_change(sender, **kwargs):
+    requirement_cache.invalidate()
+
+
+try:
+    from account_and_entitys.models import XX_SegmentType
+
+    post_save.connect(invalidate_requirements_on_segment_type_change, sender=XX_SegmentType)
+    post_delete.connect(invalidate_requirements_on_segment_type_change, sender=XX_SegmentType)
+except ImportError:
+    # Segment app not installed - no dynamic segment datasources to track
+    pass
@@ -0,0 +1,68 @@
+"""
+Tests for the validation benchmark harness (not the benchmarks themselves).
+"""
+
+import copy
+
+from django.test import SimpleTestCase, TestCase
+
+from django_dynamic_validation.benchmarks import harness
+from django_dynamic_validation.datasource_registry import datasource_registry
+from django_dynamic_validation.execution_point_registry import execution_point_registry
+
+
+def _report(**metrics):
+    base = {'p50_ms': 10.0, 'p95_ms': 20.0, 'queries': 30.0, 'alloc_blocks': 100}
+    base.update(metrics)
+    return {'config': {'lines': 1}, 'results': {'execution_engine': base}}
+
+
+class BenchmarkComparisonTests(SimpleTestCase):
+    """Baseline comparison and percentile helpers."""
+
+    def test_percentile_nearest_rank(self):
+        samples = [float(value) for value in range(1, 101)]
+        self.assertEqual(harness.percentile(samples, 50), 50.0)
+        self.assertEqual(harness.percentile(samples, 95), 95.0)
+        self.assertEqual(harness.percentile(samples, 100), 100.0)
+        self.assertEqual(harness.percentile([], 50), 0.0)
+
+    def test_within_tolerance_is_not_a_regression(self):
+        self.assertEqual(harness.compare_to_baseline(_report(p95_ms=24.0), _report(), tolerance=0.25), [])
+
+    def test_latency_regression_detected(self):
+        regressions = harness.compare_to_baseline(_report(p95_ms=30.0), _report(), tolerance=0.25)
+        self.assertEqual([(r['metric'], r['change_pct']) for r in regressions], [('p95_ms', 50.0)])
+
+    def test_any_extra_query_is_a_regression(self):
+        regressions = harness.compare_to_baseline(_report(queries=31.0), _report(), tolerance=0.25)
+        self.assertEqual([r['metric'] for r in regressions], ['queries'])
+
+    def test_config_mismatch_reported(self):
+        current = _report()
+        current['config'] = {'lines': 300}
+        regressions = harness.compare_to_baseline(current, _report())
+        self.assertEqual(regressions[0]['metric'], 'config')
+
+
+class BenchmarkRunTests(TestCase):
+    """Smoke test: the synthetic dataset builds and every scenario runs."""
+
+    def setUp(self):
+        self._datasource_registry_backup = copy.deepcopy(datasource_registry._registry)
+        self._execution_point_backup = copy.deepcopy(execution_point_registry.execution_points)
+
+    def tearDown(self):
+        datasource_registry._registry = copy.deepcopy(self._datasource_registry_backup)
+        execution_point_registry.execution_points = copy.deepcopy(self._execution_point_backup)
+
+    def test_run_benchmarks_reports_every_scenario(self):
+        report = harness.run_benchmarks(lines=3, depth=2, workflows=2, datasources=1, iterations=2, warmup=0)
+
+        self.assertEqual(
+            set(report['results']),
+            {'expression_evaluator', 'execution_engine', 'execute_workflows_for_point'}
+        )
+        point = report['results']['execute_workflows_for_point']
+        self.assertGreater(point['queries'], 0)
+        self.assertGreaterEqual(point['p95_ms'], point['p50_ms'])
@@ -0,0 +1,163 @@
+"""
+Tests for parallel workflow execution in execute_workflows_for_point.
+"""
+
+import copy
+import threading
+import time
+from unittest import mock
+
+from django.test import TestCase, TransactionTestCase
+
+from django_dynamic_validation import execution_point_registry as registry_module
+from django_dynamic_validation.datasource_registry import datasource_registry
+from django_dynamic_validation.execution_point_registry import (
+    execute_workflows_for_point,
+    execution_point_registry,
+)
+from django_dynamic_validation.models import DataSource, ValidationStep, ValidationWorkflow
+
+
+def _fake_outcome(workflow, passed=True, delay=0.0):
+    time.sleep(delay)
+    result = {
+        'workflow_id': workflow.id,
+        'workflow_name': workflow.name,
+        'execution_id': None,
+        'status': 'completed_success' if passed else 'completed_failure',
+        'passed': passed,
+        'thread': threading.current_thread().name,
+    }
+    failures = [] if passed else [{
+        'workflow_name': workflow.name,
+        'step_name': 'Step',
+        'message': f'{workflow.name} failed',
+    }]
+    return result, failures
+
+
+class ParallelExecutionTestMixin:
+    """Registers isolated datasources and an execution point for each test."""
+
+    def setUp(self):
+        self._datasource_registry_backup = copy.deepcopy(datasource_registry._registry)
+        self._execution_point_backup = copy.deepcopy(execution_point_registry.execution_points)
+
+        datasource_registry.register(
+            name='ParallelSafe', parameters=[], return_type='int', thread_safe=True
+        )(lambda: 1)
+        datasource_registry.register(
+            name='ParallelUnsafe', parameters=[], return_type='int'
+        )(lambda: 1)
+        execution_point_registry.register(
+            code='parallel_point',
+            name='Parallel Point',
+            category='tests',
+            allowed_datasources=['ParallelSafe', 'ParallelUnsafe'],
+        )
+        for name in ('ParallelSafe', 'ParallelUnsafe'):
+            DataSource.objects.create(name=name, function_name=name, parameter_names=[], return_type='int')
+
+    def tearDown(self):
+        datasource_registry._registry = copy.deepcopy(self._datasource_registry_backup)
+        execution_point_registry.execution_points = copy.deepcopy(self._execution_point_backup)
+
+    def _create_workflow(self, name, datasource='ParallelSafe'):
+        step = ValidationStep.objects.create(
+            name=f'{name} Step',
+            order=1,
+            left_expression=f'datasource:{datasource}',
+            operation='>=',
+            right_expression='1',
+            if_true_action='complete_success',
+            if_false_action='complete_failure',
+        )
+        workflow = ValidationWorkflow.objects.create(
+            name=name,
+            execution_point='parallel_point',
+            status='active',
+            initial_step=step,
+        )
+        workflow.steps.add(step)
+        return workflow
+
+
+class ParallelWorkflowExecutionTests(ParallelExecutionTestMixin, TransactionTestCase):
+    """Pool behaviour: ordering, overlap, timeouts and the thread-safety gate."""
+
+    def test_thread_safe_flag_is_recorded(self):
+        self.assertTrue(datasource_registry.is_thread_safe('ParallelSafe'))
+        self.assertFalse(datasource_registry.is_thread_safe('ParallelUnsafe'))
+        self.assertFalse(datasource_registry.is_thread_safe('MissingDatasource'))
+
+    def test_results_keep_workflow_order(self):
+        workflows = [self._create_workflow(f'WF {i}') for i in range(4)]
+        delays = {wf.id: 0.05 * (4 - i) for i, wf in enumerate(workflows)}
+
+        def fake_execute(workflow, context_data, datasource_params, user=None, **options):
+            return _fake_outcome(workflow, passed=workflow.name != 'WF 1', delay=delays[workflow.id])
+
+        with mock.patch.object(registry_module, '_execute_single_workflow', side_effect=fake_execute):
+            result = execute_workflows_for_point('parallel_point', parallel=True, max_workers=4)
+
+        self.assertEqual([r['workflow_name'] for r in result['executions']], ['WF 0', 'WF 1', 'WF 2', 'WF 3'])
+        self.assertEqual(result['failed_workflows'], ['WF 1'])
+        self.assertEqual(result['passed_count'], 3)
+        self.assertEqual(result['all_failure_messages'][0]['message'], 'WF 1 failed')
+
+    def test_parallel_runs_in_time_of_slowest_workflow(self):
+        for i in range(4):
+            self._create_workflow(f'Slow {i}')
+
+        def fake_execute(workflow, context_data, datasource_params, user=None, **options):
+            return _fake_outcome(workflow, delay=0.3)
+
+        with mock.patch.object(registry_module, '_execute_single_workflow', side_effect=fake_execute):
+            started = time.monotonic()
+            result = execute_workflows_for_point('parallel_point', parallel=True, max_workers=4)
+            elapsed = time.monotonic() - started
+
+        self.assertTrue(result['all_passed'])
+        self.assertLess(elapsed, 0.9)
+
+    def test_unsafe_workflows_run_on_calling_thread(self):
+        self._create_workflow('Safe')
+        self._create_workflow('Unsafe', datasource='ParallelUnsafe')
+
+        with mock.patch.object(registry_module, '_execute_single_workflow',
+                               side_effect=lambda wf, *args, **kwargs: _fake_outcome(wf)):
+            result = execute_workflows_for_point('parallel_point', parallel=True)
+
+        threads = {r['workflow_name']: r['thread'] for r in result['executions']}
+        self.assertTrue(threads['Safe'].startswith('validation'))
+        self.assertEqual(threads['Unsafe'], threading.current_thread().name)
+
+    def test_workflow_timeout_reports_error(self):
+        self._create_workflow('Fast')
+        self._create_workflow('Stuck')
+
+        def fake_execute(workflow, context_data, datasource_params, user=None, **options):
+            return _fake_outcome(workflow, delay=1.0 if workflow.name == 'Stuck' else 0)
+
+        with mock.patch.object(registry_module, '_execute_single_workflow', side_effect=fake_execute):
+            result = execute_workflows_for_point('parallel_point', parallel=True, workflow_timeout=0.2)
+
+        self.assertFalse(result['all_passed'])
+        self.assertEqual(result['failed_workflows'], ['Stuck'])
+        stuck = result['executions'][1]
+        self.assertEqual(stuck['status'], 'error')
+        self.assertIn('timed out', stuck['error'])
+
+
+class ParallelWorkflowFallbackTests(ParallelExecutionTestMixin, TestCase):
+    """Inside an open transaction, parallel mode must fall back to sequential execution."""
+
+    def test_atomic_block_runs_sequentially(self):
+        self._create_workflow('First')
+        self._create_workflow('Second')
+
+        result = execute_workflows_for_point('parallel_point', parallel=True)
+
+        self.assertTrue(result['all_passed'])
+        self.assertEqual(result['total_workflows'], 2)
+        self.assertTrue(all(r['execution_id'] for r in result['executions']))
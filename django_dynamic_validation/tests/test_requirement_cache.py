@@ -0,0 +1,132 @@
+"""
+Tests for the execution point requirement cache.
+"""
+
+import copy
+import time
+from unittest import mock
+
+from django.test import TestCase
+
+from budget_transfer.global_function import version_tokens
+from django_dynamic_validation.datasource_registry import datasource_registry
+from django_dynamic_validation.execution_point_registry import (
+    execute_workflows_for_point,
+    execution_point_registry,
+    get_required_datasources_for_point,
+)
+from django_dynamic_validation.models import RequirementCacheVersion, ValidationStep, ValidationWorkflow
+from django_dynamic_validation.requirement_cache import requirement_cache
+
+
+class RequirementCacheTests(TestCase):
+    """Requirement tables are frozen, reused and rebuilt when their inputs change."""
+
+    def setUp(self):
+        self._datasource_registry_backup = copy.deepcopy(datasource_registry._registry)
+        self._execution_point_backup = copy.deepcopy(execution_point_registry.execution_points)
+
+        datasource_registry.register(
+            name='CacheParam', parameters=['tenantId'], return_type='int'
+        )(lambda tenantId: tenantId)
+        execution_point_registry.register(
+            code='cache_point',
+            name='Cache Point',
+            category='tests',
+            allowed_datasources=['CacheParam'],
+        )
+
+    def tearDown(self):
+        datasource_registry._registry = copy.deepcopy(self._datasource_registry_backup)
+        execution_point_registry.execution_points = copy.deepcopy(self._execution_point_backup)
+
+    def _create_workflow(self, left_expression='datasource:CacheParam'):
+        step = ValidationStep.objects.create(
+            name='Cache Step',
+            order=1,
+            left_expression=left_expression,
+            operation='>=',
+            right_expression='1',
+            if_true_action='complete_success',
+            if_false_action='complete_failure',
+        )
+        workflow = ValidationWorkflow.objects.create(
+            name='Cache Workflow',
+            execution_point='cache_point',
+            status='active',
+            initial_step=step,
+        )
+        workflow.steps.add(step)
+        return workflow, step
+
+    def test_unknown_point_returns_none(self):
+        self.assertIsNone(requirement_cache.get('missing_point'))
+
+    def test_table_is_frozen(self):
+        self._create_workflow()
+        table = requirement_cache.get('cache_point')
+
+        self.assertEqual(table['datasources']['CacheParam']['parameters'], ('tenantId',))
+        self.assertEqual(table['allowed_datasources'], ('CacheParam',))
+        with self.assertRaises(TypeError):
+            table['datasources']['Other'] = {}
+
+    def test_table_is_reused_without_queries(self):
+        self._create_workflow()
+        first = requirement_cache.get('cache_point')
+
+        with self.assertNumQueries(0):
+            second = requirement_cache.get('cache_point')
+        self.assertIs(first, second)
+
+    def test_step_change_invalidates_table(self):
+        _, step = self._create_workflow(left_expression='5')
+        self.assertEqual(dict(requirement_cache.get('cache_point')['datasources']), {})
+
+        step.left_expression = 'datasource:CacheParam'
+        step.save()
+
+        self.assertIn('CacheParam', requirement_cache.get('cache_point')['datasources'])
+
+    def test_change_saved_by_another_process_invalidates_table(self):
+        self._create_workflow()
+        first = requirement_cache.get('cache_point')
+
+        # Another process saved a change: only the shared token moved
+        RequirementCacheVersion.objects.update_or_create(pk=1, defaults={'token': 'other-process'})
+        with self.assertNumQueries(0):
+            self.assertIs(requirement_cache.get('cache_point'), first)
+
+        later = time.monotonic() + version_tokens.VERSION_CHECK_SECONDS
+        with mock.patch.object(version_tokens.time, 'monotonic', return_value=later):
+            second = requirement_cache.get('cache_point')
+        self.assertIsNot(second, first)
+        self.assertEqual(requirement_cache.current_version()[2], 'other-process')
+
+    def test_registry_change_invalidates_table(self):
+        self._create_workflow(left_expression='datasource:LateSource')
+        self.assertEqual(dict(requirement_cache.get('cache_point')['datasources']), {})
+
+        datasource_registry.register(
+            name='LateSource', parameters=['lateId'], return_type='int'
+        )(lambda lateId: lateId)
+
+        self.assertIn('LateSource', requirement_cache.get('cache_point')['datasources'])
+
+    def test_required_datasources_shape_is_unchanged(self):
+        self._create_workflow()
+        info = get_required_datasources_for_point('cache_point')
+
+        self.assertTrue(info['success'])
+        self.assertEqual(info['total_datasources'], 1)
+        self.assertEqual(info['datasources'][0]['parameters'], ['tenantId'])
+        self.assertEqual(info['example_params'], {'CacheParam': {'tenantId': '<tenantId_value>'}})
+
+    def test_missing_params_detected_from_cached_table(self):
+        self._create_workflow()
+        requirement_cache.get('cache_point')
+
+        result = execute_workflows_for_point('cache_point', datasource_params={'CacheParam': {}})
+
+        self.assertFalse(result['success'])
+        self.assertEqual(result['error_details']['incomplete_datasources'][0]['missing_params'], ['tenantId'])
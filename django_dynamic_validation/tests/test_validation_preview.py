@@ -0,0 +1,149 @@
+"""
+Tests for the dry-run transaction validation preview.
+"""
+
+import copy
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from budget_management.models import xx_BudgetTransfer
+from transaction.models import xx_TransactionTransfer
+
+from django_dynamic_validation import execution_points
+from django_dynamic_validation.datasource_registry import datasource_registry
+from django_dynamic_validation.execution_engine import ValidationExecutionEngine
+from django_dynamic_validation.execution_point_registry import execution_point_registry
+from django_dynamic_validation.models import (
+    DataSource,
+    ValidationExecution,
+    ValidationStep,
+    ValidationStepExecution,
+    ValidationWorkflow,
+)
+from django_dynamic_validation.preview import preview_transaction_validation
+
+
+class ValidationPreviewTests(TestCase):
+    """Preview runs every submit workflow in memory, shares datasource values and caches results."""
+
+    def setUp(self):
+        self._datasource_registry_backup = copy.deepcopy(datasource_registry._registry)
+        self._execution_point_backup = copy.deepcopy(execution_point_registry.execution_points)
+        cache.clear()
+
+        self.calls = []
+
+        def preview_lines(transaction_id):
+            self.calls.append(transaction_id)
+            return xx_TransactionTransfer.objects.filter(transaction_id=transaction_id).count()
+
+        datasource_registry.register(
+            name='PreviewLines', parameters=['transaction_id'], return_type='int'
+        )(preview_lines)
+        DataSource.objects.create(
+            name='PreviewLines', function_name='preview_lines',
+            parameter_names=['transaction_id'], return_type='int'
+        )
+        for point in (execution_points.on_transfer_submit, execution_points.on_transfer_line_submit):
+            execution_point_registry.add_datasource_to_point(point, 'PreviewLines')
+
+        # bulk_create skips the post_save handlers (workflow creation, dashboards, audit log)
+        self.transfer = xx_BudgetTransfer.objects.bulk_create([
+            xx_BudgetTransfer(
+                transaction_date='2025-01-01',
+                amount=Decimal(200),
+                status='pending',
+                requested_by='preview',
+                code='FAR-PREVIEW',
+                type='FAR',
+                control_budget='MOFA_CASH',
+            )
+        ])[0]
+        xx_TransactionTransfer.objects.bulk_create([
+            xx_TransactionTransfer(transaction=self.transfer, from_center=Decimal(100), to_center=Decimal(0)),
+            xx_TransactionTransfer(transaction=self.transfer, from_center=Decimal(0), to_center=Decimal(100)),
+        ])
+        self.lines = list(xx_TransactionTransfer.objects.filter(transaction=self.transfer).order_by('transfer_id'))
+
+    def tearDown(self):
+        datasource_registry._registry = copy.deepcopy(self._datasource_registry_backup)
+        execution_point_registry.execution_points = copy.deepcopy(self._execution_point_backup)
+        cache.clear()
+
+    def _create_workflow(self, execution_point, minimum):
+        step = ValidationStep.objects.create(
+            name=f'{execution_point} Step',
+            order=1,
+            left_expression='datasource:PreviewLines',
+            operation='>=',
+            right_expression=str(minimum),
+            if_true_action='complete_success',
+            if_false_action='complete_failure',
+            if_false_action_data={'error': f'Need at least {minimum} lines'},
+        )
+        workflow = ValidationWorkflow.objects.create(
+            name=f'{execution_point} Workflow',
+            execution_point=execution_point,
+            status='active',
+            initial_step=step,
+        )
+        workflow.steps.add(step)
+        return workflow
+
+    def test_preview_aggregates_failures_without_persisting(self):
+        self._create_workflow(execution_points.on_transfer_submit, minimum=1)
+        self._create_workflow(execution_points.on_transfer_line_submit, minimum=5)
+
+        preview = preview_transaction_validation(self.transfer.transaction_id)
+
+        self.assertFalse(preview['all_passed'])
+        self.assertFalse(preview['cached'])
+        self.assertEqual(preview['validation_errors_count'], 2)
+        self.assertEqual(
+            [(e['scope'], e['transfer_id'], e['message']) for e in preview['validation_errors']],
+            [('transfer_line', line.transfer_id, 'Need at least 5 lines') for line in self.lines]
+        )
+        self.assertEqual(ValidationExecution.objects.count(), 0)
+        self.assertEqual(ValidationStepExecution.objects.count(), 0)
+
+    def test_datasource_values_shared_across_workflows_and_lines(self):
+        self._create_workflow(execution_points.on_transfer_submit, minimum=1)
+        self._create_workflow(execution_points.on_transfer_line_submit, minimum=1)
+
+        preview = preview_transaction_validation(self.transfer.transaction_id)
+
+        self.assertTrue(preview['all_passed'])
+        self.assertEqual(self.calls, [self.transfer.transaction_id])
+
+    def test_unchanged_transaction_served_from_cache(self):
+        self._create_workflow(execution_points.on_transfer_line_submit, minimum=1)
+        first = preview_transaction_validation(self.transfer.transaction_id)
+
+        second = preview_transaction_validation(self.transfer.transaction_id)
+
+        self.assertTrue(second['cached'])
+        self.assertEqual(second['fingerprint'], first['fingerprint'])
+        self.assertEqual(len(self.calls), 1)
+
+    def test_line_change_invalidates_cached_preview(self):
+        self._create_workflow(execution_points.on_transfer_line_submit, minimum=1)
+        first = preview_transaction_validation(self.transfer.transaction_id)
+
+        xx_TransactionTransfer.objects.filter(pk=self.lines[0].pk).update(from_center=Decimal(150))
+        second = preview_transaction_validation(self.transfer.transaction_id)
+
+        self.assertFalse(second['cached'])
+        self.assertNotEqual(second['fingerprint'], first['fingerprint'])
+
+    def test_engine_dry_run_keeps_step_executions_in_memory(self):
+        workflow = self._create_workflow(execution_points.on_transfer_submit, minimum=5)
+
+        engine = ValidationExecutionEngine(workflow, persist=False)
+        execution = engine.execute(datasource_params={'PreviewLines': {'transaction_id': self.transfer.transaction_id}})
+
+        self.assertIsNone(execution.pk)
+        self.assertEqual(execution.status, 'completed_failure')
+        self.assertEqual([s.error_message for s in engine.step_executions], ['Need at least 5 lines'])
+        self.assertEqual(ValidationExecution.objects.count(), 0)
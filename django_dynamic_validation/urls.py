@@ -44,4 +44,7 @@ urlpatterns = [
     path('execution-points/', views.ExecutionPointViewSet.as_view({'get': 'list'}), name='executionpoint-list'),
     path('execution-points/categories/', views.ExecutionPointViewSet.as_view({'get': 'categories'}), name='executionpoint-categories'),
     path('execution-points/<str:code>/datasources/', views.ExecutionPointViewSet.as_view({'get': 'datasources'}), name='executionpoint-datasources'),
+    
+    # Dry-run validation preview endpoints
+    path('preview/transactions/<int:pk>/', views.ValidationPreviewViewSet.as_view({'get': 'retrieve'}), name='validationpreview-transaction'),
 ]
@@ -84,5 +84,6 @@ from .views_validation import (
     ValidationWorkflowViewSet,
     ValidationExecutionViewSet,
     ValidationStepExecutionViewSet,
-    ExecutionPointViewSet
+    ExecutionPointViewSet,
+    ValidationPreviewViewSet
 )
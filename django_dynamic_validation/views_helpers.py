@@ -6,8 +6,9 @@ Provides convenient wrapper functions for using validation workflows in DRF view
 
 from rest_framework.response import Response
 from rest_framework import status
-from .execution_point_registry import execute_workflows_for_point, execution_point_registry
+from .execution_point_registry import execute_workflows_for_point
 from .datasource_registry import datasource_registry
+from .requirement_cache import requirement_cache
 
 
 def _auto_populate_datasource_params(execution_point, context_data, request=None):
@@ -27,8 +28,8 @@ def _auto_populate_datasource_params(execution_point, context_data, request=None
     Returns:
         dict: Auto-populated datasource_params ready for execute_workflows_for_point
     """
-    # Get allowed datasources for this execution point
-    allowed_datasources = execution_point_registry.get_allowed_datasources(execution_point)
+    # Get allowed datasources for this execution point (dynamic segments pre-resolved)
+    allowed_datasources = list(requirement_cache.get_allowed_datasources(execution_point))
     
     if not allowed_datasources or allowed_datasources == ['*']:
         # If all datasources allowed or none specified, get all registered datasources
@@ -89,7 +90,7 @@ def _auto_populate_datasource_params(execution_point, context_data, request=None
     return auto_params
 
 
-def execute_and_validate(execution_point, context_data=None, datasource_params=None, user=None, custom_error_message=None, request=None):
+def execute_and_validate(execution_point, context_data=None, datasource_params=None, user=None, custom_error_message=None, request=None, parallel=False):
     """
     Execute validation workflows and return error Response if validation fails.
     
@@ -132,6 +133,7 @@ def execute_and_validate(execution_point, context_data=None, datasource_params=N
         user (User, optional): The user performing the action
         custom_error_message (str, optional): Override the default error message
         request (Request, optional): Django request object for user datasources
+        parallel (bool, optional): Run thread-safe workflows concurrently
     
     Returns:
         Response: DRF Response object with error details if validation failed
@@ -150,7 +152,8 @@ def execute_and_validate(execution_point, context_data=None, datasource_params=N
         execution_point_code=execution_point,
         context_data=context_data,
         datasource_params=datasource_params,
-        user=user
+        user=user,
+        parallel=parallel
     )
     
     # Check if validation passed
@@ -185,7 +188,7 @@ def execute_and_validate(execution_point, context_data=None, datasource_params=N
     return None
 
 
-def get_validation_results(execution_point, context_data=None, datasource_params=None, user=None, request=None):
+def get_validation_results(execution_point, context_data=None, datasource_params=None, user=None, request=None, parallel=False):
     """
     Execute validation workflows and return the raw results dict.
     
@@ -210,6 +213,7 @@ def get_validation_results(execution_point, context_data=None, datasource_params
         context_data (dict, optional): Context data to pass to datasources
         datasource_params (dict, optional): Parameters for datasources
         user (User, optional): The user performing the action
+        parallel (bool, optional): Run thread-safe workflows concurrently
     
     Returns:
         dict: Validation results with keys:
@@ -230,5 +234,6 @@ def get_validation_results(execution_point, context_data=None, datasource_params
         execution_point_code=execution_point,
         context_data=context_data,
         datasource_params=datasource_params,
-        user=user
+        user=user,
+        parallel=parallel
     )
@@ -1610,3 +1610,49 @@ class ExecutionPointViewSet(viewsets.ViewSet):
             'usage_example': usage_example,
             'message': f"Use these datasources in left_expression or right_expression when creating validation steps for '{ep['name']}' workflows."
         })
+
+
+class ValidationPreviewViewSet(viewsets.ViewSet):
+    """
+    Read-only dry-run validation of a transaction.
+    
+    Evaluates every on_transfer_submit workflow and every on_transfer_line_submit
+    workflow per line without creating ValidationExecution rows. Results are
+    cached against a fingerprint of the transaction and its lines.
+    
+    Endpoints:
+        - GET /api/validations/preview/transactions/{transaction_id}/ - Preview validation results
+          Query params: refresh=true to bypass the cached result
+    """
+    
+    permission_classes = [IsAuthenticated]
+    
+    def retrieve(self, request, pk=None):
+        """
+        Returns:
+            {
+                "transaction_id": int,
+                "fingerprint": str,
+                "cached": bool,
+                "all_passed": bool,
+                "validation_errors": [list],
+                "validation_errors_count": int
+            }
+        """
+        from budget_management.models import xx_BudgetTransfer
+        from .preview import preview_transaction_validation
+        
+        if not xx_BudgetTransfer.objects.filter(transaction_id=pk).exists():
+            return Response(
+                {'error': f'Transaction {pk} not found'},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        
+        refresh = str(request.query_params.get('refresh', '')).lower() in ('1', 'true', 'yes')
+        preview = preview_transaction_validation(
+            int(pk),
+            user=request.user,
+            request=request,
+            use_cache=not refresh
+        )
+        return Response(preview)
@@ -14,6 +14,13 @@ from .budget_manager import (
     create_budget_transfer_pair,
 )
 
+from .fbdi_writer import (
+    FbdiPackage,
+    JOURNAL_FBDI,
+    BUDGET_FBDI,
+    build_fbdi_package,
+)
+
 __all__ = [
     # Journal management
     'JournalTemplateManager',
@@ -25,4 +32,9 @@ __all__ = [
     'create_budget_entry_data',
     'create_budget_entry_with_segments',
     'create_budget_transfer_pair',
+    # Direct FBDI CSV/ZIP generation
+    'FbdiPackage',
+    'JOURNAL_FBDI',
+    'BUDGET_FBDI',
+    'build_fbdi_package',
 ]
@@ -14,6 +14,7 @@ import pandas as pd
 from openpyxl import load_workbook
 
 from oracle_fbdi_integration.core.file_utils import excel_to_csv_and_zip
+from oracle_fbdi_integration.core.fbdi_writer import BUDGET_FBDI, FbdiPackage, build_fbdi_package
 from account_and_entitys.oracle import OracleSegmentMapper
 from budget_management.models import xx_BudgetTransfer
 
@@ -147,6 +148,20 @@ class BudgetTemplateManager:
 
         return str(output_path)
 
+    def build_package(self, budget_data: List[Dict[str, Any]]) -> FbdiPackage:
+        """
+        Build the XCC_BUDGET_INTERFACE CSV and its ZIP in memory, in the template's column order.
+
+        Args:
+            budget_data: List of dictionaries containing budget entry data
+
+        Returns:
+            FbdiPackage with the CSV and ZIP content
+        """
+        if not budget_data:
+            raise ValueError("No budget data provided")
+        return build_fbdi_package(BUDGET_FBDI, budget_data, template_path=str(self.template_path))
+
     def create_from_scratch(
         self,
         budget_data: List[Dict[str, Any]],
@@ -154,12 +169,12 @@ class BudgetTemplateManager:
         auto_zip: bool = True,
     ) -> str:
         """
-        Complete workflow: Create clean template, fill with data, and optionally ZIP.
+        Complete workflow: Create the ZIP directly (auto_zip), or a filled copy of the template.
 
         Args:
             budget_data: List of dictionaries containing budget entry data
             output_name: Base name for output files (optional)
-            auto_zip: Whether to create ZIP file automatically
+            auto_zip: Write the ZIP (built in memory, see build_package) instead of an .xlsm
 
         Returns:
             Path to the final file (Excel or ZIP)
@@ -170,6 +185,12 @@ class BudgetTemplateManager:
             output_name = f"XccBudgetInterface_{timestamp}"
 
         try:
+            if auto_zip:
+                package = self.build_package(budget_data)
+                zip_path = package.save_zip(str(self.template_path.parent / f"{output_name}.zip"))
+                print(f"ZIP file created: {zip_path} ({package.row_count} rows)")
+                return zip_path
+
             # Step 1: Create clean template
             clean_template = self.create_clean_template()
 
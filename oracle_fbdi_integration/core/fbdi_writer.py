@@ -0,0 +1,167 @@
+"""
+Direct FBDI Writer
+
+Builds the FBDI interface CSV (GL_INTERFACE.csv / XccBudgetInterface.csv) and
+its ZIP in memory, without going through the .xlsm template:
+
+- the column order comes from the template's header row (row 4), read once
+  per process (and again only if the template file changes)
+- rows are written straight to CSV with the same values the template round
+  trip produced (numbers without trailing zeros, empty cells for missing
+  columns, no header row)
+- the ZIP is built in memory; nothing is written to disk unless asked
+  (FbdiPackage.save_zip)
+
+Usage:
+    from oracle_fbdi_integration.core.fbdi_writer import JOURNAL_FBDI, build_fbdi_package
+
+    package = build_fbdi_package(JOURNAL_FBDI, journal_data)
+    csv_b64 = encode_csv_to_base64(package.csv_content)
+"""
+
+import csv
+import io
+import zipfile
+from decimal import Decimal
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from openpyxl import load_workbook
+
+from oracle_fbdi_integration import TEMPLATES_DIR
+
+# Template row holding the column headers (data starts on the next row)
+HEADER_ROW = 4
+
+
+class FbdiFile(NamedTuple):
+    """An FBDI interface file and the template that defines its columns."""
+
+    template_name: str
+    sheet_name: str
+    csv_name: str
+
+
+JOURNAL_FBDI = FbdiFile("JournalImportTemplate.xlsm", "GL_INTERFACE", "GL_INTERFACE.csv")
+BUDGET_FBDI = FbdiFile("BudgetImportTemplate.xlsm", "XCC_BUDGET_INTERFACE", "XccBudgetInterface.csv")
+
+
+class FbdiPackage(NamedTuple):
+    """Generated FBDI content."""
+
+    csv_name: str
+    csv_content: bytes
+    zip_content: bytes
+    row_count: int
+
+    def save_zip(self, zip_path: str) -> str:
+        """Write the ZIP to disk and return its path."""
+        Path(zip_path).write_bytes(self.zip_content)
+        return str(zip_path)
+
+
+@lru_cache(maxsize=None)
+def _read_headers(template_path: str, sheet_name: str, modified: float) -> Tuple[str, ...]:
+    workbook = load_workbook(template_path, read_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"{sheet_name} sheet not found in template: {template_path}")
+        header_row = next(
+            workbook[sheet_name].iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW, values_only=True),
+            (),
+        )
+    finally:
+        workbook.close()
+
+    headers = []
+    for value in header_row:
+        if value is None or not str(value).strip():
+            break
+        headers.append(str(value).lstrip("*").strip())
+    if not headers:
+        raise ValueError(f"No headers found in row {HEADER_ROW} of {sheet_name}: {template_path}")
+    return tuple(headers)
+
+
+def template_headers(fbdi_file: FbdiFile, template_path: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Column headers of an FBDI file, in template order (required-field "*" removed).
+
+    Args:
+        fbdi_file: JOURNAL_FBDI or BUDGET_FBDI
+        template_path: Template to read (default: the one in TEMPLATES_DIR)
+    """
+    path = Path(template_path) if template_path else TEMPLATES_DIR / fbdi_file.template_name
+    if not path.exists():
+        raise FileNotFoundError(f"Template file not found: {path}")
+    return _read_headers(str(path), fbdi_file.sheet_name, path.stat().st_mtime)
+
+
+def format_value(value: Any) -> str:
+    """
+    Format a value for the CSV as the template round trip did: numbers as
+    Excel stores them (1500.50 -> "1500.5", 3000.00 -> "3000"), None as empty.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, Decimal):
+        if value == 0:
+            return "0"
+        return format(value.normalize(), "f")
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def build_csv(headers: Tuple[str, ...], entries: List[Dict[str, Any]]) -> Tuple[bytes, int]:
+    """
+    Write entries as FBDI CSV rows (no header row), one column per header.
+
+    Returns:
+        (CSV content, number of rows written); entirely empty entries are skipped
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    row_count = 0
+    for entry in entries:
+        row = [format_value(entry.get(header)) for header in headers]
+        if any(row):
+            writer.writerow(row)
+            row_count += 1
+    return buffer.getvalue().encode("utf-8"), row_count
+
+
+def build_zip(files: Dict[str, bytes]) -> bytes:
+    """Build a ZIP archive in memory from {file name: content}."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        for name, content in files.items():
+            zf.writestr(name, content)
+    return buffer.getvalue()
+
+
+def build_fbdi_package(
+    fbdi_file: FbdiFile,
+    entries: List[Dict[str, Any]],
+    template_path: Optional[str] = None,
+) -> FbdiPackage:
+    """
+    Build the CSV and ZIP of an FBDI file from entry dictionaries keyed by header.
+
+    Raises:
+        ValueError: If there are no entries (or only empty ones)
+    """
+    if not entries:
+        raise ValueError("No entries provided")
+
+    csv_content, row_count = build_csv(template_headers(fbdi_file, template_path), entries)
+    if not row_count:
+        raise ValueError("No valid rows to write")
+
+    return FbdiPackage(
+        csv_name=fbdi_file.csv_name,
+        csv_content=csv_content,
+        zip_content=build_zip({fbdi_file.csv_name: csv_content}),
+        row_count=row_count,
+    )
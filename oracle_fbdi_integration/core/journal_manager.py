@@ -15,6 +15,7 @@ from openpyxl import load_workbook
 
 from budget_management.models import xx_BudgetTransfer
 from oracle_fbdi_integration.core.file_utils import excel_to_csv_and_zip
+from oracle_fbdi_integration.core.fbdi_writer import JOURNAL_FBDI, FbdiPackage, build_fbdi_package
 from account_and_entitys.oracle import OracleSegmentMapper
 from transaction.models import xx_TransactionTransfer
 
@@ -140,6 +141,20 @@ class JournalTemplateManager:
 
         return str(output_path)
 
+    def build_package(self, journal_data: List[Dict[str, Any]]) -> FbdiPackage:
+        """
+        Build the GL_INTERFACE CSV and its ZIP in memory, in the template's column order.
+
+        Args:
+            journal_data: List of dictionaries containing journal entry data
+
+        Returns:
+            FbdiPackage with the CSV and ZIP content
+        """
+        if not journal_data:
+            raise ValueError("No journal data provided")
+        return build_fbdi_package(JOURNAL_FBDI, journal_data, template_path=str(self.template_path))
+
     def create_from_scratch(
         self,
         journal_data: List[Dict[str, Any]],
@@ -147,12 +162,12 @@ class JournalTemplateManager:
         auto_zip: bool = True,
     ) -> str:
         """
-        Complete workflow: Create clean template, fill with data, and optionally ZIP.
+        Complete workflow: Create the ZIP directly (auto_zip), or a filled copy of the template.
 
         Args:
             journal_data: List of dictionaries containing journal entry data
             output_name: Base name for output files (optional)
-            auto_zip: Whether to create ZIP file automatically
+            auto_zip: Write the ZIP (built in memory, see build_package) instead of an .xlsm
 
         Returns:
             Path to the final file (Excel or ZIP)
@@ -162,6 +177,12 @@ class JournalTemplateManager:
             output_name = f"JournalImport_{timestamp}"
 
         try:
+            if auto_zip:
+                package = self.build_package(journal_data)
+                zip_path = package.save_zip(str(self.template_path.parent / f"{output_name}.zip"))
+                print(f"ZIP file created: {zip_path} ({package.row_count} rows)")
+                return zip_path
+
             # Create clean template
             clean_template = self.create_clean_template()
 
@@ -237,7 +258,7 @@ def create_journal_entry_data(
         from django.db.models import Q
         linked_fars = xx_BudgetTransfer.objects.filter(
             linked_transfer_id=transaction_id,
-            code__startswith="FAR"
+            code_prefix="FAR"
         ).filter(
             Q(status="approved") | Q(status_level__gte=2)
         ).exclude(
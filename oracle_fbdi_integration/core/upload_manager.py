@@ -8,7 +8,7 @@ import os
 import base64
 import re
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Dict, Optional, Union
 import requests
 from requests.auth import HTTPBasicAuth
 from dotenv import load_dotenv
@@ -16,16 +16,18 @@ from dotenv import load_dotenv
 load_dotenv()  # Loads from root .env file
 
 
-def encode_csv_to_base64(csv_path: str) -> str:
+def encode_csv_to_base64(csv_path: Union[str, bytes]) -> str:
     """
     Read CSV file and encode in base64.
 
     Args:
-        csv_path: Path to the CSV file
+        csv_path: Path to the CSV file, or the content itself (bytes, e.g. built in memory)
 
     Returns:
         Base64 encoded string of the CSV content
     """
+    if isinstance(csv_path, bytes):
+        return base64.b64encode(csv_path).decode("utf-8")
     with open(csv_path, "rb") as f:
         return base64.b64encode(f.read()).decode("utf-8")
 
@@ -175,7 +175,12 @@ def get_ess_status(job_request_id: str) -> str:
     return f"UNKNOWN (HTTP {r.status_code})"
 
 def wait_for_job(job_id: str, job_name: str) -> bool:
-    """Wait for job to complete and return success status"""
+    """
+    Wait for job to complete and return success status
+
+    Blocks until the job ends: for scripts only. Upload workflows poll their
+    jobs in the background (see ess_jobs).
+    """
     print(f"\n⏳ Waiting for {job_name} {job_id} to complete...")
     terminal_states = {"SUCCEEDED", "ERROR", "WARNING", "CANCELLED", "FAULT"}
     
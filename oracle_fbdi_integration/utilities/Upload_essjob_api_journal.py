@@ -4,12 +4,13 @@ Modular functions for UCM upload, interface loading, journal import, and auto-po
 """
 
 import os
-import base64
 import json
-import time
 import requests
 from typing import Dict, Optional
 from dotenv import load_dotenv
+from oracle_fbdi_integration.core.upload_manager import encode_csv_to_base64
+from oracle_fbdi_integration.utilities import ess_jobs
+from oracle_fbdi_integration.utilities.ess_jobs import wait_for_job_completion
 from django.utils import timezone
 from budget_management.models import xx_budget_integration_audit, xx_BudgetTransfer
 from account_and_entitys.models import XX_Segment_Funds
@@ -29,12 +30,13 @@ from user_management.utils import get_active_user_ids_for_security_group
 load_dotenv()
 
 
-def upload_file_to_ucm(file_path: str) -> Dict:
+def upload_file_to_ucm(file_path: str, file_content: Optional[bytes] = None) -> Dict:
     """
     Upload a file to Oracle UCM (Universal Content Management)
     
     Args:
-        file_path: Path to the CSV file to upload
+        file_path: Path to the CSV file to upload (only its name is used with file_content)
+        file_content: Content to upload instead of reading file_path (e.g. built in memory)
         
     Returns:
         Dictionary with DocumentId and status
@@ -44,9 +46,10 @@ def upload_file_to_ucm(file_path: str) -> Dict:
     PASS = os.getenv("FUSION_PASS")
     
     # Read and encode file to base64
-    with open(file_path, "rb") as f:
-        file_content = f.read()
-        base64_content = base64.b64encode(file_content).decode("utf-8")
+    if file_content is None:
+        with open(file_path, "rb") as f:
+            file_content = f.read()
+    base64_content = encode_csv_to_base64(file_content)
     
     print(f"File: {file_path}")
     print(f"File size: {len(file_content)} bytes")
@@ -298,56 +301,29 @@ def submit_automatic_posting() -> Dict:
         }
 
 
-def wait_for_job_completion(request_id: str, job_name: str = "Job", max_polls: int = 30, poll_interval: int = 10) -> Dict:
-    """
-    Wait for an ESS job to complete by polling its status
-    
-    Args:
-        request_id: Oracle ESS request ID
-        job_name: Name of the job for display purposes
-        max_polls: Maximum number of status checks
-        poll_interval: Seconds between status checks
-        
-    Returns:
-        Dictionary with final state and status
-    """
-    BASE_URL = os.getenv("FUSION_BASE_URL")
-    USER = os.getenv("FUSION_USER")
-    PASS = os.getenv("FUSION_PASS")
-    
-    print(f"\nWaiting for {job_name} to complete...")
-    
-    if not request_id or request_id == "-1" or request_id == -1:
-        print(f"✗ Invalid request ID: {request_id}")
-        return {"success": False, "state": "INVALID", "error": "Invalid request ID"}
-    
-    for i in range(max_polls):
-        time.sleep(poll_interval)
-        
-        status_url = f"{BASE_URL.rstrip('/')}/ess/rest/scheduler/v1/requests/{request_id}"
-        response = requests.get(
-            status_url,
-            auth=(USER, PASS),
-            headers={"Accept": "application/json"}
+def _notify_security_group(transaction_obj, eng_message: str, ara_message: str, send) -> None:
+    """Notify the active users of the transaction's security group (in-app and WebSocket)"""
+    group_id = getattr(transaction_obj, "security_group_id", None)
+    if not group_id:
+        return
+    for uid in get_active_user_ids_for_security_group(group_id):
+        xx_notification.objects.create(
+            user_id=uid,
+            Transaction_id=transaction_obj.transaction_id,
+            type_of_Trasnction=transaction_obj.type,
+            Type_of_action="List",
+            eng_message=eng_message,
+            ara_message=ara_message,
+        )
+        send(
+            uid,
+            transaction_obj.transaction_id,
+            message=eng_message,
+            ara_message=ara_message,
         )
-        
-        if response.status_code == 200:
-            status_data = response.json()
-            state = status_data.get('state')
-            print(f"  [{i+1}] Status: {state} - {status_data.get('stateDescription')}")
-            
-            if state in ["SUCCEEDED", "FAILED", "ERROR","WARNING"]:
-                return {
-                    "success": state == "SUCCEEDED",
-                    "state": state,
-                    "status_data": status_data
-                }
-    
-    print(f"✗ Timeout after {max_polls * poll_interval} seconds")
-    return {"success": False, "state": "TIMEOUT", "error": "Job did not complete in time"}
 
 
-def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transaction_id: Optional[int] = None,entry_type: str = "submit") -> Dict:
+def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transaction_id: Optional[int] = None,entry_type: str = "submit", file_content: Optional[bytes] = None, on_complete: Optional[Dict] = None) -> Dict:
     """
     Run the complete 4-step GL journal import workflow
     Sends real-time WebSocket notifications for progress updates
@@ -356,9 +332,13 @@ def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transac
         file_path: Path to the GL_INTERFACE.csv file
         Groupid: Oracle Group ID for journal import
         transaction_id: Budget transfer transaction ID
+        file_content: Content of the file, if built in memory (file_path then only names it)
+        on_complete: Celery signature called with the workflow results once the workflow ends.
+            The ESS jobs are then polled in the background (see ess_jobs) and this returns
+            as soon as the first one is submitted; without it, it waits for each job
         
     Returns:
-        Dictionary with workflow results
+        Dictionary with workflow results ("pending": True while jobs run in the background)
     """
     workflow_results = {"steps": []}
     
@@ -373,31 +353,13 @@ def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transac
         print("STEP 1: Uploading file to UCM")
         print("="*60)
         
-
-        group_id = getattr(transaction_obj, "security_group_id", None)
-        if group_id:
-            user_ids = get_active_user_ids_for_security_group(group_id)
-            for uid in user_ids:
-                eng_message = (
-                    f"Starting journal upload for transaction {transaction_obj.code}"
-                )
-                ara_message = (
-                    f"بدء رفع القيود اليومية للمعاملة {transaction_obj.code}"
-                )
-                xx_notification.objects.create(
-                    user_id=uid,
-                    Transaction_id=transaction_obj.transaction_id,
-                    type_of_Trasnction=transaction_obj.type,
-                    Type_of_action="List",
-                    eng_message=eng_message,
-                    ara_message=ara_message,
-                )
-                send_upload_started(
-                    uid,
-                    transaction_id,
-                    message=eng_message,
-                    ara_message=ara_message,
-                )
+        if transaction_obj is not None:
+            _notify_security_group(
+                transaction_obj,
+                f"Starting journal upload for transaction {transaction_obj.code}",
+                f"بدء رفع القيود اليومية للمعاملة {transaction_obj.code}",
+                send_upload_started,
+            )
         audit_ucm = xx_budget_integration_audit.objects.create(
             transaction_id=transaction_obj,
             step_name="Journal Upload to UCM",
@@ -407,7 +369,7 @@ def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transac
             Action_Type=entry_type
         )
 
-        upload_result = upload_file_to_ucm(file_path)
+        upload_result = upload_file_to_ucm(file_path, file_content=file_content)
         audit_ucm.request_id = upload_result.get("request_id")
         audit_ucm.save()
         workflow_results["steps"].append({"step": "upload", "result": upload_result})
@@ -419,7 +381,7 @@ def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transac
             audit_ucm.completed_at = timezone.now()
             audit_ucm.save()
            
-            return workflow_results
+            return ess_jobs.finish_workflow(workflow_results, on_complete)
             
         document_id = upload_result["document_id"]
 
@@ -429,198 +391,187 @@ def run_complete_workflow(file_path: str, Groupid: Optional[int] = None, transac
         audit_ucm.document_id = document_id
         audit_ucm.save()
         
-       
-        # Step 2: Submit Interface Loader
-       
-        
-        audit_interface_loader = xx_budget_integration_audit.objects.create(
-            transaction_id=transaction_obj,
-            step_name="Interface Loader Submission",
-            step_number=2,
-            status="In Progress",
-            message=f"Submitting Interface Loader for Document ID {document_id}",
-            Action_Type=entry_type
+    except Exception as e:
+        workflow_results["error"] = str(e)
+        print(f"\n✗ Error: {e}")
+        return ess_jobs.finish_workflow(workflow_results, on_complete)
+
+    # Steps 2-4: one ESS job each
+    state = {
+        "transaction_id": transaction_id,
+        "entry_type": entry_type,
+        "Groupid": Groupid,
+        "document_id": document_id,
+        "step": None,
+        "audit_id": None,
+        "results": workflow_results,
+    }
+    return ess_jobs.run_workflow(advance_workflow, state, on_complete)
 
-        )
-        load_result = submit_interface_loader(document_id)
-        audit_interface_loader.request_id = load_result.get("request_id")
-        audit_interface_loader.save()
-        workflow_results["steps"].append({"step": "interface_loader", "result": load_result})
 
-        
-        if not load_result["success"]:
-            workflow_results["error"] = "Interface loader submission failed"
-          
-            return workflow_results
-        
-        
-        
-        # Wait for interface loader to complete
-        load_status = wait_for_job_completion(load_result["request_id"], "InterfaceLoader")
-
-
-        workflow_results["steps"].append({"step": "interface_loader_status", "result": load_status})
-        
-        if not load_status["success"]:
-            workflow_results["error"] = f"Interface loader {load_status['state']}"
-            audit_interface_loader.status = "Failed"
-            audit_interface_loader.message = f"Interface loader {load_status['state']}"
-            audit_interface_loader.completed_at = timezone.now()
-            audit_interface_loader.save()
-            
-            return workflow_results
-        
-        audit_interface_loader.status = "Success"
-        audit_interface_loader.message = "Interface Loader completed successfully"
-        audit_interface_loader.completed_at = timezone.now()
-        audit_interface_loader.save()
-        
-       
-        # Step 3: Submit Journal Import
-      
-        
-        audit_journal_import = xx_budget_integration_audit.objects.create(
-            transaction_id=transaction_obj,
-            step_name="Journal Import Submission",
-            step_number=3,
-            status="In Progress",
-            message=f"Submitting Journal Import for Group ID {Groupid}",
-            group_id=Groupid,
-            Action_Type=entry_type
-
-        )
-        import_result = submit_journal_import(document_id,Groupid=Groupid)
+# ESS job steps: (label in failure messages, audit message on success, warning on failure)
+JOB_MESSAGES = {
+    "interface_loader": ("Interface loader", "Interface Loader completed successfully", None),
+    "journal_import": ("Journal import", "Journal Import completed successfully", None),
+    "autopost": ("AutoPost", "Automatic Posting completed successfully", "Journals imported but posting failed"),
+}
 
 
+def advance_workflow(state: Dict, job_status: Optional[Dict] = None) -> Optional[ess_jobs.EssJob]:
+    """
+    Steps 2-4 of run_complete_workflow, one ESS job at a time (see ess_jobs)
 
+    Records the final status of the job submitted last, then submits the next one.
+    
+    Args:
+        state: Workflow state built by run_complete_workflow
+        job_status: Final status of the job submitted last (None on the first call)
         
-        audit_journal_import.request_id = import_result.get("request_id")
-        audit_journal_import.save()
-        workflow_results["steps"].append({"step": "journal_import", "result": import_result})
-        
-        if not import_result["success"]:
-            workflow_results["error"] = "Journal import submission failed"
-            return workflow_results
-        
-        # Wait for journal import to complete
-        import_status = wait_for_job_completion(import_result["request_id"], "Journal Import")
-        workflow_results["steps"].append({"step": "journal_import_status", "result": import_status})
-        
-        if not import_status["success"]:
-            workflow_results["error"] = f"Journal import {import_status['state']}"
-            audit_journal_import.status = "Failed"
-            audit_journal_import.message = f"Journal import {import_status['state']}"
-            audit_journal_import.completed_at = timezone.now()
-            audit_journal_import.save()
-            return workflow_results
-        audit_journal_import.status = "Success"
-        audit_journal_import.message = "Journal Import completed successfully"
-        audit_journal_import.completed_at = timezone.now()
-        audit_journal_import.save()
-        
-        # Step 4: Submit AutoPost
-        audit_autopost = xx_budget_integration_audit.objects.create(
-            transaction_id=transaction_obj,
-            step_name="Automatic Posting Submission",
-            step_number=4,
-            status="In Progress",
-            message="Submitting Automatic Posting",
-            Action_Type=entry_type
+    Returns:
+        The submitted job, or None once the workflow is over (results in state["results"])
+    """
+    transaction_obj = None
+    if state["transaction_id"]:
+        transaction_obj = xx_BudgetTransfer.objects.get(transaction_id=state["transaction_id"])
+
+    step = state["step"]
+    if step is not None and not _record_job_status(state, job_status):
+        return None
+
+    if step is None:
+        return _submit_interface_loader(state, transaction_obj)
+    if step == "interface_loader":
+        return _submit_journal_import(state, transaction_obj)
+    if step == "journal_import":
+        return _submit_automatic_posting(state, transaction_obj)
+
+    _complete_workflow(state, transaction_obj)
+    return None
+
+
+def _record_job_status(state: Dict, job_status: Dict) -> bool:
+    """Record the final status of the current step's job; False if the workflow stops there"""
+    step = state["step"]
+    label, done_message, warning = JOB_MESSAGES[step]
+    workflow_results = state["results"]
+    workflow_results["steps"].append({"step": f"{step}_status", "result": job_status})
+
+    audit = xx_budget_integration_audit.objects.get(audit_id=state["audit_id"])
+    audit.completed_at = timezone.now()
+    if not job_status["success"]:
+        workflow_results["error"] = f"{label} {job_status['state']}"
+        if warning:
+            workflow_results["warning"] = warning
+        audit.status = "Failed"
+        audit.message = f"{label} {job_status['state']}"
+        audit.save()
+        return False
+
+    audit.status = "Success"
+    audit.message = done_message
+    audit.save()
+    return True
+
+
+def _submitted(state: Dict, step: str, job_name: str, audit, submit_result: Dict, error: str, warning: Optional[str] = None) -> Optional[ess_jobs.EssJob]:
+    """Record a job submission; returns the job to wait for, or None if it was not submitted"""
+    audit.request_id = submit_result.get("request_id")
+    audit.save()
+    state["results"]["steps"].append({"step": step, "result": submit_result})
+
+    if not submit_result["success"]:
+        state["results"]["error"] = error
+        if warning:
+            state["results"]["warning"] = warning
+        return None
+
+    state["step"] = step
+    state["audit_id"] = audit.audit_id
+    return ess_jobs.EssJob(submit_result["request_id"], job_name, audit.audit_id)
+
+
+def _submit_interface_loader(state: Dict, transaction_obj) -> Optional[ess_jobs.EssJob]:
+    # Step 2: Submit Interface Loader
+    document_id = state["document_id"]
+    audit_interface_loader = xx_budget_integration_audit.objects.create(
+        transaction_id=transaction_obj,
+        step_name="Interface Loader Submission",
+        step_number=2,
+        status="In Progress",
+        message=f"Submitting Interface Loader for Document ID {document_id}",
+        Action_Type=state["entry_type"]
+    )
+    load_result = submit_interface_loader(document_id)
+    return _submitted(
+        state, "interface_loader", "InterfaceLoader", audit_interface_loader, load_result,
+        "Interface loader submission failed",
+    )
 
-        )
-        post_result = submit_automatic_posting()
-        audit_autopost.request_id = post_result.get("request_id")
-        audit_autopost.save()
-        workflow_results["steps"].append({"step": "autopost", "result": post_result})
-        
-        if not post_result["success"]:
-            workflow_results["error"] = "AutoPost submission failed"
-            workflow_results["warning"] = "Journals imported but not posted"
-            return workflow_results
-        
-        # Wait for autopost to complete
-        post_status = wait_for_job_completion(post_result["request_id"], "AutoPost")
-        workflow_results["steps"].append({"step": "autopost_status", "result": post_status})
-        
-        if not post_status["success"]:
-            workflow_results["error"] = f"AutoPost {post_status['state']}"
-            workflow_results["warning"] = "Journals imported but posting failed"
-            audit_autopost.status = "Failed"
-            audit_autopost.message = f"AutoPost {post_status['state']}"
-            audit_autopost.completed_at = timezone.now()
-            audit_autopost.save()
-            return workflow_results
-        audit_autopost.status = "Success"
-        audit_autopost.message = "Automatic Posting completed successfully"
-        audit_autopost.completed_at = timezone.now()
-        audit_autopost.save()
-        
-        # All steps completed successfully
-        # overall_process = xx_budget_integration_audit.objects.create(
-        #     transaction_id=transaction_obj,
-        #     step_name="Complete Journal Import Workflow",
-        #     step_number=5,
-        #     status="Success",
-        #     message="All steps completed successfully",
-        #     completed_at=timezone.now(),
-        #     Action_Type=entry_type
-
-        # )
-        workflow_results["success"] = True
-        workflow_results["message"] = "All steps completed successfully"
-        print(f"\n✓✓✓ ALL STEPS COMPLETED SUCCESSFULLY! ✓✓✓")
-        ## REfresh Fund Values 
-        print("Refreshing fund values...")
-        period_name = "1-25"
-       
-        oracle_manager=OracleBalanceReportManager()
-        load_dotenv()
-
-        XX_Segment_Funds.objects.all().delete()
-
-        control_budget_names = ["MOFA_CASH", "MOFA_COST_2"]
-        results = []
-        total_success = 0
-        total_failed = 0
-        
-        for control_budget_name in control_budget_names:
-            result = oracle_manager.download_segments_funds(control_budget_name=control_budget_name, period_name=period_name)
-            if result['success']:
-                print("Refreshing the Fund data is Success for control budget:",control_budget_name)
-            else:
-                print("Refreshing the Fund data is Failed for control budget:",control_budget_name)
 
+def _submit_journal_import(state: Dict, transaction_obj) -> Optional[ess_jobs.EssJob]:
+    # Step 3: Submit Journal Import
+    Groupid = state["Groupid"]
+    audit_journal_import = xx_budget_integration_audit.objects.create(
+        transaction_id=transaction_obj,
+        step_name="Journal Import Submission",
+        step_number=3,
+        status="In Progress",
+        message=f"Submitting Journal Import for Group ID {Groupid}",
+        group_id=Groupid,
+        Action_Type=state["entry_type"]
+    )
+    import_result = submit_journal_import(state["document_id"], Groupid=Groupid)
+    return _submitted(
+        state, "journal_import", "Journal Import", audit_journal_import, import_result,
+        "Journal import submission failed",
+    )
 
-        
 
-        if group_id:
-            user_ids = get_active_user_ids_for_security_group(group_id)
-            for uid in user_ids:
-                eng_message = (
-                    f"Journal upload workflow completed for transaction {transaction_obj.code}"
-                )
-                ara_message = (
-                    f"اكتمل رفع القيود اليومية للمعاملة {transaction_obj.code}"
-                )
-                xx_notification.objects.create(
-                    user_id=uid,
-                    Transaction_id=transaction_obj.transaction_id,
-                    type_of_Trasnction=transaction_obj.type,
-                    Type_of_action="List",
-                    eng_message=eng_message,
-                    ara_message=ara_message,
-                )
-                send_upload_completed(
-                    uid,
-                    transaction_id,
-                    message=eng_message,
-                    ara_message=ara_message,
-                )
-        return workflow_results
-        
-    except Exception as e:
-        workflow_results["error"] = str(e)
-        print(f"\n✗ Error: {e}")
-        return workflow_results
+def _submit_automatic_posting(state: Dict, transaction_obj) -> Optional[ess_jobs.EssJob]:
+    # Step 4: Submit AutoPost
+    audit_autopost = xx_budget_integration_audit.objects.create(
+        transaction_id=transaction_obj,
+        step_name="Automatic Posting Submission",
+        step_number=4,
+        status="In Progress",
+        message="Submitting Automatic Posting",
+        Action_Type=state["entry_type"]
+    )
+    post_result = submit_automatic_posting()
+    return _submitted(
+        state, "autopost", "AutoPost", audit_autopost, post_result,
+        "AutoPost submission failed", warning="Journals imported but not posted",
+    )
 
 
+def _complete_workflow(state: Dict, transaction_obj) -> None:
+    """All steps completed successfully: refresh fund values and notify"""
+    workflow_results = state["results"]
+    workflow_results["success"] = True
+    workflow_results["message"] = "All steps completed successfully"
+    print(f"\n✓✓✓ ALL STEPS COMPLETED SUCCESSFULLY! ✓✓✓")
+    ## REfresh Fund Values 
+    print("Refreshing fund values...")
+    period_name = "1-25"
+   
+    oracle_manager=OracleBalanceReportManager()
+    load_dotenv()
+
+    XX_Segment_Funds.objects.all().delete()
+
+    control_budget_names = ["MOFA_CASH", "MOFA_COST_2"]
+    
+    for control_budget_name in control_budget_names:
+        result = oracle_manager.download_segments_funds(control_budget_name=control_budget_name, period_name=period_name)
+        if result['success']:
+            print("Refreshing the Fund data is Success for control budget:",control_budget_name)
+        else:
+            print("Refreshing the Fund data is Failed for control budget:",control_budget_name)
+
+    if transaction_obj is not None:
+        _notify_security_group(
+            transaction_obj,
+            f"Journal upload workflow completed for transaction {transaction_obj.code}",
+            f"اكتمل رفع القيود اليومية للمعاملة {transaction_obj.code}",
+            send_upload_completed,
+        )
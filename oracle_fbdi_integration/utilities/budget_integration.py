@@ -17,7 +17,7 @@ from oracle_fbdi_integration import BUDGETS_DIR, TEMPLATES_DIR
 from oracle_fbdi_integration.utilities.Upload_essjob_api_budget import run_complete_workflow
 from budget_management.models import xx_BudgetTransfer
 
-def create_and_upload_budget(transfers, transaction_id: int, entry_type: str = "submit"):
+def create_and_upload_budget(transfers, transaction_id: int, entry_type: str = "submit", on_complete=None):
     """
     Create budget entries from transfers and upload to Oracle Fusion.
 
@@ -25,6 +25,9 @@ def create_and_upload_budget(transfers, transaction_id: int, entry_type: str = "
         transfers: List of XX_TransactionTransfer objects
         transaction_id: Transaction identifier
         entry_type: "submit" or "reject" - determines debit/credit direction
+        on_complete: Celery signature called with the upload result once the
+            workflow ends; the upload then returns once the first ESS job is
+            submitted (see run_complete_workflow)
 
     Returns:
         Tuple: (upload_result dict, file_path str)
@@ -52,36 +55,31 @@ def create_and_upload_budget(transfers, transaction_id: int, entry_type: str = "
     # Create budget entry data
     budget_data = create_budget_entry_data(transfers, transaction_id)
 
-    # Initialize template manager and create budget
+    # Initialize template manager and build the XccBudgetInterface CSV/ZIP in memory
     manager = BudgetTemplateManager(str(template_path))
-    result_path = manager.create_from_scratch(
-        budget_data=budget_data,
-        output_name=str(output_name),
-        auto_zip=True,
-    )
+    package = manager.build_package(budget_data)
+    result_path = package.save_zip(f"{output_name}.zip")
 
     print(f"\nCompleted! Final file: {result_path}")
 
     # Upload to Oracle Fusion
-    upload_result = None
-    if result_path and result_path.endswith(".zip"):
-        # The ZIP file contains XccBudgetInterface.csv
-        zip_path = Path(result_path)
-        
-        print(f"Uploading ZIP to Oracle Fusion: {zip_path}")
-        
-        # Run the complete budget import workflow
-        upload_result = run_complete_workflow(str(zip_path), Groupid=group_id, transaction_id=transaction_id,entry_type=entry_type)
-
-        if upload_result.get("success"):
-            print(f"Complete workflow successful! All steps completed.")
-        else:
-            print(f"Workflow failed: {upload_result.get('error')}")
+    print(f"Uploading ZIP to Oracle Fusion: {result_path} ({package.row_count} rows)")
+
+    # Run the complete budget import workflow
+    upload_result = run_complete_workflow(
+        result_path,
+        Groupid=group_id,
+        transaction_id=transaction_id,
+        entry_type=entry_type,
+        file_content=package.zip_content,
+        on_complete=on_complete,
+    )
+
+    if upload_result.get("pending"):
+        print(f"Workflow submitted; ESS jobs are polled in the background.")
+    elif upload_result.get("success"):
+        print(f"Complete workflow successful! All steps completed.")
     else:
-        print("Budget creation did not produce expected ZIP file")
-        upload_result = {
-            "success": False,
-            "error": "No ZIP file created",
-        }
+        print(f"Workflow failed: {upload_result.get('error')}")
 
     return upload_result, result_path
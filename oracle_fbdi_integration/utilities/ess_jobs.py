@@ -0,0 +1,334 @@
+"""
+Background polling of Oracle ESS jobs.
+
+The upload workflows (Upload_essjob_api_journal / Upload_essjob_api_budget)
+submit ESS jobs one after the other and used to wait for each with a
+time.sleep loop - up to 30 x 10 s per job, holding a Celery worker the whole
+time. With an on_complete callback they now run as a state machine:
+
+- a workflow step submits its ESS job and returns an EssJob
+- the job is recorded in xx_OracleEssJob together with the workflow state,
+  and poll_ess_job is scheduled with a countdown; the worker is free again
+- each poll_ess_job run makes one status request; while the job runs it
+  reschedules itself, once it ends (or after MAX_POLLS checks) the workflow
+  function is called with the final status and submits the next job, or the
+  workflow ends and on_complete (a Celery signature) is called with its results
+
+Polls are claimed with the job's poll counter, so a duplicated or re-sent
+task never checks a job twice. Jobs whose poll went missing (broker down,
+worker lost) are re-scheduled by resume_stalled_ess_jobs from Celery beat; a
+claim made once all MAX_POLLS checks are used up ends the job with TIMEOUT
+instead of checking it again. A status that cannot be read (network error,
+non-JSON response, missing configuration) counts as a check with no state,
+so a claimed job always either gets polled again or ends.
+
+A workflow function has the signature advance(state, job_status=None): it
+records the status of the job that ended (None on the first call), submits
+the next job and returns its EssJob, or returns None once the workflow is
+over with the results in state["results"]. state must be JSON serializable.
+
+Without on_complete the workflow waits for each job in the calling process,
+as before (scripts, shell).
+
+The status endpoint is read from FUSION_BASE_URL on every request, so a local
+fake ESS server can stand in for Oracle.
+
+Settings (all optional):
+
+    ORACLE_ESS_POLLING = {
+        "POLL_INTERVAL": 10,  # seconds between status checks
+        "MAX_POLLS": 30,  # checks before a job is given up (TIMEOUT)
+        "STALL_SECONDS": 120,  # overdue polls re-scheduled by resume_stalled_ess_jobs
+    }
+
+Usage:
+    from oracle_fbdi_integration.utilities import ess_jobs
+
+    return ess_jobs.run_workflow(advance_workflow, state, on_complete=task.s(...))
+"""
+
+import os
+import time
+from datetime import timedelta
+from typing import Dict, NamedTuple, Optional
+
+import requests
+from celery import signature
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULTS = {
+    "POLL_INTERVAL": 10,
+    "MAX_POLLS": 30,
+    "STALL_SECONDS": 120,
+}
+
+# ESS states after which a job does not change anymore
+TERMINAL_STATES = {"SUCCEEDED", "FAILED", "ERROR", "WARNING", "CANCELLED"}
+
+# How long a claimed poll may take before the job counts as stalled again
+POLL_LEASE_SECONDS = 60
+
+
+class EssJob(NamedTuple):
+    """An ESS job submitted by a workflow step."""
+
+    request_id: str
+    job_name: str
+    audit_id: Optional[int] = None
+
+
+def _setting(name):
+    return getattr(settings, "ORACLE_ESS_POLLING", {}).get(name, DEFAULTS[name])
+
+
+# ----------------------------------------------------------------------------
+# Status requests
+# ----------------------------------------------------------------------------
+
+def invalid_request_status(request_id) -> Optional[Dict]:
+    """Final status for request IDs that cannot be polled, None for valid ones."""
+    if not request_id or request_id == "-1" or request_id == -1:
+        print(f"✗ Invalid request ID: {request_id}")
+        return {"success": False, "state": "INVALID", "error": "Invalid request ID"}
+    return None
+
+
+def check_job_status(request_id: str) -> Dict:
+    """
+    Request the status of an ESS job once.
+
+    Returns:
+        {"success": bool, "state": str, "status_data": dict}; state is None
+        when the status could not be read (the job is then polled again)
+    """
+    BASE_URL = os.getenv("FUSION_BASE_URL")
+    USER = os.getenv("FUSION_USER")
+    PASS = os.getenv("FUSION_PASS")
+
+    if not BASE_URL:
+        return {"success": False, "state": None, "error": "FUSION_BASE_URL is not set"}
+
+    status_url = f"{BASE_URL.rstrip('/')}/ess/rest/scheduler/v1/requests/{request_id}"
+    try:
+        response = requests.get(
+            status_url,
+            auth=(USER, PASS),
+            headers={"Accept": "application/json"},
+            timeout=30,
+        )
+    except requests.RequestException as e:
+        return {"success": False, "state": None, "error": str(e)}
+
+    if response.status_code != 200:
+        return {"success": False, "state": None, "error": f"HTTP {response.status_code}"}
+
+    try:
+        status_data = response.json()
+    except ValueError as e:
+        return {"success": False, "state": None, "error": f"Invalid status response: {e}"}
+    if not isinstance(status_data, dict):
+        return {"success": False, "state": None, "error": "Invalid status response"}
+    state = status_data.get("state")
+    return {"success": state == "SUCCEEDED", "state": state, "status_data": status_data}
+
+
+def timeout_status(max_polls: int, poll_interval: int) -> Dict:
+    print(f"✗ Timeout after {max_polls * poll_interval} seconds")
+    return {"success": False, "state": "TIMEOUT", "error": "Job did not complete in time"}
+
+
+def wait_for_job_completion(request_id: str, job_name: str = "Job", max_polls: int = 30, poll_interval: int = 10) -> Dict:
+    """
+    Wait for an ESS job to complete by polling its status, in this process.
+
+    Blocks for up to max_polls * poll_interval seconds: meant for scripts and
+    the shell. Celery tasks should pass on_complete to the workflows instead.
+
+    Returns:
+        Dictionary with final state and status
+    """
+    print(f"\nWaiting for {job_name} to complete...")
+
+    invalid = invalid_request_status(request_id)
+    if invalid:
+        return invalid
+
+    for i in range(max_polls):
+        time.sleep(poll_interval)
+        job_status = check_job_status(request_id)
+        if job_status["state"] is None:
+            continue
+        print(f"  [{i+1}] Status: {job_status['state']} - {job_status['status_data'].get('stateDescription')}")
+        if job_status["state"] in TERMINAL_STATES:
+            return job_status
+
+    return timeout_status(max_polls, poll_interval)
+
+
+# ----------------------------------------------------------------------------
+# Running workflows
+# ----------------------------------------------------------------------------
+
+def finish_workflow(results: Dict, on_complete: Optional[Dict] = None) -> Dict:
+    """End a workflow: call on_complete (if any) with its results and return them."""
+    if on_complete is not None:
+        signature(on_complete).delay(results)
+    return results
+
+
+def _advance(advance, state, job_status=None) -> Optional[EssJob]:
+    try:
+        return advance(state, job_status)
+    except Exception as e:
+        state["results"]["error"] = str(e)
+        print(f"\n✗ Error: {e}")
+        return None
+
+
+def run_workflow(advance, state: Dict, on_complete: Optional[Dict] = None) -> Dict:
+    """
+    Run a workflow of ESS jobs (see the module docstring).
+
+    Args:
+        advance: Workflow function (module level, it is stored by dotted path)
+        state: Workflow state; state["results"] holds the workflow results
+        on_complete: Celery signature called with the results once the
+            workflow ends; the jobs are then polled in the background
+
+    Returns:
+        The workflow results; with on_complete, the results so far and
+        "pending": True while jobs are still running
+    """
+    job = _advance(advance, state)
+    if on_complete is None:
+        while job is not None:
+            job = _advance(advance, state, wait_for_job_completion(job.request_id, job.job_name))
+        return state["results"]
+    return _continue(advance, state, on_complete, job)
+
+
+def _continue(advance, state, on_complete, job):
+    while job is not None:
+        invalid = invalid_request_status(job.request_id)
+        if invalid is None:
+            break
+        job = _advance(advance, state, invalid)
+
+    if job is None:
+        return finish_workflow(state["results"], on_complete)
+
+    track_job(job, f"{advance.__module__}.{advance.__name__}", state, on_complete)
+    return dict(state["results"], pending=True)
+
+
+# ----------------------------------------------------------------------------
+# Tracked jobs
+# ----------------------------------------------------------------------------
+
+def track_job(job: EssJob, handler: str, state: Dict, on_complete: Optional[Dict] = None):
+    """Record a submitted job and schedule its first poll."""
+    from budget_management.models import xx_OracleEssJob
+
+    print(f"Polling {job.job_name} ({job.request_id}) in the background")
+    poll_interval = _setting("POLL_INTERVAL")
+    ess_job = xx_OracleEssJob.objects.create(
+        transaction_id=state.get("transaction_id"),
+        audit_id=job.audit_id,
+        request_id=str(job.request_id),
+        job_name=job.job_name,
+        max_polls=_setting("MAX_POLLS"),
+        poll_interval=poll_interval,
+        next_poll_at=timezone.now() + timedelta(seconds=poll_interval),
+        handler=handler,
+        context={"state": state, "on_complete": on_complete},
+    )
+    transaction.on_commit(lambda: schedule_poll(ess_job))
+    return ess_job
+
+
+def schedule_poll(ess_job):
+    from budget_management.tasks import poll_ess_job
+
+    try:
+        poll_ess_job.apply_async(args=[ess_job.pk, ess_job.polls], countdown=ess_job.poll_interval)
+    except Exception as e:
+        # Broker unavailable: resume_stalled_ess_jobs picks the job up again
+        print(f"Error scheduling ESS job poll: {e}")
+
+
+def poll_job(job_id: int, poll: int) -> Optional[str]:
+    """
+    Check a tracked job once and move it (and its workflow) forward.
+
+    Args:
+        poll: Number of checks done when the poll was scheduled; the poll is
+            skipped if another one got there first, and ends the job with
+            TIMEOUT if all max_polls checks are used up
+
+    Returns:
+        The job state, or None if the poll was skipped
+    """
+    from budget_management.models import xx_OracleEssJob
+
+    now = timezone.now()
+    claimed = xx_OracleEssJob.objects.filter(
+        pk=job_id, state=xx_OracleEssJob.STATE_WAITING, polls=poll
+    ).update(polls=poll + 1, next_poll_at=now + timedelta(seconds=POLL_LEASE_SECONDS))
+    if not claimed:
+        return None
+
+    ess_job = xx_OracleEssJob.objects.get(pk=job_id)
+    if poll >= ess_job.max_polls:
+        # The last check already ran (its poll was lost or failed after the claim)
+        job_status = timeout_status(ess_job.max_polls, ess_job.poll_interval)
+    else:
+        try:
+            job_status = check_job_status(ess_job.request_id)
+        except Exception as e:
+            # Never leave a claimed job without a next poll
+            job_status = {"success": False, "state": None, "error": str(e)}
+        print(f"  [{ess_job.polls}] {ess_job.job_name} status: {job_status['state']}")
+
+        if job_status["state"] not in TERMINAL_STATES:
+            if ess_job.polls < ess_job.max_polls:
+                ess_job.status_data = job_status.get("status_data")
+                ess_job.next_poll_at = timezone.now() + timedelta(seconds=ess_job.poll_interval)
+                ess_job.save(update_fields=["status_data", "next_poll_at"])
+                schedule_poll(ess_job)
+                return ess_job.state
+            job_status = timeout_status(ess_job.max_polls, ess_job.poll_interval)
+
+    ess_job.state = job_status["state"]
+    ess_job.status_data = job_status.get("status_data")
+    ess_job.completed_at = timezone.now()
+    ess_job.save(update_fields=["state", "status_data", "completed_at"])
+
+    advance = import_string(ess_job.handler)
+    state = ess_job.context["state"]
+    on_complete = ess_job.context.get("on_complete")
+    _continue(advance, state, on_complete, _advance(advance, state, job_status))
+    return ess_job.state
+
+
+def resume_stalled_jobs(now=None) -> int:
+    """
+    Re-schedule the polls of waiting jobs that are overdue by STALL_SECONDS.
+
+    Returns:
+        int: Number of jobs re-scheduled
+    """
+    from budget_management.models import xx_OracleEssJob
+
+    now = now or timezone.now()
+    stalled = xx_OracleEssJob.objects.filter(
+        state=xx_OracleEssJob.STATE_WAITING,
+        next_poll_at__lt=now - timedelta(seconds=_setting("STALL_SECONDS")),
+    )
+    resumed = 0
+    for ess_job in stalled:
+        schedule_poll(ess_job)
+        resumed += 1
+    return resumed
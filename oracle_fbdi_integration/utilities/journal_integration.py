@@ -16,9 +16,10 @@ from oracle_fbdi_integration.core.journal_manager import (
 from oracle_fbdi_integration.core.upload_manager import upload_journal_fbdi
 from oracle_fbdi_integration import JOURNALS_DIR, TEMPLATES_DIR
 from oracle_fbdi_integration.utilities.Upload_essjob_api_journal import run_complete_workflow
+from oracle_fbdi_integration.utilities.ess_jobs import finish_workflow
 from budget_management.models import xx_BudgetTransfer
 
-def create_and_upload_journal(transfers, transaction_id: int, entry_type: str = "submit"):
+def create_and_upload_journal(transfers, transaction_id: int, entry_type: str = "submit", on_complete=None):
     """
     Create journal entries from transfers and upload to Oracle Fusion.
 
@@ -26,6 +27,9 @@ def create_and_upload_journal(transfers, transaction_id: int, entry_type: str =
         transfers: List of XX_TransactionTransfer objects
         transaction_id: Transaction identifier
         entry_type: "submit" or "reject" - determines debit/credit direction
+        on_complete: Celery signature called with the upload result once the
+            workflow ends; the upload then returns once the first ESS job is
+            submitted (see run_complete_workflow)
 
     Returns:
         Tuple: (upload_result dict, file_path str)
@@ -53,54 +57,36 @@ def create_and_upload_journal(transfers, transaction_id: int, entry_type: str =
     # Create journal entry data
     journal_data,Status = create_journal_entry_data(transfers, transaction_id, entry_type, group_id)
     if Status==False:
-        return {
+        return finish_workflow({
             "success": True,
             "massage": "No journal entries to create because the total from are already in balance.",
-        }, None
+        }, on_complete), None
 
-    # Initialize template manager and create journal
+    # Initialize template manager and build the GL_INTERFACE CSV/ZIP in memory
     manager = JournalTemplateManager(str(template_path))
-    result_path = manager.create_from_scratch(
-        journal_data=journal_data,
-        output_name=str(output_name),
-        auto_zip=True,
-    )
+    package = manager.build_package(journal_data)
+    result_path = package.save_zip(f"{output_name}.zip")
 
     print(f"\nCompleted! Final file: {result_path}")
 
     # Upload to Oracle Fusion
-    upload_result = None
-    Status="N/A"
-    Status_Detail=""
-    if result_path and result_path.endswith(".zip"):
-        # The CSV file should be in the same directory as the ZIP file
-        zip_path = Path(result_path)
-        csv_path = zip_path.parent / "GL_INTERFACE.csv"
-
-        if csv_path.exists():
-            print(f"Uploading CSV to Oracle Fusion: {csv_path}")
-            
-            # Import the new workflow function
-            
-            # Run the complete 4-step workflow (UCM upload → Interface Load → Import → AutoPost)
-           
-            upload_result = run_complete_workflow(str(csv_path), Groupid=group_id, transaction_id=transaction_id,entry_type=entry_type)
-
-            if upload_result.get("success"):
-                print(f"Complete workflow successful! All steps completed.")
-            else:
-                print(f"Workflow failed: {upload_result.get('error')}")
-        else:
-            print(f"CSV file not found at expected location: {csv_path}")
-            upload_result = {
-                "success": False,
-                "error": "CSV file not found",
-            }
+    print(f"Uploading {package.csv_name} to Oracle Fusion ({package.row_count} rows)")
+
+    # Run the complete 4-step workflow (UCM upload → Interface Load → Import → AutoPost)
+    upload_result = run_complete_workflow(
+        package.csv_name,
+        Groupid=group_id,
+        transaction_id=transaction_id,
+        entry_type=entry_type,
+        file_content=package.csv_content,
+        on_complete=on_complete,
+    )
+
+    if upload_result.get("pending"):
+        print(f"Workflow submitted; ESS jobs are polled in the background.")
+    elif upload_result.get("success"):
+        print(f"Complete workflow successful! All steps completed.")
     else:
-        print("Journal creation did not produce expected ZIP file")
-        upload_result = {
-            "success": False,
-            "error": "No ZIP file created",
-        }
+        print(f"Workflow failed: {upload_result.get('error')}")
 
     return upload_result, result_path
@@ -1,5 +1,6 @@
 from django.db import models
 from django.core.exceptions import ValidationError
+from user_management import state_tracking
 # Refer to budget model by string to avoid circular import
 
 # Removed encrypted fields import - using standard Django fields now
@@ -286,6 +287,10 @@ class xx_TransactionTransfer(models.Model):
         return SegmentManager.validate_transaction_segments(validation_data)
 
 
+# Tracked at import time so the snapshot is refreshed before any other post_save receiver
+state_tracking.track(xx_TransactionTransfer)
+
+
 
 
 
@@ -54,7 +54,6 @@ from account_and_entitys.oracle import OracleBalanceReportManager, OracleSegment
 from oracle_fbdi_integration.utilities.journal_integration import create_and_upload_journal
 from oracle_fbdi_integration.utilities.budget_integration import create_and_upload_budget
 from oracle_fbdi_integration.utilities.automatic_posting import submit_automatic_posting
-from oracle_fbdi_integration.utilities.Status import wait_for_job
 from budget_management.models import xx_BudgetTransfer
 def validate_transaction_dynamic(data, code=None):
     """
@@ -1134,7 +1133,7 @@ class TransactionTransferListView(APIView):
                         # Find all FAR transfers that match this HFR's segment combination
                         linked_far_transfers = xx_BudgetTransfer.objects.filter(
                             linked_transfer_id=transaction_id,
-                            code__startswith="FAR"
+                            code_prefix="FAR"
                         ).order_by('request_date')
                         
                         # Calculate usage for this specific segment combination
@@ -1241,59 +1240,13 @@ class TransactionTransferListView(APIView):
                 }
 
             status = {"status": status}
-            # Execute dynamic validation workflows - collect all errors
-            from django_dynamic_validation.views_helpers import get_validation_results
-            from django_dynamic_validation import execution_points
-            from django_dynamic_validation.datasource_params import StandardParams
-            
-            all_validation_errors = []
-            
-            # Validate at transaction level
-            validation_result = get_validation_results(
-                execution_point=execution_points.on_transfer_submit,
-                context_data={StandardParams.TRANSACTION_ID: transaction_id},
-                user=request.user,
-                request=request
-            )
-            
-            # Check if transaction-level validation failed
-            if not validation_result.get('all_passed', False):
-                failure_messages = validation_result.get('all_failure_messages', [])
-                for failure in failure_messages:
-                    all_validation_errors.append({
-                        "scope": "transaction",
-                        "transaction_id": transaction_id,
-                        "workflow": failure.get('workflow_name', 'Unknown'),
-                        "step": failure.get('step_name', 'Unknown'),
-                        "message": failure.get('message', 'Validation failed'),
-                        "execution_id": failure.get('execution_id')
-                    })
-            
-            # Validate each transfer line
-            for transfer in transfers:
-                validation_result = get_validation_results(
-                    execution_point=execution_points.on_transfer_line_submit,
-                    context_data={
-                        StandardParams.TRANSACTION_ID: transaction_id,
-                        StandardParams.TRANSFER_ID: transfer.transfer_id
-                    },
-                    user=request.user,
-                    request=request
-                )
-                
-                # Check if transfer line validation failed
-                if not validation_result.get('all_passed', False):
-                    failure_messages = validation_result.get('all_failure_messages', [])
-                    for failure in failure_messages:
-                        all_validation_errors.append({
-                            "scope": "transfer_line",
-                            "transaction_id": transaction_id,
-                            "transfer_id": transfer.transfer_id,
-                            "workflow": failure.get('workflow_name', 'Unknown'),
-                            "step": failure.get('step_name', 'Unknown'),
-                            "message": failure.get('message', 'Validation failed'),
-                            "execution_id": failure.get('execution_id')
-                        })
+            # Dry-run validation preview: cached per transaction fingerprint and
+            # writes no ValidationExecution rows on page views
+            from django_dynamic_validation.preview import preview_transaction_validation
+
+            all_validation_errors = preview_transaction_validation(
+                transaction_id, user=request.user, request=request
+            )["validation_errors"]
             
             return Response(
                 {
@@ -1327,59 +1280,13 @@ class TransactionTransferListView(APIView):
                 
             }
             status = {"status": status}
-            # Execute dynamic validation workflows - collect all errors
-            from django_dynamic_validation.views_helpers import get_validation_results
-            from django_dynamic_validation import execution_points
-            from django_dynamic_validation.datasource_params import StandardParams
-            
-            all_validation_errors = []
-            
-            # Validate at transaction level
-            validation_result = get_validation_results(
-                execution_point=execution_points.on_transfer_submit,
-                context_data={StandardParams.TRANSACTION_ID: transaction_id},
-                user=request.user,
-                request=request
-            )
-            
-            # Check if transaction-level validation failed
-            if not validation_result.get('all_passed', False):
-                failure_messages = validation_result.get('all_failure_messages', [])
-                for failure in failure_messages:
-                    all_validation_errors.append({
-                        "scope": "transaction",
-                        "transaction_id": transaction_id,
-                        "workflow": failure.get('workflow_name', 'Unknown'),
-                        "step": failure.get('step_name', 'Unknown'),
-                        "message": failure.get('message', 'Validation failed'),
-                        "execution_id": failure.get('execution_id')
-                    })
-            
-            # Validate each transfer line
-            for transfer in transfers:
-                validation_result = get_validation_results(
-                    execution_point=execution_points.on_transfer_line_submit,
-                    context_data={
-                        StandardParams.TRANSACTION_ID: transaction_id,
-                        StandardParams.TRANSFER_ID: transfer.transfer_id
-                    },
-                    user=request.user,
-                    request=request
-                )
-                
-                # Check if transfer line validation failed
-                if not validation_result.get('all_passed', False):
-                    failure_messages = validation_result.get('all_failure_messages', [])
-                    for failure in failure_messages:
-                        all_validation_errors.append({
-                            "scope": "transfer_line",
-                            "transaction_id": transaction_id,
-                            "transfer_id": transfer.transfer_id,
-                            "workflow": failure.get('workflow_name', 'Unknown'),
-                            "step": failure.get('step_name', 'Unknown'),
-                            "message": failure.get('message', 'Validation failed'),
-                            "execution_id": failure.get('execution_id')
-                        })
+            # Dry-run validation preview: cached per transaction fingerprint and
+            # writes no ValidationExecution rows on page views
+            from django_dynamic_validation.preview import preview_transaction_validation
+
+            all_validation_errors = preview_transaction_validation(
+                transaction_id, user=request.user, request=request
+            )["validation_errors"]
             return Response(
                 {
                     "summary": summary, 
@@ -0,0 +1,310 @@
+# user_management/access_cache.py
+"""
+User Access Cache
+
+Compiled, cached per-user segment access maps so list views do not re-walk
+every security group membership on every request.
+
+An access map is {segment_type_id: frozenset(segment_codes)}: the segments a
+user reaches through their active security group memberships (the member's
+assigned segments if any, otherwise all of the group's segments), with the
+descendants of every granted segment added for segment types that have a
+hierarchy.
+
+Maps are stored in the Django cache under the user's access version and a
+global access version, both tokens in XX_AccessVersion:
+
+- the user's version is bumped when their memberships, member role/segment
+  assignments or direct XX_UserSegmentAccess grants change
+- the global version is bumped when security groups, group roles, group
+  segments or segments (hierarchy) change, since those affect every member
+
+Both are bumped from signal handlers (see signals.py), in the transaction
+that makes the change. The versions are read from the database on every
+lookup, so no process serves a stale map once the change is committed, even
+with a per-process cache backend. Bulk queryset updates do not send signals:
+call invalidate_user() / invalidate_all() after them.
+
+For SQL-side filtering the map is also materialized into
+XX_UserAccessibleSegment (ensure_materialized), so segment lists can join
+against it instead of sending thousands of codes in an IN clause. The map key
+the rows were written for is stored on the user's XX_AccessVersion row; rows
+are rewritten only when it changes, under that row's lock, and never for a
+map older than the current versions.
+
+The same cache holds each hierarchical segment type's parent map
+({code: parent_code}), tagged with the global version, so the full ancestor
+chain of a segment is resolved without climbing the hierarchy query by query.
+
+Usage:
+    from user_management.access_cache import user_access_cache
+
+    access_map = user_access_cache.get_access_map(user)
+    allowed_codes = access_map.get(segment_type_id, frozenset())
+
+    user_access_cache.ensure_materialized(user)
+    segments = segments.filter(user_access_cache.accessible_filter(user))
+"""
+
+from collections import defaultdict
+from typing import Dict, FrozenSet
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+
+from budget_transfer.global_function.version_tokens import VersionTokens
+
+
+class UserAccessCache:
+    """
+    Cache of compiled user access maps, keyed by user and access versions.
+    """
+
+    GLOBAL_SCOPE = 'global'
+    USER_SCOPE = 'user:{user_id}'
+    MAP_KEY = 'user_access_map:{user_id}:{global_version}:{user_version}'
+    PARENTS_KEY = 'segment_parents:{segment_type_id}:{global_version}'
+    MATERIALIZE_BATCH_SIZE = 1000
+    MAP_TIMEOUT = 60 * 60 * 24
+
+    def __init__(self):
+        # Read on every lookup: no process may serve a map older than a commit
+        self._versions = VersionTokens('user_management.XX_AccessVersion', key_field='scope', check_seconds=0)
+
+    # ------------------------------------------------------------------
+    # Versioning
+    # ------------------------------------------------------------------
+
+    def invalidate_user(self, user_id):
+        """Invalidate the access map of one user."""
+        if user_id is not None:
+            self._versions.bump(self.USER_SCOPE.format(user_id=user_id))
+
+    def invalidate_all(self):
+        """Invalidate the access maps of all users."""
+        self._versions.bump(self.GLOBAL_SCOPE)
+
+    def get_global_version(self) -> str:
+        return self._versions.get(self.GLOBAL_SCOPE)
+
+    def _map_key(self, user_id):
+        user_scope = self.USER_SCOPE.format(user_id=user_id)
+        versions = self._versions.get_many([self.GLOBAL_SCOPE, user_scope])
+        return self.MAP_KEY.format(
+            user_id=user_id,
+            global_version=versions[self.GLOBAL_SCOPE],
+            user_version=versions[user_scope],
+        )
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def get_access_map(self, user) -> Dict[int, FrozenSet[str]]:
+        """
+        Get the compiled access map of a user.
+
+        Returns:
+            dict: {segment_type_id: frozenset(segment_codes)}
+        """
+        return self._get_map(self._map_key(user.pk), user.pk)
+
+    def _get_map(self, key, user_id):
+        access_map = cache.get(key)
+        if access_map is None:
+            access_map = self.build_access_map(user_id)
+            cache.set(key, access_map, self.MAP_TIMEOUT)
+        return access_map
+
+    def ensure_materialized(self, user) -> Dict[int, FrozenSet[str]]:
+        """
+        Make XX_UserAccessibleSegment hold the user's current access map.
+
+        Returns:
+            dict: the access map, as get_access_map()
+        """
+        from user_management.models import XX_AccessVersion, XX_UserAccessibleSegment
+
+        user_scope = self.USER_SCOPE.format(user_id=user.pk)
+        key = self._map_key(user.pk)
+        access_map = self._get_map(key, user.pk)
+        if XX_AccessVersion.objects.filter(scope=user_scope, materialized=key).exists():
+            return access_map
+
+        with transaction.atomic():
+            XX_AccessVersion.objects.get_or_create(scope=user_scope)
+            version = XX_AccessVersion.objects.select_for_update().get(scope=user_scope)
+            # Versions may have moved on while the map was built (or while
+            # waiting for the lock): never write rows for an outdated map
+            current_key = self._map_key(user.pk)
+            if current_key != key:
+                key = current_key
+                access_map = self._get_map(key, user.pk)
+            if version.materialized == key:
+                # Another process wrote these rows meanwhile
+                return access_map
+
+            XX_UserAccessibleSegment.objects.filter(user_id=user.pk).delete()
+            XX_UserAccessibleSegment.objects.bulk_create(
+                (
+                    XX_UserAccessibleSegment(user_id=user.pk, segment_type_id=segment_type_id, segment_code=code)
+                    for segment_type_id, codes in access_map.items()
+                    for code in codes
+                ),
+                batch_size=self.MATERIALIZE_BATCH_SIZE,
+                ignore_conflicts=True,
+            )
+            version.materialized = key
+            version.save(update_fields=['materialized'])
+        return access_map
+
+    def accessible_filter(self, user, segment_field='code', segment_type_field='segment_type_id'):
+        """
+        Exists() condition restricting an XX_Segment queryset (or any model with
+        a segment type and code) to segments the user reaches through security
+        groups. Call ensure_materialized() first.
+        """
+        from user_management.models import XX_UserAccessibleSegment
+
+        return Exists(
+            XX_UserAccessibleSegment.objects.filter(
+                user_id=user.pk,
+                segment_type_id=OuterRef(segment_type_field),
+                segment_code=OuterRef(segment_field),
+            )
+        )
+
+    def get_segment_parents(self, segment_type_id, global_version=None):
+        """
+        Get {code: parent_code} for a segment type, or None if it has no hierarchy.
+
+        Pass global_version (get_global_version()) when resolving many segments
+        to read it once.
+        """
+        if global_version is None:
+            global_version = self.get_global_version()
+        key = self.PARENTS_KEY.format(segment_type_id=segment_type_id, global_version=global_version)
+        parents = cache.get(key)
+        if parents is None:
+            parents = self._build_segment_parents(segment_type_id)
+            # Wrapped so "no hierarchy" (None) is cached too
+            cache.set(key, {'parents': parents}, self.MAP_TIMEOUT)
+            return parents
+        return parents['parents']
+
+    def get_ancestor_chain(self, segment_type_id, segment_code, global_version=None):
+        """
+        Get [segment_code, parent, grandparent, ...] up to the root.
+
+        Just [segment_code] for segment types without a hierarchy.
+        """
+        chain = [segment_code]
+        parents = self.get_segment_parents(segment_type_id, global_version)
+        if not parents:
+            return chain
+        seen = {segment_code}
+        current = parents.get(segment_code)
+        while current and current not in seen:
+            chain.append(current)
+            seen.add(current)
+            current = parents.get(current)
+        return chain
+
+    # ------------------------------------------------------------------
+    # Building
+    # ------------------------------------------------------------------
+
+    def _build_segment_parents(self, segment_type_id):
+        from account_and_entitys.models import XX_Segment, XX_SegmentType
+
+        if not XX_SegmentType.objects.filter(segment_id=segment_type_id, has_hierarchy=True).exists():
+            return None
+        return {
+            code: parent_code
+            for code, parent_code in XX_Segment.objects.filter(
+                segment_type_id=segment_type_id
+            ).exclude(parent_code__isnull=True).exclude(parent_code='').values_list('code', 'parent_code').iterator()
+        }
+
+    def build_access_map(self, user_id) -> Dict[int, FrozenSet[str]]:
+        from user_management.models import XX_SecurityGroupSegment, XX_UserGroupMembership
+
+        memberships = dict(
+            XX_UserGroupMembership.objects.filter(
+                user_id=user_id,
+                is_active=True,
+                security_group__is_active=True,
+            ).values_list('id', 'security_group_id')
+        )
+        if not memberships:
+            return {}
+
+        codes = defaultdict(set)
+
+        # Members with assigned segments only see those (active ones)
+        Assignment = XX_UserGroupMembership.assigned_segments.through
+        restricted = set()
+        assignments = Assignment.objects.filter(
+            xx_usergroupmembership_id__in=memberships
+        ).values_list(
+            'xx_usergroupmembership_id',
+            'xx_securitygroupsegment__is_active',
+            'xx_securitygroupsegment__segment_type_id',
+            'xx_securitygroupsegment__segment__code',
+        )
+        for membership_id, is_active, segment_type_id, code in assignments:
+            restricted.add(membership_id)
+            if is_active:
+                codes[segment_type_id].add(code)
+
+        # Everyone else sees all of their group's segments
+        open_groups = {
+            group_id for membership_id, group_id in memberships.items()
+            if membership_id not in restricted
+        }
+        if open_groups:
+            group_segments = XX_SecurityGroupSegment.objects.filter(
+                security_group_id__in=open_groups,
+                is_active=True,
+            ).values_list('segment_type_id', 'segment__code')
+            for segment_type_id, code in group_segments:
+                codes[segment_type_id].add(code)
+
+        self._expand_hierarchy(codes)
+        return {segment_type_id: frozenset(type_codes) for segment_type_id, type_codes in codes.items()}
+
+    def _expand_hierarchy(self, codes):
+        """Add all descendants of the granted codes, for segment types with a hierarchy."""
+        from account_and_entitys.models import XX_Segment, XX_SegmentType
+
+        hierarchical = set(
+            XX_SegmentType.objects.filter(
+                segment_id__in=list(codes), has_hierarchy=True
+            ).values_list('segment_id', flat=True)
+        )
+        if not hierarchical:
+            return
+
+        children = defaultdict(list)
+        rows = (
+            XX_Segment.objects.filter(segment_type_id__in=hierarchical)
+            .exclude(parent_code__isnull=True)
+            .exclude(parent_code='')
+            .values_list('segment_type_id', 'parent_code', 'code')
+        )
+        for segment_type_id, parent_code, code in rows.iterator():
+            children[(segment_type_id, parent_code)].append(code)
+
+        for segment_type_id in hierarchical:
+            type_codes = codes[segment_type_id]
+            pending = list(type_codes)
+            while pending:
+                for child in children.get((segment_type_id, pending.pop()), ()):
+                    if child not in type_codes:
+                        type_codes.add(child)
+                        pending.append(child)
+
+
+# Global cache instance
+user_access_cache = UserAccessCache()
@@ -7,6 +7,7 @@ import traceback
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.contenttypes.models import ContentType
 from .audit_models import XX_AuditLog
+from .audit_sink import audit_sink
 from . import audit_signals  # Import to make request available to signals
 
 
@@ -21,6 +22,9 @@ class AuditLoggingMiddleware(MiddlewareMixin):
     - IP address and user agent
     - Response status
     - Duration of request
+    
+    Entries are handed to the batched audit sink, so audit I/O is not part
+    of the request latency.
     """
     
     # Endpoints to exclude from logging (to avoid spam)
@@ -130,9 +134,9 @@ class AuditLoggingMiddleware(MiddlewareMixin):
         elif response.status_code >= 500:
             severity = 'ERROR'
         
-        # Try to create audit log (fail silently to avoid breaking requests)
+        # Try to queue audit log (fail silently to avoid breaking requests)
         try:
-            XX_AuditLog.objects.create(
+            audit_sink.submit(XX_AuditLog(
                 user=user,
                 username=username,
                 action_type=self.get_action_type(request),
@@ -143,14 +147,13 @@ class AuditLoggingMiddleware(MiddlewareMixin):
                 ip_address=self.get_client_ip(request),
                 user_agent=request.META.get('HTTP_USER_AGENT', '')[:500],
                 status=status,
-                timestamp=None,  # Will use auto_now_add
                 duration_ms=duration_ms,
                 module=self.get_module_from_path(request.path),
                 metadata=json.dumps({
                     'status_code': response.status_code,
                     'query_params': dict(request.GET),
                 })
-            )
+            ))
         except Exception as e:
             # Log error but don't break the request
             print(f"Failed to create audit log: {e}")
@@ -173,7 +176,7 @@ class AuditLoggingMiddleware(MiddlewareMixin):
             duration_ms = int((time.time() - request._audit_start_time) * 1000)
         
         try:
-            XX_AuditLog.objects.create(
+            audit_sink.submit(XX_AuditLog(
                 user=user,
                 username=username,
                 action_type=self.get_action_type(request),
@@ -191,7 +194,7 @@ class AuditLoggingMiddleware(MiddlewareMixin):
                     'exception_type': type(exception).__name__,
                     'traceback': traceback.format_exc(),
                 })
-            )
+            ))
         except Exception as e:
             print(f"Failed to log exception: {e}")
         
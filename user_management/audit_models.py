@@ -5,6 +5,7 @@ from django.db import models
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.utils import timezone
 import json
 
 
@@ -156,9 +157,9 @@ class XX_AuditLog(models.Model):
         help_text='Error message if action failed'
     )
     timestamp = models.DateTimeField(
-        auto_now_add=True,
+        default=timezone.now,
         db_index=True,
-        help_text='When the action was performed'
+        help_text='When the action was performed (set when queued, not when written)'
     )
     duration_ms = models.IntegerField(
         null=True,
@@ -291,3 +292,104 @@ class XX_AuditLoginHistory(models.Model):
     def __str__(self):
         status = "SUCCESS" if self.success else "FAILED"
         return f"{self.username} - {self.login_type} - {status} @ {self.timestamp}"
+
+
+class XX_AuditLogRollupDay(models.Model):
+    """
+    One row per day whose audit logs have been rolled up into
+    XX_AuditLogDailyRollup (see audit_rollups.py). Days are rolled up in
+    order, so the latest row marks how far the rollups reach.
+    """
+    
+    day = models.DateField(unique=True)
+    total = models.IntegerField(default=0, help_text='Audit log entries of the day')
+    rolled_at = models.DateTimeField(default=timezone.now)
+    archived = models.BooleanField(
+        default=False,
+        help_text="Whether the day's raw entries were moved out of XX_AUDIT_LOG_XX"
+    )
+    
+    class Meta:
+        db_table = 'XX_AUDIT_LOG_ROLLUP_DAY_XX'
+        ordering = ['-day']
+        verbose_name = 'Audit Log Rollup Day'
+        verbose_name_plural = 'Audit Log Rollup Days'
+    
+    def __str__(self):
+        return f"{self.day}: {self.total} entries"
+
+
+class XX_AuditLogDailyRollup(models.Model):
+    """
+    Number of audit log entries per day, user, action type, module and severity.
+    """
+    
+    day = models.DateField()
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    username = models.CharField(max_length=255, null=True, blank=True)
+    action_type = models.CharField(max_length=50)
+    module = models.CharField(max_length=100, null=True, blank=True)
+    severity = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+    
+    class Meta:
+        db_table = 'XX_AUDIT_LOG_DAILY_ROLLUP_XX'
+        indexes = [
+            models.Index(fields=['day']),
+            models.Index(fields=['user', 'day']),
+        ]
+        verbose_name = 'Audit Log Daily Rollup'
+        verbose_name_plural = 'Audit Log Daily Rollups'
+    
+    def __str__(self):
+        return f"{self.day} - {self.username} - {self.action_type}: {self.count}"
+
+
+class XX_AuditLogArchive(models.Model):
+    """
+    Audit log entries moved out of XX_AUDIT_LOG_XX by the retention job.
+    
+    Same columns as XX_AuditLog (ids kept, references as plain ids), plus the
+    month of the entry so old months can be exported or dropped as a unit.
+    """
+    
+    audit_id = models.IntegerField(primary_key=True)
+    month = models.CharField(max_length=7, db_index=True, help_text='YYYY-MM of timestamp')
+    user_id = models.IntegerField(null=True, blank=True)
+    username = models.CharField(max_length=255, null=True, blank=True)
+    action_type = models.CharField(max_length=50)
+    action_description = models.TextField()
+    severity = models.CharField(max_length=20, default='INFO')
+    endpoint = models.CharField(max_length=500, null=True, blank=True)
+    request_method = models.CharField(max_length=10, null=True, blank=True)
+    ip_address = models.GenericIPAddressField(null=True, blank=True)
+    user_agent = models.TextField(null=True, blank=True)
+    content_type_id = models.IntegerField(null=True, blank=True)
+    object_id = models.PositiveIntegerField(null=True, blank=True)
+    object_repr = models.CharField(max_length=500, null=True, blank=True)
+    old_values = models.TextField(null=True, blank=True)
+    new_values = models.TextField(null=True, blank=True)
+    metadata = models.TextField(null=True, blank=True)
+    status = models.CharField(max_length=20, default='SUCCESS')
+    error_message = models.TextField(null=True, blank=True)
+    timestamp = models.DateTimeField()
+    duration_ms = models.IntegerField(null=True, blank=True)
+    module = models.CharField(max_length=100, null=True, blank=True)
+    
+    class Meta:
+        db_table = 'XX_AUDIT_LOG_ARCHIVE_XX'
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['user_id', '-timestamp']),
+        ]
+        verbose_name = 'Archived Audit Log'
+        verbose_name_plural = 'Archived Audit Logs'
+    
+    def __str__(self):
+        return f"{self.username} - {self.action_type} - {self.action_description[:50]} @ {self.timestamp}"
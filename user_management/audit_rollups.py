@@ -0,0 +1,236 @@
+"""
+Daily rollups and retention for XX_AuditLog.
+
+AuditLogViewSet.statistics used to group the raw XX_AUDIT_LOG_XX rows of the
+whole requested range, four times. Closed days are now rolled up into
+XX_AuditLogDailyRollup (entry counts per day, user, action type, module and
+severity), and statistics read:
+
+- the rollups of every rolled-up day in the range
+- the raw entries of the days after the last rolled-up one (normally today)
+
+Days are rolled up in order, once they ended at least GRACE_MINUTES ago (the
+audit sink writes entries shortly after the fact); XX_AuditLogRollupDay marks
+the rolled-up days, including days without entries.
+
+Retention: raw entries older than RETENTION_DAYS are moved to
+XX_AuditLogArchive (ARCHIVE=True, tagged with their month) or deleted
+(ARCHIVE=False). Only rolled-up days are touched, so statistics keep counting
+them.
+
+Both run from Celery beat (user_management.tasks).
+
+Settings (all optional):
+
+    AUDIT_LOG_ROLLUP = {
+        "RETENTION_DAYS": 90,  # None: keep raw entries forever
+        "ARCHIVE": True,
+        "BATCH_SIZE": 5000,
+        "GRACE_MINUTES": 10,
+    }
+
+Usage:
+    from user_management import audit_rollups
+
+    audit_rollups.rollup_closed_days()
+    counts = audit_rollups.audit_statistics(start_day, user=None)
+"""
+
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min, Sum
+from django.utils import timezone
+
+DEFAULTS = {
+    "RETENTION_DAYS": 90,
+    "ARCHIVE": True,
+    "BATCH_SIZE": 5000,
+    "GRACE_MINUTES": 10,
+}
+
+ROLLUP_FIELDS = ("user_id", "username", "action_type", "module", "severity")
+
+# Statistics section -> counted field
+STATISTICS_FIELDS = {
+    "actions_by_type": "action_type",
+    "actions_by_module": "module",
+    "actions_by_user": "username",
+    "actions_by_severity": "severity",
+}
+
+
+def _setting(name):
+    return getattr(settings, "AUDIT_LOG_ROLLUP", {}).get(name, DEFAULTS[name])
+
+
+def day_start(day):
+    """Start of a (local) day, as an aware datetime."""
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+# ----------------------------------------------------------------------------
+# Rolling up
+# ----------------------------------------------------------------------------
+
+def rolled_until():
+    """First day that is not rolled up yet, or None if no day is."""
+    from .audit_models import XX_AuditLogRollupDay
+
+    last = XX_AuditLogRollupDay.objects.aggregate(last=Max("day"))["last"]
+    return last + timedelta(days=1) if last else None
+
+
+def rollup_day(day):
+    """
+    (Re)compute the rollups of one day from its raw entries.
+
+    Days whose raw entries were already archived are left as they are.
+
+    Returns:
+        int: Number of entries of the day, or None if the day is archived
+    """
+    from .audit_models import XX_AuditLog, XX_AuditLogDailyRollup, XX_AuditLogRollupDay
+
+    if XX_AuditLogRollupDay.objects.filter(day=day, archived=True).exists():
+        return None
+
+    rows = (
+        XX_AuditLog.objects.filter(
+            timestamp__gte=day_start(day),
+            timestamp__lt=day_start(day + timedelta(days=1)),
+        )
+        .values(*ROLLUP_FIELDS)
+        .annotate(entries=Count("pk"))
+        .order_by()
+    )
+    rollups = [XX_AuditLogDailyRollup(day=day, count=row.pop("entries"), **row) for row in rows]
+    total = sum(rollup.count for rollup in rollups)
+
+    with transaction.atomic():
+        XX_AuditLogDailyRollup.objects.filter(day=day).delete()
+        XX_AuditLogDailyRollup.objects.bulk_create(rollups, batch_size=_setting("BATCH_SIZE"))
+        XX_AuditLogRollupDay.objects.update_or_create(
+            day=day, defaults={"total": total, "rolled_at": timezone.now()}
+        )
+    return total
+
+
+def rollup_closed_days(now=None):
+    """
+    Roll up, in order, every closed day that is not rolled up yet.
+
+    Returns:
+        int: Number of days rolled up
+    """
+    from .audit_models import XX_AuditLog
+
+    now = now or timezone.now()
+    last_closed = timezone.localdate(now - timedelta(minutes=_setting("GRACE_MINUTES"))) - timedelta(days=1)
+
+    day = rolled_until()
+    if day is None:
+        first = XX_AuditLog.objects.aggregate(first=Min("timestamp"))["first"]
+        if first is None:
+            return 0
+        day = timezone.localdate(first)
+
+    rolled = 0
+    while day <= last_closed:
+        rollup_day(day)
+        day += timedelta(days=1)
+        rolled += 1
+    return rolled
+
+
+# ----------------------------------------------------------------------------
+# Retention
+# ----------------------------------------------------------------------------
+
+def _archive_entry(row):
+    from .audit_models import XX_AuditLogArchive
+
+    return XX_AuditLogArchive(month=timezone.localtime(row["timestamp"]).strftime("%Y-%m"), **row)
+
+
+def archive_old_logs(now=None):
+    """
+    Move raw entries older than RETENTION_DAYS out of XX_AUDIT_LOG_XX.
+
+    Returns:
+        int: Number of entries archived (or deleted, with ARCHIVE=False)
+    """
+    from .audit_models import XX_AuditLog, XX_AuditLogArchive, XX_AuditLogRollupDay
+
+    retention_days = _setting("RETENTION_DAYS")
+    until = rolled_until()
+    if retention_days is None or until is None:
+        return 0
+
+    # Never past the rollups: archived entries are only counted through them
+    cutoff_day = min(timezone.localdate(now) - timedelta(days=retention_days), until)
+    fields = [field.attname for field in XX_AuditLog._meta.concrete_fields]
+    old = XX_AuditLog.objects.filter(timestamp__lt=day_start(cutoff_day)).order_by("audit_id")
+    batch_size = _setting("BATCH_SIZE")
+    archive = _setting("ARCHIVE")
+
+    moved = 0
+    while True:
+        batch = list(old.values(*fields)[:batch_size])
+        if not batch:
+            break
+        with transaction.atomic():
+            if archive:
+                XX_AuditLogArchive.objects.bulk_create(
+                    [_archive_entry(row) for row in batch], ignore_conflicts=True
+                )
+            XX_AuditLog.objects.filter(audit_id__in=[row["audit_id"] for row in batch]).delete()
+        moved += len(batch)
+
+    XX_AuditLogRollupDay.objects.filter(day__lt=cutoff_day, archived=False).update(archived=True)
+    return moved
+
+
+# ----------------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------------
+
+def audit_statistics(start_day, user=None):
+    """
+    Entry counts from start_day (a local date) up to now.
+
+    Args:
+        user: Only count this user's entries
+
+    Returns:
+        {"total_actions": int, "actions_by_type": {...}, "actions_by_module": {...},
+         "actions_by_user": {username: count}, "actions_by_severity": {...}}
+    """
+    from .audit_models import XX_AuditLog, XX_AuditLogDailyRollup
+
+    until = rolled_until()
+    raw_from = start_day if until is None else max(start_day, until)
+
+    rollups = XX_AuditLogDailyRollup.objects.filter(day__gte=start_day, day__lt=raw_from)
+    raw = XX_AuditLog.objects.filter(timestamp__gte=day_start(raw_from))
+    if user is not None:
+        rollups = rollups.filter(user=user)
+        raw = raw.filter(user=user)
+
+    stats = {}
+    for name, field in STATISTICS_FIELDS.items():
+        counts = {}
+        if raw_from > start_day:
+            for key, entries in (
+                rollups.values(field).annotate(entries=Sum("count")).order_by().values_list(field, "entries")
+            ):
+                counts[key] = counts.get(key, 0) + entries
+        for key, entries in (
+            raw.values(field).annotate(entries=Count("pk")).order_by().values_list(field, "entries")
+        ):
+            counts[key] = counts.get(key, 0) + entries
+        stats[name] = counts
+
+    stats["total_actions"] = sum(stats["actions_by_type"].values())
+    return stats
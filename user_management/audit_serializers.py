@@ -146,5 +146,6 @@ class AuditStatsSerializer(serializers.Serializer):
     actions_by_type = serializers.DictField()
     actions_by_user = serializers.DictField()
     actions_by_module = serializers.DictField()
+    actions_by_severity = serializers.DictField()
     recent_errors = serializers.ListField()
     time_range = serializers.DictField()
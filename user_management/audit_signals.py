@@ -2,18 +2,21 @@
 Django signals for automatic audit logging of model changes.
 
 This module automatically tracks changes to important models and logs them
-with before/after values in the audit system.
+with before/after values in the audit system. Entries are written in batches
+by the audit sink (see audit_sink.py), after the saving transaction commits.
 """
+from django.apps import apps
 from django.db.models.signals import post_save, post_delete, pre_save
 from django.dispatch import receiver
 from django.contrib.contenttypes.models import ContentType
 from threading import local
 import json
 
+from . import state_tracking
 from .audit_utils import AuditLogger
 from .audit_models import XX_AuditLog
 
-# Thread-local storage to keep track of old instances
+# Thread-local storage to keep track of the current request
 _thread_locals = local()
 
 
@@ -27,23 +30,9 @@ def set_current_request(request):
     _thread_locals.request = request
 
 
-def get_old_instance(instance):
-    """Get the old instance from thread local storage."""
-    key = f"{instance.__class__.__name__}_{instance.pk}"
-    return getattr(_thread_locals, key, None)
-
-
-def set_old_instance(instance):
-    """Store the old instance in thread local storage."""
-    key = f"{instance.__class__.__name__}_{instance.pk}"
-    setattr(_thread_locals, key, instance)
-
-
-def clear_old_instance(instance):
-    """Clear the old instance from thread local storage."""
-    key = f"{instance.__class__.__name__}_{instance.pk}"
-    if hasattr(_thread_locals, key):
-        delattr(_thread_locals, key)
+def get_old_values(instance):
+    """Get the field values captured before the pending save ({attname: value}), or None."""
+    return getattr(instance, '_audit_previous', None)
 
 
 def should_audit_model(model_class):
@@ -68,31 +57,38 @@ def should_audit_model(model_class):
     return model_class.__name__ in audited_models
 
 
-def get_model_fields_as_dict(instance, exclude_fields=None):
+def get_model_fields_as_dict(instance, exclude_fields=None, values=None):
     """
     Get all model fields as a dictionary.
     
+    Foreign keys are read from their "<name>_id" attribute, so related
+    objects are never fetched.
+    
     Args:
         instance: Model instance
         exclude_fields: List of field names to exclude
+        values: {attname: value} to serialize instead of the instance's
+            current values (e.g. from get_old_values())
     
     Returns:
         Dictionary of field names and values
     """
     if exclude_fields is None:
         exclude_fields = ['password', 'created_at', 'updated_at']
+    if values is None:
+        values = instance.__dict__
     
     data = {}
     for field in instance._meta.fields:
-        if field.name in exclude_fields:
+        if field.name in exclude_fields or field.attname not in values:
             continue
         
         try:
-            value = getattr(instance, field.name)
+            value = values[field.attname]
             
             # Convert complex types to strings
-            if hasattr(value, 'pk'):  # Foreign key
-                data[field.name] = f"{value.pk}"
+            if field.is_relation and value is not None:  # Foreign key
+                data[field.name] = f"{value}"
             elif isinstance(value, (list, dict)):
                 data[field.name] = json.dumps(value)
             else:
@@ -112,6 +108,12 @@ def get_user_from_request():
     return None
 
 
+# Snapshot audited models' loaded field values, so old values need no query
+for _model in apps.get_models():
+    if should_audit_model(_model):
+        state_tracking.track(_model)
+
+
 @receiver(pre_save)
 def capture_old_instance(sender, instance, **kwargs):
     """
@@ -126,13 +128,8 @@ def capture_old_instance(sender, instance, **kwargs):
     if sender.__name__ in ['XX_AuditLog', 'XX_AuditLoginHistory']:
         return
     
-    try:
-        # Get the old instance from the database
-        old_instance = sender.objects.get(pk=instance.pk)
-        # Store it in thread-local storage
-        set_old_instance(old_instance)
-    except sender.DoesNotExist:
-        pass
+    # From the loaded-state snapshot; one query only for instances not loaded from the database
+    instance._audit_previous = state_tracking.all_previous_values(instance)
 
 
 @receiver(post_save)
@@ -161,12 +158,10 @@ def log_model_save(sender, instance, created, **kwargs):
         new_values = get_model_fields_as_dict(instance)
         
         if not created:
-            # For updates, get the old instance we captured in pre_save
-            old_instance = get_old_instance(instance)
-            if old_instance:
-                old_values = get_model_fields_as_dict(old_instance)
-                # Clear from thread-local storage
-                clear_old_instance(instance)
+            # For updates, get the old values we captured in pre_save
+            previous = get_old_values(instance)
+            if previous:
+                old_values = get_model_fields_as_dict(instance, values=previous)
         
         # Create action description
         model_name = sender._meta.verbose_name or sender.__name__
@@ -182,7 +177,8 @@ def log_model_save(sender, instance, created, **kwargs):
             new_values=new_values,
             severity='INFO',
             status='SUCCESS',
-            request=request
+            request=request,
+            defer=True
         )
         
     except Exception as e:
@@ -233,7 +229,8 @@ def log_model_delete(sender, instance, **kwargs):
                 'deleted_pk': instance.pk,
                 'deleted_repr': str(instance)[:500]
             },
-            request=request
+            request=request,
+            defer=True
         )
         
     except Exception as e:
@@ -253,12 +250,13 @@ def log_transaction_status_change(sender, instance, created, **kwargs):
     if created:
         return
     
-    old_instance = get_old_instance(instance)
-    if not old_instance:
+    previous = get_old_values(instance)
+    if not previous:
         return
+    old_status = previous.get('status')
     
     # Check if status changed
-    if old_instance.status != instance.status:
+    if old_status != instance.status:
         user = get_user_from_request()
         request = get_current_request()
         
@@ -267,21 +265,22 @@ def log_transaction_status_change(sender, instance, created, **kwargs):
         if instance.status in ['approved', 'rejected']:
             severity = 'WARNING'
         
-        action_description = f"Transaction {instance.code or instance.transaction_id} status changed from '{old_instance.status}' to '{instance.status}'"
+        action_description = f"Transaction {instance.code or instance.transaction_id} status changed from '{old_status}' to '{instance.status}'"
         
         AuditLogger.log_action(
             user=user,
             action_type='UPDATE',
             action_description=action_description,
             affected_object=instance,
-            old_values={'status': old_instance.status},
+            old_values={'status': old_status},
             new_values={'status': instance.status},
             severity=severity,
             status='SUCCESS',
             metadata={
                 'transaction_id': instance.transaction_id,
                 'transaction_code': instance.code,
-                'status_change': f"{old_instance.status} → {instance.status}"
+                'status_change': f"{old_status} → {instance.status}"
             },
-            request=request
+            request=request,
+            defer=True
         )
@@ -0,0 +1,237 @@
+"""
+Asynchronous, batched writer for XX_AuditLog.
+
+AuditLoggingMiddleware and the audit signal receivers used to insert one
+XX_AuditLog row per request / per model save, synchronously and inside the
+caller's transaction. They now hand unsaved XX_AuditLog instances to the
+global audit_sink, which:
+
+- enqueues them once the caller's transaction commits (nothing is logged for
+  changes that roll back, as before)
+- holds them in a bounded in-process queue
+- writes them from a background thread with bulk_create, every
+  BATCH_SIZE records or FLUSH_INTERVAL seconds, whichever comes first
+
+Back-pressure: when the queue is full, submitters wait up to PUT_TIMEOUT
+seconds for room. If it is still full the OVERFLOW policy applies:
+
+- "drop": discard the record (counted in stats()["dropped"])
+- "sync": write it inline, as before
+
+Remaining records are flushed at interpreter exit (atexit), and flush() can be
+called explicitly (management commands, tests). With ASYNC disabled every
+record is written inline.
+
+Settings (all optional):
+
+    AUDIT_LOG_SINK = {
+        "ASYNC": True,
+        "BATCH_SIZE": 200,
+        "FLUSH_INTERVAL": 1.0,
+        "MAX_QUEUE_SIZE": 10000,
+        "PUT_TIMEOUT": 0.05,
+        "OVERFLOW": "drop",
+    }
+
+Usage:
+    from user_management.audit_sink import audit_sink
+
+    audit_sink.submit(XX_AuditLog(username=..., action_type=..., ...))
+"""
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    "ASYNC": True,
+    "BATCH_SIZE": 200,
+    "FLUSH_INTERVAL": 1.0,
+    "MAX_QUEUE_SIZE": 10000,
+    "PUT_TIMEOUT": 0.05,
+    "OVERFLOW": "drop",
+}
+
+OVERFLOW_DROP = "drop"
+OVERFLOW_SYNC = "sync"
+
+# Log a dropped-records warning at most this often (seconds)
+DROP_WARNING_INTERVAL = 60
+
+
+class AuditSink:
+    """
+    Bounded queue of unsaved XX_AuditLog instances drained by a writer thread.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._queue = None
+        self._thread = None
+        self._pid = None
+        self._stopping = threading.Event()
+        self._stats = {"submitted": 0, "written": 0, "dropped": 0, "failed": 0}
+        self._last_drop_warning = 0.0
+        self._atexit_registered = False
+
+    # ------------------------------------------------------------------
+    # Configuration
+    # ------------------------------------------------------------------
+
+    def _setting(self, name):
+        return getattr(settings, "AUDIT_LOG_SINK", {}).get(name, DEFAULTS[name])
+
+    @property
+    def is_async(self):
+        return bool(self._setting("ASYNC"))
+
+    # ------------------------------------------------------------------
+    # Submitting
+    # ------------------------------------------------------------------
+
+    def submit(self, record):
+        """
+        Queue an unsaved XX_AuditLog for writing once the current transaction commits.
+        """
+        # Runs immediately when not inside an atomic block
+        transaction.on_commit(lambda: self._enqueue(record))
+
+    def _enqueue(self, record):
+        self._count("submitted")
+        if not self.is_async:
+            self._write([record])
+            return
+
+        self._ensure_started()
+        try:
+            self._queue.put(record, timeout=self._setting("PUT_TIMEOUT"))
+        except queue.Full:
+            if self._setting("OVERFLOW") == OVERFLOW_SYNC:
+                self._write([record])
+            else:
+                self._count("dropped")
+                self._warn_dropped()
+
+    def _warn_dropped(self):
+        now = time.monotonic()
+        if now - self._last_drop_warning >= DROP_WARNING_INTERVAL:
+            self._last_drop_warning = now
+            logger.warning(
+                f"Audit log queue full - dropping records ({self._stats['dropped']} dropped so far)"
+            )
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _ensure_started(self):
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid != pid:
+                # New process (fork): the parent's queue and thread are not ours
+                self._queue = queue.Queue(maxsize=self._setting("MAX_QUEUE_SIZE"))
+                self._thread = None
+                self._pid = pid
+            if self._thread is None or not self._thread.is_alive():
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="audit-log-writer", daemon=True)
+                self._thread.start()
+            if not self._atexit_registered:
+                atexit.register(self.shutdown)
+                self._atexit_registered = True
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._collect(self._setting("BATCH_SIZE"), self._setting("FLUSH_INTERVAL"))
+            if batch:
+                # This thread's connection outlives any request: replace it once
+                # stale or broken. Never done for inline writes, where the
+                # connection belongs to the caller.
+                close_old_connections()
+                self._write(batch)
+
+    def _collect(self, batch_size, flush_interval):
+        """Wait for up to batch_size records, for at most flush_interval seconds."""
+        batch = []
+        deadline = time.monotonic() + flush_interval
+        while len(batch) < batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self):
+        batch = []
+        if self._queue is None:
+            return batch
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                return batch
+
+    def _write(self, records):
+        from .audit_models import XX_AuditLog
+
+        try:
+            XX_AuditLog.objects.bulk_create(records, batch_size=self._setting("BATCH_SIZE"))
+            self._count("written", len(records))
+            return
+        except Exception as e:
+            logger.error(f"Bulk audit log write of {len(records)} records failed: {e}")
+
+        # Write one by one so a single bad record does not lose the batch
+        for record in records:
+            try:
+                record.pk = None
+                record.save(force_insert=True)
+                self._count("written")
+            except Exception as e:
+                self._count("failed")
+                logger.error(f"Failed to write audit log '{record.action_description[:100]}': {e}")
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._stats[name] += amount
+
+    # ------------------------------------------------------------------
+    # Flushing / shutdown
+    # ------------------------------------------------------------------
+
+    def flush(self):
+        """Write everything currently queued, in the calling thread."""
+        batch = self._drain()
+        batch_size = self._setting("BATCH_SIZE")
+        for start in range(0, len(batch), batch_size):
+            self._write(batch[start:start + batch_size])
+        return len(batch)
+
+    def shutdown(self, timeout=5.0):
+        """Stop the writer thread and flush the remaining records."""
+        self._stopping.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and self._pid == os.getpid():
+            thread.join(timeout)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats, queued=self._queue.qsize() if self._queue is not None else 0)
+
+
+# Global sink instance
+audit_sink = AuditSink()
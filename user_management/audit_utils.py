@@ -4,6 +4,7 @@ Utility functions for creating audit logs programmatically.
 import json
 from django.contrib.contenttypes.models import ContentType
 from .audit_models import XX_AuditLog, XX_AuditLoginHistory
+from .audit_sink import audit_sink
 
 
 class AuditLogger:
@@ -24,7 +25,8 @@ class AuditLogger:
         status='SUCCESS',
         error_message=None,
         metadata=None,
-        request=None
+        request=None,
+        defer=False
     ):
         """
         Create an audit log entry.
@@ -41,9 +43,10 @@ class AuditLogger:
             error_message: Error message if action failed
             metadata: Additional metadata dict
             request: HTTP request object (optional)
+            defer: Hand the entry to the batched audit_sink instead of inserting it now
         
         Returns:
-            XX_AuditLog instance
+            XX_AuditLog instance (unsaved when deferred)
         """
         
         # Prepare data
@@ -84,7 +87,7 @@ class AuditLogger:
         metadata_json = json.dumps(metadata) if metadata else None
         
         # Create audit log
-        audit_log = XX_AuditLog.objects.create(
+        audit_log = XX_AuditLog(
             user=user,
             username=username,
             action_type=action_type,
@@ -105,6 +108,11 @@ class AuditLogger:
             module=module,
         )
         
+        if defer:
+            audit_sink.submit(audit_log)
+        else:
+            audit_log.save()
+        
         return audit_log
     
     @staticmethod
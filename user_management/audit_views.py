@@ -5,9 +5,10 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db.models import Count, Q
+from django.db.models import Q
 from django.utils import timezone
 from datetime import timedelta
+from . import audit_rollups
 from .audit_models import XX_AuditLog, XX_AuditLoginHistory
 from .audit_serializers import (
     AuditLogSerializer,
@@ -110,45 +111,31 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         Get audit statistics.
         
         Query params:
-        - days: Number of days to include (default: 30)
+        - days: Number of days before today to include (default: 30)
         """
         days = int(request.query_params.get('days', 30))
-        start_date = timezone.now() - timedelta(days=days)
+        # Whole days: closed days are counted from the daily rollups
+        start_day = timezone.localdate() - timedelta(days=days)
+        start_date = audit_rollups.day_start(start_day)
         
         queryset = XX_AuditLog.objects.filter(timestamp__gte=start_date)
         
         # Only show user's own stats if not admin
         user = request.user
+        stats_user = None
         if hasattr(user, 'role') and user.role not in ['admin', 'superadmin']:
             queryset = queryset.filter(user=user)
+            stats_user = user
         
-        # Total actions
-        total_actions = queryset.count()
-        
-        # Actions by type
-        actions_by_type = dict(
-            queryset.values('action_type')
-            .annotate(count=Count('audit_id'))
-            .values_list('action_type', 'count')
-        )
+        counts = audit_rollups.audit_statistics(start_day, user=stats_user)
         
         # Actions by user (only for admins)
         actions_by_user = {}
         if hasattr(user, 'role') and user.role in ['admin', 'superadmin']:
             actions_by_user = dict(
-                queryset.values('username')
-                .annotate(count=Count('audit_id'))
-                .order_by('-count')[:10]
-                .values_list('username', 'count')
+                sorted(counts['actions_by_user'].items(), key=lambda item: item[1], reverse=True)[:10]
             )
         
-        # Actions by module
-        actions_by_module = dict(
-            queryset.values('module')
-            .annotate(count=Count('audit_id'))
-            .values_list('module', 'count')
-        )
-        
         # Recent errors
         recent_errors = queryset.filter(
             Q(severity__in=['ERROR', 'CRITICAL']) | Q(status='FAILED')
@@ -161,10 +148,11 @@ class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
         )
         
         stats = {
-            'total_actions': total_actions,
-            'actions_by_type': actions_by_type,
+            'total_actions': counts['total_actions'],
+            'actions_by_type': counts['actions_by_type'],
             'actions_by_user': actions_by_user,
-            'actions_by_module': actions_by_module,
+            'actions_by_module': counts['actions_by_module'],
+            'actions_by_severity': counts['actions_by_severity'],
             'recent_errors': list(recent_errors),
             'time_range': {
                 'start': start_date.isoformat(),
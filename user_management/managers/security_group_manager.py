@@ -12,6 +12,7 @@ from user_management.models import (
     xx_UserLevel,
 )
 from account_and_entitys.models import XX_SegmentType, XX_Segment
+from user_management.access_cache import user_access_cache
 
 
 class SecurityGroupManager:
@@ -298,6 +299,19 @@ class SecurityGroupManager:
             'errors': []
         }
     
+    @staticmethod
+    def get_user_access_map(user):
+        """
+        Get the compiled segment access map of a user (cached, see access_cache).
+        
+        Args:
+            user: xx_User instance
+            
+        Returns:
+            dict: {segment_type_id: frozenset(segment_codes)}, hierarchy expanded
+        """
+        return user_access_cache.get_access_map(user)
+    
     @staticmethod
     def get_user_accessible_segments(user):
         """
@@ -306,6 +320,8 @@ class SecurityGroupManager:
         Respects member-specific segment assignments:
         - If member has assigned_segments, only those are returned
         - Otherwise, all group segments are returned
+        For segment types with a hierarchy, descendants of accessible segments
+        are included.
         
         Args:
             user: xx_User instance
@@ -313,39 +329,11 @@ class SecurityGroupManager:
         Returns:
             dict: {segment_type_id: [segment_codes]}
         """
-        accessible_segments = {}
-        
-        # Get all active memberships
-        memberships = XX_UserGroupMembership.objects.filter(
-            user=user,
-            is_active=True,
-            security_group__is_active=True
-        ).prefetch_related('assigned_segments__segment_type', 'assigned_segments__segment')
-        
-        print(f"\n=== DEBUG get_user_accessible_segments for user={user.username} ===")
-        print(f"Found {memberships.count()} active memberships")
-        
-        for membership in memberships:
-            print(f"\nProcessing membership: group={membership.security_group.group_name}, group_id={membership.security_group.id}")
-            
-            # Use the get_member_segments helper to get correct segments
-            member_segments = SecurityGroupManager.get_member_segments(membership)
-            
-            print(f"Member segments result: {member_segments}")
-            
-            # Merge into accessible_segments
-            for seg_type_id, seg_codes in member_segments.items():
-                if seg_type_id not in accessible_segments:
-                    accessible_segments[seg_type_id] = []
-                
-                for seg_code in seg_codes:
-                    if seg_code not in accessible_segments[seg_type_id]:
-                        accessible_segments[seg_type_id].append(seg_code)
-        
-        print(f"\nFinal accessible_segments for user {user.username}: {accessible_segments}")
-        print("=== END DEBUG ===\n")
-        
-        return accessible_segments
+        access_map = user_access_cache.get_access_map(user)
+        return {
+            seg_type_id: sorted(seg_codes)
+            for seg_type_id, seg_codes in access_map.items()
+        }
     
     @staticmethod
     def assign_segments_to_member(membership, segment_assignment_ids, assigned_by=None):
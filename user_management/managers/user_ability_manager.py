@@ -7,11 +7,71 @@ Replaces legacy xx_UserAbility with flexible segment-based abilities.
 Phase 4: User Models Update
 """
 
+from collections import defaultdict
+
 from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 
 
+# Operation name -> ability type it requires
+OPERATION_ABILITY_TYPES = {
+    'edit': 'EDIT',
+    'edit_transfer': 'EDIT',
+    'modify': 'EDIT',
+    'approve': 'APPROVE',
+    'approve_transfer': 'APPROVE',
+    'view': 'VIEW',
+    'delete': 'DELETE',
+    'transfer': 'TRANSFER',
+    'transfer_budget': 'TRANSFER',
+    'report': 'REPORT',
+    'generate_report': 'REPORT',
+}
+
+
+class UserAbilityIndex:
+    """
+    A user's active abilities, indexed for in-memory combination checks.
+
+    Abilities are grouped by ability type and then by "shape" (the sorted
+    segment type IDs they constrain), and keyed within a shape by their
+    (segment_type_id, segment_code) pairs. A combination is checked by
+    projecting it onto each shape and looking the projection up, so the
+    cost is one dict lookup per distinct shape rather than one per ability.
+    """
+
+    def __init__(self, abilities):
+        # {ability_type: {shape: {segment_key: [ability, ...]}}}
+        self._index = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+        for ability in abilities:
+            segments = {str(k): str(v) for k, v in ability.segment_combination.items()}
+            shape = tuple(sorted(segments))
+            key = tuple(segments[seg_type_id] for seg_type_id in shape)
+            self._index[ability.ability_type][shape][key].append(ability)
+
+    def matches(self, ability_type, segment_combination):
+        """Abilities of the given type matching a combination, in grant (pk) order."""
+        normalized = {str(k): str(v) for k, v in segment_combination.items()}
+        matched = []
+        for shape, abilities_by_key in self._index.get(ability_type, {}).items():
+            if any(seg_type_id not in normalized for seg_type_id in shape):
+                continue
+            key = tuple(normalized[seg_type_id] for seg_type_id in shape)
+            matched.extend(abilities_by_key.get(key, ()))
+        matched.sort(key=lambda ability: ability.pk)
+        return matched
+
+    def check(self, ability_type, segment_combination):
+        """Same result shape as UserAbilityManager.check_user_has_ability()."""
+        matched = self.matches(ability_type, segment_combination)
+        return {
+            'has_ability': bool(matched),
+            'ability': matched[0] if matched else None,
+            'matched_combinations': [ability.segment_combination for ability in matched]
+        }
+
+
 class UserAbilityManager:
     """
     Manager for XX_UserSegmentAbility model operations.
@@ -202,34 +262,9 @@ class UserAbilityManager:
                 'matched_combinations': list
             }
         """
-        from user_management.models import XX_UserSegmentAbility
-        
         try:
-            # Get all active abilities of this type for user
-            abilities = XX_UserSegmentAbility.objects.filter(
-                user=user,
-                ability_type=ability_type,
-                is_active=True
-            )
-            
-            # Normalize input
-            normalized_input = {str(k): str(v) for k, v in segment_combination.items()}
-            
-            # Check each ability to see if it matches
-            matched_combinations = []
-            matching_ability = None
-            
-            for ability in abilities:
-                if ability.matches_segments(normalized_input):
-                    matched_combinations.append(ability.segment_combination)
-                    if not matching_ability:
-                        matching_ability = ability
-            
-            return {
-                'has_ability': len(matched_combinations) > 0,
-                'ability': matching_ability,
-                'matched_combinations': matched_combinations
-            }
+            index = UserAbilityManager.build_ability_index(user, ability_types=[ability_type])
+            return index.check(ability_type, segment_combination)
             
         except Exception as e:
             return {
@@ -239,6 +274,42 @@ class UserAbilityManager:
                 'error': str(e)
             }
     
+    @staticmethod
+    def build_ability_index(user, ability_types=None):
+        """
+        Load the user's active abilities once and index them for in-memory checks.
+        
+        Args:
+            user: xx_User instance
+            ability_types: iterable of str (optional) - Only load these ability types
+            
+        Returns:
+            UserAbilityIndex
+        """
+        from user_management.models import XX_UserSegmentAbility
+        
+        abilities = XX_UserSegmentAbility.objects.filter(user=user, is_active=True)
+        if ability_types is not None:
+            abilities = abilities.filter(ability_type__in=list(ability_types))
+        return UserAbilityIndex(abilities.order_by('pk'))
+    
+    @staticmethod
+    def check_user_abilities_bulk(user, ability_type, segment_combinations):
+        """
+        Check one ability type against many segment combinations with a single query.
+        
+        Args:
+            user: xx_User instance
+            ability_type: str - Ability type to check
+            segment_combinations: list of dicts - [{segment_type_id: segment_code}, ...]
+            
+        Returns:
+            list of dicts, one per combination in input order, each shaped like
+            check_user_has_ability(): {'has_ability', 'ability', 'matched_combinations'}
+        """
+        index = UserAbilityManager.build_ability_index(user, ability_types=[ability_type])
+        return [index.check(ability_type, combination) for combination in segment_combinations]
+    
     @staticmethod
     def get_user_abilities(user, ability_type=None, segment_type_id=None, include_inactive=False):
         """
@@ -426,22 +497,7 @@ class UserAbilityManager:
                 'ability': XX_UserSegmentAbility or None
             }
         """
-        # Map operations to ability types
-        operation_mapping = {
-            'edit': 'EDIT',
-            'edit_transfer': 'EDIT',
-            'modify': 'EDIT',
-            'approve': 'APPROVE',
-            'approve_transfer': 'APPROVE',
-            'view': 'VIEW',
-            'delete': 'DELETE',
-            'transfer': 'TRANSFER',
-            'transfer_budget': 'TRANSFER',
-            'report': 'REPORT',
-            'generate_report': 'REPORT',
-        }
-        
-        ability_type = operation_mapping.get(operation.lower())
+        ability_type = OPERATION_ABILITY_TYPES.get(operation.lower())
         
         if not ability_type:
             return {
@@ -469,3 +525,50 @@ class UserAbilityManager:
                 'reason': f"User does not have '{ability_type}' ability for this segment combination",
                 'ability': None
             }
+    
+    @staticmethod
+    def validate_abilities_for_operation(user, operation, segment_combinations):
+        """
+        Validate an operation against many segment combinations (e.g. every line
+        of a transfer) with a single query.
+        
+        Args:
+            user: xx_User instance
+            operation: str - Operation name (e.g., 'edit_transfer', 'approve_transfer')
+            segment_combinations: list of dicts - [{segment_type_id: segment_code}, ...]
+            
+        Returns:
+            dict: {
+                'allowed': bool - True if every combination is allowed,
+                'reason': str or None,
+                'results': list of {'allowed', 'reason', 'ability'} in input order
+            }
+        """
+        ability_type = OPERATION_ABILITY_TYPES.get(operation.lower())
+        
+        if not ability_type:
+            reason = f"Unknown operation '{operation}'"
+            return {
+                'allowed': False,
+                'reason': reason,
+                'results': [
+                    {'allowed': False, 'reason': reason, 'ability': None}
+                    for _ in segment_combinations
+                ]
+            }
+        
+        denied_reason = f"User does not have '{ability_type}' ability for this segment combination"
+        results = []
+        for check in UserAbilityManager.check_user_abilities_bulk(user, ability_type, segment_combinations):
+            results.append({
+                'allowed': check['has_ability'],
+                'reason': None if check['has_ability'] else denied_reason,
+                'ability': check['ability']
+            })
+        
+        denied = sum(1 for result in results if not result['allowed'])
+        return {
+            'allowed': denied == 0,
+            'reason': f"User lacks '{ability_type}' ability for {denied} segment combination(s)" if denied else None,
+            'results': results
+        }
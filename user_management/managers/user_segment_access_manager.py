@@ -11,6 +11,16 @@ from django.db import models, transaction
 from django.core.exceptions import ValidationError
 from django.db.models import Q
 
+from user_management.access_cache import user_access_cache
+
+# Access level hierarchy (higher levels include lower levels)
+ACCESS_LEVEL_RANKS = {
+    'VIEW': 1,
+    'EDIT': 2,
+    'APPROVE': 3,
+    'ADMIN': 4
+}
+
 
 class UserSegmentAccessManager:
     """
@@ -151,6 +161,8 @@ class UserSegmentAccessManager:
             # Revoke
             if soft_delete:
                 accesses.update(is_active=False)
+                # Bulk updates send no signals
+                user_access_cache.invalidate_user(user.pk)
             else:
                 accesses.delete()
             
@@ -578,12 +590,80 @@ class UserSegmentAccessManager:
                 'errors': [f"Error granting access to children: {str(e)}"]
             }
     
+    @staticmethod
+    def _get_chain_accesses(user, chains):
+        """
+        Load the user's active grants on every code of the given ancestor chains in one query.
+        
+        Args:
+            chains: dict {segment_type_id: iterable of codes}
+            
+        Returns:
+            dict: {(segment_type_id, segment_code): [XX_UserSegmentAccess, ...]}
+        """
+        from user_management.models import XX_UserSegmentAccess
+        
+        all_codes = {code for codes in chains.values() for code in codes}
+        if not all_codes:
+            return {}
+        
+        accesses = XX_UserSegmentAccess.objects.filter(
+            user=user,
+            segment_type_id__in=list(chains),
+            segment__code__in=all_codes,
+            is_active=True
+        ).select_related('segment_type', 'segment')
+        
+        by_segment = {}
+        for access in accesses:
+            key = (access.segment_type_id, access.segment.code)
+            if access.segment.code in chains.get(access.segment_type_id, ()):
+                by_segment.setdefault(key, []).append(access)
+        return by_segment
+    
+    @staticmethod
+    def _resolve_on_chain(segment_type_id, chain, accesses, required_level):
+        """
+        Resolve access on an ancestor chain (segment first, root last).
+        
+        The closest segment holding a grant of at least required_level wins;
+        its highest such grant is returned.
+        """
+        required_rank = ACCESS_LEVEL_RANKS.get(required_level, 1)
+        
+        for depth, code in enumerate(chain):
+            best = None
+            for access in accesses.get((segment_type_id, code), ()):
+                rank = ACCESS_LEVEL_RANKS.get(access.access_level, 0)
+                if rank >= required_rank and (
+                    best is None or rank > ACCESS_LEVEL_RANKS.get(best.access_level, 0)
+                ):
+                    best = access
+            if best is not None:
+                return {
+                    'has_access': True,
+                    'access_level': best.access_level,
+                    'access': best,
+                    'inherited_from': code if depth else None
+                }
+        
+        return {
+            'has_access': False,
+            'access_level': None,
+            'access': None,
+            'inherited_from': None
+        }
+    
     @staticmethod
     def check_user_has_access_hierarchical(user, segment_type_id, segment_code, required_level='VIEW'):
         """
         Check if user has access to a segment OR any of its parent segments (for hierarchical segments).
         This allows granting access at parent level to apply to all children.
         
+        The segment's ancestor chain comes from the cached parent map
+        (user_access_cache) and the user's grants on the whole chain are
+        loaded in one query.
+        
         Args:
             user: xx_User instance
             segment_type_id: int - Segment type ID
@@ -598,91 +678,14 @@ class UserSegmentAccessManager:
                 'inherited_from': str or None - Parent segment code if inherited
             }
         """
-        from user_management.models import XX_UserSegmentAccess
-        from account_and_entitys.models import XX_SegmentType, XX_Segment
-        
-        ACCESS_HIERARCHY = {
-            'VIEW': 1,
-            'EDIT': 2,
-            'APPROVE': 3,
-            'ADMIN': 4
-        }
-        
         try:
-            # First, check direct access on this segment
-            direct_result = UserSegmentAccessManager.check_user_has_access(
-                user=user,
-                segment_type_id=segment_type_id,
-                segment_code=segment_code,
-                required_level=required_level
-            )
-            
-            if direct_result['has_access']:
-                return {
-                    'has_access': True,
-                    'access_level': direct_result['access_level'],
-                    'access': direct_result['access'],
-                    'inherited_from': None
-                }
-            
-            # Check if segment type supports hierarchy
-            segment_type = XX_SegmentType.objects.get(segment_id=segment_type_id)
-            if not segment_type.has_hierarchy:
-                return {
-                    'has_access': False,
-                    'access_level': None,
-                    'access': None,
-                    'inherited_from': None
-                }
-            
-            # Get segment object to traverse parents
-            segment = XX_Segment.objects.get(
-                segment_type=segment_type,
-                code=segment_code
+            segment_type_id = int(segment_type_id)
+            chain = user_access_cache.get_ancestor_chain(segment_type_id, segment_code)
+            accesses = UserSegmentAccessManager._get_chain_accesses(user, {segment_type_id: chain})
+            return UserSegmentAccessManager._resolve_on_chain(
+                segment_type_id, chain, accesses, required_level
             )
             
-            # Traverse up the parent hierarchy
-            current_code = segment.parent_code
-            while current_code:
-                # Check access on parent
-                parent_accesses = XX_UserSegmentAccess.objects.filter(
-                    user=user,
-                    segment_type=segment_type,
-                    segment__code=current_code,
-                    is_active=True
-                ).select_related('segment')
-                
-                # Check if any parent access meets required level
-                for parent_access in parent_accesses:
-                    user_level = ACCESS_HIERARCHY.get(parent_access.access_level, 0)
-                    req_level = ACCESS_HIERARCHY.get(required_level, 0)
-                    
-                    if user_level >= req_level:
-                        return {
-                            'has_access': True,
-                            'access_level': parent_access.access_level,
-                            'access': parent_access,
-                            'inherited_from': current_code
-                        }
-                
-                # Move to next parent
-                try:
-                    parent_segment = XX_Segment.objects.get(
-                        segment_type=segment_type,
-                        code=current_code
-                    )
-                    current_code = parent_segment.parent_code
-                except XX_Segment.DoesNotExist:
-                    break
-            
-            # No access found in hierarchy
-            return {
-                'has_access': False,
-                'access_level': None,
-                'access': None,
-                'inherited_from': None
-            }
-            
         except Exception as e:
             return {
                 'has_access': False,
@@ -692,6 +695,40 @@ class UserSegmentAccessManager:
                 'error': str(e)
             }
     
+    @staticmethod
+    def check_user_access_bulk(user, segments, required_level='VIEW'):
+        """
+        Hierarchical access check for many segments at once.
+        
+        Resolves every ancestor chain from the cached parent maps and loads the
+        user's grants on all of them in a single query.
+        
+        Args:
+            user: xx_User instance
+            segments: iterable of (segment_type_id, segment_code) pairs
+            required_level: str - Minimum access level required
+            
+        Returns:
+            dict: {(segment_type_id, segment_code): result} with the same result
+                  dicts as check_user_has_access_hierarchical
+        """
+        pairs = [(int(segment_type_id), segment_code) for segment_type_id, segment_code in segments]
+        global_version = user_access_cache.get_global_version()
+        chains = {
+            pair: user_access_cache.get_ancestor_chain(*pair, global_version=global_version)
+            for pair in dict.fromkeys(pairs)
+        }
+        
+        codes_by_type = {}
+        for (segment_type_id, _), chain in chains.items():
+            codes_by_type.setdefault(segment_type_id, set()).update(chain)
+        accesses = UserSegmentAccessManager._get_chain_accesses(user, codes_by_type)
+        
+        return {
+            pair: UserSegmentAccessManager._resolve_on_chain(pair[0], chain, accesses, required_level)
+            for pair, chain in chains.items()
+        }
+    
     @staticmethod
     def get_effective_access_level(user, segment_type_id, segment_code):
         """
@@ -708,44 +745,40 @@ class UserSegmentAccessManager:
                 'access_level': str or None - Highest access level (VIEW/EDIT/APPROVE/ADMIN)
                 'direct_access': bool - True if access is directly granted, False if inherited
                 'source_segment': str - Segment code where access is granted
+                'access': XX_UserSegmentAccess instance or None
                 'errors': list
             }
         """
-        from account_and_entitys.models import XX_SegmentType, XX_Segment
-        
-        ACCESS_HIERARCHY = {
-            'VIEW': 1,
-            'EDIT': 2,
-            'APPROVE': 3,
-            'ADMIN': 4
-        }
-        REVERSE_HIERARCHY = {v: k for k, v in ACCESS_HIERARCHY.items()}
-        
         try:
-            # Check all access levels from highest to lowest
-            for level_name in ['ADMIN', 'APPROVE', 'EDIT', 'VIEW']:
-                hierarchical_result = UserSegmentAccessManager.check_user_has_access_hierarchical(
-                    user=user,
-                    segment_type_id=segment_type_id,
-                    segment_code=segment_code,
-                    required_level=level_name
-                )
-                
-                if hierarchical_result['has_access']:
-                    return {
-                        'success': True,
-                        'access_level': hierarchical_result['access_level'],
-                        'direct_access': hierarchical_result['inherited_from'] is None,
-                        'source_segment': hierarchical_result['inherited_from'] or segment_code,
-                        'errors': []
-                    }
-            
-            # No access found
+            segment_type_id = int(segment_type_id)
+            chain = user_access_cache.get_ancestor_chain(segment_type_id, segment_code)
+            accesses = UserSegmentAccessManager._get_chain_accesses(user, {segment_type_id: chain})
+            
+            # Highest level anywhere on the chain, granted closest to the segment
+            best = None
+            best_depth = None
+            for depth, code in enumerate(chain):
+                for access in accesses.get((segment_type_id, code), ()):
+                    rank = ACCESS_LEVEL_RANKS.get(access.access_level, 0)
+                    if best is None or rank > ACCESS_LEVEL_RANKS.get(best.access_level, 0):
+                        best, best_depth = access, depth
+            
+            if best is None:
+                return {
+                    'success': True,
+                    'access_level': None,
+                    'direct_access': False,
+                    'source_segment': None,
+                    'access': None,
+                    'errors': []
+                }
+            
             return {
                 'success': True,
-                'access_level': None,
-                'direct_access': False,
-                'source_segment': None,
+                'access_level': best.access_level,
+                'direct_access': best_depth == 0,
+                'source_segment': chain[best_depth],
+                'access': best,
                 'errors': []
             }
             
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:48
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('account_and_entitys', '0009_alter_xx_gfs_mamping_same'),
+        ('user_management', '0007_xx_auditloginhistory_xx_auditlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XX_UserAccessibleSegment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('segment_code', models.CharField(help_text='Segment code reachable by the user', max_length=50)),
+                ('segment_type', models.ForeignKey(help_text='Type of segment', on_delete=django.db.models.deletion.CASCADE, related_name='accessible_to_users', to='account_and_entitys.xx_segmenttype')),
+                ('user', models.ForeignKey(help_text='User who reaches this segment', on_delete=django.db.models.deletion.CASCADE, related_name='accessible_segments', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'XX_USER_ACCESSIBLE_SEGMENT_XX',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='xx_useraccessiblesegment',
+            constraint=models.UniqueConstraint(fields=('user', 'segment_type', 'segment_code'), name='unique_user_accessible_segment'),
+        ),
+    ]
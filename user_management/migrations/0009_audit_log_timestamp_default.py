@@ -0,0 +1,19 @@
+# Generated by Django 4.2.7 on 2026-10-18 21:55
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0008_user_accessible_segment'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='xx_auditlog',
+            name='timestamp',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, help_text='When the action was performed (set when queued, not when written)'),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:06
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0009_audit_log_timestamp_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XX_AuditLogRollupDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('total', models.IntegerField(default=0, help_text='Audit log entries of the day')),
+                ('rolled_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('archived', models.BooleanField(default=False, help_text="Whether the day's raw entries were moved out of XX_AUDIT_LOG_XX")),
+            ],
+            options={
+                'verbose_name': 'Audit Log Rollup Day',
+                'verbose_name_plural': 'Audit Log Rollup Days',
+                'db_table': 'XX_AUDIT_LOG_ROLLUP_DAY_XX',
+                'ordering': ['-day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='XX_AuditLogArchive',
+            fields=[
+                ('audit_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('month', models.CharField(db_index=True, help_text='YYYY-MM of timestamp', max_length=7)),
+                ('user_id', models.IntegerField(blank=True, null=True)),
+                ('username', models.CharField(blank=True, max_length=255, null=True)),
+                ('action_type', models.CharField(max_length=50)),
+                ('action_description', models.TextField()),
+                ('severity', models.CharField(default='INFO', max_length=20)),
+                ('endpoint', models.CharField(blank=True, max_length=500, null=True)),
+                ('request_method', models.CharField(blank=True, max_length=10, null=True)),
+                ('ip_address', models.GenericIPAddressField(blank=True, null=True)),
+                ('user_agent', models.TextField(blank=True, null=True)),
+                ('content_type_id', models.IntegerField(blank=True, null=True)),
+                ('object_id', models.PositiveIntegerField(blank=True, null=True)),
+                ('object_repr', models.CharField(blank=True, max_length=500, null=True)),
+                ('old_values', models.TextField(blank=True, null=True)),
+                ('new_values', models.TextField(blank=True, null=True)),
+                ('metadata', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(default='SUCCESS', max_length=20)),
+                ('error_message', models.TextField(blank=True, null=True)),
+                ('timestamp', models.DateTimeField()),
+                ('duration_ms', models.IntegerField(blank=True, null=True)),
+                ('module', models.CharField(blank=True, max_length=100, null=True)),
+            ],
+            options={
+                'verbose_name': 'Archived Audit Log',
+                'verbose_name_plural': 'Archived Audit Logs',
+                'db_table': 'XX_AUDIT_LOG_ARCHIVE_XX',
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['user_id', '-timestamp'], name='XX_AUDIT_LO_user_id_b29d1f_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='XX_AuditLogDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('username', models.CharField(blank=True, max_length=255, null=True)),
+                ('action_type', models.CharField(max_length=50)),
+                ('module', models.CharField(blank=True, max_length=100, null=True)),
+                ('severity', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Audit Log Daily Rollup',
+                'verbose_name_plural': 'Audit Log Daily Rollups',
+                'db_table': 'XX_AUDIT_LOG_DAILY_ROLLUP_XX',
+                'indexes': [models.Index(fields=['day'], name='XX_AUDIT_LO_day_067471_idx'), models.Index(fields=['user', 'day'], name='XX_AUDIT_LO_user_id_f9eeff_idx')],
+            },
+        ),
+    ]
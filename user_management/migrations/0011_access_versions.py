@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0010_audit_log_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='XX_AccessVersion',
+            fields=[
+                ('scope', models.CharField(max_length=40, primary_key=True, serialize=False)),
+                ('token', models.CharField(blank=True, default='', max_length=32)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'db_table': 'XX_ACCESS_VERSION_XX',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-18 22:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user_management', '0011_access_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='xx_accessversion',
+            name='materialized',
+            field=models.CharField(blank=True, default='', max_length=120),
+        ),
+    ]
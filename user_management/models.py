@@ -216,6 +216,71 @@ class XX_UserSegmentAccess(models.Model):
         super().save(*args, **kwargs)
 
 
+class XX_UserAccessibleSegment(models.Model):
+    """
+    Materialized copy of a user's compiled security group access map
+    (see user_management.access_cache), one row per reachable segment code.
+    
+    Lets segment lists filter by access with a join/semi-join instead of an
+    IN list of every granted code. Rows are rewritten lazily by
+    UserAccessCache.ensure_materialized() when the user's access versions
+    change (see XX_AccessVersion.materialized); never edit them directly.
+    """
+    user = models.ForeignKey(
+        xx_User,
+        on_delete=models.CASCADE,
+        related_name='accessible_segments',
+        help_text="User who reaches this segment"
+    )
+    segment_type = models.ForeignKey(
+        XX_SegmentType,
+        on_delete=models.CASCADE,
+        related_name='accessible_to_users',
+        help_text="Type of segment"
+    )
+    segment_code = models.CharField(
+        max_length=50,
+        help_text="Segment code reachable by the user"
+    )
+    
+    class Meta:
+        db_table = 'XX_USER_ACCESSIBLE_SEGMENT_XX'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'segment_type', 'segment_code'],
+                name='unique_user_accessible_segment'
+            )
+        ]
+    
+    def __str__(self):
+        return f"{self.user_id} - {self.segment_type_id}: {self.segment_code}"
+
+
+class XX_AccessVersion(models.Model):
+    """
+    Access version tokens of the compiled access maps (see
+    user_management.access_cache).
+    
+    One row per scope: 'global' for changes that affect every member (groups,
+    group roles/segments, segment hierarchy) and 'user:<id>' for changes to one
+    user's memberships and grants. A new token is written in the transaction
+    that makes the change, so every process sees it once it commits.
+    
+    materialized (user scopes only) is the map key the user's
+    XX_UserAccessibleSegment rows were written for.
+    """
+    scope = models.CharField(max_length=40, primary_key=True)
+    token = models.CharField(max_length=32, blank=True, default='')
+    materialized = models.CharField(max_length=120, blank=True, default='')
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'XX_ACCESS_VERSION_XX'
+    
+    def __str__(self):
+        return f"{self.scope}: {self.token}"
+
+
 class XX_UserSegmentAbility(models.Model):
     """
     Dynamic segment-based user abilities (replaces xx_UserAbility).
@@ -702,4 +767,10 @@ class xx_notification(models.Model):
 
 
 # Import audit models at the end to avoid circular imports
-from .audit_models import XX_AuditLog, XX_AuditLoginHistory
+from .audit_models import (
+    XX_AuditLog,
+    XX_AuditLoginHistory,
+    XX_AuditLogRollupDay,
+    XX_AuditLogDailyRollup,
+    XX_AuditLogArchive,
+)
@@ -47,6 +47,7 @@ from user_management.serializers import (
     BulkAbilityGrantSerializer
 )
 from user_management.managers import UserSegmentAccessManager, UserAbilityManager
+from user_management.managers.user_ability_manager import OPERATION_ABILITY_TYPES
 from user_management.permissions import IsSuperAdmin
 
 
@@ -657,6 +658,13 @@ class UserSegmentAccessHierarchicalCheckView(APIView):
             "required_level": "VIEW"
         }
     
+    Or, to check many segments at once:
+        {
+            "user_id": 5,
+            "segments": [{"segment_type_id": 1, "segment_code": "E001-A-1"}, ...],
+            "required_level": "VIEW"
+        }
+    
     Returns:
         {
             "success": true,
@@ -665,6 +673,13 @@ class UserSegmentAccessHierarchicalCheckView(APIView):
             "inherited_from": "E001",  // If inherited from parent
             "access": {...}
         }
+    
+    Bulk returns:
+        {
+            "success": true,
+            "all_have_access": false,
+            "results": [{"segment_type_id", "segment_code", "has_access", "access_level", "inherited_from"}, ...]
+        }
     """
     permission_classes = [IsAuthenticated]
     
@@ -674,6 +689,10 @@ class UserSegmentAccessHierarchicalCheckView(APIView):
             segment_type_id = request.data.get('segment_type_id')
             segment_code = request.data.get('segment_code')
             required_level = request.data.get('required_level', 'VIEW')
+            segments = request.data.get('segments')
+            
+            if segments is not None:
+                return self._bulk_check(user_id, segments, required_level)
             
             # Validate required fields
             if not all([user_id, segment_type_id, segment_code]):
@@ -720,6 +739,52 @@ class UserSegmentAccessHierarchicalCheckView(APIView):
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
+    def _bulk_check(self, user_id, segments, required_level):
+        if not user_id or not isinstance(segments, list):
+            return Response({
+                'success': False,
+                'error': 'Missing required fields: user_id, segments (list)'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            pairs = [(int(item['segment_type_id']), str(item['segment_code'])) for item in segments]
+        except (KeyError, TypeError, ValueError):
+            return Response({
+                'success': False,
+                'error': 'Each segment needs segment_type_id and segment_code'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user = xx_User.objects.get(id=user_id)
+        except xx_User.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': f'User with id {user_id} not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        results = UserSegmentAccessManager.check_user_access_bulk(
+            user=user,
+            segments=pairs,
+            required_level=required_level
+        )
+        
+        return Response({
+            'success': True,
+            'required_level': required_level,
+            'all_have_access': all(result['has_access'] for result in results.values()),
+            'results': [
+                {
+                    'segment_type_id': pair[0],
+                    'segment_code': pair[1],
+                    'has_access': results[pair]['has_access'],
+                    'access_level': results[pair]['access_level'],
+                    'inherited_from': results[pair]['inherited_from'],
+                }
+                for pair in pairs
+            ]
+        })
+
+
 class UserEffectiveAccessLevelView(APIView):
     """
     Get user's effective access level (highest in hierarchy chain).
@@ -1129,6 +1194,9 @@ class UserSegmentAbilityCheckView(APIView):
             "segment_combination": {"1": "E001", "2": "A100"}
         }
     
+    Several combinations (e.g. every line of a transfer) are checked with a
+    single query by sending "segment_combinations": [{...}, {...}] instead.
+    
     Returns:
         {
             "success": true,
@@ -1143,6 +1211,10 @@ class UserSegmentAbilityCheckView(APIView):
             user_id = request.data.get('user_id')
             ability_type = request.data.get('ability_type')
             segment_combination = request.data.get('segment_combination')
+            segment_combinations = request.data.get('segment_combinations')
+            
+            if segment_combinations is not None:
+                return self._bulk_check(user_id, ability_type, segment_combinations)
             
             # Validate required fields
             if not all([user_id, ability_type, segment_combination]):
@@ -1184,6 +1256,45 @@ class UserSegmentAbilityCheckView(APIView):
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    def _bulk_check(self, user_id, ability_type, segment_combinations):
+        if not user_id or not ability_type or not _is_combination_list(segment_combinations):
+            return Response({
+                'success': False,
+                'error': 'Missing required fields: user_id, ability_type, segment_combinations (list of objects)'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user = xx_User.objects.get(id=user_id)
+        except xx_User.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': f'User with id {user_id} not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        results = UserAbilityManager.check_user_abilities_bulk(
+            user=user,
+            ability_type=ability_type,
+            segment_combinations=segment_combinations
+        )
+        
+        return Response({
+            'success': True,
+            'ability_type': ability_type,
+            'all_have_ability': all(result['has_ability'] for result in results),
+            'results': [
+                {
+                    'segment_combination': combination,
+                    'has_ability': result['has_ability'],
+                    'ability_id': result['ability'].id if result['ability'] else None,
+                }
+                for combination, result in zip(segment_combinations, results)
+            ]
+        })
+
+
+def _is_combination_list(value):
+    return isinstance(value, list) and all(isinstance(item, dict) for item in value)
+
 
 class UserSegmentAbilityBulkGrantView(APIView):
     """
@@ -1436,6 +1547,9 @@ class ValidateAbilityForOperationView(APIView):
             "segment_combination": {"1": "E001", "2": "A100"}
         }
     
+    Several combinations are validated with a single query by sending
+    "segment_combinations": [{...}, {...}] instead.
+    
     Operations map to ability types:
         - approve_transfer → APPROVE
         - edit_budget → EDIT
@@ -1460,6 +1574,10 @@ class ValidateAbilityForOperationView(APIView):
             user_id = request.data.get('user_id')
             operation = request.data.get('operation')
             segment_combination = request.data.get('segment_combination')
+            segment_combinations = request.data.get('segment_combinations')
+            
+            if segment_combinations is not None:
+                return self._bulk_validate(user_id, operation, segment_combinations)
             
             # Validate required fields
             if not all([user_id, operation, segment_combination]):
@@ -1484,15 +1602,7 @@ class ValidateAbilityForOperationView(APIView):
                 segment_combination=segment_combination
             )
             
-            # Map operations to ability types for response
-            operation_mapping = {
-                'edit': 'EDIT', 'edit_transfer': 'EDIT', 'modify': 'EDIT',
-                'approve': 'APPROVE', 'approve_transfer': 'APPROVE',
-                'view': 'VIEW', 'delete': 'DELETE',
-                'transfer': 'TRANSFER', 'transfer_budget': 'TRANSFER',
-                'report': 'REPORT', 'generate_report': 'REPORT',
-            }
-            required_ability = operation_mapping.get(operation.lower(), operation.upper())
+            required_ability = OPERATION_ABILITY_TYPES.get(operation.lower(), operation.upper())
             
             response_data = {
                 'success': True,
@@ -1515,6 +1625,46 @@ class ValidateAbilityForOperationView(APIView):
                 'success': False,
                 'error': str(e)
             }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    
+    def _bulk_validate(self, user_id, operation, segment_combinations):
+        if not user_id or not operation or not _is_combination_list(segment_combinations):
+            return Response({
+                'success': False,
+                'error': 'Missing required fields: user_id, operation, segment_combinations (list of objects)'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            user = xx_User.objects.get(id=user_id)
+        except xx_User.DoesNotExist:
+            return Response({
+                'success': False,
+                'error': f'User with id {user_id} not found'
+            }, status=status.HTTP_404_NOT_FOUND)
+        
+        result = UserAbilityManager.validate_abilities_for_operation(
+            user=user,
+            operation=operation,
+            segment_combinations=segment_combinations
+        )
+        
+        response_data = {
+            'success': True,
+            'allowed': result['allowed'],
+            'required_ability': OPERATION_ABILITY_TYPES.get(operation.lower(), operation.upper()),
+            'results': [
+                {
+                    'segment_combination': combination,
+                    'allowed': line['allowed'],
+                    'ability_id': line['ability'].id if line['ability'] else None,
+                }
+                for combination, line in zip(segment_combinations, result['results'])
+            ]
+        }
+        
+        if result.get('reason'):
+            response_data['reason'] = result['reason']
+        
+        return Response(response_data)
 
 
 # =============================================================================
@@ -1,10 +1,19 @@
 """
-Signal handlers for Security Group System validations.
+Signal handlers for Security Group System validations and access cache invalidation.
 """
-from django.db.models.signals import m2m_changed, pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.core.exceptions import ValidationError
-from .models import XX_UserGroupMembership, XX_SecurityGroupRole, XX_SecurityGroupSegment
+from account_and_entitys.models import XX_Segment
+from . import state_tracking
+from .access_cache import user_access_cache
+from .models import (
+    XX_SecurityGroup,
+    XX_SecurityGroupRole,
+    XX_SecurityGroupSegment,
+    XX_UserGroupMembership,
+    XX_UserSegmentAccess,
+)
 
 
 @receiver(m2m_changed, sender=XX_UserGroupMembership.assigned_roles.through)
@@ -70,3 +79,82 @@ def validate_assigned_segments(sender, instance, action, **kwargs):
                         f"Segment '{seg_assignment.segment.code}' (Type: {seg_assignment.segment_type.segment_name}) "
                         f"does not belong to security group '{instance.security_group.group_name}' or is inactive."
                     )
+
+
+# =============================================================================
+# Access map cache invalidation (see access_cache.py)
+# =============================================================================
+
+@receiver(post_save, sender=XX_UserGroupMembership)
+@receiver(post_delete, sender=XX_UserGroupMembership)
+def invalidate_member_access(sender, instance, **kwargs):
+    """Membership changes only affect the member's access map."""
+    user_access_cache.invalidate_user(instance.user_id)
+
+
+@receiver(m2m_changed, sender=XX_UserGroupMembership.assigned_roles.through)
+@receiver(m2m_changed, sender=XX_UserGroupMembership.assigned_segments.through)
+def invalidate_member_assignment_access(sender, instance, action, reverse=False, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        # Changed from the role/segment side - several members may be affected
+        user_access_cache.invalidate_all()
+    else:
+        user_access_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=XX_UserSegmentAccess)
+@receiver(post_delete, sender=XX_UserSegmentAccess)
+def invalidate_direct_access(sender, instance, **kwargs):
+    user_access_cache.invalidate_user(instance.user_id)
+
+
+@receiver(post_save, sender=XX_SecurityGroup)
+@receiver(post_delete, sender=XX_SecurityGroup)
+@receiver(post_save, sender=XX_SecurityGroupRole)
+@receiver(post_delete, sender=XX_SecurityGroupRole)
+@receiver(post_save, sender=XX_SecurityGroupSegment)
+@receiver(post_delete, sender=XX_SecurityGroupSegment)
+@receiver(post_delete, sender=XX_Segment)
+def invalidate_all_access(sender, **kwargs):
+    """Group, group role/segment and segment hierarchy changes affect every member."""
+    user_access_cache.invalidate_all()
+
+
+# Segment fields the access maps depend on (granted codes and the hierarchy);
+# renames of the alias, level changes etc. leave every map as it was
+SEGMENT_ACCESS_FIELDS = ('segment_type_id', 'code', 'parent_code', 'is_active')
+
+state_tracking.track(XX_Segment)
+
+
+def _segment_access_state(instance):
+    return {attname: getattr(instance, attname) for attname in SEGMENT_ACCESS_FIELDS}
+
+
+@receiver(pre_save, sender=XX_Segment)
+def capture_segment_access_fields(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Remember the access-relevant fields before an update, from the loaded-state snapshot."""
+    if raw or instance._state.adding:
+        return
+    if update_fields is not None and not {
+        instance._meta.get_field(name).attname for name in update_fields
+    } & set(SEGMENT_ACCESS_FIELDS):
+        # None of them is written
+        instance._access_previous = _segment_access_state(instance)
+        return
+    instance._access_previous = state_tracking.previous_values(instance, SEGMENT_ACCESS_FIELDS)
+
+
+@receiver(post_save, sender=XX_Segment)
+def invalidate_segment_access(sender, instance, created, raw=False, **kwargs):
+    """A segment save only affects access maps when it moves a code in or out of the hierarchy."""
+    previous = instance.__dict__.pop('_access_previous', None)
+    if created and not raw:
+        # A new segment is only reachable through its parent until a group grants it
+        changed = bool(instance.parent_code)
+    else:
+        changed = previous != _segment_access_state(instance)
+    if changed:
+        user_access_cache.invalidate_all()
@@ -0,0 +1,145 @@
+"""
+Field-level state tracking for "what did this row look like before the save".
+
+Audit diffs, dashboard counter deltas and the budget transfer submit check
+all need a row's values from before the pending save. Instead of re-reading
+the row in pre_save, tracked models keep a snapshot of their concrete field
+values ({attname: value}):
+
+- taken in post_init, i.e. when the instance is loaded from the database
+  (deferred fields are left out and not loaded)
+- refreshed in post_save, for the fields the save wrote
+- retaken by refresh_from_db() (including deferred field loads), for the
+  fields it reloaded
+
+The snapshot is only trusted for persisted instances (_state.adding is
+False): instances built by hand with an existing pk, or snapshots missing a
+requested (deferred) field, fall back to a single query as before.
+
+Not reflected: queryset.update() and raw SQL writes made after the instance
+was loaded. Unlike the per-save re-read, the snapshot keeps the values as
+loaded until the instance is saved or refreshed, so code that writes behind
+an instance's back must call refresh_from_db() before saving it.
+
+Usage:
+    from user_management import state_tracking
+
+    state_tracking.track(MyModel)
+    previous = state_tracking.previous_values(instance, ["status"])  # None: row not found
+"""
+
+import copy
+import functools
+
+from django.db.models.signals import post_init, post_save
+
+SNAPSHOT_ATTR = "_loaded_state"
+
+_tracked = set()
+
+
+def track(model):
+    """Start snapshotting instances of a concrete model (idempotent)."""
+    if model in _tracked:
+        return
+    _tracked.add(model)
+    post_init.connect(_snapshot_on_init, sender=model, dispatch_uid=f"state_tracking_init_{model._meta.label}")
+    post_save.connect(_snapshot_on_save, sender=model, dispatch_uid=f"state_tracking_save_{model._meta.label}")
+    if not getattr(model.refresh_from_db, "_state_tracking", False):
+        model.refresh_from_db = _snapshot_on_refresh(model.refresh_from_db)
+
+
+def is_tracked(model):
+    return model in _tracked
+
+
+def _copy(value):
+    # JSON fields and the like can be mutated in place
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+def _current_values(instance, attnames=None):
+    values = instance.__dict__
+    if attnames is None:
+        attnames = [field.attname for field in instance._meta.concrete_fields]
+    return {attname: _copy(values[attname]) for attname in attnames if attname in values}
+
+
+def _snapshot_on_init(sender, instance, **kwargs):
+    instance.__dict__[SNAPSHOT_ATTR] = _current_values(instance)
+
+
+def _snapshot_on_save(sender, instance, raw=False, update_fields=None, **kwargs):
+    snapshot = instance.__dict__.setdefault(SNAPSHOT_ATTR, {})
+    if update_fields is None:
+        snapshot.update(_current_values(instance))
+        return
+    attnames = [instance._meta.get_field(name).attname for name in update_fields]
+    snapshot.update(_current_values(instance, attnames))
+
+
+def _snapshot_on_refresh(refresh_from_db):
+    # Django sends no signal for refresh_from_db(): it loads a fresh copy
+    # (whose post_init snapshot is discarded) and copies its values over
+    @functools.wraps(refresh_from_db)
+    def wrapper(self, using=None, fields=None, *args, **kwargs):
+        requested = None if fields is None else set(fields)
+        refresh_from_db(self, using, fields, *args, **kwargs)
+        if requested is None:
+            self.__dict__[SNAPSHOT_ATTR] = _current_values(self)
+            return
+        attnames = [
+            field.attname for field in self._meta.concrete_fields
+            if field.attname in requested or field.name in requested
+        ]
+        self.__dict__.setdefault(SNAPSHOT_ATTR, {}).update(_current_values(self, attnames))
+
+    wrapper._state_tracking = True
+    return wrapper
+
+
+def loaded_state(instance, attnames=None):
+    """
+    The snapshot of a persisted instance, or None when it cannot be trusted.
+
+    Args:
+        attnames: Only return these fields; None if any of them is missing
+    """
+    if instance._state.adding:
+        return None
+    snapshot = instance.__dict__.get(SNAPSHOT_ATTR)
+    if snapshot is None:
+        return None
+    if attnames is None:
+        return dict(snapshot)
+    if any(attname not in snapshot for attname in attnames):
+        return None
+    return {attname: snapshot[attname] for attname in attnames}
+
+
+def previous_values(instance, attnames):
+    """
+    Field values of the instance's row before the pending save.
+
+    Served from the snapshot when possible, otherwise read with one query.
+
+    Returns:
+        {attname: value}, or None if the row does not exist
+    """
+    state = loaded_state(instance, attnames)
+    if state is not None:
+        return state
+    if instance.pk is None:
+        return None
+    return (
+        type(instance)._base_manager.filter(pk=instance.pk)
+        .values(*attnames)
+        .first()
+    )
+
+
+def all_previous_values(instance):
+    """previous_values() for every concrete field."""
+    return previous_values(instance, [field.attname for field in instance._meta.concrete_fields])
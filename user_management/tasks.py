@@ -0,0 +1,37 @@
+"""
+Celery tasks for user management
+"""
+from celery import shared_task
+import logging
+
+from . import audit_rollups
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task
+def rollup_audit_logs():
+    """
+    Roll up the audit log entries of closed days for the statistics endpoint.
+
+    Returns the number of days rolled up.
+    """
+    rolled = audit_rollups.rollup_closed_days()
+    if rolled:
+        logger.info(f"Audit logs: rolled up {rolled} days")
+    return rolled
+
+
+@shared_task
+def archive_audit_logs():
+    """
+    Move raw audit log entries past the retention period to the archive.
+
+    Pending days are rolled up first, since only rolled-up days are archived.
+    Returns the number of entries moved.
+    """
+    audit_rollups.rollup_closed_days()
+    moved = audit_rollups.archive_old_logs()
+    if moved:
+        logger.info(f"Audit logs: archived {moved} entries")
+    return moved
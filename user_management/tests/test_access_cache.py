@@ -0,0 +1,206 @@
+"""
+Tests for the compiled user access maps and their invalidation.
+"""
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from account_and_entitys.models import XX_Segment, XX_SegmentType
+from user_management.access_cache import user_access_cache
+from user_management.models import (
+    XX_AccessVersion,
+    XX_SecurityGroup,
+    XX_SecurityGroupSegment,
+    XX_UserAccessibleSegment,
+    XX_UserGroupMembership,
+    xx_User,
+)
+
+
+def accessible_rows(user):
+    return set(XX_UserAccessibleSegment.objects.filter(user=user).values_list('segment_type_id', 'segment_code'))
+
+
+@override_settings(AUDIT_LOG_SINK={'ASYNC': False})
+class AccessCacheTestCase(TestCase):
+
+    def setUp(self):
+        # Map keys restart from empty tokens after each test's rollback
+        cache.clear()
+        self.entity = XX_SegmentType.objects.create(
+            segment_id=1, segment_name='Entity', segment_type='cost_center',
+            oracle_segment_number=1, has_hierarchy=True,
+        )
+        self.account = XX_SegmentType.objects.create(
+            segment_id=2, segment_name='Account', segment_type='account', oracle_segment_number=2,
+        )
+        # E1 -> E11 -> E111, E2; accounts A1 -> A11 (no hierarchy on the type)
+        self.segments = {}
+        for segment_type, code, parent in (
+            (self.entity, 'E1', None), (self.entity, 'E11', 'E1'), (self.entity, 'E111', 'E11'),
+            (self.entity, 'E2', None), (self.account, 'A1', None), (self.account, 'A11', 'A1'),
+        ):
+            self.segments[code] = XX_Segment.objects.create(segment_type=segment_type, code=code, parent_code=parent)
+
+        self.group = XX_SecurityGroup.objects.create(group_name='ACCESS')
+        self.group_segments = {
+            code: XX_SecurityGroupSegment.objects.create(
+                security_group=self.group, segment_type=self.segments[code].segment_type, segment=self.segments[code]
+            )
+            for code in ('E1', 'E2', 'A1')
+        }
+        self.user = xx_User.objects.create(username='access', role='user')
+        self.membership = XX_UserGroupMembership.objects.create(user=self.user, security_group=self.group)
+
+    def global_version(self):
+        return user_access_cache.get_global_version()
+
+
+class BuildAccessMapTests(AccessCacheTestCase):
+    """Members see their assigned segments, or all of the group's, plus descendants."""
+
+    def test_member_without_assignments_sees_the_group_segments_and_descendants(self):
+        self.assertEqual(user_access_cache.build_access_map(self.user.pk), {
+            self.entity.pk: frozenset({'E1', 'E11', 'E111', 'E2'}),
+            # Account has no hierarchy: its parent_code is not followed
+            self.account.pk: frozenset({'A1'}),
+        })
+
+    def test_member_with_assignments_sees_only_those(self):
+        self.membership.assigned_segments.add(self.group_segments['E2'])
+
+        self.assertEqual(user_access_cache.build_access_map(self.user.pk), {self.entity.pk: frozenset({'E2'})})
+
+    def test_inactive_group_segments_are_left_out(self):
+        XX_SecurityGroupSegment.objects.filter(pk=self.group_segments['E1'].pk).update(is_active=False)
+
+        self.assertEqual(user_access_cache.build_access_map(self.user.pk)[self.entity.pk], frozenset({'E2'}))
+
+    def test_inactive_membership_or_group_grants_nothing(self):
+        XX_UserGroupMembership.objects.filter(pk=self.membership.pk).update(is_active=False)
+        self.assertEqual(user_access_cache.build_access_map(self.user.pk), {})
+
+        XX_UserGroupMembership.objects.filter(pk=self.membership.pk).update(is_active=True)
+        XX_SecurityGroup.objects.filter(pk=self.group.pk).update(is_active=False)
+        self.assertEqual(user_access_cache.build_access_map(self.user.pk), {})
+
+    def test_map_follows_membership_changes(self):
+        self.assertIn('E1', user_access_cache.get_access_map(self.user)[self.entity.pk])
+
+        self.membership.assigned_segments.add(self.group_segments['E2'])
+
+        self.assertEqual(user_access_cache.get_access_map(self.user), {self.entity.pk: frozenset({'E2'})})
+
+    def test_ancestor_chain(self):
+        self.assertEqual(user_access_cache.get_ancestor_chain(self.entity.pk, 'E111'), ['E111', 'E11', 'E1'])
+        self.assertEqual(user_access_cache.get_ancestor_chain(self.account.pk, 'A11'), ['A11'])
+
+
+class SegmentInvalidationTests(AccessCacheTestCase):
+    """Segment saves bump the global version only when the codes or the hierarchy change."""
+
+    def assertBumps(self, change, bumps=True):
+        before = self.global_version()
+        change()
+        if bumps:
+            self.assertNotEqual(self.global_version(), before)
+        else:
+            self.assertEqual(self.global_version(), before)
+
+    def loaded(self, code):
+        return XX_Segment.objects.get(segment_type=self.entity, code=code)
+
+    def test_unrelated_field_change_keeps_the_version(self):
+        segment = self.loaded('E11')
+        segment.alias = 'Renamed'
+        segment.level = 3
+        self.assertBumps(segment.save, bumps=False)
+        self.assertBumps(lambda: segment.save(update_fields=['alias']), bumps=False)
+
+    def test_hierarchy_changes_bump_the_version(self):
+        segment = self.loaded('E111')
+        segment.parent_code = 'E2'
+        self.assertBumps(segment.save)
+
+        segment.is_active = False
+        self.assertBumps(lambda: segment.save(update_fields=['is_active']))
+
+        segment.code = 'E3'
+        self.assertBumps(segment.save)
+
+    def test_new_child_bumps_the_version(self):
+        self.assertBumps(lambda: XX_Segment.objects.create(segment_type=self.entity, code='E4'), bumps=False)
+        self.assertBumps(lambda: XX_Segment.objects.create(segment_type=self.entity, code='E12', parent_code='E1'))
+        self.assertIn('E12', user_access_cache.get_access_map(self.user)[self.entity.pk])
+
+    def test_delete_bumps_the_version(self):
+        self.assertBumps(self.loaded('E111').delete)
+
+    def test_reparented_segment_leaves_the_cached_map(self):
+        self.assertIn('E111', user_access_cache.get_access_map(self.user)[self.entity.pk])
+        self.membership.assigned_segments.add(self.group_segments['E1'])
+
+        segment = self.loaded('E111')
+        segment.parent_code = 'E2'
+        segment.save()
+
+        self.assertEqual(user_access_cache.get_access_map(self.user)[self.entity.pk], frozenset({'E1', 'E11'}))
+
+
+class EnsureMaterializedTests(AccessCacheTestCase):
+    """Accessible segment rows are rewritten only for a newer map key, never for an outdated one."""
+
+    def materialized_key(self):
+        return XX_AccessVersion.objects.get(scope=f'user:{self.user.pk}').materialized
+
+    def test_rows_are_written_once_per_map_key(self):
+        user_access_cache.ensure_materialized(self.user)
+        self.assertEqual(accessible_rows(self.user), {
+            (self.entity.pk, 'E1'), (self.entity.pk, 'E11'), (self.entity.pk, 'E111'), (self.entity.pk, 'E2'),
+            (self.account.pk, 'A1'),
+        })
+        key = self.materialized_key()
+
+        with mock.patch.object(XX_UserAccessibleSegment.objects, 'bulk_create') as bulk_create:
+            user_access_cache.ensure_materialized(self.user)
+        bulk_create.assert_not_called()
+        self.assertEqual(self.materialized_key(), key)
+
+    def test_version_bump_rewrites_the_rows(self):
+        user_access_cache.ensure_materialized(self.user)
+        key = self.materialized_key()
+
+        self.membership.assigned_segments.add(self.group_segments['A1'])
+        user_access_cache.ensure_materialized(self.user)
+
+        self.assertNotEqual(self.materialized_key(), key)
+        self.assertEqual(accessible_rows(self.user), {(self.account.pk, 'A1')})
+
+    def test_map_outdated_while_building_is_not_written(self):
+        build_access_map = user_access_cache.build_access_map
+        bumped = []
+
+        def build_then_change(user_id):
+            access_map = build_access_map(user_id)
+            if not bumped:
+                # Another process changes the user's access meanwhile
+                bumped.append(True)
+                self.membership.assigned_segments.add(self.group_segments['E2'])
+            return access_map
+
+        with mock.patch.object(user_access_cache, 'build_access_map', side_effect=build_then_change):
+            access_map = user_access_cache.ensure_materialized(self.user)
+
+        self.assertEqual(access_map, {self.entity.pk: frozenset({'E2'})})
+        self.assertEqual(accessible_rows(self.user), {(self.entity.pk, 'E2')})
+        self.assertEqual(self.materialized_key(), user_access_cache._map_key(self.user.pk))
+
+    def test_accessible_filter_uses_the_rows(self):
+        self.membership.assigned_segments.add(self.group_segments['E1'])
+        user_access_cache.ensure_materialized(self.user)
+
+        codes = XX_Segment.objects.filter(user_access_cache.accessible_filter(self.user)).values_list('code', flat=True)
+
+        self.assertEqual(set(codes), {'E1', 'E11', 'E111'})
@@ -0,0 +1,134 @@
+"""
+Tests for the daily audit log rollups and retention.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from user_management import audit_rollups
+from user_management.audit_models import XX_AuditLog, XX_AuditLogArchive, XX_AuditLogRollupDay
+from user_management.models import xx_User
+
+
+@override_settings(
+    AUDIT_LOG_SINK={"ASYNC": False},
+    AUDIT_LOG_ROLLUP={"RETENTION_DAYS": 90, "ARCHIVE": True, "BATCH_SIZE": 2, "GRACE_MINUTES": 0},
+)
+class AuditRollupTests(TestCase):
+    """Statistics count the same entries whether they are raw, rolled up or archived."""
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.alice = xx_User.objects.create(username="alice", role="user")
+        self.bob = xx_User.objects.create(username="bob", role="user")
+        self.log(self.alice, 110, "LOGIN", "auth")
+        self.log(self.bob, 110, "UPDATE", "budget", severity="WARNING")
+        self.log(self.alice, 100, "UPDATE", "budget")
+        self.log(self.alice, 5, "CREATE", "budget")
+        self.log(self.bob, 5, "DELETE", "budget", severity="ERROR")
+        self.log(self.bob, 1, "UPDATE", "approvals")
+        self.log(self.alice, 0, "LOGIN", "auth")
+
+    def log(self, user, days_ago, action_type, module, severity="INFO"):
+        XX_AuditLog.objects.bulk_create([XX_AuditLog(
+            user=user,
+            username=user.username,
+            action_type=action_type,
+            action_description=f"{action_type} {module}",
+            module=module,
+            severity=severity,
+            timestamp=audit_rollups.day_start(self.today - timedelta(days=days_ago)) + timedelta(hours=12),
+        )])
+
+    def statistics(self, user=None):
+        return audit_rollups.audit_statistics(self.today - timedelta(days=365), user=user)
+
+    def snapshot(self):
+        return {user: self.statistics(user) for user in (None, self.alice, self.bob)}
+
+    def test_statistics_are_unchanged_by_rollup_and_archive(self):
+        before = self.snapshot()
+        self.assertEqual(before[None]["total_actions"], 7)
+        self.assertEqual(before[None]["actions_by_user"], {"alice": 4, "bob": 3})
+        self.assertEqual(before[None]["actions_by_severity"], {"INFO": 5, "WARNING": 1, "ERROR": 1})
+
+        self.assertEqual(audit_rollups.rollup_closed_days(), 110)
+        self.assertEqual(audit_rollups.rolled_until(), self.today)
+        self.assertEqual(self.snapshot(), before)
+
+        self.assertEqual(audit_rollups.archive_old_logs(), 3)
+        self.assertEqual(XX_AuditLogArchive.objects.count(), 3)
+        self.assertEqual(XX_AuditLog.objects.count(), 4)
+        self.assertEqual(self.snapshot(), before)
+
+    def test_per_user_statistics(self):
+        audit_rollups.rollup_closed_days()
+
+        alice = self.statistics(self.alice)
+
+        self.assertEqual(alice["total_actions"], 4)
+        self.assertEqual(alice["actions_by_user"], {"alice": 4})
+        self.assertEqual(alice["actions_by_type"], {"LOGIN": 2, "UPDATE": 1, "CREATE": 1})
+        self.assertEqual(alice["actions_by_module"], {"auth": 2, "budget": 2})
+
+    def test_rolled_up_days_come_from_rollups_and_later_days_from_raw_entries(self):
+        audit_rollups.rollup_closed_days()
+        before = self.statistics()["total_actions"]
+
+        # A late entry of a rolled-up day only counts once that day is rolled up again
+        self.log(self.bob, 1, "UPDATE", "approvals")
+        self.assertEqual(self.statistics()["total_actions"], before)
+        audit_rollups.rollup_day(self.today - timedelta(days=1))
+        self.assertEqual(self.statistics()["total_actions"], before + 1)
+
+        # Entries from rolled_until() on are read raw
+        self.log(self.alice, 0, "LOGIN", "auth")
+        self.assertEqual(self.statistics()["total_actions"], before + 2)
+
+    def test_statistics_start_inside_the_rolled_up_days(self):
+        audit_rollups.rollup_closed_days()
+
+        recent = audit_rollups.audit_statistics(self.today - timedelta(days=5))
+
+        self.assertEqual(recent["actions_by_type"], {"CREATE": 1, "DELETE": 1, "UPDATE": 1, "LOGIN": 1})
+
+    def test_archive_cutoff_never_passes_the_rolled_up_days(self):
+        # Only the days up to 106 days ago are closed at that time
+        rolled = audit_rollups.rollup_closed_days(now=audit_rollups.day_start(self.today - timedelta(days=105)))
+        self.assertEqual(rolled, 5)
+        before = self.snapshot()
+
+        self.assertEqual(audit_rollups.archive_old_logs(), 2)
+
+        # The entry 100 days ago is past the retention but not rolled up yet
+        self.assertTrue(XX_AuditLog.objects.filter(
+            timestamp__lt=audit_rollups.day_start(self.today - timedelta(days=99))
+        ).exists())
+        self.assertFalse(XX_AuditLog.objects.filter(
+            timestamp__lt=audit_rollups.day_start(self.today - timedelta(days=105))
+        ).exists())
+        self.assertEqual(self.snapshot(), before)
+        self.assertFalse(
+            XX_AuditLogRollupDay.objects.filter(archived=True, day__gte=audit_rollups.rolled_until()).exists()
+        )
+
+    def test_archived_days_are_not_rolled_up_again(self):
+        audit_rollups.rollup_closed_days()
+        audit_rollups.archive_old_logs()
+        before = self.snapshot()
+
+        self.assertIsNone(audit_rollups.rollup_day(self.today - timedelta(days=110)))
+
+        self.assertEqual(self.snapshot(), before)
+
+    @override_settings(AUDIT_LOG_ROLLUP={"RETENTION_DAYS": 90, "ARCHIVE": False, "GRACE_MINUTES": 0})
+    def test_delete_retention_keeps_the_statistics(self):
+        audit_rollups.rollup_closed_days()
+        before = self.snapshot()
+
+        self.assertEqual(audit_rollups.archive_old_logs(), 3)
+
+        self.assertEqual(XX_AuditLogArchive.objects.count(), 0)
+        self.assertEqual(self.snapshot(), before)
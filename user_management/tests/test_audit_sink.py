@@ -0,0 +1,136 @@
+"""
+Tests for the batched audit log writer.
+
+The writer loop runs in the test thread: a second thread would need its own
+connection to the test database, which holds the test's open transaction.
+"""
+
+import os
+import queue
+from unittest import mock
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from user_management import audit_sink as audit_sink_module
+from user_management.audit_models import XX_AuditLog
+from user_management.audit_sink import AuditSink
+
+
+def sink_settings(**overrides):
+    return override_settings(AUDIT_LOG_SINK={"ASYNC": True, "PUT_TIMEOUT": 0, "FLUSH_INTERVAL": 0.01, **overrides})
+
+
+def record(index=0):
+    return XX_AuditLog(username="sink", action_type="UPDATE", action_description=f"Audit record {index}")
+
+
+class AuditSinkTests(TestCase):
+    """Records are queued once their transaction commits and written in batches."""
+
+    def setUp(self):
+        self.sink = AuditSink()
+        close = mock.patch.object(audit_sink_module, "close_old_connections")
+        self.close_old_connections = close.start()
+        self.addCleanup(close.stop)
+
+    def start_queue(self):
+        """Set up the sink's queue without starting its writer thread."""
+        self.sink._queue = queue.Queue(maxsize=self.sink._setting("MAX_QUEUE_SIZE"))
+        self.sink._pid = os.getpid()
+        started = mock.patch.object(self.sink, "_ensure_started")
+        started.start()
+        self.addCleanup(started.stop)
+
+    def submit(self, count):
+        with self.captureOnCommitCallbacks(execute=True):
+            for index in range(count):
+                self.sink.submit(record(index))
+
+    def run_writer(self):
+        """Run the writer loop until the queue is empty; returns the batch sizes written."""
+        batches = []
+        write = self.sink._write
+
+        def write_and_stop_when_drained(records):
+            batches.append(len(records))
+            write(records)
+            if self.sink._queue.empty():
+                self.sink._stopping.set()
+
+        with mock.patch.object(self.sink, "_write", side_effect=write_and_stop_when_drained):
+            self.sink._run()
+        return batches
+
+    @sink_settings(ASYNC=False)
+    def test_inline_writes_happen_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.sink.submit(record())
+            self.assertEqual(XX_AuditLog.objects.count(), 0)
+
+        self.assertEqual(XX_AuditLog.objects.count(), 1)
+        self.assertEqual(self.sink.stats()["written"], 1)
+        # The caller's connection is left alone
+        self.close_old_connections.assert_not_called()
+
+    @sink_settings()
+    def test_nothing_is_queued_when_the_transaction_rolls_back(self):
+        self.start_queue()
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.sink.submit(record())
+                raise RuntimeError("rolled back")
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self.sink.stats(), {"submitted": 0, "written": 0, "dropped": 0, "failed": 0, "queued": 0})
+
+    @sink_settings(BATCH_SIZE=2)
+    def test_writer_writes_in_batches(self):
+        self.start_queue()
+        self.submit(5)
+        self.assertEqual(XX_AuditLog.objects.count(), 0)
+
+        self.assertEqual(self.run_writer(), [2, 2, 1])
+
+        self.assertEqual(XX_AuditLog.objects.count(), 5)
+        self.assertEqual(self.sink.stats()["written"], 5)
+        # Stale connections are only replaced by the writer, once per batch
+        self.assertEqual(self.close_old_connections.call_count, 3)
+
+    @sink_settings(BATCH_SIZE=2)
+    def test_flush_writes_everything_queued(self):
+        self.start_queue()
+        self.submit(3)
+
+        self.assertEqual(self.sink.flush(), 3)
+
+        self.assertEqual(XX_AuditLog.objects.count(), 3)
+        self.assertEqual(self.sink.stats()["queued"], 0)
+        self.assertEqual(self.sink.flush(), 0)
+        self.close_old_connections.assert_not_called()
+
+    @sink_settings(MAX_QUEUE_SIZE=1, OVERFLOW="drop")
+    def test_drop_overflow_discards_records(self):
+        self.start_queue()
+
+        with self.assertLogs("user_management.audit_sink", "WARNING") as logs:
+            self.submit(3)
+
+        self.assertEqual(self.sink.stats()["queued"], 1)
+        self.assertEqual(self.sink.stats()["dropped"], 2)
+        # Warned once per DROP_WARNING_INTERVAL, not per record
+        self.assertEqual(len(logs.output), 1)
+        self.sink.flush()
+        self.assertEqual(XX_AuditLog.objects.count(), 1)
+
+    @sink_settings(MAX_QUEUE_SIZE=1, OVERFLOW="sync")
+    def test_sync_overflow_writes_inline(self):
+        self.start_queue()
+
+        self.submit(3)
+
+        self.assertEqual(self.sink.stats()["queued"], 1)
+        self.assertEqual(self.sink.stats()["dropped"], 0)
+        self.assertEqual(XX_AuditLog.objects.count(), 2)
+        self.close_old_connections.assert_not_called()
@@ -0,0 +1,92 @@
+"""
+Tests for the loaded-state snapshots of tracked models.
+"""
+
+from decimal import Decimal
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from transaction.models import xx_TransactionTransfer
+from user_management import state_tracking
+
+
+@override_settings(AUDIT_LOG_SINK={'ASYNC': False})
+class StateTrackingTests(TestCase):
+    """previous_values() matches the row as last loaded, saved or refreshed."""
+
+    FIELDS = ['from_center', 'to_center']
+
+    def setUp(self):
+        # Dashboards are refreshed by their own background task
+        dirty = mock.patch('budget_management.signals.transcation_transfer.mark_dashboard_dirty')
+        dirty.start()
+        self.addCleanup(dirty.stop)
+        self.pk = xx_TransactionTransfer.objects.create(from_center=Decimal('1'), to_center=Decimal('2')).pk
+
+    def load(self, *only):
+        queryset = xx_TransactionTransfer.objects.all()
+        if only:
+            queryset = queryset.only(*only)
+        return queryset.get(pk=self.pk)
+
+    def previous(self, instance, queries=0):
+        with self.assertNumQueries(queries):
+            return state_tracking.previous_values(instance, self.FIELDS)
+
+    def test_model_is_tracked(self):
+        self.assertTrue(state_tracking.is_tracked(xx_TransactionTransfer))
+
+    def test_load_then_save(self):
+        line = self.load()
+        self.assertEqual(self.previous(line), {'from_center': Decimal('1'), 'to_center': Decimal('2')})
+
+        line.from_center = Decimal('5')
+        # Unsaved edits are not part of the snapshot
+        self.assertEqual(self.previous(line)['from_center'], Decimal('1'))
+
+        line.save()
+        self.assertEqual(self.previous(line), {'from_center': Decimal('5'), 'to_center': Decimal('2')})
+
+    def test_update_fields_only_snapshots_the_written_fields(self):
+        line = self.load()
+        line.from_center = Decimal('5')
+        line.to_center = Decimal('6')
+
+        line.save(update_fields=['from_center'])
+
+        # to_center was not written: the row still holds the loaded value
+        self.assertEqual(self.previous(line), {'from_center': Decimal('5'), 'to_center': Decimal('2')})
+        self.assertEqual(self.load().to_center, Decimal('2'))
+
+    def test_refresh_from_db_retakes_the_snapshot(self):
+        line = self.load()
+        xx_TransactionTransfer.objects.filter(pk=self.pk).update(from_center=Decimal('7'), to_center=Decimal('8'))
+        # Written behind the instance's back: not visible until it is refreshed
+        self.assertEqual(self.previous(line)['from_center'], Decimal('1'))
+
+        line.refresh_from_db(fields=['to_center'])
+        self.assertEqual(self.previous(line), {'from_center': Decimal('1'), 'to_center': Decimal('8')})
+
+        line.refresh_from_db()
+        self.assertEqual(self.previous(line), {'from_center': Decimal('7'), 'to_center': Decimal('8')})
+
+    def test_deferred_fields_are_snapshotted_when_loaded(self):
+        line = self.load('transfer_id', 'from_center')
+        self.assertEqual(self.previous(line, queries=1), {'from_center': Decimal('1'), 'to_center': Decimal('2')})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(line.to_center, Decimal('2'))
+        self.assertEqual(self.previous(line), {'from_center': Decimal('1'), 'to_center': Decimal('2')})
+
+    def test_hand_built_instance_with_a_pk_reads_the_row(self):
+        line = xx_TransactionTransfer(pk=self.pk, from_center=Decimal('9'), to_center=Decimal('9'))
+
+        self.assertIsNone(state_tracking.loaded_state(line))
+        self.assertEqual(self.previous(line, queries=1), {'from_center': Decimal('1'), 'to_center': Decimal('2')})
+
+        line.save()
+        self.assertEqual(self.previous(line), {'from_center': Decimal('9'), 'to_center': Decimal('9')})
+
+    def test_new_instance_has_no_previous_values(self):
+        self.assertIsNone(self.previous(xx_TransactionTransfer(from_center=Decimal('1'))))
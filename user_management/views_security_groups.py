@@ -18,6 +18,7 @@ from user_management.models import (
 )
 from account_and_entitys.models import XX_SegmentType, XX_Segment
 from user_management.managers.security_group_manager import SecurityGroupManager
+from user_management.access_cache import user_access_cache
 
 
 class SystemRolesView(APIView):
@@ -231,8 +232,10 @@ class SecurityGroupDetailView(APIView):
         group.is_active = False
         group.save()
         
-        # Deactivate all memberships
+        # Deactivate all memberships; bulk updates send no signals, and
+        # every member's access map changes
         XX_UserGroupMembership.objects.filter(security_group=group).update(is_active=False)
+        user_access_cache.invalidate_all()
         
         return Response({
             'message': f'Security group "{group.group_name}" deactivated successfully'